@@ -0,0 +1,118 @@
+"""
+Benchmarks access rule resolution on a synthetic org.
+
+Usage:
+    python dev_tools/benchmarks/access_rules.py --accounts 1000 --models 500
+
+Every access model is evaluated on every account with evaluate_on_provider
+and with an AccessRuleMatrix, then update_access_attributes is timed for the same models
+as it runs during an import merge.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+import iambic.core.utils as utils
+from iambic.core.template_generation import update_access_attributes
+from iambic.plugins.v0_1_0.aws.models import AccessModel, AWSAccount
+
+ENVIRONMENTS = ("dev", "staging", "qa", "prod")
+
+
+def get_accounts(account_count: int) -> list[AWSAccount]:
+    return [
+        AWSAccount(
+            account_id=str(100000000000 + elem),
+            account_name=f"{ENVIRONMENTS[elem % len(ENVIRONMENTS)]}-{elem}",
+            org_id=f"o-{elem % 3}",
+        )
+        for elem in range(account_count)
+    ]
+
+
+def get_access_models(
+    accounts: list[AWSAccount], model_count: int
+) -> list[tuple[AccessModel, AccessModel]]:
+    rand = random.Random(0)
+    access_models = []
+    for _ in range(model_count):
+        environment = rand.choice(ENVIRONMENTS)
+        existing_model = AccessModel(
+            included_accounts=[f"{environment}-*"],
+            excluded_accounts=[
+                account.account_name for account in rand.sample(accounts, 5)
+            ],
+        )
+        # The accounts the resource was found on during the import
+        new_model = AccessModel(
+            included_accounts=[
+                account.account_name
+                for account in accounts
+                if account.account_name.startswith(environment) and rand.random() > 0.01
+            ],
+        )
+        access_models.append((new_model, existing_model))
+    return access_models
+
+
+def run_evaluate_on_provider(accounts, access_models) -> int:
+    return sum(
+        utils.evaluate_on_provider(existing_model, account, False)
+        for _, existing_model in access_models
+        for account in accounts
+    )
+
+
+def run_access_rule_matrix(accounts, access_models) -> int:
+    access_rule_matrix = utils.AccessRuleMatrix(accounts)
+    return sum(
+        bin(access_rule_matrix.evaluate(existing_model, False)).count("1")
+        for _, existing_model in access_models
+    )
+
+
+def run_update_access_attributes(accounts, access_models):
+    for new_model, existing_model in access_models:
+        update_access_attributes(new_model.copy(), existing_model.copy(), accounts)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--accounts", type=int, default=1000)
+    parser.add_argument("--models", type=int, default=500)
+    args = parser.parse_args()
+
+    accounts = get_accounts(args.accounts)
+    access_models = get_access_models(accounts, args.models)
+
+    expected, evaluate_seconds = timed(
+        run_evaluate_on_provider, accounts, access_models
+    )
+    result, matrix_seconds = timed(run_access_rule_matrix, accounts, access_models)
+    assert result == expected, "AccessRuleMatrix does not match evaluate_on_provider"
+    print(
+        f"evaluate_on_provider  accounts={args.accounts} models={args.models} "
+        f"seconds={evaluate_seconds:.2f}"
+    )
+    print(
+        f"AccessRuleMatrix      accounts={args.accounts} models={args.models} "
+        f"seconds={matrix_seconds:.2f} speedup={evaluate_seconds / matrix_seconds:.2f}x"
+    )
+
+    _, update_seconds = timed(run_update_access_attributes, accounts, access_models)
+    print(
+        f"update_access_attributes accounts={args.accounts} models={args.models} "
+        f"seconds={update_seconds:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
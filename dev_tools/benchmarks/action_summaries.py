@@ -0,0 +1,107 @@
+"""
+Benchmarks compiling and rendering the plan summary of a synthetic plan.
+
+Usage:
+    python dev_tools/benchmarks/action_summaries.py --changes 100000 [--render]
+
+The changes are spread across templates and accounts the way an apply reports them.
+The summary is compiled once with ActionSummaries.compile.
+With --render, the file, screen and markdown renderers are then timed
+as they run after a plan, sharing the compiled summary.
+Rendering the rich trees of every change takes minutes at 100k changes.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+
+from iambic.core.models import (
+    AccountChangeDetails,
+    ProposedChange,
+    ProposedChangeType,
+    TemplateChangeDetails,
+)
+from iambic.output.markdown import gh_render_resource_changes
+from iambic.output.models import ActionSummaries
+from iambic.output.text import (
+    file_render_resource_changes,
+    screen_render_resource_changes,
+)
+
+CHANGES_PER_ACCOUNT = 5
+ACCOUNTS_PER_TEMPLATE = 10
+CHANGE_TYPES = list(ProposedChangeType)
+
+
+def get_template_changes(change_count: int) -> list[TemplateChangeDetails]:
+    changes_per_template = CHANGES_PER_ACCOUNT * ACCOUNTS_PER_TEMPLATE
+    return [
+        TemplateChangeDetails(
+            resource_id=f"role-{elem}",
+            resource_type="aws:iam:role",
+            template_path=f"resources/aws/iam/role/role-{elem}.yaml",
+            proposed_changes=[
+                AccountChangeDetails(
+                    account=f"account-{account} - ({100000000000 + account})",
+                    resource_id=f"role-{elem}",
+                    proposed_changes=[
+                        ProposedChange(
+                            change_type=CHANGE_TYPES[(elem + change) % 3],
+                            resource_id=f"role-{elem}",
+                            resource_type="aws:iam:role",
+                            attribute=f"attribute_{change}",
+                            current_value={"description": "before"},
+                            new_value={"description": "after"},
+                        )
+                        for change in range(CHANGES_PER_ACCOUNT)
+                    ],
+                )
+                for account in range(ACCOUNTS_PER_TEMPLATE)
+            ],
+        )
+        for elem in range(max(change_count // changes_per_template, 1))
+    ]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--changes", type=int, default=100000)
+    parser.add_argument("--render", action="store_true")
+    args = parser.parse_args()
+
+    template_changes = get_template_changes(args.changes)
+    action_summaries, compile_seconds = timed(ActionSummaries.compile, template_changes)
+    print(
+        f"compile changes={args.changes} templates={len(template_changes)} "
+        f"seconds={compile_seconds:.2f} "
+        f"actions={action_summaries.num_create_actions + action_summaries.num_update_actions + action_summaries.num_delete_actions}"
+    )
+
+    if not args.render:
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "proposed_changes.txt")
+        _, file_seconds = timed(
+            file_render_resource_changes, file_path, template_changes
+        )
+        _, screen_seconds = timed(screen_render_resource_changes, template_changes)
+        _, markdown_seconds = timed(gh_render_resource_changes, template_changes)
+
+    print(
+        f"render file_seconds={file_seconds:.2f} "
+        f"screen_seconds={screen_seconds:.2f} "
+        f"markdown_seconds={markdown_seconds:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
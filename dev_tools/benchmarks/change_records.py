@@ -0,0 +1,124 @@
+"""
+Benchmarks creating and outputting the change records of a synthetic full-repo plan.
+
+Usage:
+    python dev_tools/benchmarks/change_records.py --changes 100000 [--validate]
+
+The changes are spread across templates and accounts the way a plan reports them.
+The records are created the way the providers create them and then output
+as output_proposed_changes does, which is when they are validated.
+With --validate, every record is fully validated as it's created instead,
+the way the change records behaved before they skipped validation.
+The peak memory of the records is measured with tracemalloc.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+
+from iambic.core.models import (
+    AccountChangeDetails,
+    ProposedChange,
+    ProposedChangeType,
+    TemplateChangeDetails,
+)
+
+CHANGES_PER_ACCOUNT = 5
+ACCOUNTS_PER_TEMPLATE = 10
+CHANGE_TYPES = list(ProposedChangeType)
+
+
+def new_record(record_cls, validate: bool, **kwargs):
+    if validate:
+        return record_cls.parse_obj(kwargs)
+    return record_cls(**kwargs)
+
+
+def get_template_changes(
+    change_count: int, validate: bool
+) -> list[TemplateChangeDetails]:
+    changes_per_template = CHANGES_PER_ACCOUNT * ACCOUNTS_PER_TEMPLATE
+    template_changes = []
+    for elem in range(max(change_count // changes_per_template, 1)):
+        template_change = new_record(
+            TemplateChangeDetails,
+            validate,
+            resource_id=f"role-{elem}",
+            resource_type="aws:iam:role",
+            template_path=f"resources/aws/iam/role/role-{elem}.yaml",
+        )
+        account_changes = []
+        for account in range(ACCOUNTS_PER_TEMPLATE):
+            account_change = new_record(
+                AccountChangeDetails,
+                validate,
+                account=f"account-{account} - ({100000000000 + account})",
+                resource_id=f"role-{elem}",
+                new_value={"description": "after"},
+                proposed_changes=[],
+            )
+            account_change.extend_changes(
+                [
+                    new_record(
+                        ProposedChange,
+                        validate,
+                        change_type=CHANGE_TYPES[(elem + change) % 3],
+                        resource_id=f"role-{elem}",
+                        resource_type="aws:iam:role",
+                        attribute=f"attribute_{change}",
+                        current_value={"description": "before"},
+                        new_value={"description": "after"},
+                    )
+                    for change in range(CHANGES_PER_ACCOUNT)
+                ]
+            )
+            account_changes.append(account_change)
+        template_change.extend_changes(account_changes)
+        if validate:
+            # Providers return the template change and it's validated as part of the response
+            template_change = TemplateChangeDetails.parse_obj(
+                {**template_change.__dict__}
+            )
+        template_changes.append(template_change)
+    return template_changes
+
+
+def output_template_changes(template_changes: list[TemplateChangeDetails]) -> int:
+    return len(
+        [template_change.validated().dict() for template_change in template_changes]
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--changes", type=int, default=100000)
+    parser.add_argument("--validate", action="store_true")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    template_changes = get_template_changes(args.changes, args.validate)
+    create_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    output_template_changes(template_changes)
+    output_seconds = time.perf_counter() - start
+    del template_changes
+
+    # Measured separately as tracemalloc slows down creating the records
+    tracemalloc.start()
+    template_changes = get_template_changes(args.changes, args.validate)
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"changes={args.changes} templates={len(template_changes)} "
+        f"validate={args.validate} "
+        f"create_seconds={create_seconds:.2f} "
+        f"output_seconds={output_seconds:.2f} "
+        f"peak_mb={peak_bytes / 1024 / 1024:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmarks the generate phase of an AWS role import across process pool sizes.
+
+Usage:
+    python dev_tools/benchmarks/template_generation.py --roles 2000 --accounts 10
+
+Synthetic role responses are written to a temp directory, then create_templated_resources
+is timed for every pool size so the speedup with core count can be compared.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from multiprocessing import cpu_count
+
+import iambic.plugins.v0_1_0.aws.template_generation as template_generation
+from iambic.core.models import Variable
+from iambic.plugins.v0_1_0.aws.iam.role.template_generation import create_templated_role
+from iambic.plugins.v0_1_0.aws.iambic_plugin import AWSConfig
+from iambic.plugins.v0_1_0.aws.models import AWSAccount
+
+
+def get_role_response(role_name: str, account_id: str) -> dict:
+    return {
+        "RoleName": role_name,
+        "Path": "/",
+        "Arn": f"arn:aws:iam::{account_id}:role/{role_name}",
+        "MaxSessionDuration": 3600,
+        "Description": f"{role_name} used by the benchmark",
+        "AssumeRolePolicyDocument": {
+            "Version": "2012-10-17",
+            "Statement": [
+                {
+                    "Effect": "Allow",
+                    "Principal": {"Service": "ec2.amazonaws.com"},
+                    "Action": "sts:AssumeRole",
+                }
+            ],
+        },
+        "Tags": [{"Key": "owner", "Value": "benchmark"}],
+        "ManagedPolicies": [
+            {"PolicyArn": "arn:aws:iam::aws:policy/ReadOnlyAccess"},
+        ],
+        "InlinePolicies": [
+            {
+                "PolicyName": "s3",
+                "Version": "2012-10-17",
+                "Statement": [
+                    {
+                        "Effect": "Allow",
+                        "Action": ["s3:GetObject", "s3:ListBucket"],
+                        "Resource": [f"arn:aws:s3:::{account_id}-bucket/*"],
+                    }
+                ],
+            }
+        ],
+    }
+
+
+def setup(base_dir: str, role_count: int, account_count: int):
+    aws_accounts = []
+    for elem in range(account_count):
+        account = AWSAccount(
+            account_id=str(100000000000 + elem), account_name=f"account_{elem}"
+        )
+        account.variables = [
+            Variable(key="account_id", value=account.account_id),
+            Variable(key="account_name", value=account.account_name),
+        ]
+        aws_accounts.append(account)
+
+    grouped_role_map = {}
+    for role_elem in range(role_count):
+        role_name = f"benchmark_role_{role_elem}"
+        grouped_role_map[role_name] = []
+        for aws_account in aws_accounts:
+            path = os.path.join(
+                base_dir, "responses", aws_account.account_id, f"{role_name}.json"
+            )
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(
+                    json.dumps(get_role_response(role_name, aws_account.account_id))
+                )
+            grouped_role_map[role_name].append(
+                {"account_id": aws_account.account_id, "path": path}
+            )
+
+    return aws_accounts, grouped_role_map
+
+
+async def run(aws_accounts, grouped_role_map, output_dir: str, processes: int):
+    return await template_generation.create_templated_resources(
+        create_templated_role,
+        {account.account_id: account for account in aws_accounts},
+        grouped_role_map,
+        output_dir,
+        {},
+        AWSConfig(accounts=aws_accounts),
+        processes=processes,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--roles", type=int, default=1000)
+    parser.add_argument("--accounts", type=int, default=10)
+    parser.add_argument(
+        "--processes",
+        type=int,
+        nargs="*",
+        default=sorted({1, 2, 4, max(1, cpu_count() // 2), cpu_count()}),
+    )
+    args = parser.parse_args()
+    template_generation.TEMPLATE_GENERATION_POOL_THRESHOLD = 0
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        aws_accounts, grouped_role_map = setup(base_dir, args.roles, args.accounts)
+        baseline = None
+        for processes in args.processes:
+            output_dir = os.path.join(base_dir, f"templates_{processes}")
+            start = time.perf_counter()
+            asyncio.run(run(aws_accounts, grouped_role_map, output_dir, processes))
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(
+                f"processes={processes:<4} roles={args.roles} accounts={args.accounts} "
+                f"seconds={elapsed:.2f} speedup={baseline / elapsed:.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
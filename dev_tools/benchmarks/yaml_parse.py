@@ -0,0 +1,111 @@
+"""
+Benchmarks template parse and dump throughput.
+
+Usage:
+    python dev_tools/benchmarks/yaml_parse.py --templates 2000
+
+Synthetic role templates, as written by BaseTemplate.write, are loaded
+with the round-trip loader and with the fast loader used for files without comments,
+then dumped again to check the output is byte-identical.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+
+from iambic.core.utils import load_template_dict
+from iambic.plugins.v0_1_0.aws.iam.role.models import AwsIamRoleTemplate
+
+
+def get_template(elem: int, file_path: str) -> AwsIamRoleTemplate:
+    return AwsIamRoleTemplate(
+        file_path=file_path,
+        identifier=f"role-{elem}",
+        included_accounts=["dev-*", "staging-*"],
+        properties={
+            "role_name": f"role-{elem}",
+            "description": f"Role {elem} used by the benchmark",
+            "assume_role_policy_document": {
+                "version": "2012-10-17",
+                "statement": [
+                    {
+                        "action": "sts:AssumeRole",
+                        "effect": "Allow",
+                        "principal": {"service": "ec2.amazonaws.com"},
+                    }
+                ],
+            },
+            "inline_policies": [
+                {
+                    "policy_name": f"policy-{policy}",
+                    "statement": [
+                        {
+                            "action": ["s3:GetObject", "s3:ListBucket"],
+                            "effect": "Allow",
+                            "resource": [
+                                f"arn:aws:s3:::bucket-{elem}-{policy}",
+                                f"arn:aws:s3:::bucket-{elem}-{policy}/*",
+                            ],
+                        }
+                    ],
+                }
+                for policy in range(5)
+            ],
+            "tags": [{"key": "owner", "value": f"team-{elem % 10}"}],
+        },
+    )
+
+
+def run_load(file_paths: list[str], round_trip: bool) -> list[dict]:
+    return [
+        load_template_dict(file_path, round_trip=round_trip) for file_path in file_paths
+    ]
+
+
+def run_dump(file_paths: list[str], template_dicts: list[dict]) -> list[str]:
+    return [
+        AwsIamRoleTemplate(file_path=file_path, **template_dict).get_body()
+        for file_path, template_dict in zip(file_paths, template_dicts)
+    ]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--templates", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_paths = []
+        for elem in range(args.templates):
+            file_path = os.path.join(temp_dir, f"role-{elem}.yaml")
+            get_template(elem, file_path).write()
+            file_paths.append(file_path)
+
+        results = {}
+        for round_trip in (True, False):
+            template_dicts, load_seconds = timed(run_load, file_paths, round_trip)
+            bodies, dump_seconds = timed(run_dump, file_paths, template_dicts)
+            results[round_trip] = bodies
+            print(
+                f"{'round-trip' if round_trip else 'fast':<10} templates={args.templates} "
+                f"load_seconds={load_seconds:.2f} "
+                f"templates_per_second={args.templates / load_seconds:.0f} "
+                f"dump_seconds={dump_seconds:.2f}"
+            )
+
+        for file_path, body in zip(file_paths, results[False]):
+            with open(file_path) as f:
+                assert f.read() == body, f"{file_path} is not byte-identical"
+        assert results[True] == results[False]
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,11 @@ from __future__ import annotations
 
 import asyncio
 import importlib
+import inspect
 import itertools
 import os
 import subprocess
+import time
 import traceback
 from collections import defaultdict
 from enum import Enum
@@ -14,13 +16,16 @@ from typing import List, Optional, Union
 from uuid import uuid4
 
 import ujson as json
+import xxhash
 from botocore.exceptions import ClientError, NoCredentialsError
 from pydantic import BaseModel, Field
 from pydantic import create_model as create_pydantic_model
 
-import iambic.plugins.v0_1_0.github
+from iambic.core.change_stream import template_change_stream
 from iambic.core.context import ctx
 from iambic.core.exceptions import MultipleSecretsNotAcceptedException
+from iambic.core.executor import Executor, get_executor
+from iambic.core.expiry_index import expiry_index
 from iambic.core.iambic_plugin import ProviderPlugin
 from iambic.core.logger import log
 from iambic.core.models import (
@@ -28,9 +33,17 @@ from iambic.core.models import (
     ConfigMixin,
     ExecutionMessage,
     TemplateChangeDetails,
+    rendered_resources,
+    template_deletions,
+    template_write_stats,
+)
+from iambic.core.telemetry import telemetry
+from iambic.core.utils import sort_dict, template_provider_index, yaml
+from iambic.plugins.v0_1_0 import (
+    DEFAULT_PLUGIN_NAMES,
+    PLUGIN_VERSION,
+    get_default_plugin_location,
 )
-from iambic.core.utils import sort_dict, yaml
-from iambic.plugins.v0_1_0 import PLUGIN_VERSION, aws, azure_ad, google_workspace, okta
 
 try:
     CURRENT_IAMBIC_VERSION = version("iambic-core")
@@ -119,6 +132,53 @@ def load_plugins(
     return plugins
 
 
+def get_plugin_defs_to_load(
+    plugin_defs: list[PluginDefinition], config_dict: dict
+) -> list[PluginDefinition]:
+    """
+    Return the plugin definitions that must be loaded for the given config.
+
+    A plugin shipped with iambic is skipped if the config doesn't define it,
+    so its modules and SDK dependencies are never imported.
+    Custom plugins are always loaded.
+    Every plugin is loaded if the config extends another source,
+    because that source may be what defines the plugin's config.
+
+    :param plugin_defs: The plugin definitions of the config.
+    :param config_dict: The raw config file contents.
+    :return: The plugin definitions to pass to load_plugins.
+    """
+    if config_dict.get("extends"):
+        return plugin_defs
+
+    default_plugin_map = {
+        get_default_plugin_location(plugin_name): plugin_name
+        for plugin_name in DEFAULT_PLUGIN_NAMES
+    }
+    plugin_defs_to_load = []
+    for plugin_def in plugin_defs:
+        plugin_name = default_plugin_map.get(plugin_def.location)
+        if plugin_name and plugin_name not in config_dict:
+            log.debug("Skipping unconfigured plugin", plugin=plugin_name)
+            continue
+
+        plugin_defs_to_load.append(plugin_def)
+
+    return plugin_defs_to_load
+
+
+def get_remote_worker_kwargs(
+    plugin_callable, remote_worker: Optional[Executor]
+) -> dict:
+    """Only pass the remote worker to plugin callables that support one."""
+    if (
+        remote_worker
+        and "remote_worker" in inspect.signature(plugin_callable).parameters
+    ):
+        return {"remote_worker": remote_worker}
+    return {}
+
+
 class ExtendsConfig(BaseModel):
     key: ExtendsConfigKey
     value: str
@@ -136,27 +196,27 @@ class Config(ConfigMixin, BaseTemplate):
         default=[
             PluginDefinition(
                 type=PluginType.DIRECTORY_PATH,
-                location=aws.__path__[0],
+                location=get_default_plugin_location("aws"),
                 version=PLUGIN_VERSION,
             ),
             PluginDefinition(
                 type=PluginType.DIRECTORY_PATH,
-                location=google_workspace.__path__[0],
+                location=get_default_plugin_location("google_workspace"),
                 version=PLUGIN_VERSION,
             ),
             PluginDefinition(
                 type=PluginType.DIRECTORY_PATH,
-                location=okta.__path__[0],
+                location=get_default_plugin_location("okta"),
                 version=PLUGIN_VERSION,
             ),
             PluginDefinition(
                 type=PluginType.DIRECTORY_PATH,
-                location=iambic.plugins.v0_1_0.github.__path__[0],
+                location=get_default_plugin_location("github"),
                 version=PLUGIN_VERSION,
             ),
             PluginDefinition(
                 type=PluginType.DIRECTORY_PATH,
-                location=azure_ad.__path__[0],
+                location=get_default_plugin_location("azure_ad"),
                 version=PLUGIN_VERSION,
             ),
         ],
@@ -243,35 +303,59 @@ class Config(ConfigMixin, BaseTemplate):
                                 )
                             self.secrets.setdefault(k, v)
 
+    @telemetry.traced()
     async def run_import(
         self,
         exe_message: ExecutionMessage,
         output_dir: str,
     ):
         ctx.command = exe_message.parent_command
+        template_write_stats.reset()
+        remote_worker = get_executor(self.file_path)
+        ctx.use_remote = bool(remote_worker)
         # It's the responsibility of the provider to handle throttling.
-        if exe_message.provider_type:
-            plugin = [
-                plugin
-                for plugin in self.configured_plugins
-                if plugin.config_name == exe_message.provider_type
-            ][0]
-            await plugin.async_import_callable(
-                exe_message, self.get_config_plugin(plugin), output_dir
-            )
-        else:
-            tasks = []
-            for plugin in self.configured_plugins:
-                task_message = exe_message.copy()
-                task_message.provider_type = plugin.config_name
-                tasks.append(
-                    plugin.async_import_callable(
-                        task_message, self.get_config_plugin(plugin), output_dir
+        try:
+            with template_deletions.batch():
+                if exe_message.provider_type:
+                    plugin = [
+                        plugin
+                        for plugin in self.configured_plugins
+                        if plugin.config_name == exe_message.provider_type
+                    ][0]
+                    await plugin.async_import_callable(
+                        exe_message,
+                        self.get_config_plugin(plugin),
+                        output_dir,
+                        **get_remote_worker_kwargs(
+                            plugin.async_import_callable, remote_worker
+                        ),
                     )
-                )
+                else:
+                    tasks = []
+                    for plugin in self.configured_plugins:
+                        task_message = exe_message.copy()
+                        task_message.provider_type = plugin.config_name
+                        tasks.append(
+                            plugin.async_import_callable(
+                                task_message,
+                                self.get_config_plugin(plugin),
+                                output_dir,
+                                **get_remote_worker_kwargs(
+                                    plugin.async_import_callable, remote_worker
+                                ),
+                            )
+                        )
 
-            await asyncio.gather(*tasks)
+                    await asyncio.gather(*tasks)
+        finally:
+            if remote_worker:
+                remote_worker.stop()
+            ctx.use_remote = False
+
+        expiry_index.save()
+        log.info("Finished writing templates.", **template_write_stats.dict())
 
+    @telemetry.traced()
     async def run_apply(
         self, exe_message: ExecutionMessage, templates: list[BaseTemplate]
     ) -> list[TemplateChangeDetails]:
@@ -292,6 +376,8 @@ class Config(ConfigMixin, BaseTemplate):
             plugin_templates[provider].append(template)
 
         tasks = []
+        remote_worker = get_executor(self.file_path)
+        ctx.use_remote = bool(remote_worker)
         for plugin in self.plugin_instances:
             if (
                 exe_message.provider_type
@@ -301,11 +387,24 @@ class Config(ConfigMixin, BaseTemplate):
 
             if templates := plugin_templates.get(plugin.config_name):
                 if plugin_config := self.get_config_plugin(plugin):
+                    provider_children = plugin_config.provider_children
+                    if provider_children or template_provider_index.scope_rules:
+                        templates = template_provider_index.build(
+                            templates, provider_children
+                        )
+                        if not templates:
+                            continue
+
                     task_message = exe_message.copy()
                     task_message.provider_type = plugin.config_name
                     tasks.append(
                         plugin.async_apply_callable(
-                            task_message, plugin_config, templates
+                            task_message,
+                            plugin_config,
+                            templates,
+                            **get_remote_worker_kwargs(
+                                plugin.async_apply_callable, remote_worker
+                            ),
                         )
                     )
                 else:
@@ -315,10 +414,24 @@ class Config(ConfigMixin, BaseTemplate):
                     )
 
         # Retrieve template changes across plugins and flatten responses
-        template_changes = await asyncio.gather(*tasks)
+        try:
+            # Rendered resources are reused while applying,
+            # a template changed by an apply must be passed to rendered_resources.invalidate.
+            with template_deletions.batch(), rendered_resources.batch():
+                template_changes = await asyncio.gather(*tasks)
+        finally:
+            if remote_worker:
+                remote_worker.stop()
+            ctx.use_remote = False
+            template_provider_index.clear()
         template_changes = list(itertools.chain.from_iterable(template_changes))
+        has_changes = bool(template_changes)
+        if template_change_stream.active:
+            # The changes were written to the stream, only its counts are kept
+            has_changes = template_change_stream.counts.has_changes
+            template_changes = []
 
-        if ctx.execute and template_changes:
+        if ctx.execute and has_changes:
             log.info("Finished applying changes.")
         elif not ctx.execute:
             log.info("Finished scanning for changes.")
@@ -327,18 +440,20 @@ class Config(ConfigMixin, BaseTemplate):
 
         return template_changes
 
+    @telemetry.traced()
     async def run_detect_changes(
         self, repo_dir: str, message_details_file: Optional[str]
     ) -> Union[str, None]:
-        change_str_list = await asyncio.gather(
-            *[
-                plugin.async_detect_changes_callable(
-                    self.get_config_plugin(plugin), repo_dir, message_details_file
-                )
-                for plugin in self.configured_plugins
-                if plugin.async_detect_changes_callable
-            ]
-        )
+        with template_deletions.batch():
+            change_str_list = await asyncio.gather(
+                *[
+                    plugin.async_detect_changes_callable(
+                        self.get_config_plugin(plugin), repo_dir, message_details_file
+                    )
+                    for plugin in self.configured_plugins
+                    if plugin.async_detect_changes_callable
+                ]
+            )
 
         if change_str_list := [
             change_str for change_str in change_str_list if change_str
@@ -462,10 +577,64 @@ class Config(ConfigMixin, BaseTemplate):
         log.info("Config successfully written", config_location=file_path)
 
 
+# The assumed role sessions held by the config expire after an hour so keep this well below that
+CONFIG_CACHE_TTL = int(os.getenv("IAMBIC_CONFIG_CACHE_TTL", 2700))
+
+
+class ConfigCache:
+    """
+    Keeps the last loaded config for long-running processes like the GitHub app server.
+
+    The config is only loaded again when the hash of the config file
+    or the load_config arguments change, or once it's older than ttl seconds.
+    Reusing the config also reuses the boto3 sessions and plugin metadata it holds.
+    Reloading it discovers new organization accounts, secrets and extends
+    and replaces the sessions before their temporary credentials expire.
+    Disabled by default so every CLI invocation loads the config from scratch.
+    """
+
+    def __init__(self, ttl: int = CONFIG_CACHE_TTL):
+        self.enabled = False
+        self.ttl = ttl
+        self._key: Optional[str] = None
+        self._config: Optional[Config] = None
+        self._loaded_at = 0.0
+
+    @staticmethod
+    def get_key(config_body: str, *load_args) -> str:
+        return xxhash.xxh64(f"{config_body}{load_args}").hexdigest()
+
+    def get(self, key: str, config_path: str) -> Optional[Config]:
+        if not self.enabled or key != self._key:
+            return None
+        elif time.time() - self._loaded_at > self.ttl:
+            self.clear()
+            return None
+
+        # The same config may be read from a new checkout of the templates repo
+        self._config.file_path = config_path
+        return self._config
+
+    def set(self, key: str, config: Config):
+        if self.enabled:
+            self._key = key
+            self._config = config
+            self._loaded_at = time.time()
+
+    def clear(self):
+        self._key = None
+        self._config = None
+
+
+config_cache = ConfigCache()
+
+
+@telemetry.traced()
 async def load_config(
     config_path: str | Path,
     configure_plugins: bool = True,
     approved_plugins_only: bool = False,
+    load_all_plugins: bool = False,
 ) -> Config:
     """
     Load the configuration from the specified file path.
@@ -483,6 +652,8 @@ async def load_config(
 
     Parameters:
     - config_path (str): The file path of the configuration file.
+    - load_all_plugins (bool): Load plugins the config doesn't define.
+        Only needed when the config is going to be extended, e.g. by the setup wizard.
 
     Returns:
     - Config: The configuration object created from the specified file.
@@ -492,15 +663,27 @@ async def load_config(
         config_path = str(
             config_path
         )  # Ensure it's a string in case it's a Path for pydantic
-        config_dict = yaml.load(open(config_path))
+        with open(config_path) as f:
+            config_body = f.read()
+        cache_key = config_cache.get_key(
+            config_body, configure_plugins, approved_plugins_only, load_all_plugins
+        )
+        if config := config_cache.get(cache_key, config_path):
+            log.info("Config unchanged, using the loaded config.")
+            return config
+
+        config_dict = yaml.load(config_body)
         base_config = Config(file_path=config_path, **config_dict)
-        return await process_config(
+        config = await process_config(
             base_config,
             config_path,
             config_dict,
             configure_plugins,
             approved_plugins_only,
+            load_all_plugins,
         )
+        config_cache.set(cache_key, config)
+        return config
     except NoCredentialsError:
         log.error(
             (
@@ -531,6 +714,7 @@ async def process_config(
     config_dict,
     configure_plugins: bool = True,
     approved_plugins_only: bool = False,
+    load_all_plugins: bool = False,
 ) -> Config:
     if approved_plugins_only:
         default_plugins = [
@@ -542,7 +726,11 @@ async def process_config(
             if plugin.location in default_plugins
         ]
 
-    all_plugins = load_plugins(base_config.plugins)
+    plugin_defs = base_config.plugins
+    if not load_all_plugins:
+        plugin_defs = get_plugin_defs_to_load(plugin_defs, config_dict)
+
+    all_plugins = load_plugins(plugin_defs)
     config_fields = {}
     for plugin in all_plugins:
         config_fields[plugin.config_name] = (plugin.provider_config, None)
@@ -549,7 +549,7 @@ class ConfigurationWizard:
 
         if os.path.exists(self.config_path) and os.path.getsize(self.config_path) != 0:
             log.info("Found existing configuration file", config_path=self.config_path)
-            self.config = await load_config(self.config_path)
+            self.config = await load_config(self.config_path, load_all_plugins=True)
         else:
             # Create a stubbed out config file to use for the wizard
             self.config_path = f"{self.repo_dir}/iambic_config.yaml"
@@ -558,7 +558,10 @@ class ConfigurationWizard:
             )
 
             self.config = await process_config(
-                base_config, self.config_path, base_config.dict()
+                base_config,
+                self.config_path,
+                base_config.dict(),
+                load_all_plugins=True,
             )
 
     async def _get_config_path(self):
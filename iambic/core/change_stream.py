@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import IO, TYPE_CHECKING, Iterator, Optional, Union
+
+from iambic.core import noq_json as json
+from iambic.core.logger import log
+from iambic.core.models import (
+    AccountChangeDetails,
+    ProposedChange,
+    ProposedChangeType,
+    TemplateChangeDetails,
+)
+from iambic.core.utils import yaml
+
+if TYPE_CHECKING:
+    from iambic.core.models import BaseTemplate
+
+
+class TemplateChangeCounts:
+    """
+    The counters rendered in a plan summary, aggregated one template change at a time.
+
+    Mirrors the totals of iambic.output.models.ActionSummaries
+    without holding on to the changes.
+    """
+
+    def __init__(self):
+        self.action_counts: dict[str, int] = defaultdict(int)
+        self.action_templates: dict[str, set[str]] = defaultdict(set)
+        self.exception_counts: dict[str, int] = defaultdict(int)
+        self.accounts: set[str] = set()
+
+    @staticmethod
+    def _get_account_changes(
+        changes: list[Union[AccountChangeDetails, ProposedChange]], attribute: str
+    ) -> list[tuple[str, ProposedChange]]:
+        account_changes = []
+        for change in changes:
+            if isinstance(change, AccountChangeDetails):
+                account_changes.extend(
+                    (change.account, account_change)
+                    for account_change in getattr(change, attribute)
+                )
+            else:
+                account_changes.append(("NONE", change))
+        return account_changes
+
+    def add(self, template_change: TemplateChangeDetails):
+        template_path = str(template_change.template_path)
+        for account, change in self._get_account_changes(
+            template_change.proposed_changes, "proposed_changes"
+        ):
+            self.action_counts[change.change_type.value] += 1
+            self.action_templates[change.change_type.value].add(template_path)
+            self.accounts.add(str(account))
+
+        for _, change in self._get_account_changes(
+            template_change.exceptions_seen, "exceptions_seen"
+        ):
+            self.exception_counts[change.change_type.value] += 1
+
+    @property
+    def has_changes(self) -> bool:
+        """
+        Whether a template had a proposed change or an exception.
+
+        num_templates only counts the templates with a proposed change.
+        """
+        return bool(self.action_templates or any(self.exception_counts.values()))
+
+    def dict(self) -> dict:
+        return {
+            **{
+                f"num_{change_type.value.lower()}_actions": self.action_counts[
+                    change_type.value
+                ]
+                for change_type in ProposedChangeType
+            },
+            "num_templates": sum(
+                len(template_paths) for template_paths in self.action_templates.values()
+            ),
+            "num_accounts": len(self.accounts),
+            "num_exceptions": sum(
+                1
+                for exception_count in self.exception_counts.values()
+                if exception_count
+            ),
+        }
+
+
+class TemplateChangeStream:
+    """
+    Streams the changes of each template to a file as soon as the template has been applied.
+
+    Used by plans too large to keep every TemplateChangeDetails in memory.
+    The file is JSON lines unless it has a .yaml or .yml extension,
+    in which case every template change is its own YAML document.
+    Once written, only the counters are kept for the summary.
+    The proposed changes are dropped from the change and the exceptions are kept without their values
+    so the caller can still tell the template failed.
+    """
+
+    def __init__(self):
+        self.file_path: Optional[str] = None
+        self.counts = TemplateChangeCounts()
+        self._file: Optional[IO] = None
+
+    @property
+    def active(self) -> bool:
+        return bool(self._file)
+
+    @property
+    def is_yaml(self) -> bool:
+        return str(self.file_path).endswith((".yaml", ".yml"))
+
+    @contextmanager
+    def open(self, file_path: str):
+        self.file_path = str(file_path)
+        self.counts = TemplateChangeCounts()
+        self._file = open(self.file_path, "w")
+        try:
+            yield self
+        finally:
+            self._file.close()
+            self._file = None
+            log.info(
+                "The proposed changes have been saved.",
+                file_path=self.file_path,
+                **self.counts.dict(),
+            )
+
+    @staticmethod
+    def _drop_values(
+        changes: list[Union[AccountChangeDetails, ProposedChange]]
+    ) -> list[Union[AccountChangeDetails, ProposedChange]]:
+        for change in changes:
+            change.current_value = None
+            change.new_value = None
+            if isinstance(change, AccountChangeDetails):
+                TemplateChangeStream._drop_values(change.proposed_changes)
+                TemplateChangeStream._drop_values(change.exceptions_seen)
+        return changes
+
+    def write(
+        self, template_change: Optional[TemplateChangeDetails]
+    ) -> Optional[TemplateChangeDetails]:
+        if not self.active or not template_change:
+            return template_change
+        elif not (template_change.proposed_changes or template_change.exceptions_seen):
+            return template_change
+
+        validated_change = template_change.validated()
+        if self.is_yaml:
+            self._file.write("---\n")
+            yaml.dump(json.loads(validated_change.json()), self._file)
+        else:
+            self._file.write(f"{validated_change.json()}\n")
+        self._file.flush()
+
+        self.counts.add(template_change)
+        return TemplateChangeDetails(
+            resource_id=template_change.resource_id,
+            resource_type=template_change.resource_type,
+            template_path=template_change.template_path,
+            exceptions_seen=self._drop_values(template_change.exceptions_seen),
+        )
+
+
+template_change_stream = TemplateChangeStream()
+
+
+def read_template_changes(file_path: str) -> Iterator[TemplateChangeDetails]:
+    """Read the template changes written by a TemplateChangeStream one at a time."""
+    with open(file_path) as f:
+        if str(file_path).endswith((".yaml", ".yml")):
+            for template_change in yaml.load_all(f):
+                if template_change:
+                    yield TemplateChangeDetails.parse_obj(template_change)
+        else:
+            for line in f:
+                if line.strip():
+                    yield TemplateChangeDetails.parse_raw(line)
+
+
+async def apply_template(template: BaseTemplate, config) -> TemplateChangeDetails:
+    """Apply the template and stream its changes if a TemplateChangeStream is open."""
+    return template_change_stream.write(await template.apply(config))
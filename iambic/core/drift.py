@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import os
+import time
+from typing import TYPE_CHECKING, Optional
+
+import xxhash
+
+from iambic.core import noq_json as json
+from iambic.core.utils import (
+    get_cache_file_path,
+    get_rendered_template_str_value,
+    load_json_cache_file,
+    save_json_cache_file,
+)
+
+if TYPE_CHECKING:
+    from iambic.core.models import BaseTemplate, ProviderChild
+
+# Opt-in, the cloud side is only re-read once a change signal invalidates an entry or it expires.
+# Only enable it if CloudTrail detect messages are processed, e.g. through the SQS detect setup,
+# otherwise changes made outside of IAMbic aren't reverted until the entry expires.
+DRIFT_FINGERPRINT_ENABLED = os.getenv(
+    "IAMBIC_DRIFT_FINGERPRINT_ENABLED", ""
+).lower() in ("1", "true", "yes")
+# Entries older than this are ignored so every resource still gets a full
+# live reconciliation periodically, even without a change signal.
+DRIFT_FINGERPRINT_TTL = int(os.getenv("IAMBIC_DRIFT_FINGERPRINT_TTL", 60 * 60 * 24))
+
+
+def get_fingerprint(*objs) -> str:
+    return xxhash.xxh64(json.dumps(objs, sort_keys=True)).hexdigest()
+
+
+class DriftFingerprintStore:
+    """
+    A persisted map of (template, provider child) to the fingerprint of the last
+    successfully applied rendered resource.
+
+    Used by enforce runs to skip the live read and apply of a template on a provider child
+    when neither the template nor the cloud resource has changed since the last run.
+    The cloud side is considered unchanged until a change signal
+    (e.g. a CloudTrail detect message) invalidates the entry or the entry expires.
+    Only used by enforce runs when IAMBIC_DRIFT_FINGERPRINT_ENABLED is set.
+    """
+
+    def __init__(self, file_path: Optional[str] = None, ttl: int = None):
+        self._file_path = file_path
+        self.ttl = DRIFT_FINGERPRINT_TTL if ttl is None else ttl
+        self.enabled = False
+        self._fingerprints: Optional[dict[str, dict]] = None
+
+    @property
+    def file_path(self) -> str:
+        if not self._file_path:
+            self._file_path = get_cache_file_path("drift_fingerprints.json")
+        return self._file_path
+
+    @property
+    def fingerprints(self) -> dict[str, dict]:
+        if self._fingerprints is None:
+            self._fingerprints = (
+                load_json_cache_file(self.file_path, "drift fingerprints") or {}
+            )
+        return self._fingerprints
+
+    @staticmethod
+    def get_key(template: BaseTemplate, provider_child: ProviderChild) -> str:
+        return f"{template.file_path}|{provider_child.preferred_identifier}"
+
+    @staticmethod
+    def get_template_fingerprint(
+        template: BaseTemplate, provider_child: ProviderChild
+    ) -> str:
+        return get_fingerprint(
+            template.dict(), template.apply_resource_dict(provider_child)
+        )
+
+    def is_current(self, template: BaseTemplate, provider_child: ProviderChild) -> bool:
+        """Returns True if the template was applied to the provider child and nothing moved since."""
+        if not self.enabled or getattr(template, "deleted", False):
+            return False
+
+        entry = self.fingerprints.get(self.get_key(template, provider_child))
+        if not entry or time.time() - entry["applied_at"] > self.ttl:
+            return False
+
+        return entry["template_fingerprint"] == self.get_template_fingerprint(
+            template, provider_child
+        )
+
+    def record(self, template: BaseTemplate, provider_child: ProviderChild):
+        """Record the fingerprint of a template that was successfully applied to a provider child."""
+        if not self.enabled:
+            return
+
+        self.fingerprints[self.get_key(template, provider_child)] = {
+            "template_fingerprint": self.get_template_fingerprint(
+                template, provider_child
+            ),
+            "resource_id": get_rendered_template_str_value(
+                template.resource_id, provider_child
+            ),
+            "identifiers": sorted(provider_child.all_identifiers),
+            "applied_at": time.time(),
+        }
+
+    def invalidate(self, provider_child_id: str, resource_id: str) -> int:
+        """Drop any entry for the resource on the provider child.
+
+        Called when a change signal says the cloud side moved.
+        Returns the number of entries removed.
+        """
+        provider_child_id = str(provider_child_id).lower()
+        stale_keys = [
+            key
+            for key, entry in self.fingerprints.items()
+            if entry["resource_id"] == resource_id
+            and provider_child_id in entry["identifiers"]
+        ]
+        for key in stale_keys:
+            del self.fingerprints[key]
+
+        return len(stale_keys)
+
+    def save(self):
+        if self._fingerprints is None:
+            return
+
+        save_json_cache_file(self.file_path, self._fingerprints)
+
+
+drift_fingerprints = DriftFingerprintStore()
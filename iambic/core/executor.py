@@ -0,0 +1,505 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import queue
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from typing import TYPE_CHECKING, Optional, Union
+
+from iambic.core import noq_json as json
+from iambic.core.context import ctx
+from iambic.core.iambic_enum import ExecutionStatus
+from iambic.core.logger import log
+from iambic.core.models import (
+    AccountChangeDetails,
+    BaseTemplate,
+    ExecutionMessage,
+    ExecutionResponse,
+    ProposedChange,
+    ProposedChangeType,
+    TemplateChangeDetails,
+)
+from iambic.core.utils import aio_wrapper
+
+if TYPE_CHECKING:
+    from iambic.config.dynamic_config import Config
+
+# The number of local worker processes. 0 disables distributed execution
+# unless IAMBIC_EXECUTOR_QUEUE_PATH is set for workers started with `iambic worker`.
+EXECUTOR_PROCESSES = int(os.getenv("IAMBIC_EXECUTOR_PROCESSES", 0))
+EXECUTOR_QUEUE_PATH = os.getenv("IAMBIC_EXECUTOR_QUEUE_PATH")
+EXECUTOR_TASK_TIMEOUT = int(os.getenv("IAMBIC_EXECUTOR_TASK_TIMEOUT", 60 * 60))
+# How long tasks may go unclaimed before a run without local workers
+# assumes no `iambic worker` is reading the queue.
+EXECUTOR_CLAIM_TIMEOUT = int(os.getenv("IAMBIC_EXECUTOR_CLAIM_TIMEOUT", 60))
+EXECUTOR_POLL_INTERVAL = 1
+
+
+class ExecutionQueue:
+    """
+    The queue tasks are handed to workers through and results are returned on.
+
+    Tasks and results are JSON serializable dicts
+    so a queue can be backed by anything the workers are able to reach.
+    Every task and result carries the run_id of the Executor.run that created it,
+    so Executors sharing a queue only get the results of their own runs.
+    """
+
+    def put_task(self, task: dict):
+        raise NotImplementedError
+
+    def get_task(self, timeout: float) -> Optional[dict]:
+        """Claim the next task. Returns None if no task was available before the timeout."""
+        raise NotImplementedError
+
+    def get_task_count(self, run_id: str) -> int:
+        """The number of tasks of the run that have not been claimed by a worker."""
+        raise NotImplementedError
+
+    def put_result(self, result: dict):
+        raise NotImplementedError
+
+    def get_result(self, run_id: str, timeout: float) -> Optional[dict]:
+        """Pop the next result of the run. Returns None if no result was available before the timeout."""
+        raise NotImplementedError
+
+    def purge(self, run_id: str):
+        """Remove the tasks and results of the run."""
+        raise NotImplementedError
+
+    def purge_stale(self, max_age: float):
+        """Remove the tasks and results put more than max_age seconds ago."""
+        raise NotImplementedError
+
+
+class LocalExecutionQueue(ExecutionQueue):
+    """An ExecutionQueue for worker processes on the same host."""
+
+    def __init__(self):
+        mp_context = multiprocessing.get_context("spawn")
+        self._tasks = mp_context.Queue()
+        self._results = mp_context.Queue()
+
+    @staticmethod
+    def _get(mp_queue, timeout: float) -> Optional[dict]:
+        try:
+            return json.loads(mp_queue.get(timeout=timeout))
+        except queue.Empty:
+            return None
+
+    def put_task(self, task: dict):
+        self._tasks.put(json.dumps(task))
+
+    def get_task(self, timeout: float) -> Optional[dict]:
+        return self._get(self._tasks, timeout)
+
+    def get_task_count(self, run_id: str) -> int:
+        # The queue belongs to a single Executor so every task is of the current run
+        return self._tasks.qsize()
+
+    def put_result(self, result: dict):
+        self._results.put(json.dumps(result))
+
+    def get_result(self, run_id: str, timeout: float) -> Optional[dict]:
+        deadline = time.time() + timeout
+        while result := self._get(self._results, max(deadline - time.time(), 0)):
+            if result.get("run_id") == run_id:
+                return result
+
+    def _drain(self):
+        # A result of a purged run that is put afterwards is skipped by get_result
+        for mp_queue in (self._tasks, self._results):
+            while self._get(mp_queue, 0) is not None:
+                pass
+
+    def purge(self, run_id: str):
+        # The queue belongs to a single Executor so everything in it is of the current run
+        self._drain()
+
+    def purge_stale(self, max_age: float):
+        # Runs of the Executor don't overlap so anything left is of an earlier run
+        self._drain()
+
+
+class SQLiteExecutionQueue(ExecutionQueue):
+    """
+    An ExecutionQueue persisted to a SQLite file.
+
+    Any process that can open the file can be a worker,
+    e.g. `iambic worker` running on hosts that share the file system.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for table in ("tasks", "results"):
+                columns = [
+                    row[1] for row in conn.execute(f"PRAGMA table_info({table})")
+                ]
+                if columns and "created_at" not in columns:
+                    # Created by a version of iambic that didn't scope rows to a run
+                    conn.execute(f"DROP TABLE {table}")
+                conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} "
+                    "(id INTEGER PRIMARY KEY AUTOINCREMENT, run_id TEXT, created_at REAL, "
+                    "payload TEXT NOT NULL)"
+                )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.file_path, timeout=30, isolation_level=None)
+
+    def _put(self, table: str, payload: dict):
+        with closing(self._connect()) as conn:
+            conn.execute(
+                f"INSERT INTO {table} (run_id, created_at, payload) VALUES (?, ?, ?)",
+                (payload.get("run_id"), time.time(), json.dumps(payload)),
+            )
+
+    def _pop(self, table: str, timeout: float, run_id: str = None) -> Optional[dict]:
+        query = f"SELECT id, payload FROM {table}"
+        params = ()
+        if run_id:
+            query += " WHERE run_id = ?"
+            params = (run_id,)
+        query += " ORDER BY id LIMIT 1"
+
+        deadline = time.time() + timeout
+        while True:
+            with closing(self._connect()) as conn:
+                # Take the write lock up front so only one worker claims a row
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(query, params).fetchone()
+                if row:
+                    conn.execute(f"DELETE FROM {table} WHERE id = ?", (row[0],))
+                conn.execute("COMMIT")
+
+            if row:
+                return json.loads(row[1])
+            elif time.time() >= deadline:
+                return None
+
+            time.sleep(min(0.1, timeout))
+
+    def put_task(self, task: dict):
+        self._put("tasks", task)
+
+    def get_task(self, timeout: float) -> Optional[dict]:
+        return self._pop("tasks", timeout)
+
+    def get_task_count(self, run_id: str) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM tasks WHERE run_id = ?", (run_id,)
+            ).fetchone()[0]
+
+    def put_result(self, result: dict):
+        self._put("results", result)
+
+    def get_result(self, run_id: str, timeout: float) -> Optional[dict]:
+        return self._pop("results", timeout, run_id)
+
+    def purge(self, run_id: str):
+        with closing(self._connect()) as conn:
+            for table in ("tasks", "results"):
+                conn.execute(f"DELETE FROM {table} WHERE run_id = ?", (run_id,))
+
+    def purge_stale(self, max_age: float):
+        with closing(self._connect()) as conn:
+            for table in ("tasks", "results"):
+                conn.execute(
+                    f"DELETE FROM {table} WHERE created_at < ?",
+                    (time.time() - max_age,),
+                )
+
+
+async def execute_task(config: Config, task: dict) -> dict:
+    """
+    Run a single task against the plugin of the task's execution message.
+
+    A task with templates is an apply, anything else is an import.
+    Import output is written to the execution directory for the base runner to collect.
+    """
+    exe_message = ExecutionMessage.parse_obj(task["exe_message"])
+    response = ExecutionResponse(**exe_message.dict(), status=ExecutionStatus.SUCCEEDED)
+    ctx.eval_only = task["eval_only"]
+    ctx.command = exe_message.parent_command
+
+    try:
+        plugin = [
+            plugin
+            for plugin in config.configured_plugins
+            if plugin.config_name == exe_message.provider_type
+        ][0]
+        plugin_config = config.get_config_plugin(plugin)
+        if task.get("templates") is not None:
+            templates = [
+                config.template_map[template["template_type"]](**template)
+                for template in task["templates"]
+            ]
+            response.template_changes = await plugin.async_apply_callable(
+                exe_message, plugin_config, templates
+            )
+        else:
+            await plugin.async_import_callable(
+                exe_message, plugin_config, task["base_output_dir"]
+            )
+    except Exception as err:
+        log.error(
+            "Unable to run execution task.",
+            error=repr(err),
+            provider_type=exe_message.provider_type,
+            provider_id=exe_message.provider_id,
+            metadata=exe_message.metadata,
+        )
+        response.status = ExecutionStatus.FAILED
+        response.errors = [repr(err)]
+
+    return {
+        "task_id": task["task_id"],
+        "run_id": task.get("run_id"),
+        "response": json.loads(response.json()),
+    }
+
+
+async def _run_worker(config_path: str, execution_queue: ExecutionQueue):
+    from iambic.config.dynamic_config import load_config
+
+    config = await load_config(config_path)
+    while True:
+        task = await aio_wrapper(execution_queue.get_task, EXECUTOR_POLL_INTERVAL)
+        if not task:
+            continue
+        elif task.get("stop"):
+            return
+
+        execution_queue.put_result(await execute_task(config, task))
+
+
+def run_worker(config_path: str, execution_queue: ExecutionQueue):
+    """Load the config and run tasks from the queue until a stop task is received."""
+    asyncio.run(_run_worker(config_path, execution_queue))
+
+
+class Executor:
+    """
+    Dispatches execution messages to workers through an ExecutionQueue.
+
+    This is what plugins receive as remote_worker.
+    The base runner shards an import or apply into one ExecutionMessage per
+    (provider_type, provider_id, service) and waits on Executor.run for every shard.
+    Import shards write their output to the execution directory
+    so the base runner gathers it with ExecutionMessage.get_sub_exe_files.
+    """
+
+    def __init__(
+        self,
+        config_path: str,
+        execution_queue: ExecutionQueue = None,
+        processes: int = None,
+    ):
+        self.config_path = str(config_path)
+        self.execution_queue = execution_queue or LocalExecutionQueue()
+        self.processes = EXECUTOR_PROCESSES if processes is None else processes
+        self._workers: list[multiprocessing.Process] = []
+
+    def start(self):
+        if self._workers:
+            return
+
+        mp_context = multiprocessing.get_context("spawn")
+        for _ in range(self.processes):
+            worker = mp_context.Process(
+                target=run_worker,
+                args=(self.config_path, self.execution_queue),
+                daemon=True,
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def stop(self):
+        for _ in self._workers:
+            self.execution_queue.put_task({"stop": True})
+        for worker in self._workers:
+            worker.join(timeout=10)
+            if worker.is_alive():
+                worker.terminate()
+        self._workers = []
+
+    async def run(
+        self,
+        exe_messages: list[ExecutionMessage],
+        base_output_dir: str = None,
+        templates: Union[list[BaseTemplate], dict[str, list[BaseTemplate]]] = None,
+    ) -> list[ExecutionResponse]:
+        """
+        Run an import or, if templates are provided, an apply for every execution message.
+
+        Templates are either sent to every shard or, if keyed by provider_id,
+        each shard is only sent the templates of its provider_id.
+        They're sent to the workers as in-memory only copies
+        so deleting template files is left to the caller once all shards have succeeded.
+
+        Tasks and results left behind by runs that outlived EXECUTOR_TASK_TIMEOUT are purged
+        before the run starts. Those of other runs in progress on a shared queue are kept.
+        """
+        self.start()
+        run_id = str(uuid.uuid4())
+        self.execution_queue.purge_stale(EXECUTOR_TASK_TIMEOUT)
+
+        if isinstance(templates, list):
+            templates = {
+                exe_message.provider_id: templates for exe_message in exe_messages
+            }
+
+        pending = {}
+        for exe_message in exe_messages:
+            task_id = str(uuid.uuid4())
+            pending[task_id] = exe_message
+            task_templates = None
+            if templates is not None:
+                task_templates = [
+                    dict(json.loads(template.json()), is_memory_only=True)
+                    for template in templates.get(exe_message.provider_id, [])
+                ]
+
+            self.execution_queue.put_task(
+                {
+                    "task_id": task_id,
+                    "run_id": run_id,
+                    "exe_message": json.loads(exe_message.json()),
+                    "base_output_dir": base_output_dir,
+                    "templates": task_templates,
+                    "eval_only": ctx.eval_only,
+                }
+            )
+
+        responses = []
+        started_at = time.time()
+        deadline = started_at + EXECUTOR_TASK_TIMEOUT
+        while pending and time.time() < deadline:
+            if self._workers and not any(worker.is_alive() for worker in self._workers):
+                log.error("All executor worker processes have exited.")
+                break
+            elif (
+                not self._workers
+                and time.time() - started_at >= EXECUTOR_CLAIM_TIMEOUT
+                and self.execution_queue.get_task_count(run_id) == len(exe_messages)
+            ):
+                log.error(
+                    "No executor worker claimed a task. "
+                    "Make sure `iambic worker` is running against the queue.",
+                    claim_timeout=EXECUTOR_CLAIM_TIMEOUT,
+                )
+                break
+
+            result = await aio_wrapper(
+                self.execution_queue.get_result,
+                run_id,
+                EXECUTOR_POLL_INTERVAL,
+            )
+            if not result:
+                continue
+            elif not pending.pop(result["task_id"], None):
+                log.warning("Ignoring result of an unknown task.", **result)
+                continue
+
+            response = ExecutionResponse.parse_obj(result["response"])
+            if response.status == ExecutionStatus.FAILED:
+                log.error(
+                    "Execution task failed.",
+                    provider_type=response.provider_type,
+                    provider_id=response.provider_id,
+                    metadata=response.metadata,
+                    errors=response.errors,
+                )
+            responses.append(response)
+
+        if pending:
+            # Unclaimed tasks of an incomplete run must not be picked up later
+            self.execution_queue.purge(run_id)
+
+        for exe_message in pending.values():
+            log.error(
+                "Execution task did not complete.",
+                provider_type=exe_message.provider_type,
+                provider_id=exe_message.provider_id,
+                metadata=exe_message.metadata,
+            )
+            responses.append(
+                ExecutionResponse(
+                    **exe_message.dict(),
+                    status=ExecutionStatus.FAILED,
+                    errors=["Execution task did not complete."],
+                )
+            )
+
+        return responses
+
+
+def get_executor(config_path: str) -> Optional[Executor]:
+    """Return an Executor if distributed execution is enabled."""
+    if EXECUTOR_QUEUE_PATH:
+        return Executor(config_path, SQLiteExecutionQueue(EXECUTOR_QUEUE_PATH))
+    elif EXECUTOR_PROCESSES:
+        return Executor(config_path)
+
+
+def merge_template_changes(
+    templates: Union[list[BaseTemplate], dict[str, list[BaseTemplate]]],
+    responses: list[ExecutionResponse],
+) -> list[TemplateChangeDetails]:
+    """
+    Combine the template changes of apply shards into one entry per template.
+
+    The templates are passed the same way as to Executor.run,
+    either sent to every shard or keyed by the provider_id of the shard they were sent to.
+    A failed shard is reported as an exception on every template sent to the shard
+    because it is unknown which changes were made before it failed.
+    """
+    if isinstance(templates, list):
+        templates = {response.provider_id: templates for response in responses}
+
+    template_change_map = {}
+    for shard_templates in templates.values():
+        for template in shard_templates:
+            if str(template.file_path) not in template_change_map:
+                template_change_map[str(template.file_path)] = TemplateChangeDetails(
+                    resource_id=template.resource_id,
+                    resource_type=template.resource_type,
+                    template_path=template.file_path,
+                )
+
+    for response in responses:
+        if response.status == ExecutionStatus.FAILED:
+            for template in templates.get(response.provider_id, []):
+                template_change = template_change_map[str(template.file_path)]
+                template_change.exceptions_seen.append(
+                    AccountChangeDetails(
+                        account=response.provider_id,
+                        resource_id=template_change.resource_id,
+                        exceptions_seen=[
+                            ProposedChange(
+                                change_type=ProposedChangeType.UNKNOWN,
+                                exceptions_seen=response.errors,
+                            )
+                        ],
+                    )
+                )
+            continue
+
+        for template_change in response.template_changes:
+            merged_change = template_change_map[str(template_change.template_path)]
+            merged_change.proposed_changes.extend(template_change.proposed_changes)
+            merged_change.exceptions_seen.extend(template_change.exceptions_seen)
+
+    return [
+        template_change
+        for template_change in template_change_map.values()
+        if template_change.proposed_changes or template_change.exceptions_seen
+    ]
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import datetime
+import os
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Optional
+
+from pydantic import BaseModel as PydanticBaseModel
+
+from iambic.core.utils import (
+    get_cache_file_path,
+    load_json_cache_file,
+    save_json_cache_file,
+)
+
+if TYPE_CHECKING:
+    from iambic.core.models import BaseTemplate
+
+
+def get_expiry_entries(resource, path: str = "$") -> list[tuple[str, float]]:
+    """
+    The JSON path and expires_at timestamp of every resource in the model that has an expiry.
+
+    Resources that are already marked as deleted are left out.
+    """
+    if not isinstance(resource, PydanticBaseModel):
+        return []
+
+    expires_at = getattr(resource, "expires_at", None)
+    if isinstance(expires_at, datetime.datetime):
+        if getattr(resource, "deleted", None) is True:
+            return []
+        entries = [(path, expires_at.timestamp())]
+    else:
+        entries = []
+
+    for field_name in resource.__fields__.keys():
+        field_val = getattr(resource, field_name, None)
+        if isinstance(field_val, list):
+            for elem_index, elem in enumerate(field_val):
+                entries.extend(
+                    get_expiry_entries(elem, f"{path}.{field_name}[{elem_index}]")
+                )
+        elif isinstance(field_val, PydanticBaseModel):
+            entries.extend(get_expiry_entries(field_val, f"{path}.{field_name}"))
+
+    return entries
+
+
+class ExpiryIndex:
+    """
+    A persisted map of template file path to the expires_at values set in the template.
+
+    Kept up to date by BaseTemplate.write and used by flag_expired_resources
+    to only load the templates that have an expired resource.
+    An entry is ignored once the file was modified outside of iambic, e.g. by a git pull,
+    in which case the template is loaded and indexed again.
+    """
+
+    def __init__(self, file_path: Optional[str] = None):
+        self._file_path = file_path
+        self._entries: Optional[dict[str, dict]] = None
+        # key -> entry, or None if removed. Only set while changes are tracked
+        self._changes: Optional[dict[str, Optional[dict]]] = None
+
+    @property
+    def file_path(self) -> str:
+        if not self._file_path:
+            self._file_path = get_cache_file_path("expiry_index.json")
+        return self._file_path
+
+    @property
+    def entries(self) -> dict[str, dict]:
+        if self._entries is None:
+            self._entries = load_json_cache_file(self.file_path, "expiry index") or {}
+        return self._entries
+
+    @staticmethod
+    def get_key(file_path: str) -> str:
+        return os.path.abspath(os.path.expanduser(str(file_path)))
+
+    @staticmethod
+    def get_file_signature(file_path: str) -> Optional[list[int]]:
+        try:
+            file_stat = os.stat(file_path)
+        except OSError:
+            return None
+        return [file_stat.st_mtime_ns, file_stat.st_size]
+
+    @contextmanager
+    def track_changes(self):
+        """
+        Collect the records and removals made inside the block instead of applying them.
+
+        Used by a process pool worker that returns the changes for the parent to apply.
+        """
+        self._changes = {}
+        try:
+            yield self._changes
+        finally:
+            self._changes = None
+
+    def apply_changes(self, changes: dict[str, Optional[dict]]):
+        for key, entry in changes.items():
+            if entry is None:
+                self.entries.pop(key, None)
+            else:
+                self.entries[key] = entry
+
+    def record(self, template: BaseTemplate):
+        """Index the expiry of a template that was just written to its file."""
+        key = self.get_key(template.file_path)
+        entry = {
+            "file_signature": self.get_file_signature(key),
+            "expires_at": get_expiry_entries(template),
+        }
+        if self._changes is not None:
+            self._changes[key] = entry
+        else:
+            self.entries[key] = entry
+
+    def remove(self, file_path: str):
+        key = self.get_key(file_path)
+        if self._changes is not None:
+            self._changes[key] = None
+        else:
+            self.entries.pop(key, None)
+
+    def is_indexed(self, file_path: str) -> bool:
+        key = self.get_key(file_path)
+        entry = self.entries.get(key)
+        return bool(entry) and entry["file_signature"] == self.get_file_signature(key)
+
+    def has_expired(self, file_path: str, now: datetime.datetime) -> bool:
+        entry = self.entries.get(self.get_key(file_path), {})
+        timestamp = now.timestamp()
+        return any(
+            expires_at < timestamp for _, expires_at in entry.get("expires_at", [])
+        )
+
+    def save(self):
+        if self._entries is None:
+            return
+
+        self._entries = {
+            key: entry for key, entry in self._entries.items() if os.path.exists(key)
+        }
+        save_json_cache_file(self.file_path, self._entries)
+
+
+expiry_index = ExpiryIndex()
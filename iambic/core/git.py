@@ -5,7 +5,9 @@ import platform
 import re
 from io import StringIO
 from typing import TYPE_CHECKING, Optional, Type
+from urllib.parse import urlparse
 
+import xxhash
 from deepdiff import DeepDiff
 from git.exc import GitCommandError
 from git.repo import Repo
@@ -14,7 +16,12 @@ from pydantic import BaseModel as PydanticBaseModel
 from iambic.core.logger import log
 from iambic.core.models import BaseTemplate
 from iambic.core.parser import load_templates
-from iambic.core.utils import NOQ_TEMPLATE_REGEX, file_regex_search, yaml
+from iambic.core.utils import (
+    NOQ_TEMPLATE_REGEX,
+    file_regex_search,
+    get_writable_directory,
+    yaml,
+)
 
 if TYPE_CHECKING:
     from iambic.config.dynamic_config import Config
@@ -66,9 +73,72 @@ async def clone_git_repos(config, repo_dir: str) -> dict[str, Repo]:
     return repos
 
 
+class GitMirrors:
+    """
+    Bare mirrors of the remote repos, kept warm by long-running processes like the GitHub app server.
+
+    Every clone_git_repo call still creates its own working copy
+    but only the objects pushed since the last clone are fetched from the remote.
+    The mirrors are stored under the writable directory and keyed on the repo url without credentials.
+    Credentials are never persisted in the mirror, the url is passed on every fetch.
+    Disabled by default so a CLI clone does not leave a mirror behind.
+    """
+
+    def __init__(self, mirror_dir: Optional[str] = None):
+        self.enabled = False
+        self._mirror_dir = mirror_dir
+
+    @property
+    def mirror_dir(self) -> str:
+        return self._mirror_dir or os.path.join(
+            get_writable_directory(), ".iambic", "git_mirrors"
+        )
+
+    def get_mirror_path(self, repo_url: str) -> str:
+        parsed_url = urlparse(repo_url)
+        url_without_credentials = parsed_url._replace(
+            netloc=parsed_url.netloc.rsplit("@", 1)[-1]
+        ).geturl()
+        return os.path.join(
+            self.mirror_dir, xxhash.xxh64(url_without_credentials).hexdigest()
+        )
+
+    def update(self, repo_url: str) -> str:
+        mirror_path = self.get_mirror_path(repo_url)
+        if os.path.exists(mirror_path):
+            mirror = Repo(mirror_path)
+        else:
+            log.info("Creating git mirror.", mirror_path=mirror_path)
+            mirror = Repo.init(mirror_path, bare=True)
+
+        mirror.git.fetch(repo_url, "+refs/heads/*:refs/heads/*", "--prune")
+        return mirror_path
+
+
+git_mirrors = GitMirrors()
+
+
 def clone_git_repo(repo_url: str, repo_path: str, remote_branch_name: str):
-    repo = Repo.clone_from(repo_url, repo_path, branch=remote_branch_name)
-    return repo
+    if not git_mirrors.enabled:
+        return Repo.clone_from(repo_url, repo_path, branch=remote_branch_name)
+
+    try:
+        mirror_path = git_mirrors.update(repo_url)
+    except GitCommandError as err:
+        log.warning(
+            "Unable to update git mirror, cloning from the remote.",
+            error=str(err.stderr),
+        )
+        return Repo.clone_from(repo_url, repo_path, branch=remote_branch_name)
+
+    # dissociate so the clone does not depend on the mirror once created
+    return Repo.clone_from(
+        repo_url,
+        repo_path,
+        branch=remote_branch_name,
+        reference=mirror_path,
+        dissociate=True,
+    )
 
 
 def get_remote_default_branch(repo: Repo, remote_name: str = "origin"):
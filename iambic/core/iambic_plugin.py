@@ -6,6 +6,7 @@ from typing import Any, Optional, Type
 from pydantic import BaseModel as PydanticBaseModel
 from pydantic import Field
 
+from iambic.core.change_stream import apply_template
 from iambic.core.models import BaseTemplate, ExecutionMessage, TemplateChangeDetails
 
 
@@ -24,7 +25,7 @@ async def default_apply_callable(
     :param remote_worker: The remote worker to use for applying templates.
     """
     template_changes = await asyncio.gather(
-        *[template.apply(config) for template in templates]
+        *[apply_template(template, config) for template in templates]
     )
 
     return [
@@ -58,13 +59,13 @@ class ProviderPlugin(PydanticBaseModel):
     async_import_callable: Any = Field(
         description="The function that called to import resources across all templates for this provider."
         "This function must accept the "
-        "params: (exe_message: ExecutionMessage, config: ProviderConfig, base_output_dir: str, detect_messages: list = None, remote_worker: Worker = None)",
+        "params: (exe_message: ExecutionMessage, config: ProviderConfig, base_output_dir: str, detect_messages: list = None, remote_worker: Executor = None)",
         hidden_from_schema=True,
     )
     async_apply_callable: Any = Field(
         description="The function that called to apply resources across all templates for this provider."
         "This function must accept the "
-        "params: (exe_message: ExecutionMessage, config: ProviderConfig, templates: list[BaseTemplate], remote_worker: Worker = None)."
+        "params: (exe_message: ExecutionMessage, config: ProviderConfig, templates: list[BaseTemplate], remote_worker: Executor = None)."
         "It must return a list[TemplateChangeDetails].",
         default=default_apply_callable,
         hidden_from_schema=True,
@@ -91,7 +92,7 @@ class ProviderPlugin(PydanticBaseModel):
         description="(OPTIONAL) The function that called to discover upstream config changes."
         "An example of this would be a new account being added to an AWS Organization,"
         "or a change to AWS account's name or tags."
-        "This function must accept the params: (exe_message: ExecutionMessage, config: ProviderConfig, repo_dir: str, remote_worker: Worker = None)",
+        "This function must accept the params: (exe_message: ExecutionMessage, config: ProviderConfig, repo_dir: str, remote_worker: Executor = None)",
         hidden_from_schema=True,
     )
     templates: list[Type[BaseTemplate]] = Field(
@@ -8,6 +8,8 @@ import itertools
 import os
 import re
 import typing
+from collections import OrderedDict
+from contextlib import contextmanager
 from enum import Enum
 from hashlib import md5
 from pathlib import Path
@@ -15,6 +17,7 @@ from types import GenericAlias
 from typing import (
     TYPE_CHECKING,
     Any,
+    ClassVar,
     Dict,
     List,
     Optional,
@@ -26,27 +29,37 @@ from typing import (
 )
 
 import aiofiles
-import dateparser
 from deepdiff.model import PrettyOrderedSet
 from git import Repo
 from pydantic import BaseModel as PydanticBaseModel
-from pydantic import Extra, Field, root_validator, schema, validate_model, validator
+from pydantic import (
+    Extra,
+    Field,
+    PrivateAttr,
+    root_validator,
+    schema,
+    validate_model,
+    validator,
+)
 from pydantic.fields import ModelField
 
 from iambic.core import noq_json as json
 from iambic.core.context import ctx
+from iambic.core.expiry_index import expiry_index
 from iambic.core.iambic_enum import Command, ExecutionStatus, IambicManaged
 from iambic.core.logger import log
+from iambic.core.telemetry import telemetry
 from iambic.core.utils import (
     LiteralScalarString,
     apply_to_provider,
     create_commented_map,
+    get_identity_key,
     get_rendered_template_str_value,
     get_writable_directory,
+    load_template_dict,
     simplify_dt,
     snake_to_camelcap,
     sort_dict,
-    transform_comments,
     yaml,
 )
 
@@ -83,6 +96,88 @@ def strip_out_variables(s: str) -> str:
     return VARIABLE_REGEX.sub("", s)
 
 
+RENDERED_RESOURCE_CACHE_SIZE = int(
+    os.getenv("IAMBIC_RENDERED_RESOURCE_CACHE_SIZE", 10000)
+)
+
+
+class RenderedResources:
+    """
+    Keeps the resource dicts rendered for a provider child by apply_resource_dict while a batch is active.
+
+    A plan or apply renders the same template for the same provider child more than once,
+    e.g. to check its drift fingerprint, to apply it and to record its fingerprint.
+    An entry is only used while the template's render version is unchanged.
+    Changes to a template aren't detected, code that changes a template
+    while a batch is active, e.g. removing its expired resources, must call invalidate with it.
+    The rendered json string is kept so every caller gets its own copy of the dict.
+    """
+
+    def __init__(self, max_size: int = RENDERED_RESOURCE_CACHE_SIZE):
+        self.max_size = max_size
+        self._depth = 0
+        # get_identity_key(template, provider_child) -> (template, provider_child, render version, rendered json)
+        self._entries: OrderedDict[
+            tuple[int, ...], tuple[Any, Any, int, str]
+        ] = OrderedDict()
+
+    @property
+    def active(self) -> bool:
+        return self._depth > 0
+
+    @contextmanager
+    def batch(self):
+        self._depth += 1
+        try:
+            yield self
+        finally:
+            self._depth -= 1
+            if not self._depth:
+                self.clear()
+
+    def get(self, template, provider_child) -> Optional[str]:
+        if not self.active:
+            return None
+
+        key = get_identity_key(template, provider_child)
+        entry = self._entries.get(key)
+        if (
+            entry
+            and entry[0] is template
+            and entry[1] is provider_child
+            and entry[2] == template._render_version
+        ):
+            self._entries.move_to_end(key)
+            return entry[3]
+        return None
+
+    def set(self, template, provider_child, rendered: str):
+        if not self.active:
+            return
+
+        key = get_identity_key(template, provider_child)
+        self._entries[key] = (
+            template,
+            provider_child,
+            template._render_version,
+            rendered,
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def invalidate(template):
+        """Drop the resources rendered for the template after it was changed."""
+        template._render_version += 1
+
+    def clear(self):
+        self._entries = OrderedDict()
+
+
+rendered_resources = RenderedResources()
+
+
 class IambicPydanticBaseModel(PydanticBaseModel):
     metadata_iambic_fields = Field(
         set(), description="metadata for iambic", exclude=True, hidden_from_schema=True
@@ -302,8 +397,11 @@ class BaseModel(IambicPydanticBaseModel):
         return {self.case_convention(k): v for k, v in resource_dict.items()}
 
     def apply_resource_dict(self, provider_child: Type[ProviderChild]) -> dict:
-        response = self._apply_resource_dict(provider_child)
-        data = get_rendered_template_str_value(json.dumps(response), provider_child)
+        data = rendered_resources.get(self, provider_child)
+        if data is None:
+            response = self._apply_resource_dict(provider_child)
+            data = get_rendered_template_str_value(json.dumps(response), provider_child)
+            rendered_resources.set(self, provider_child, data)
         # TODO data has not been re-validated after variable substitution.
         # Unfortunately, _apply_resource_dict is not totally reversible back into a
         # pydantic model for validation. Next phase of improvement should consider
@@ -313,40 +411,44 @@ class BaseModel(IambicPydanticBaseModel):
         # it is no longer reversible.
         return json.loads(data)
 
-    async def remove_expired_resources(self):
-        # Look at current model and recurse through submodules to see if it is a subclass of ExpiryModel
-        # If it is, then call the remove_expired_resources method
+    async def remove_expired_resources(self) -> bool:
+        return self._remove_expired_resources(
+            datetime.datetime.now(datetime.timezone.utc)
+        )
 
+    def _remove_expired_resources(self, now: datetime.datetime) -> bool:
+        # Look at current model and recurse through submodules to see if it is a subclass of ExpiryModel
+        # If it is, then mark it as deleted once expired.
+        # A plain walk, the check is too cheap to be worth a coroutine per submodule.
+        # Returns whether an expired resource was found.
         if issubclass(type(self), ExpiryModel):
             if hasattr(self, "expires_at") and self.expires_at:
-                if self.expires_at < datetime.datetime.now(datetime.timezone.utc):
+                if self.expires_at < now:
                     self.deleted = True
                     log.info("Expired resource found, marking for deletion")
-                    return self
+                    return True
+        expired = False
         for field_name in self.__fields__.keys():
             field_val = getattr(self, field_name)
             if isinstance(field_val, list):
-                await asyncio.gather(
-                    *[
-                        elem.remove_expired_resources()
-                        for elem in field_val
-                        if isinstance(elem, BaseModel)
-                    ]
-                )
                 for elem in field_val:
-                    if getattr(elem, "deleted", None) is True:
-                        field_val.remove(elem)
-
-            elif not (
-                isinstance(field_val, BaseModel) or isinstance(field_val, ExpiryModel)
-            ):
-                continue
-
-            else:
-                if isinstance(field_val, BaseModel):
-                    await field_val.remove_expired_resources()
-                    if getattr(field_val, "deleted", None) is True:
-                        setattr(self, field_name, None)
+                    if isinstance(elem, BaseModel) and elem._remove_expired_resources(
+                        now
+                    ):
+                        expired = True
+                field_val[:] = [
+                    elem
+                    for elem in field_val
+                    if getattr(elem, "deleted", None) is not True
+                ]
+
+            elif isinstance(field_val, BaseModel):
+                if field_val._remove_expired_resources(now):
+                    expired = True
+                if getattr(field_val, "deleted", None) is True:
+                    setattr(self, field_name, None)
+
+        return expired
 
     @property
     def exclude_keys(self) -> set:
@@ -375,7 +477,104 @@ class ProposedChangeType(Enum):
     UNKNOWN = "Unknown"
 
 
-class ProposedChange(PydanticBaseModel):
+class ChangeRecord(PydanticBaseModel):
+    """
+    Base for the records of the changes made by a plan or apply.
+
+    A full plan creates a record per tag, policy and assignment per account,
+    so records created in code are not validated and are not copied into the record they are added to.
+    Only the cheap coercions in _coerce_record_values are applied.
+    Records are fully validated once they are output, see validated.
+    Records created from a dict, e.g. by parse_obj or a nested dict, are always fully validated.
+
+    The pydantic metaclass already gives every record class __slots__,
+    what's left per record is the __dict__ pydantic keeps the fields in and the fields set.
+    Records created in code share the fields set of the records set with the same fields.
+    """
+
+    # The fields holding a list of records. Validated in full unless every element is a record.
+    _record_list_fields: ClassVar[tuple[str, ...]] = ()
+    _shared_fields_sets: ClassVar[dict[frozenset[str], frozenset[str]]] = {}
+
+    def __init__(__pydantic_self__, **data: Any):
+        values = __pydantic_self__._get_record_values(data)
+        if values is None:
+            super().__init__(**data)
+            return
+
+        object.__setattr__(__pydantic_self__, "__dict__", values)
+        object.__setattr__(
+            __pydantic_self__,
+            "__fields_set__",
+            __pydantic_self__._get_shared_fields_set(data),
+        )
+        __pydantic_self__._init_private_attributes()
+
+    @classmethod
+    def _get_shared_fields_set(cls, data: dict) -> frozenset[str]:
+        fields_set = frozenset(data).intersection(cls.__fields__)
+        return cls._shared_fields_sets.setdefault(fields_set, fields_set)
+
+    def __setattr__(self, name, value):
+        if isinstance(self.__fields_set__, frozenset):
+            # The fields set is shared, it's copied before pydantic adds to it
+            object.__setattr__(self, "__fields_set__", set(self.__fields_set__))
+        super().__setattr__(name, value)
+
+    @classmethod
+    def _get_record_values(cls, data: dict) -> Optional[dict]:
+        for field_name in cls._record_list_fields:
+            if field_val := data.get(field_name):
+                if not isinstance(field_val, list) or not all(
+                    isinstance(elem, ChangeRecord) for elem in field_val
+                ):
+                    return None
+
+        values = {}
+        for field_name, field in cls.__fields__.items():
+            if field_name in data:
+                values[field_name] = data[field_name]
+            elif field.required:
+                return None
+            else:
+                values[field_name] = field.get_default()
+
+        for field_name in cls._record_list_fields:
+            # Don't share the list with the caller the same as a validated model
+            values[field_name] = list(values[field_name])
+
+        try:
+            cls._coerce_record_values(values)
+        except (TypeError, ValueError):
+            return None
+        return values
+
+    @classmethod
+    def _coerce_record_values(cls, values: dict):
+        pass
+
+    @classmethod
+    def parse_obj(cls, obj: Any):
+        obj = cls._enforce_dict_if_root(obj)
+        if not isinstance(obj, dict):
+            return super().parse_obj(obj)
+
+        record = cls.__new__(cls)
+        PydanticBaseModel.__init__(record, **obj)
+        return record
+
+    @classmethod
+    def validate(cls, value: Any):
+        if isinstance(value, dict):
+            return cls.parse_obj(value)
+        return super().validate(value)
+
+    def validated(self):
+        """Returns a fully validated copy of the record, raises a ValidationError if the record is invalid."""
+        return self.parse_obj(self.dict())
+
+
+class ProposedChange(ChangeRecord):
     change_type: ProposedChangeType
     account: Optional[
         str
@@ -390,8 +589,12 @@ class ProposedChange(PydanticBaseModel):
         default=[]
     )  # FIXME, can we do better than string?
 
+    @classmethod
+    def _coerce_record_values(cls, values: dict):
+        values["change_type"] = ProposedChangeType(values["change_type"])
 
-class AccountChangeDetails(PydanticBaseModel):
+
+class AccountChangeDetails(ChangeRecord):
     org_id: Optional[str]
     account: Union[str, int]
     resource_id: Union[str, int]
@@ -400,6 +603,11 @@ class AccountChangeDetails(PydanticBaseModel):
     proposed_changes: list[ProposedChange] = Field(default=[])
     exceptions_seen: list[ProposedChange] = Field(default=[])
 
+    _record_list_fields: ClassVar[tuple[str, ...]] = (
+        "proposed_changes",
+        "exceptions_seen",
+    )
+
     def extend_changes(self, changes: list[ProposedChange]):
         for change in changes:
             if change.exceptions_seen:
@@ -408,7 +616,7 @@ class AccountChangeDetails(PydanticBaseModel):
                 self.proposed_changes.append(change)
 
 
-class TemplateChangeDetails(PydanticBaseModel):
+class TemplateChangeDetails(ChangeRecord):
     resource_id: str
     resource_type: str
     template_path: Union[str, Path]
@@ -418,6 +626,11 @@ class TemplateChangeDetails(PydanticBaseModel):
         default=[]
     )
 
+    _record_list_fields: ClassVar[tuple[str, ...]] = (
+        "proposed_changes",
+        "exceptions_seen",
+    )
+
     class Config:
         json_encoders = {PrettyOrderedSet: list}
         extra = Extra.ignore
@@ -426,6 +639,10 @@ class TemplateChangeDetails(PydanticBaseModel):
     def validate_template_path(cls, v: Union[str, Path]):
         return str(v)
 
+    @classmethod
+    def _coerce_record_values(cls, values: dict):
+        values["template_path"] = str(values["template_path"])
+
     def extend_changes(
         self, changes: list[Union[AccountChangeDetails, ProposedChange]]
     ):
@@ -544,6 +761,144 @@ class AccessModelMixin:
         )
 
 
+class TemplateWriteStats:
+    """Counts the template files written, skipped because they were unchanged, and deleted."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.written = 0
+        self.skipped = 0
+        self.deleted = 0
+
+    def dict(self) -> dict[str, int]:
+        return {
+            "written": self.written,
+            "skipped": self.skipped,
+            "deleted": self.deleted,
+        }
+
+
+template_write_stats = TemplateWriteStats()
+
+# git rm receives the paths as arguments so keep each call well under ARG_MAX
+TEMPLATE_DELETION_CHUNK_SIZE = 500
+
+
+def remove_template_files(file_paths: list[str]):
+    """
+    Remove template files from the git index and the working tree.
+
+    Files are grouped by repo so each repo is opened once and
+    its index is updated once per chunk instead of once per file.
+    Files git doesn't track are removed from the file system.
+    """
+    repos: dict[str, Repo] = {}
+    repo_file_map: dict[Optional[str], list[str]] = {}
+    for file_path in file_paths:
+        file_path = os.path.abspath(os.path.expanduser(file_path))
+        repo_dir = next(
+            (
+                repo_dir
+                for repo_dir in repos
+                if file_path.startswith(f"{repo_dir}{os.sep}")
+            ),
+            None,
+        )
+        if not repo_dir:
+            try:
+                repo = Repo(os.path.dirname(file_path), search_parent_directories=True)
+                repo_dir = repo.working_tree_dir
+                repos[repo_dir] = repo
+            except Exception:
+                repo_dir = None
+        repo_file_map.setdefault(repo_dir, []).append(file_path)
+
+    for repo_dir, repo_file_paths in repo_file_map.items():
+        if repo_dir:
+            for elem in range(0, len(repo_file_paths), TEMPLATE_DELETION_CHUNK_SIZE):
+                chunk = repo_file_paths[elem : elem + TEMPLATE_DELETION_CHUNK_SIZE]
+                try:
+                    # why force=True? Expire could have modified the local contents
+                    # without force=True, git rm would not be able to remove the file
+                    repos[repo_dir].index.remove(
+                        chunk, working_tree=True, force=True, ignore_unmatch=True
+                    )
+                except Exception as e:
+                    log.error(
+                        "Unable to remove files from local Git repo. Deleting manually",
+                        error=e,
+                        repo_dir=repo_dir,
+                        file_count=len(chunk),
+                    )
+
+        for file_path in repo_file_paths:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+
+class TemplateDeletions:
+    """
+    Defers template file deletions made inside a batch
+    so they are removed with a single index update when the batch ends.
+
+    A template written after it was deleted in the same batch is kept.
+    """
+
+    def __init__(self):
+        self._depth = 0
+        self._file_paths: dict[str, None] = {}
+
+    @property
+    def active(self) -> bool:
+        return self._depth > 0
+
+    @contextmanager
+    def batch(self):
+        self._depth += 1
+        try:
+            yield self
+        finally:
+            self._depth -= 1
+            if not self._depth:
+                self.flush()
+
+    @contextmanager
+    def collect(self):
+        """
+        Defer the deletions made inside the block without removing them when it ends.
+
+        Used by a process pool worker that hands its deletions to the parent with pop.
+        """
+        self._depth += 1
+        try:
+            yield self
+        finally:
+            self._depth -= 1
+
+    def add(self, file_path: Union[str, Path]):
+        self._file_paths[str(file_path)] = None
+
+    def discard(self, file_path: Union[str, Path]):
+        self._file_paths.pop(str(file_path), None)
+
+    def pop(self) -> list[str]:
+        """Return and forget the pending deletions."""
+        file_paths = list(self._file_paths)
+        self._file_paths = {}
+        return file_paths
+
+    def flush(self):
+        if file_paths := list(self._file_paths):
+            self._file_paths = {}
+            log.debug("Removing deleted template files.", file_count=len(file_paths))
+            remove_template_files(file_paths)
+
+
+template_deletions = TemplateDeletions()
+
+
 class BaseTemplate(
     BaseModel,
 ):
@@ -561,6 +916,14 @@ class BaseTemplate(
         description="if true, it's in-memory only used for clean up operation",
         hidden_from_schema=True,
     )
+    # Bumped by rendered_resources.invalidate when the template is changed during an apply
+    _render_version: int = PrivateAttr(0)
+
+    async def remove_expired_resources(self) -> bool:
+        if expired := await super().remove_expired_resources():
+            # The expired resources are removed in place
+            rendered_resources.invalidate(self)
+        return expired
 
     def dict(
         self,
@@ -641,6 +1004,7 @@ class BaseTemplate(
 
         return as_yaml
 
+    @telemetry.traced("write_template")
     def write(self, exclude_none=True, exclude_unset=True, exclude_defaults=True):
         # pay the cost of validating the models once more.
         self.validate_model_afterward()
@@ -652,41 +1016,43 @@ class BaseTemplate(
         # to makedirs
         if parent_directory:
             os.makedirs(parent_directory, exist_ok=True)
+
+        # The template was recreated after being deleted in the current batch
+        template_deletions.discard(self.file_path)
+        if os.path.isfile(self.file_path):
+            with open(self.file_path, "r") as f:
+                if f.read() == as_yaml:
+                    # Leave the file alone so a no-op import doesn't touch the repo
+                    template_write_stats.skipped += 1
+                    expiry_index.record(self)
+                    return
+
         with open(self.file_path, "w") as f:
             f.write(as_yaml)
+        template_write_stats.written += 1
+        expiry_index.record(self)
 
     def delete(self):
         log.info("Deleting template file", file_path=self.file_path)
         if self.is_memory_only:
             log.info("template file is in-memory-only", file_path=self.file_path)
             return
-        try:
-            repo = Repo(self.file_path, search_parent_directories=True)
-            # why force=True? Expire could have modified the local contents
-            # without force=True, git rm would not be able to remove the file
-            repo.index.remove(
-                [
-                    str(self.file_path)
-                ],  # manual cast to str is necessary because git library only accepts str and not FilePath
-                working_tree=True,
-                force=True,
-            )
-        except Exception as e:
-            log.error(
-                "Unable to remove file from local Git repo. Deleting manually",
-                error=e,
-                file_path=self.file_path,
-            )
-            os.remove(self.file_path)
+
+        if template_deletions.active:
+            template_deletions.add(self.file_path)
+        else:
+            # manual cast to str is necessary because git library only accepts str and not FilePath
+            remove_template_files([str(self.file_path)])
+
+        expiry_index.remove(self.file_path)
+        template_write_stats.deleted += 1
 
     async def apply(self, config: Config) -> TemplateChangeDetails:
         raise NotImplementedError
 
     @classmethod
     def load(cls, file_path: str):
-        return cls(
-            file_path=file_path, **transform_comments(yaml.load(open(file_path)))
-        )
+        return cls(file_path=file_path, **load_template_dict(file_path))
 
     @classmethod
     def iambic_specific_knowledge(cls) -> set[str]:
@@ -742,6 +1108,9 @@ class ExpiryModel(IambicPydanticBaseModel):
             if not dt.tzinfo:
                 dt = dt.replace(tzinfo=datetime.timezone.utc)
             return dt
+        # dateparser is slow to import and only needed for relative times
+        import dateparser
+
         dt = dateparser.parse(
             value, settings={"TIMEZONE": "UTC", "RETURN_AS_TIMEZONE_AWARE": True}
         )
@@ -866,6 +1235,7 @@ class ExecutionMessage(PydanticBaseModel):
 class ExecutionResponse(ExecutionMessage):
     status: ExecutionStatus
     errors: Optional[list[str]]
+    template_changes: list[TemplateChangeDetails] = []
 
 
 class ConfigMixin:
@@ -873,6 +1243,11 @@ class ConfigMixin:
     def templates(self) -> list[Type[BaseTemplate]]:
         raise NotImplementedError
 
+    @property
+    def provider_children(self) -> list[ProviderChild]:
+        """The children templates are evaluated on with their access rules, e.g. AWS accounts."""
+        return []
+
     @property
     def template_map(self) -> dict[str, Type[BaseTemplate]]:
         return {
@@ -13,7 +13,8 @@ from ruamel.yaml.scanner import ScannerError
 
 from iambic.core.logger import log
 from iambic.core.models import BaseTemplate
-from iambic.core.utils import transform_comments, yaml
+from iambic.core.telemetry import telemetry
+from iambic.core.utils import load_template_dict
 
 # we must avoid import multiprocessing pool in the module loading time
 if os.environ.get("AWS_LAMBDA_FUNCTION_NAME", False):
@@ -79,7 +80,7 @@ def format_validation_error(err, ruamel_dict):
 
 def load_template(template_path: str, raise_validation_err: bool = True) -> dict:
     try:
-        template_dict = transform_comments(yaml.load(open(template_path)))
+        template_dict = load_template_dict(template_path)
         template_type = template_dict.get("template_type")
         if template_type and template_type not in ["NOQ::Core::Config"]:
             template_dict["file_path"] = template_path
@@ -92,6 +93,7 @@ def load_template(template_path: str, raise_validation_err: bool = True) -> dict
             raise ValueError(f"{template_path} template has validation error.") from err
 
 
+@telemetry.traced()
 def load_templates(
     template_paths: list[str],
     template_map: dict[str, Type[BaseTemplate]],
@@ -140,7 +142,10 @@ def load_templates(
                 error=repr(err),
             )
             if raise_validation_err:
-                hints = format_validation_error(err, template_dict)
+                # The line info used for the hints is only kept by the round-trip loader
+                hints = format_validation_error(
+                    err, load_template_dict(template_dict["file_path"], round_trip=True)
+                )
                 raise ValueError(
                     f"{template_dict['file_path']} template has validation error. \n{hints}"
                 ) from err
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import contextvars
+import functools
+import inspect
+import os
+import secrets
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Coroutine, Optional
+
+from iambic.core import noq_json as json
+from iambic.core.logger import log
+
+# The directory the telemetry summary and trace of a run are written to.
+# Telemetry is only recorded if this is set or the CLI is run with --telemetry-dir.
+TELEMETRY_DIR = os.getenv("IAMBIC_TELEMETRY_DIR")
+TELEMETRY_SUMMARY_FILE_NAME = "telemetry_summary.json"
+TELEMETRY_TRACE_FILE_NAME = "telemetry_trace.json"
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "iambic_telemetry_span", default=None
+)
+
+
+class Span:
+    __slots__ = (
+        "name",
+        "span_id",
+        "parent",
+        "attributes",
+        "start_ns",
+        "end_ns",
+        "error",
+    )
+
+    def __init__(self, name: str, parent: Optional[Span], attributes: dict):
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent = parent
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    @property
+    def parent_span_id(self) -> Optional[str]:
+        return self.parent.span_id if self.parent else None
+
+    @property
+    def seconds(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+
+class Telemetry:
+    """
+    Records per-phase timings and API call counters for a single run.
+
+    Phases are recorded as spans, nested by the span active in the current context
+    so the spans of concurrent tasks are attributed to the phase that started them.
+    Counters are keyed by name and attributes.
+    If not set explicitly, the provider_id of the nearest span is added to a counter's attributes
+    so API calls are broken down per account without threading it through every call.
+
+    Spans started in the worker processes of a process pool are not recorded.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.trace_id = secrets.token_hex(16)
+        self.spans: list[Span] = []
+        self.counters: dict[tuple, float] = defaultdict(int)
+
+    def reset(self):
+        self.trace_id = secrets.token_hex(16)
+        self.spans = []
+        self.counters = defaultdict(int)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        if not self.enabled:
+            yield None
+            return
+
+        span = Span(name, _current_span.get(), attributes)
+        self.spans.append(span)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as err:
+            span.error = repr(err)
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            _current_span.reset(token)
+
+    async def trace(self, coroutine: Coroutine, name: str = None, **attributes) -> Any:
+        """Await the coroutine inside a span named after the coroutine function by default."""
+        with self.span(name or coroutine.__name__, **attributes):
+            return await coroutine
+
+    async def trace_apply(
+        self, template, provider_id: str, coroutine: Coroutine
+    ) -> Any:
+        """Await the apply of a template to a single provider child, e.g. an AWS account, inside a span."""
+        return await self.trace(
+            coroutine,
+            "apply_to_account",
+            resource_type=template.resource_type,
+            resource_id=template.resource_id,
+            provider_id=provider_id,
+        )
+
+    def traced(self, name: str = None) -> Callable:
+        """Decorate a function or coroutine function to run every call inside a span."""
+
+        def decorator(func: Callable) -> Callable:
+            span_name = name or func.__name__
+
+            if inspect.iscoroutinefunction(func):
+
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(span_name):
+                        return await func(*args, **kwargs)
+
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def increment(self, name: str, value: float = 1, **attributes):
+        if not self.enabled:
+            return
+
+        if "provider_id" not in attributes:
+            span = _current_span.get()
+            while span:
+                if provider_id := span.attributes.get("provider_id"):
+                    attributes["provider_id"] = provider_id
+                    break
+                span = span.parent
+
+        self.counters[(name, tuple(sorted(attributes.items())))] += value
+
+    def summary(self) -> dict:
+        phases = {}
+        for span in self.spans:
+            phase = phases.setdefault(
+                span.name,
+                {"count": 0, "errors": 0, "total_seconds": 0, "max_seconds": 0},
+            )
+            phase["count"] += 1
+            phase["errors"] += int(bool(span.error))
+            phase["total_seconds"] += span.seconds
+            phase["max_seconds"] = max(phase["max_seconds"], span.seconds)
+
+        root_spans = [span for span in self.spans if not span.parent_span_id]
+        return {
+            "trace_id": self.trace_id,
+            "total_seconds": sum(span.seconds for span in root_spans),
+            "phases": dict(
+                sorted(
+                    phases.items(),
+                    key=lambda phase: phase[1]["total_seconds"],
+                    reverse=True,
+                )
+            ),
+            "counters": [
+                {"name": name, "attributes": dict(attributes), "value": value}
+                for (name, attributes), value in sorted(
+                    self.counters.items(), key=lambda counter: str(counter[0])
+                )
+            ],
+        }
+
+    def trace_export(self) -> dict:
+        """The recorded spans in the OpenTelemetry OTLP/JSON trace format."""
+
+        def get_attributes(attributes: dict) -> list[dict]:
+            return [
+                {"key": key, "value": {"stringValue": str(value)}}
+                for key, value in attributes.items()
+            ]
+
+        spans = []
+        for span in self.spans:
+            otel_span = {
+                "traceId": self.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                # SPAN_KIND_INTERNAL
+                "kind": 1,
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns or time.time_ns()),
+                "attributes": get_attributes(span.attributes),
+                # STATUS_CODE_ERROR or STATUS_CODE_UNSET
+                "status": {"code": 2, "message": span.error} if span.error else {},
+            }
+            if span.parent_span_id:
+                otel_span["parentSpanId"] = span.parent_span_id
+            spans.append(otel_span)
+
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": get_attributes({"service.name": "iambic"})
+                    },
+                    "scopeSpans": [
+                        {"scope": {"name": "iambic.core.telemetry"}, "spans": spans}
+                    ],
+                }
+            ]
+        }
+
+    def export(self, directory: str) -> tuple[str, str]:
+        """Write the summary and the trace to the directory and return their paths."""
+        os.makedirs(directory, exist_ok=True)
+        summary_path = os.path.join(directory, TELEMETRY_SUMMARY_FILE_NAME)
+        trace_path = os.path.join(directory, TELEMETRY_TRACE_FILE_NAME)
+        with open(summary_path, "w") as f:
+            f.write(json.dumps(self.summary(), indent=2))
+        with open(trace_path, "w") as f:
+            f.write(json.dumps(self.trace_export()))
+
+        log.info(
+            "Telemetry has been saved.",
+            summary_path=summary_path,
+            trace_path=trace_path,
+        )
+        return summary_path, trace_path
+
+
+telemetry = Telemetry(enabled=bool(TELEMETRY_DIR))
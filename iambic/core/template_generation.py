@@ -8,12 +8,19 @@ import xxhash
 from iambic.core import noq_json as json
 from iambic.core.iambic_enum import IambicManaged
 from iambic.core.logger import log
-from iambic.core.models import AccessModelMixin, BaseModel, BaseTemplate, ProviderChild
+from iambic.core.models import (
+    AccessModelMixin,
+    BaseModel,
+    BaseTemplate,
+    ProviderChild,
+    template_deletions,
+)
 from iambic.core.parser import load_templates
 from iambic.core.utils import (
     IAMBIC_ERR_MSG,
     evaluate_on_provider,
     gather_templates,
+    get_access_rule_matrix,
     get_provider_value,
     is_regex_match,
     sanitize_string,
@@ -679,10 +686,20 @@ def update_access_attributes(
         new_model, existing_model = sync_access_model_scope(new_model, existing_model)
         return new_model, existing_model
     else:
-        for child in all_provider_children:
-            currently_evaluated = evaluate_on_provider(existing_model, child, False)
+        access_rule_matrix = get_access_rule_matrix(all_provider_children)
+        currently_evaluated_bits = access_rule_matrix.evaluate(existing_model, False)
+        # Identifiers of children whose rules were changed in existing_model
+        updated_identifiers = set()
+        new_included_children = set(new_model.included_children)
+        for elem, child in enumerate(all_provider_children):
+            child_identifiers = access_rule_matrix.child_identifiers[elem]
+            if updated_identifiers.isdisjoint(child_identifiers):
+                currently_evaluated = bool(currently_evaluated_bits & (1 << elem))
+            else:
+                # A rule added or removed for a previous child may also match this one
+                currently_evaluated = evaluate_on_provider(existing_model, child, False)
             evaluated_on_new_model = bool(
-                child.preferred_identifier in new_model.included_children
+                child.preferred_identifier in new_included_children
             )
             if evaluated_on_new_model and not currently_evaluated:
                 if (
@@ -704,6 +721,7 @@ def update_access_attributes(
                     existing_model.set_excluded_children(excluded_children)
                 else:
                     existing_model.included_children.append(child.preferred_identifier)
+                updated_identifiers.update(child_identifiers)
 
             if not evaluated_on_new_model and currently_evaluated:
                 # If the child was explicitly defined in included_children then remove it
@@ -719,6 +737,7 @@ def update_access_attributes(
                     existing_model.set_included_children(included_children)
                 else:
                     existing_model.excluded_children.append(child.preferred_identifier)
+                updated_identifiers.update(child_identifiers)
 
     existing_model, new_model = sync_access_model_scope(existing_model, new_model)
     return new_model, existing_model
@@ -747,19 +766,24 @@ def resolve_model_orphaned_children(
     These children are ones that didn't hit on an existing model's included_children
     """
     all_provider_children = list(provider_child_map.values())
+    access_rule_matrix = get_access_rule_matrix(all_provider_children)
+    lowered_resolved_children = {child.lower() for child in resolved_children}
 
     for included_child in new_model.included_children:
         provider_child = provider_child_map.get(included_child)
         if not provider_child:
             continue
 
-        if any(is_regex_match(included_child, child) for child in resolved_children):
+        if "*" not in included_child:
+            if included_child.lower() in lowered_resolved_children:
+                continue
+        elif any(is_regex_match(included_child, child) for child in resolved_children):
             continue
 
+        provider_child_bit = access_rule_matrix.bit(provider_child)
         for elem, matching_model in enumerate(merged_model_list):
-            if any(
-                is_regex_match(child, provider_child.preferred_identifier)
-                for child in matching_model.excluded_children
+            if provider_child_bit & access_rule_matrix.rules_bits(
+                matching_model.excluded_children, preferred_only=True
             ):
                 # Don't merge the child if the model excludes it explicitly
                 continue
@@ -775,6 +799,7 @@ def resolve_model_orphaned_children(
                 for attr in matching_model.iambic_specific_knowledge()
             ):
                 resolved_children.add(included_child)
+                lowered_resolved_children.add(included_child.lower())
                 merged_model = merge_model(
                     new_model, matching_model, all_provider_children
                 )
@@ -1133,14 +1158,15 @@ def delete_orphaned_templates(
     - existing_templates (list[BaseTemplate]): List of templates that were already in IAMbic
     - resource_ids (set[str]): The set of resource ids that were found in the latest import
     """
-    for existing_template in existing_templates:
-        if existing_template.resource_id not in resource_ids:
-            if existing_template.iambic_managed == IambicManaged.ENFORCED:
-                # If the template is marked as ENFORCED, we should not delete it.
-                continue
-            log.warning(
-                "Removing template that references deleted resource",
-                resource_type=existing_template.resource_type,
-                resource_id=existing_template.resource_id,
-            )
-            existing_template.delete()
+    with template_deletions.batch():
+        for existing_template in existing_templates:
+            if existing_template.resource_id not in resource_ids:
+                if existing_template.iambic_managed == IambicManaged.ENFORCED:
+                    # If the template is marked as ENFORCED, we should not delete it.
+                    continue
+                log.warning(
+                    "Removing template that references deleted resource",
+                    resource_type=existing_template.resource_type,
+                    resource_id=existing_template.resource_id,
+                )
+                existing_template.delete()
@@ -7,11 +7,14 @@ import pathlib
 import re
 import sys
 import tempfile
+import threading
 import typing
+import weakref
+from collections import OrderedDict, defaultdict
 from datetime import date, datetime, timezone
 from io import StringIO
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Coroutine, Optional, Union
+from typing import TYPE_CHECKING, Any, Callable, Coroutine, Hashable, Optional, Union
 from urllib.parse import unquote_plus
 
 import aiofiles
@@ -20,12 +23,15 @@ from asgiref.sync import sync_to_async
 from jinja2 import BaseLoader
 from jinja2.sandbox import ImmutableSandboxedEnvironment
 from ruamel.yaml import YAML, scalarstring
+from ruamel.yaml.constructor import SafeConstructor
+from ruamel.yaml.error import YAMLError
 
 from iambic.core import noq_json as json
 from iambic.core.aio_utils import gather_limit
 from iambic.core.exceptions import RateLimitException
 from iambic.core.iambic_enum import IambicManaged
 from iambic.core.logger import log
+from iambic.core.telemetry import telemetry
 
 if TYPE_CHECKING:
     from iambic.core.models import ProposedChange, ProviderChild
@@ -70,6 +76,41 @@ def get_writable_directory() -> pathlib.Path:
     return __WRITABLE_DIRECTORY__
 
 
+def get_cache_file_path(*path_parts: str) -> str:
+    """The path of a file kept across runs in the .iambic directory of the writable directory."""
+    return os.path.join(get_writable_directory(), ".iambic", *path_parts)
+
+
+def load_json_cache_file(file_path: str, cache_name: str) -> Optional[Any]:
+    """
+    Load a file written by save_json_cache_file.
+
+    Returns None if the file doesn't exist or can't be loaded, the caller then starts fresh.
+    """
+    if not os.path.exists(file_path):
+        return None
+
+    try:
+        with open(file_path, "r") as f:
+            return json.loads(f.read())
+    except Exception as err:
+        log.warning(
+            f"Unable to load the {cache_name}. Starting fresh.",
+            file_path=file_path,
+            error=str(err),
+        )
+        return None
+
+
+def save_json_cache_file(file_path: str, data: Any):
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    # Write then rename so a concurrent reader never sees a partial file
+    tmp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}"
+    with open(tmp_path, "w") as f:
+        f.write(json.dumps(data))
+    os.replace(tmp_path, file_path)
+
+
 def camel_to_snake(str_obj: str) -> str:
     return re.sub("([a-z0-9])([A-Z])", r"\1_\2", str_obj).lower()
 
@@ -149,6 +190,7 @@ async def file_regex_search(
         return None
 
 
+@telemetry.traced()
 async def gather_templates(repo_dir: str, template_type: str = None) -> list[str]:
     repo_dir_path = Path(repo_dir)
     if not repo_dir_path.is_dir():
@@ -230,6 +272,70 @@ class NoqSemaphore:
         )
 
 
+class LoopSemaphore:
+    """
+    A semaphore shared by every event loop of the process.
+
+    An asyncio.Semaphore is bound to the loop it is first awaited on
+    and a run may call asyncio.run more than once, so a semaphore is created per loop.
+    """
+
+    def __init__(self, value: int):
+        self.value = value
+        self._semaphores: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = weakref.WeakKeyDictionary()
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if (semaphore := self._semaphores.get(loop)) is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.value)
+        return semaphore
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+
+    async def __aexit__(self, *args):
+        self.semaphore.release()
+
+
+class SingleFlight:
+    """
+    Concurrent calls with the same key share a single in-flight call.
+
+    The result of a call is kept for its key until it's dropped.
+    A failed call is not kept and a call in flight on another event loop is made again.
+    """
+
+    def __init__(self):
+        self._futures: dict[Hashable, asyncio.Future] = {}
+
+    async def get(self, key: Hashable, fn: Callable, *args, **kwargs):
+        future = self._futures.get(key)
+        if future is None or (
+            not future.done() and future.get_loop() is not asyncio.get_running_loop()
+        ):
+            future = asyncio.ensure_future(fn(*args, **kwargs))
+            self._futures[key] = future
+
+        try:
+            return await future
+        except Exception:
+            if self._futures.get(key) is future:
+                self._futures.pop(key)
+            raise
+
+    def keys(self) -> list[Hashable]:
+        return list(self._futures)
+
+    def pop(self, key: Hashable):
+        self._futures.pop(key, None)
+
+    def clear(self):
+        self._futures = {}
+
+
 async def async_batch_processor(
     tasks: list,
     batch_size: int,
@@ -362,6 +468,21 @@ def transform_comments(yaml_dict):
 
     comment_dict = {}
     yaml_dict["metadata_commented_dict"] = comment_dict
+    if not isinstance(yaml_dict, CommentedMap):
+        # Loaded by the fast loader so there are no comments to transform
+        for key, value in yaml_dict.items():
+            if value is comment_dict:
+                continue
+            elif (
+                isinstance(value, list)
+                and len(value) > 0
+                and isinstance(value[0], dict)
+            ):
+                yaml_dict[key] = [transform_comments(n) for n in value]
+            elif isinstance(value, dict):
+                yaml_dict[key] = transform_comments(value)
+        return yaml_dict
+
     if yaml_dict.ca.comment:
         comment_dict["__file_header__"] = yaml_dict.ca.comment[
             1
@@ -451,6 +572,98 @@ yaml.indent(mapping=2, sequence=4, offset=2)
 yaml.representer.ignore_aliases = lambda *data: True
 yaml.width = 4096
 
+# Set to load every template with the round-trip loader
+YAML_ROUND_TRIP_ONLY = bool(os.getenv("IAMBIC_YAML_ROUND_TRIP_ONLY"))
+_INT_RE = re.compile(r"^[-+]?(0|[1-9][0-9]*)$")
+# Comments, anchors and blank lines are kept by the round-trip loader
+_ROUND_TRIP_RE = re.compile(rb"[#&]|(?:^|\n)[ \t]*\r?\n")
+
+
+class RoundTripRequired(Exception):
+    pass
+
+
+class FastConstructor(SafeConstructor):
+    """
+    A SafeConstructor that builds the same values as the round-trip loader for files without comments.
+
+    Quoted and literal strings keep their style so they are dumped exactly as they were loaded.
+    Raises RoundTripRequired for anything the round-trip loader keeps formatting data for
+    (flow collections, anchors, folded strings, floats, non-decimal ints and timestamps)
+    so the file is loaded by the round-trip loader instead.
+    """
+
+    def construct_scalar(self, node):
+        if node.anchor or node.style == ">":
+            raise RoundTripRequired
+        elif node.style == "|":
+            return scalarstring.LiteralScalarString(node.value)
+        elif node.style == "'":
+            return scalarstring.SingleQuotedScalarString(node.value)
+        elif node.style == '"':
+            return scalarstring.DoubleQuotedScalarString(node.value)
+        return super().construct_scalar(node)
+
+    def construct_mapping(self, node, deep=False):
+        if node.anchor or node.flow_style:
+            raise RoundTripRequired
+        return super().construct_mapping(node, deep=deep)
+
+    def construct_sequence(self, node, deep=False):
+        if node.anchor or node.flow_style:
+            raise RoundTripRequired
+        return super().construct_sequence(node, deep=deep)
+
+    def construct_yaml_int(self, node):
+        if node.anchor or not _INT_RE.match(node.value):
+            raise RoundTripRequired
+        return int(node.value)
+
+    def construct_yaml_float(self, node):
+        raise RoundTripRequired
+
+    def construct_yaml_timestamp(self, node, values=None):
+        value = super().construct_yaml_timestamp(node, values)
+        if isinstance(value, datetime):
+            raise RoundTripRequired
+        return value
+
+
+FastConstructor.add_constructor(
+    "tag:yaml.org,2002:int", FastConstructor.construct_yaml_int
+)
+FastConstructor.add_constructor(
+    "tag:yaml.org,2002:float", FastConstructor.construct_yaml_float
+)
+FastConstructor.add_constructor(
+    "tag:yaml.org,2002:timestamp", FastConstructor.construct_yaml_timestamp
+)
+
+fast_yaml = YAML(typ="safe")
+fast_yaml.Constructor = FastConstructor
+
+
+def load_template_dict(file_path: str, round_trip: bool = False) -> dict:
+    """
+    Load a template file into the dict its template class is created from.
+
+    Files without comments, anchors or blank lines, found with a byte scan,
+    are loaded by the C-backed fast loader.
+    Everything else, including files the fast loader can't reproduce exactly,
+    goes through the round-trip loader.
+    Set round_trip to keep the line info of the round-trip loader, e.g. for validation hints.
+    """
+    with open(file_path, "rb") as f:
+        contents = f.read()
+
+    if not (round_trip or YAML_ROUND_TRIP_ONLY or _ROUND_TRIP_RE.search(contents)):
+        try:
+            return transform_comments(fast_yaml.load(contents))
+        except (RoundTripRequired, YAMLError):
+            pass
+
+    return transform_comments(yaml.load(contents))
+
 
 def evaluate_on_provider(
     resource,
@@ -553,6 +766,285 @@ def is_regex_match(regex, test_string):
         return regex == test_string
 
 
+# The number of provider children lists an AccessRuleMatrix is kept for.
+# Templates of an import are merged against the same provider children so this rarely exceeds 1 per plugin.
+ACCESS_RULE_MATRIX_CACHE_SIZE = 8
+
+
+class AccessRuleMatrix:
+    """
+    Resolves access rules against every provider child at once.
+
+    Each provider child is a bit of an int.
+    The children a rule matches are computed once per rule,
+    so evaluating a resource on all children is a handful of bitwise operations
+    instead of an evaluate_on_provider call, and a regex match per rule, for every child.
+
+    The result is the same as calling evaluate_on_provider on each child.
+    """
+
+    def __init__(self, provider_children: list[ProviderChild]):
+        self.provider_children = list(provider_children)
+        self.all_bits = (1 << len(self.provider_children)) - 1
+        # The lower cased all_identifiers of each child
+        self.child_identifiers: list[frozenset[str]] = []
+        self._child_bits: dict[int, int] = {}
+        self._identifier_bits: dict[str, int] = defaultdict(int)
+        self._preferred_identifier_bits: dict[str, int] = defaultdict(int)
+        self._parent_bits: dict[str, int] = defaultdict(int)
+        self._iambic_managed_bits: dict[IambicManaged, int] = defaultdict(int)
+        self._organization_account_bits = 0
+
+        for elem, child in enumerate(self.provider_children):
+            bit = 1 << elem
+            self._child_bits.setdefault(id(child), bit)
+            self.child_identifiers.append(
+                frozenset(identifier.lower() for identifier in child.all_identifiers)
+            )
+            for identifier in self.child_identifiers[elem]:
+                self._identifier_bits[identifier] |= bit
+            self._preferred_identifier_bits[child.preferred_identifier.lower()] |= bit
+            if child.parent_id:
+                self._parent_bits[child.parent_id] |= bit
+            self._iambic_managed_bits[child.iambic_managed] |= bit
+            if getattr(child, "organization_account", False):
+                self._organization_account_bits |= bit
+
+        self._rule_bits: dict[tuple[str, bool], int] = {}
+        self._parent_rule_bits: dict[tuple[tuple, tuple], int] = {}
+        self._children_rule_bits: dict[tuple[tuple, tuple], int] = {}
+
+    def bit(self, provider_child: ProviderChild) -> int:
+        return self._child_bits.get(id(provider_child), 0)
+
+    def rule_bits(self, rule: str, preferred_only: bool = False) -> int:
+        """
+        The children matched by the rule using is_regex_match.
+
+        :param preferred_only: Only match against the preferred_identifier of each child.
+        """
+        rule = rule.lower()
+        if (bits := self._rule_bits.get((rule, preferred_only))) is not None:
+            return bits
+
+        identifier_bits = (
+            self._preferred_identifier_bits if preferred_only else self._identifier_bits
+        )
+        bits = 0
+        if rule == "*":
+            bits = self.all_bits
+        elif "*" not in rule:
+            bits = identifier_bits.get(rule, 0)
+        else:
+            for identifier, child_bits in identifier_bits.items():
+                if is_regex_match(rule, identifier):
+                    bits |= child_bits
+
+        self._rule_bits[(rule, preferred_only)] = bits
+        return bits
+
+    def rules_bits(self, rules: list[str], preferred_only: bool = False) -> int:
+        """The children matched by any of the rules."""
+        bits = 0
+        for rule in rules:
+            bits |= self.rule_bits(rule, preferred_only)
+        return bits
+
+    def _parents_bits(self, included_parents: tuple, excluded_parents: tuple) -> int:
+        key = (included_parents, excluded_parents)
+        if (bits := self._parent_rule_bits.get(key)) is not None:
+            return bits
+
+        bits = self.all_bits
+        for parent_id, parent_bits in self._parent_bits.items():
+            if parent_id in excluded_parents or (
+                "*" not in included_parents
+                and not any(
+                    re.match(included_parent, parent_id)
+                    for included_parent in included_parents
+                )
+            ):
+                bits &= ~parent_bits
+
+        self._parent_rule_bits[key] = bits
+        return bits
+
+    def _children_bits(self, included_children: tuple, excluded_children: tuple) -> int:
+        """
+        Children are included by their longest matching included rule
+        if it is longer than their longest matching excluded rule.
+        """
+        key = (included_children, excluded_children)
+        if (bits := self._children_rule_bits.get(key)) is not None:
+            return bits
+
+        # [(rule weight, children whose longest matching excluded rule has that weight)]
+        exclude_weights = []
+        unmatched = self.all_bits
+        for exclude_rule in sorted(excluded_children, key=len, reverse=True):
+            if matched := self.rule_bits(exclude_rule) & unmatched:
+                exclude_weights.append((len(exclude_rule), matched))
+                unmatched &= ~matched
+
+        bits = 0
+        unmatched = self.all_bits
+        for include_rule in sorted(included_children, key=len, reverse=True):
+            if not (matched := self.rule_bits(include_rule) & unmatched):
+                continue
+
+            unmatched &= ~matched
+            for exclude_weight, excluded in exclude_weights:
+                if exclude_weight >= len(include_rule):
+                    matched &= ~excluded
+            bits |= matched
+
+        self._children_rule_bits[key] = bits
+        return bits
+
+    def evaluate(self, resource, exclude_import_only: bool = True) -> int:
+        """The children evaluate_on_provider would return True for."""
+        from iambic.core.models import AccessModelMixin
+
+        if getattr(resource, "organization_account_needed", None):
+            return self._organization_account_bits
+
+        no_op_values = [IambicManaged.DISABLED]
+        if exclude_import_only:
+            no_op_values.append(IambicManaged.IMPORT_ONLY)
+
+        if getattr(resource, "iambic_managed", None) in no_op_values:
+            return 0
+
+        bits = self.all_bits
+        for no_op_value in no_op_values:
+            bits &= ~self._iambic_managed_bits.get(no_op_value, 0)
+
+        if not isinstance(resource, AccessModelMixin):
+            return bits
+
+        bits &= self._parents_bits(
+            tuple(resource.included_parents), tuple(resource.excluded_parents)
+        )
+        if not resource.included_children:
+            return bits
+
+        return bits & self._children_bits(
+            tuple(rule.lower() for rule in resource.included_children),
+            tuple(rule.lower() for rule in resource.excluded_children),
+        )
+
+
+def get_identity_key(*objs) -> tuple[int, ...]:
+    """
+    Key a cache entry on the identity of the objects, e.g. templates and provider children.
+
+    An id can be reused once its object is freed,
+    so the entry must hold a reference to the objects for as long as it's cached.
+    """
+    return tuple(id(obj) for obj in objs)
+
+
+_access_rule_matrices: OrderedDict[tuple, AccessRuleMatrix] = OrderedDict()
+
+
+def get_access_rule_matrix(provider_children: list[ProviderChild]) -> AccessRuleMatrix:
+    """
+    Return the AccessRuleMatrix for the provider children.
+
+    Matrices are reused for as long as the same provider child objects are passed in,
+    i.e. for every template merged during an import.
+    """
+    key = get_identity_key(*provider_children)
+    if matrix := _access_rule_matrices.get(key):
+        _access_rule_matrices.move_to_end(key)
+        return matrix
+
+    matrix = AccessRuleMatrix(provider_children)
+    _access_rule_matrices[key] = matrix
+    if len(_access_rule_matrices) > ACCESS_RULE_MATRIX_CACHE_SIZE:
+        _access_rule_matrices.popitem(last=False)
+    return matrix
+
+
+class TemplateProviderIndex:
+    """
+    The provider children, e.g. AWS accounts, each template is applied to, resolved once per run.
+
+    Built by Config.run_apply with an AccessRuleMatrix so literal rules are looked up directly
+    and wildcard rules are matched once per child instead of once per template and child.
+    Templates that weren't indexed, or are applied to a different list of children
+    like the single account of a distributed apply shard, fall back to evaluate_on_provider.
+
+    The index can be scoped to the children matching a list of rules, e.g. `iambic plan --account`,
+    in which case templates that don't touch any of those children aren't applied.
+    """
+
+    def __init__(self):
+        self.scope_rules: list[str] = []
+        # get_identity_key(template) -> (template, the children it was evaluated on, the children it is applied to)
+        self._template_children: dict[
+            tuple[int, ...], tuple[Any, list[ProviderChild], list[ProviderChild]]
+        ] = {}
+
+    @contextlib.contextmanager
+    def scope(self, rules: Optional[list[str]]):
+        self.scope_rules = list(rules or [])
+        try:
+            yield self
+        finally:
+            self.scope_rules = []
+
+    def clear(self):
+        self._template_children = {}
+
+    def build(self, templates: list, provider_children: list[ProviderChild]) -> list:
+        """
+        Index the templates and return the ones to apply.
+
+        All templates are returned unless the index is scoped,
+        a template without children may still have to be deleted.
+        """
+        matrix = get_access_rule_matrix(provider_children)
+        scope_bits = (
+            matrix.rules_bits(self.scope_rules) if self.scope_rules else matrix.all_bits
+        )
+        templates_to_apply = []
+        for template in templates:
+            bits = matrix.evaluate(template) & scope_bits
+            children = []
+            while bits:
+                low_bit = bits & -bits
+                children.append(matrix.provider_children[low_bit.bit_length() - 1])
+                bits ^= low_bit
+
+            self._template_children[get_identity_key(template)] = (
+                template,
+                provider_children,
+                children,
+            )
+            if children or not self.scope_rules:
+                templates_to_apply.append(template)
+
+        return templates_to_apply
+
+    def get(
+        self, template, provider_children: list[ProviderChild]
+    ) -> list[ProviderChild]:
+        """The provider children the template is applied to, in provider_children order."""
+        indexed = self._template_children.get(get_identity_key(template))
+        if indexed and indexed[0] is template and indexed[1] is provider_children:
+            return indexed[2]
+
+        return [
+            provider_child
+            for provider_child in provider_children
+            if evaluate_on_provider(template, provider_child)
+        ]
+
+
+template_provider_index = TemplateProviderIndex()
+
+
 def get_provider_value(matching_values: list, identifiers: set[str]):
     """
     Get the provider value that matches the given identifiers.
@@ -654,6 +1146,7 @@ class GlobalRetryController:
         retries = 0
         while retries < self.max_retries:
             try:
+                telemetry.increment("api_calls", api_call=endpoint)
                 res = await func(*args, **kwargs)
                 if retries > 0:
                     log.info(f"Retry successful for {endpoint}.")
@@ -675,6 +1168,9 @@ class GlobalRetryController:
                     asyncio.get_running_loop().time() + self.wait_time
                 )
                 retries += 1
+                telemetry.increment("api_retries", api_call=endpoint)
+                if isinstance(e, RateLimitException):
+                    telemetry.increment("api_throttles", api_call=endpoint)
                 log.warning(
                     f"Rate limit hit for {endpoint}. Retrying in {self.wait_time} seconds."
                 )
@@ -762,50 +1258,89 @@ async def remove_expired_resources(
     template_resource_id: str,
     delete_resource_if_expired: bool = True,
 ):
+    from iambic.core.models import BaseTemplate, rendered_resources
+
+    expired_resources = []
+    resource = flag_expired_resources_in_model(
+        resource,
+        template_resource_type,
+        template_resource_id,
+        delete_resource_if_expired,
+        expired_resources=expired_resources,
+    )
+    if expired_resources and isinstance(resource, BaseTemplate):
+        rendered_resources.invalidate(resource)
+    return resource
+
+
+def flag_expired_resources_in_model(
+    resource,
+    template_resource_type: str,
+    template_resource_id: str,
+    delete_resource_if_expired: bool = True,
+    now: Optional[datetime] = None,
+    expired_resources: Optional[list] = None,
+):
+    """
+    Mark every expired resource in the model as deleted.
+
+    A synchronous walk, the check is too cheap per resource to be worth a coroutine.
+    Expired resources in a list are removed unless delete_resource_if_expired is False.
+    If expired_resources is provided, every expired resource is appended to it.
+    """
     from iambic.core.models import BaseModel
 
     if not isinstance(resource, BaseModel):
         return resource
 
-    log_params = {}
-    if hasattr(resource, "resource_type"):
-        log_params["resource_type"] = resource.resource_type
-    if hasattr(resource, "resource_id"):
-        log_params["resource_id"] = resource.resource_id
-    if template_resource_type != log_params.get(
-        "resource_type"
-    ) or template_resource_id != log_params.get("resource_id"):
-        log_params["parent_resource_type"] = template_resource_type
-        log_params["parent_resource_id"] = template_resource_id
-
-    if isinstance(resource, BaseModel) and hasattr(resource, "expires_at"):
-        if resource.expires_at:
-            cur_time = datetime.now(tz=timezone.utc)
-            if resource.expires_at < cur_time:
-                log.info("Expired resource found, marking for deletion", **log_params)
-                resource.deleted = True
-                return resource
+    if now is None:
+        now = datetime.now(tz=timezone.utc)
+
+    if getattr(resource, "expires_at", None) and resource.expires_at < now:
+        log_params = {}
+        if hasattr(resource, "resource_type"):
+            log_params["resource_type"] = resource.resource_type
+        if hasattr(resource, "resource_id"):
+            log_params["resource_id"] = resource.resource_id
+        if template_resource_type != log_params.get(
+            "resource_type"
+        ) or template_resource_id != log_params.get("resource_id"):
+            log_params["parent_resource_type"] = template_resource_type
+            log_params["parent_resource_id"] = template_resource_id
+
+        log.info("Expired resource found, marking for deletion", **log_params)
+        resource.deleted = True
+        if expired_resources is not None:
+            expired_resources.append(resource)
+        return resource
 
     for field_name in resource.__fields__.keys():
         field_val = getattr(resource, field_name)
         if isinstance(field_val, list):
-            new_value = await asyncio.gather(
-                *[
-                    remove_expired_resources(
-                        elem, template_resource_type, template_resource_id
-                    )
-                    for elem in field_val
+            new_value = [
+                flag_expired_resources_in_model(
+                    elem,
+                    template_resource_type,
+                    template_resource_id,
+                    now=now,
+                    expired_resources=expired_resources,
+                )
+                for elem in field_val
+            ]
+            if delete_resource_if_expired:
+                new_value = [
+                    elem
+                    for elem in new_value
+                    if getattr(elem, "deleted", None) is not True
                 ]
-            )
             setattr(resource, field_name, new_value)
-            if delete_resource_if_expired:
-                for elem in new_value:
-                    if getattr(elem, "deleted", None) is True:
-                        new_value.remove(elem)
-                        setattr(resource, field_name, new_value)
-        else:
-            new_value = await remove_expired_resources(
-                field_val, template_resource_type, template_resource_id
+        elif isinstance(field_val, BaseModel):
+            new_value = flag_expired_resources_in_model(
+                field_val,
+                template_resource_type,
+                template_resource_id,
+                now=now,
+                expired_resources=expired_resources,
             )
             if getattr(new_value, "deleted", None) is True:
                 setattr(resource, field_name, None)
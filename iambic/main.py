@@ -4,10 +4,11 @@ import asyncio
 import json
 import os
 import pathlib
+import subprocess
 import sys
 import uuid
 import warnings
-from typing import Optional
+from typing import Optional, Union
 
 import click
 
@@ -16,21 +17,32 @@ from iambic.config.utils import (
     check_and_update_resource_limit,
     resolve_config_template_path,
 )
-from iambic.config.wizard import ConfigurationWizard
+from iambic.core.change_stream import (
+    TemplateChangeCounts,
+    read_template_changes,
+    template_change_stream,
+)
 from iambic.core.context import ctx
+from iambic.core.drift import DRIFT_FINGERPRINT_ENABLED, drift_fingerprints
+from iambic.core.executor import SQLiteExecutionQueue, run_worker
 from iambic.core.git import clone_git_repos
 from iambic.core.iambic_enum import Command, IambicManaged
 from iambic.core.logger import log
 from iambic.core.models import ExecutionMessage, TemplateChangeDetails
 from iambic.core.parser import load_templates
+from iambic.core.telemetry import telemetry
 from iambic.core.utils import (
     convert_between_json_and_yaml,
     exceptions_in_proposed_changes,
     gather_templates,
     init_writable_directory,
+    template_provider_index,
 )
+from iambic.output.models import ActionSummaries, get_template_data
 from iambic.output.text import (
+    file_render_change_counts,
     file_render_resource_changes,
+    screen_render_change_counts,
     screen_render_resource_changes,
 )
 from iambic.request_handler.expire_resources import flag_expired_resources
@@ -46,18 +58,59 @@ def output_proposed_changes(
     template_changes: list[TemplateChangeDetails],
     output_path: str = "proposed_changes.txt",
     exit_on_error: bool = True,
+    template_data: Optional[ActionSummaries] = None,
 ):
     if output_path is None:
         output_path = "proposed_changes.txt"
     if template_changes:
         log.info(f"A detailed summary of changes has been saved to {output_path}")
-        file_render_resource_changes(output_path, template_changes)
+        file_render_resource_changes(output_path, template_changes, template_data)
 
+    # Change records are only validated once they're output
+    template_change_dicts = [
+        template_change.validated().dict() for template_change in template_changes
+    ]
     json_filepath = pathlib.Path(output_path).with_suffix(".json")
     with open(str(json_filepath), "w") as fp:
-        json.dump([template_change.dict() for template_change in template_changes], fp)
+        json.dump(template_change_dicts, fp)
+
+    if exceptions_in_proposed_changes(template_change_dicts):
+        log.error(
+            "Exceptions encountered. Some operations failed. Please read proposed_changes for details."
+        )
+        if exit_on_error:
+            raise SystemExit(1)
+
+
+def output_streamed_changes(
+    change_counts: TemplateChangeCounts,
+    stream_output: str,
+    output_path: str = "proposed_changes.txt",
+    exit_on_error: bool = True,
+):
+    """
+    Write the same outputs as output_proposed_changes for changes written to stream_output.
+
+    The text summary only has the totals of change_counts.
+    The JSON output is written from stream_output one template at a time.
+    """
+    if output_path is None:
+        output_path = "proposed_changes.txt"
+    if change_counts.has_changes:
+        log.info(f"A summary of changes has been saved to {output_path}")
+        file_render_change_counts(output_path, change_counts)
 
-    if exceptions_in_proposed_changes([change.dict() for change in template_changes]):
+    json_filepath = pathlib.Path(output_path).with_suffix(".json")
+    with open(str(json_filepath), "w") as fp:
+        fp.write("[")
+        for elem, template_change in enumerate(read_template_changes(stream_output)):
+            if elem:
+                fp.write(", ")
+            json.dump(template_change.dict(), fp)
+        fp.write("]")
+
+    screen_render_change_counts(change_counts)
+    if change_counts.dict()["num_exceptions"]:
         log.error(
             "Exceptions encountered. Some operations failed. Please read proposed_changes for details."
         )
@@ -65,10 +118,82 @@ def output_proposed_changes(
             raise SystemExit(1)
 
 
+def get_import_time_report(
+    module_name: str = "iambic.main", limit: Optional[int] = 25
+) -> tuple[int, list[tuple[int, int, str]]]:
+    """
+    Import a module in a fresh interpreter with -X importtime.
+
+    :return: The total import time in microseconds and
+        the slowest modules as (cumulative us, self us, module name) tuples.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+        capture_output=True,
+        text=True,
+    )
+    module_times = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+
+        self_us, cumulative_us, imported_module = line[12:].split("|")
+        module_times.append(
+            (int(cumulative_us), int(self_us), imported_module.rstrip())
+        )
+
+    total_us = next(
+        (
+            cumulative_us
+            for cumulative_us, _, imported_module in module_times
+            if imported_module.strip() == module_name
+        ),
+        0,
+    )
+    module_times.sort(reverse=True)
+    return total_us, module_times[:limit]
+
+
+def profile_startup(click_ctx: click.Context, _, value: bool):
+    if not value or click_ctx.resilient_parsing:
+        return
+
+    total_us, module_times = get_import_time_report()
+    click.echo(f"Startup import time: {total_us / 1e6:.3f}s")
+    click.echo(f"{'cumulative (s)':>14} | {'self (s)':>8} | module")
+    for cumulative_us, self_us, imported_module in module_times:
+        click.echo(
+            f"{cumulative_us / 1e6:>14.3f} | {self_us / 1e6:>8.3f} | {imported_module}"
+        )
+    click_ctx.exit()
+
+
 @click.group()
 @click.version_option(package_name="iambic-core")
-def cli():
-    ...
+@click.option(
+    "--profile-startup",
+    is_flag=True,
+    expose_value=False,
+    is_eager=True,
+    callback=profile_startup,
+    help="Show the time spent importing the CLI modules and exit.",
+)
+@click.option(
+    "--telemetry-dir",
+    envvar="IAMBIC_TELEMETRY_DIR",
+    type=click.Path(file_okay=False),
+    help=(
+        "Record the time spent in each phase and the provider API calls made. "
+        "A JSON summary and an OpenTelemetry trace are written to the directory on exit."
+    ),
+)
+def cli(telemetry_dir: Optional[str]):
+    if telemetry_dir:
+        telemetry.enabled = True
+        click.get_current_context().call_on_close(
+            lambda: telemetry.export(telemetry_dir)
+        )
 
 
 @cli.command(short_help="Remove local expired resources")
@@ -285,14 +410,22 @@ def run_apply(
             [template.file_path for template in templates], config.template_map
         )
     )
+    # If opted in, enforce runs only re-read and re-apply where the template or the cloud resource moved
+    drift_fingerprints.enabled = enforced_only and DRIFT_FINGERPRINT_ENABLED
     template_changes = asyncio.run(config.run_apply(exe_message, templates))
-    output_proposed_changes(template_changes, output_path=output_path)
+    # The summary is compiled once for the file and the screen
+    template_data = get_template_data(template_changes)
+    output_proposed_changes(
+        template_changes, output_path=output_path, template_data=template_data
+    )
 
-    screen_render_resource_changes(template_changes)
+    screen_render_resource_changes(template_changes, template_data)
 
     if ctx.eval_only and template_changes and click.confirm("Proceed?"):
         ctx.eval_only = False
         template_changes = asyncio.run(config.run_apply(exe_message, templates))
+    if drift_fingerprints.enabled:
+        drift_fingerprints.save()
     # This was here before, but I don't think it's needed. Leaving it here for now to see if anything breaks.
     # asyncio.run(config.run_detect_changes(repo_dir))
     return template_changes
@@ -317,8 +450,11 @@ def run_git_apply(
             to_sha=to_sha,
         )
     )
-    output_proposed_changes(template_changes, output_path, exit_on_error=False)
-    screen_render_resource_changes(template_changes)
+    template_data = get_template_data(template_changes)
+    output_proposed_changes(
+        template_changes, output_path, exit_on_error=False, template_data=template_data
+    )
+    screen_render_resource_changes(template_changes, template_data)
     return template_changes
 
 
@@ -352,19 +488,56 @@ def run_git_apply(
     is_flag=True,
     hidden=True,
 )
-def plan(templates: list, plan_output: str, repo_dir: str, git_aware: bool):
+@click.option(
+    "--stream-output",
+    "stream_output",
+    required=False,
+    type=click.Path(dir_okay=False),
+    help=(
+        "Write the changes of each template to this file as soon as the template is planned "
+        "instead of keeping the full plan in memory. "
+        "JSON lines unless the file ends in .yaml. Example: ./proposed_changes.jsonl"
+    ),
+)
+@click.option(
+    "--account",
+    "accounts",
+    multiple=True,
+    help=(
+        "Only plan templates applied to this AWS account, by name, id or wildcard. "
+        "Can be passed multiple times. Example: --account dev-* --account 123456789012"
+    ),
+)
+def plan(
+    templates: list,
+    plan_output: str,
+    repo_dir: str,
+    git_aware: bool,
+    stream_output: Optional[str],
+    accounts: tuple[str],
+):
     """
     Print a report of the changes in the local repository to specified template(s),
     that have yet to be applied remotely to configured providers. To apply changes after
     previewing, run `iambic apply`.
     """
     if git_aware:
-        run_git_plan(plan_output, repo_dir=repo_dir)
+        run_git_plan(
+            plan_output,
+            repo_dir=repo_dir,
+            stream_output=stream_output,
+            accounts=list(accounts),
+        )
     else:
         if not templates:
             log.error("Invalid arguments", error="templates is a required argument")
             raise sys.exit(1)
-        run_plan(templates, repo_dir=repo_dir)
+        run_plan(
+            templates,
+            repo_dir=repo_dir,
+            stream_output=stream_output,
+            accounts=list(accounts),
+        )
 
 
 def run_git_plan(
@@ -373,7 +546,15 @@ def run_git_plan(
     config_path: pathlib.Path = None,
     config: Config = None,
     skip_flag_expired_resources_phase: bool = False,
-) -> list[TemplateChangeDetails]:
+    stream_output: str = None,
+    accounts: list[str] = None,
+) -> Union[list[TemplateChangeDetails], TemplateChangeCounts]:
+    """
+    Plan the changes in the git repo and write them to output_path.
+
+    If stream_output is set the changes are streamed to that file
+    and the counts of the changes are returned instead of the changes.
+    """
     ctx.eval_only = True
 
     if config_path is None:
@@ -382,20 +563,39 @@ def run_git_plan(
     if config is None:
         config = asyncio.run(load_config(config_path))
     check_and_update_resource_limit(config)
-    template_changes = asyncio.run(
-        plan_git_changes(
-            config_path,
-            repo_dir,
-            config=config,
-            skip_flag_expired_resources_phase=skip_flag_expired_resources_phase,
-        )
+    plan_coroutine = plan_git_changes(
+        config_path,
+        repo_dir,
+        config=config,
+        skip_flag_expired_resources_phase=skip_flag_expired_resources_phase,
+    )
+    with template_provider_index.scope(accounts):
+        if stream_output:
+            with template_change_stream.open(stream_output):
+                asyncio.run(plan_coroutine)
+            output_streamed_changes(
+                template_change_stream.counts,
+                stream_output,
+                output_path,
+                exit_on_error=False,
+            )
+            return template_change_stream.counts
+
+        template_changes = asyncio.run(plan_coroutine)
+    template_data = get_template_data(template_changes)
+    output_proposed_changes(
+        template_changes, output_path, exit_on_error=False, template_data=template_data
     )
-    output_proposed_changes(template_changes, output_path, exit_on_error=False)
-    screen_render_resource_changes(template_changes)
+    screen_render_resource_changes(template_changes, template_data)
     return template_changes
 
 
-def run_plan(templates: list[str], repo_dir: str = str(pathlib.Path.cwd())):
+def run_plan(
+    templates: list[str],
+    repo_dir: str = str(pathlib.Path.cwd()),
+    stream_output: str = None,
+    accounts: list[str] = None,
+):
     if not templates:
         templates = asyncio.run(gather_templates(repo_dir))
 
@@ -415,11 +615,18 @@ def run_plan(templates: list[str], repo_dir: str = str(pathlib.Path.cwd())):
         sys.exit(1)
 
     ctx.eval_only = True
-    template_changes = asyncio.run(
-        config.run_apply(exe_message, load_templates(templates, config.template_map))
-    )
-    output_proposed_changes(template_changes)
-    screen_render_resource_changes(template_changes)
+    templates = load_templates(templates, config.template_map)
+    with template_provider_index.scope(accounts):
+        if stream_output:
+            with template_change_stream.open(stream_output):
+                asyncio.run(config.run_apply(exe_message, templates))
+            output_streamed_changes(template_change_stream.counts, stream_output)
+            return
+
+        template_changes = asyncio.run(config.run_apply(exe_message, templates))
+    template_data = get_template_data(template_changes)
+    output_proposed_changes(template_changes, template_data=template_data)
+    screen_render_resource_changes(template_changes, template_data)
 
 
 @cli.command(short_help="Pull upstream AWS org changes")
@@ -521,6 +728,32 @@ def init_plugins_cmd(repo_dir: str):
     asyncio.run(init_plugins(config_path))
 
 
+@cli.command(short_help="Run import and apply tasks from a shared queue")
+@click.option(
+    "--queue-path",
+    "queue_path",
+    required=True,
+    envvar="IAMBIC_EXECUTOR_QUEUE_PATH",
+    type=click.Path(),
+    help="The SQLite execution queue shared with the iambic run dispatching tasks.",
+)
+@click.option(
+    "--repo-dir",
+    "-d",
+    "repo_dir",
+    required=False,
+    type=click.Path(exists=True),
+    default=os.getenv("IAMBIC_REPO_DIR"),
+    help="The repo directory. Example: ~/iambic-templates",
+)
+def worker(queue_path: str, repo_dir: str):
+    """
+    Run tasks of a distributed import or apply until the dispatching run stops the worker.
+    """
+    config_path = asyncio.run(resolve_config_template_path(repo_dir))
+    run_worker(str(config_path), SQLiteExecutionQueue(queue_path))
+
+
 @cli.command(short_help="Run the setup wizard")
 @click.option(
     "--repo-dir",
@@ -543,6 +776,9 @@ def setup(repo_dir: str, is_more_options: bool):
     """
     Run the setup wizard.
     """
+    # The wizard pulls in every plugin and its SDK so only import it when it's used
+    from iambic.config.wizard import ConfigurationWizard
+
     ctx.command = Command.APPLY
     ConfigurationWizard(repo_dir, is_more_options=is_more_options).run()
 
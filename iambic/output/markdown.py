@@ -1,14 +1,72 @@
 from __future__ import annotations
 
-from typing import List
+from typing import Iterable, Iterator, List, Optional
 
+from iambic.core.change_stream import TemplateChangeCounts
 from iambic.core.models import TemplateChangeDetails
 from iambic.output import get_template_env
-from iambic.output.models import get_template_data
+from iambic.output.models import ActionSummaries, get_template_data
 
+TRUNCATED_TEMPLATE_SUMMARY = """<details>
+<summary>Template: {template_path}</summary>
+The changes of this template are too large to include. View the extended plan details.
+</details>
+"""
 
-def gh_render_resource_changes(resource_changes: List[TemplateChangeDetails]):
-    template_data = get_template_data(resource_changes)
+
+def gh_render_resource_changes(
+    resource_changes: List[TemplateChangeDetails],
+    template_data: Optional[ActionSummaries] = None,
+):
+    template_data = template_data or get_template_data(resource_changes)
     env = get_template_env()
     template = env.get_template("github_summary.jinja2")
     return template.render(iambic=template_data)
+
+
+def gh_render_change_counts(change_counts: TemplateChangeCounts) -> str:
+    env = get_template_env()
+    template = env.get_template("github_summary.jinja2")
+    return template.render(iambic=ActionSummaries.compile_counts(change_counts))
+
+
+def gh_render_template_change(template_change: TemplateChangeDetails) -> str:
+    env = get_template_env()
+    template = env.get_template("github_template_summary.jinja2")
+    return template.render(
+        iambic=ActionSummaries.compile([template_change]),
+        template_change=template_change,
+    )
+
+
+def gh_render_resource_change_chunks(
+    template_changes: Iterable[TemplateChangeDetails],
+    change_counts: TemplateChangeCounts,
+    max_length: int,
+) -> Iterator[str]:
+    """
+    Render the markdown summary of the changes in chunks of at most max_length characters.
+
+    The first chunk starts with the totals of change_counts followed by the details of every template.
+    Each template is summarized and rendered on its own so only one template is held at a time
+    and template_changes can be a generator over a streamed plan.
+    A template that does not fit in a chunk on its own is replaced with a stub.
+    """
+    chunk = gh_render_change_counts(change_counts)
+    for template_change in template_changes:
+        if not (template_change.proposed_changes or template_change.exceptions_seen):
+            continue
+
+        rendered_template = gh_render_template_change(template_change)
+        if len(rendered_template) > max_length:
+            rendered_template = TRUNCATED_TEMPLATE_SUMMARY.format(
+                template_path=template_change.template_path
+            )
+
+        if len(chunk) + len(rendered_template) > max_length:
+            yield chunk
+            chunk = ""
+        chunk += rendered_template
+
+    if chunk:
+        yield chunk
@@ -3,12 +3,13 @@ from __future__ import annotations
 import json
 import pathlib
 from collections import defaultdict
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, ClassVar, Dict, List, Optional
 
 from dictdiffer import diff
 from pydantic import BaseModel as PydanticBaseModel
 from pydantic import Field
 
+from iambic.core.change_stream import TemplateChangeCounts
 from iambic.core.logger import log
 from iambic.core.models import (
     AccountChangeDetails,
@@ -23,7 +24,7 @@ class ProposedChangeDiff(ProposedChange):
     diff: Optional[str]
     diff_resolved: Optional[str]
 
-    field_map = {
+    field_map: ClassVar[Dict[str, str]] = {
         "inline_policies": "InlinePolicies",
         "managed_policies": "ManagedPolicies",
         "policy_document": "PolicyDocument",
@@ -42,7 +43,13 @@ class ProposedChangeDiff(ProposedChange):
     }
 
     def __init__(self, proposed_change: ProposedChange) -> None:
-        super().__init__(**proposed_change.dict())
+        # The proposed change has already been validated so its values are copied as is
+        object.__setattr__(
+            self,
+            "__dict__",
+            {**proposed_change.__dict__, "diff": None, "diff_resolved": None},
+        )
+        object.__setattr__(self, "__fields_set__", set(proposed_change.__fields_set__))
         try:
             object_attribute = camel_to_snake(self.attribute)
         except TypeError:
@@ -118,9 +125,10 @@ class ApplicableChange(PydanticBaseModel):
         template_change: TemplateChangeDetails,
         **data: Any,
     ) -> None:
-        super().__init__(
-            change=ProposedChangeDiff(change), template_change=template_change, **data
-        )
+        super().__init__(**data)
+        # Assigned after validation so the template change is not copied for every change
+        self.change = ProposedChangeDiff(change)
+        self.template_change = template_change
         self.template_name = pathlib.Path(template_change.template_path).name
 
 
@@ -168,65 +176,116 @@ class TemplateSummary(PydanticBaseModel):
         instance.template_path = template_path
         instance.template_name = template_name
         instance.count = count
-        instance.num_accounts = len(set([x.account for x in changes]))
-        accounts = set(x.account for x in changes)
+        account_changes = defaultdict(list)
+        for change in changes:
+            account_changes[change.account].append(change)
+        instance.num_accounts = len(account_changes)
         instance.accounts = [
             AccountSummary.compile(
                 account=account,
                 count=len(changes),
-                changes=[x for x in changes if x.account == account],
+                changes=changes_for_account,
             )
-            for account in accounts
+            for account, changes_for_account in account_changes.items()
         ]
         return instance
 
 
-def get_applicable_changes(
+def compile_template_summaries(
+    applicable_changes: List[ApplicableChange],
+) -> List[TemplateSummary]:
+    """Group applicable changes into a TemplateSummary per template path."""
+    template_changes = defaultdict(list)
+    for applicable_change in applicable_changes:
+        template_changes[applicable_change.template_change.template_path].append(
+            applicable_change
+        )
+
+    return [
+        TemplateSummary.compile(
+            template_path=template_path,
+            template_name=changes[0].template_name,
+            count=1,
+            changes=changes,
+        )
+        for template_path, changes in template_changes.items()
+    ]
+
+
+def get_applicable_changes_by_type(
     template_changes: List[TemplateChangeDetails],
-    proposed_change_type: str,
     attribute: str = "proposed_changes",
-) -> Any:
-    """Compile applicable changes as a list of ApplicableChange objects.
+) -> Dict[str, List[ApplicableChange]]:
+    """Compile the applicable changes of every change type in a single pass.
+
+    Identical changes are only included once.
 
     :param template_changes: list of TemplateChangeDetails objects
-    :param proposed_change_type: one of ProposedChangeType values
     :param attribute: str. is either "proposed_changes" or "exceptions_seen"
-    :return: set of ApplicableChange
+    :return: dict of ProposedChangeType value to a list of ApplicableChange
     """
+    applicable_changes: Dict[str, List[ApplicableChange]] = {
+        change_type.value: [] for change_type in ProposedChangeType
+    }
+    # Equal changes always share this key, so only changes under the same key are compared
+    seen_changes: Dict[tuple, List[ApplicableChange]] = defaultdict(list)
 
-    def _get_annotated_change(
+    def _add_annotated_change(
         change: ProposedChange,
         template_change: TemplateChangeDetails,
         account: str = "NONE",
-    ) -> ApplicableChange:
-        return ApplicableChange(
+    ):
+        applicable_change = ApplicableChange(
             account=account,
             change=change,
             template_change=template_change,
             resource_id=change.resource_id,
             resource_type=change.resource_type,
         )
+        key = (
+            account,
+            str(template_change.template_path),
+            change.change_type.value,
+            change.resource_id,
+            change.resource_type,
+            change.attribute,
+        )
+        if applicable_change in seen_changes[key]:
+            return
+
+        seen_changes[key].append(applicable_change)
+        applicable_changes[change.change_type.value].append(applicable_change)
 
-    applicable_changes: Set[ApplicableChange] = set()
     for template_change in template_changes:
         for proposed_change in getattr(template_change, attribute, []):
             if isinstance(proposed_change, AccountChangeDetails):
                 # If proposed change is a list of AccountChangeDetails, we need to iterate through those
                 for account_change in getattr(proposed_change, attribute, []):
-                    if account_change.change_type.value == proposed_change_type:
-                        applicable_changes.add(
-                            _get_annotated_change(
-                                account_change, template_change, proposed_change.account
-                            )
-                        )
-            else:
-                if proposed_change.change_type.value == proposed_change_type:
-                    # If proposed change is a single change, we can just append it
-                    applicable_changes.add(
-                        _get_annotated_change(proposed_change, template_change)
+                    _add_annotated_change(
+                        account_change, template_change, proposed_change.account
                     )
+            else:
+                # If proposed change is a single change, we can just append it
+                _add_annotated_change(proposed_change, template_change)
+
+    return applicable_changes
+
+
+def get_applicable_changes(
+    template_changes: List[TemplateChangeDetails],
+    proposed_change_type: str,
+    attribute: str = "proposed_changes",
+) -> List[ApplicableChange]:
+    """Compile applicable changes as a list of ApplicableChange objects.
 
-    return set(applicable_changes)  # collapse across accounts and no accounts
+    :param template_changes: list of TemplateChangeDetails objects
+    :param proposed_change_type: one of ProposedChangeType values
+    :param attribute: str. is either "proposed_changes" or "exceptions_seen"
+    :return: list of ApplicableChange
+    """
+    return get_applicable_changes_by_type(template_changes, attribute)[
+        proposed_change_type
+    ]
 
 
 class ActionSummary(PydanticBaseModel):
@@ -235,6 +294,19 @@ class ActionSummary(PydanticBaseModel):
     num_templates: Optional[int]
     templates: Optional[List[TemplateSummary]]
 
+    @classmethod
+    def compile_applicable_changes(
+        cls, proposed_change_type: str, applicable_changes: List[ApplicableChange]
+    ) -> Any:
+        log.debug(f"Found {len(applicable_changes)} applicable changes")
+        templates = compile_template_summaries(applicable_changes)
+        return cls(
+            action=proposed_change_type,
+            count=len(applicable_changes),
+            num_templates=len(templates),
+            templates=templates,
+        )
+
     @classmethod
     def compile_proposed_changes(
         cls, template_changes: List[TemplateChangeDetails], proposed_change_type: str
@@ -244,34 +316,12 @@ class ActionSummary(PydanticBaseModel):
         :param resources_changes: list of TemplateChangeDetails objects
         :returns: None
         """
-        applicable_changes = get_applicable_changes(
-            template_changes, proposed_change_type, attribute="proposed_changes"
-        )
-        log.debug(f"Found {len(applicable_changes)} applicable changes")
-
-        instance = cls(
-            action=proposed_change_type, count=len(applicable_changes), templates=[]
-        )
-        templates = set(
-            [
-                TemplateSummary.compile(
-                    template_path=x.template_change.template_path,
-                    template_name=x.template_name,
-                    count=1,
-                    changes=[
-                        y
-                        for y in applicable_changes
-                        if y.template_change.template_path
-                        == x.template_change.template_path
-                    ],
-                )
-                for x in applicable_changes
-            ]
+        return cls.compile_applicable_changes(
+            proposed_change_type,
+            get_applicable_changes(
+                template_changes, proposed_change_type, attribute="proposed_changes"
+            ),
         )
-        instance.templates = templates
-        instance.num_templates = len(templates)
-
-        return instance
 
 
 class ExceptionSummary(PydanticBaseModel):
@@ -281,40 +331,28 @@ class ExceptionSummary(PydanticBaseModel):
     templates: Optional[List[TemplateSummary]]
 
     @classmethod
-    def compile_exceptions_seen(
-        cls, template_changes: List[TemplateChangeDetails], proposed_change_type: str
+    def compile_applicable_changes(
+        cls, proposed_change_type: str, exceptions: List[ApplicableChange]
     ) -> Any:
-        exceptions = get_applicable_changes(
-            template_changes, proposed_change_type, attribute="exceptions_seen"
-        )
         log.debug(f"Found {len(exceptions)} exceptions")
-
-        instance = cls(
+        templates = compile_template_summaries(exceptions)
+        return cls(
             action=proposed_change_type,
             count=len(exceptions),
-            num_templates=0,
-            templates=[],
+            num_templates=len(templates),
+            templates=templates,
         )
-        templates = set(
-            [
-                TemplateSummary.compile(
-                    template_path=x.template_change.template_path,
-                    template_name=x.template_name,
-                    count=1,
-                    changes=[
-                        y
-                        for y in exceptions
-                        if y.template_change.template_path
-                        == x.template_change.template_path
-                    ],
-                )
-                for x in exceptions
-            ]
-        )
-        instance.templates = templates
-        instance.num_templates = len(templates)
 
-        return instance
+    @classmethod
+    def compile_exceptions_seen(
+        cls, template_changes: List[TemplateChangeDetails], proposed_change_type: str
+    ) -> Any:
+        return cls.compile_applicable_changes(
+            proposed_change_type,
+            get_applicable_changes(
+                template_changes, proposed_change_type, attribute="exceptions_seen"
+            ),
+        )
 
 
 class ActionSummaries(PydanticBaseModel):
@@ -333,8 +371,11 @@ class ActionSummaries(PydanticBaseModel):
     @classmethod
     def compile(cls, changes: List[TemplateChangeDetails]):
         instance = cls()
+        applicable_changes = get_applicable_changes_by_type(
+            changes, attribute="proposed_changes"
+        )
         instance.action_summaries = [
-            ActionSummary.compile_proposed_changes(changes, x)
+            ActionSummary.compile_applicable_changes(x, applicable_changes[x])
             for x in list([e.value for e in ProposedChangeType])
         ]
 
@@ -363,13 +404,21 @@ class ActionSummaries(PydanticBaseModel):
             ]
         )
         instance.num_accounts = len(accounts)
+        exceptions = get_applicable_changes_by_type(
+            changes, attribute="exceptions_seen"
+        )
         instance.exceptions = [
-            ExceptionSummary.compile_exceptions_seen(changes, x)
+            ExceptionSummary.compile_applicable_changes(x, exceptions[x])
             for x in list([e.value for e in ProposedChangeType])
         ]
         instance.num_exceptions = sum([1 for x in instance.exceptions if x.count > 0])
         return instance
 
+    @classmethod
+    def compile_counts(cls, change_counts: TemplateChangeCounts):
+        """Summarize streamed changes from their counters, without the per template details."""
+        return cls(**change_counts.dict(), action_summaries=[], exceptions=[])
+
 
 def get_template_data(resources_changes: List[TemplateChangeDetails]) -> Dict[str, Any]:
     """Convert TemplateChangeDetails into a format that is oriented in this format.
@@ -391,6 +440,9 @@ def get_template_data(resources_changes: List[TemplateChangeDetails]) -> Dict[st
 
     * Exceptions: templates/exception_details.jinja2
 
+    Compile it once and pass it to each renderer when the same changes are rendered
+    to the screen, a file and markdown.
+
     :param resources_changes: list of TemplateChangeDetails objects
     :returns: Dict[str, Any]
     """
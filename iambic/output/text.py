@@ -1,31 +1,48 @@
 from __future__ import annotations
 
-from typing import List
+from typing import List, Optional
 
 import rich
 
+from iambic.core.change_stream import TemplateChangeCounts
 from iambic.core.models import TemplateChangeDetails
 from iambic.output import get_template_env
-from iambic.output.models import get_template_data
+from iambic.output.models import ActionSummaries, get_template_data
 
 
 def file_render_resource_changes(
     filepath: str,
     resource_changes: List[TemplateChangeDetails],
+    template_data: Optional[ActionSummaries] = None,
 ) -> str:
-    # Get template data
-    template_data = get_template_data(resource_changes)
-    # Get template environment
+    return _file_render(filepath, template_data or get_template_data(resource_changes))
+
+
+def file_render_change_counts(filepath: str, change_counts: TemplateChangeCounts):
+    return _file_render(filepath, ActionSummaries.compile_counts(change_counts))
+
+
+def _file_render(filepath: str, template_data: ActionSummaries) -> str:
     env = get_template_env()
-    # Render template
     template = env.get_template("text_file_summary.jinja2")
     rendered_data = template.render(iambic=template_data)
     with open(filepath, "w", encoding="utf-8") as f:
         f.write(rendered_data)
+    return rendered_data
+
+
+def screen_render_resource_changes(
+    resource_changes: List[TemplateChangeDetails],
+    template_data: Optional[ActionSummaries] = None,
+):
+    return _screen_render(template_data or get_template_data(resource_changes))
+
+
+def screen_render_change_counts(change_counts: TemplateChangeCounts):
+    return _screen_render(ActionSummaries.compile_counts(change_counts))
 
 
-def screen_render_resource_changes(resource_changes: List[TemplateChangeDetails]):
-    template_data = get_template_data(resource_changes)
+def _screen_render(template_data: ActionSummaries):
     env = get_template_env()
     template = env.get_template("text_screen_summary.jinja2")
     rendered_template = template.render(iambic=template_data)
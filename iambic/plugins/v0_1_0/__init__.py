@@ -1,3 +1,19 @@
 from __future__ import annotations
 
+import os
+
 PLUGIN_VERSION = "v0.1.0"
+
+# The plugins shipped with iambic, keyed by their config_name.
+# Each lives in a sub-package of the same name.
+DEFAULT_PLUGIN_NAMES = ("aws", "google_workspace", "okta", "github", "azure_ad")
+
+
+def get_default_plugin_location(plugin_name: str) -> str:
+    """
+    Return the directory of a plugin shipped with iambic.
+
+    The path is resolved without importing the plugin package
+    so the plugin and its SDK dependencies are only loaded if the plugin is used.
+    """
+    return os.path.join(os.path.dirname(__file__), plugin_name)
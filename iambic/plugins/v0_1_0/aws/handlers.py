@@ -11,7 +11,10 @@ from typing import TYPE_CHECKING, Coroutine, Optional, Union
 import boto3
 
 from iambic.config.dynamic_config import ExtendsConfig, ExtendsConfigKey
+from iambic.core.change_stream import apply_template, template_change_stream
 from iambic.core.context import ctx
+from iambic.core.drift import drift_fingerprints
+from iambic.core.executor import Executor, merge_template_changes
 from iambic.core.iambic_enum import Command, IambicManaged
 from iambic.core.logger import log
 from iambic.core.models import (
@@ -21,11 +24,18 @@ from iambic.core.models import (
     Variable,
 )
 from iambic.core.parser import load_templates
+from iambic.core.telemetry import telemetry
 from iambic.core.template_generation import (
     get_existing_template_map,
     templatize_resource,
 )
-from iambic.core.utils import async_batch_processor, gather_templates, yaml
+from iambic.core.utils import (
+    async_batch_processor,
+    gather_templates,
+    load_json_cache_file,
+    template_provider_index,
+    yaml,
+)
 from iambic.plugins.v0_1_0.aws.event_bridge.models import (
     GroupMessageDetails,
     ManagedPolicyMessageDetails,
@@ -71,9 +81,13 @@ from iambic.plugins.v0_1_0.aws.organizations.scp.template_generation import (
     get_organizations_account_map,
 )
 from iambic.plugins.v0_1_0.aws.organizations.scp.utils import (
+    scp_policy_cache,
     service_control_policy_is_enabled,
 )
-from iambic.plugins.v0_1_0.aws.utils import get_aws_account_map
+from iambic.plugins.v0_1_0.aws.utils import (
+    get_aws_account_map,
+    get_org_account_inventory_path,
+)
 
 if TYPE_CHECKING:
     from iambic.plugins.v0_1_0.aws.iambic_plugin import AWSConfig
@@ -90,8 +104,13 @@ async def load(config: AWSConfig) -> AWSConfig:
                 "IAMbic will prefer the `hub_role_arn` specified under your AWS Organization. To remove this message, "
                 "please remove the `hub_role_arn` specified in an `AWS Account`."
             )
+        # Only the accounts defined in the config are used so don't wait on the rest of the org
+        config_account_ids = set(config_account_idx_map.keys())
         orgs_accounts = await asyncio.gather(
-            *[org.get_accounts() for org in config.organizations]
+            *[
+                org.get_accounts(account_ids=config_account_ids)
+                for org in config.organizations
+            ]
         )
         for org_accounts, org in zip(orgs_accounts, config.organizations):
             for account in org_accounts:
@@ -113,11 +132,21 @@ async def load(config: AWSConfig) -> AWSConfig:
                             organization=org,
                             config=config,
                         )
-                else:
+
+            # The rest of the org isn't fetched so it's reported from the org account inventory
+            org_inventory = (
+                load_json_cache_file(
+                    get_org_account_inventory_path(org.org_id or org.org_account_id),
+                    "org account inventory",
+                )
+                or {}
+            )
+            for account in org_inventory.get("accounts", []):
+                if account["Id"] not in config_account_idx_map:
                     log.warning(
                         "Account not found in config. Account will be ignored.",
-                        account_id=account.account_id,
-                        account_name=account.account_name,
+                        account_id=account["Id"],
+                        account_name=account["Name"],
                     )
     elif config.accounts:
         hub_account = [account for account in config.accounts if account.hub_role_arn]
@@ -172,7 +201,7 @@ async def apply_identity_center_templates(
     """
     await config.set_identity_center_details(exe_message.provider_id)
     return await async_batch_processor(
-        [template.apply(config) for template in templates],
+        [apply_template(template, config) for template in templates],
         5,
         0.5,
     )
@@ -202,7 +231,7 @@ async def apply_iam_templates(
     excluded_from_batch = [AWS_MANAGED_POLICY_TEMPLATE_TYPE]
 
     if managed_policy_tasks := [
-        template.apply(config)
+        apply_template(template, config)
         for template in templates
         if template.template_type == AWS_MANAGED_POLICY_TEMPLATE_TYPE
     ]:
@@ -220,7 +249,7 @@ async def apply_iam_templates(
         # There are user templates that may rely on the group so groups must be created first
         excluded_from_batch.append(AWS_IAM_GROUP_TEMPLATE_TYPE)
         group_tasks = [
-            template.apply(config)
+            apply_template(template, config)
             for template in templates
             if template.template_type == AWS_IAM_GROUP_TEMPLATE_TYPE
         ]
@@ -231,7 +260,7 @@ async def apply_iam_templates(
     template_changes.extend(
         await async_batch_processor(
             [
-                template.apply(config)
+                apply_template(template, config)
                 for template in templates
                 if template.template_type not in excluded_from_batch
             ],
@@ -255,12 +284,25 @@ async def apply(
     :param templates: The list of templates to apply.
     :param remote_worker: The remote worker to use for applying templates.
     """
-    # TODO: Leverage exe_message as part of a distributed execution
-    # TODO: Leverage remote_worker as part of a distributed execution
+    if ctx.use_remote and remote_worker and not exe_message.provider_id:
+        return await apply_with_remote_worker(
+            exe_message, config, templates, remote_worker
+        )
+    elif exe_message.provider_id:
+        # A shard of a distributed apply, only apply to the shard's account
+        config = config.copy()
+        config.accounts = [
+            aws_account
+            for aws_account in config.accounts
+            if aws_account.account_id == exe_message.provider_id
+        ]
 
     identity_center_templates = []
     iam_templates = []
     tasks = []
+    scp_policy_cache.clear()
+    for aws_account in config.accounts:
+        aws_account.read_cache.start_run(exe_message.execution_id)
 
     for template in templates:
         if template.template_type == AWS_IDENTITY_CENTER_PERMISSION_SET_TEMPLATE_TYPE:
@@ -289,6 +331,61 @@ async def apply(
     ]
 
 
+async def apply_with_remote_worker(
+    exe_message: ExecutionMessage,
+    config: AWSConfig,
+    templates: list[BaseTemplate],
+    remote_worker: Executor,
+) -> list[TemplateChangeDetails]:
+    """
+    Apply the templates with one remote worker task per AWS account.
+
+    Each task runs the regular apply restricted to its account
+    so the ordering of dependent resources within an account is preserved.
+    A task is only sent the templates applied to its account.
+    """
+    account_templates = {}
+    for template in templates:
+        for aws_account in template_provider_index.get(template, config.accounts):
+            account_templates.setdefault(aws_account.account_id, []).append(template)
+
+    task_messages = []
+    for aws_account in config.accounts:
+        if (
+            aws_account.iambic_managed == IambicManaged.DISABLED
+            or aws_account.account_id not in account_templates
+        ):
+            continue
+
+        task_message = exe_message.copy()
+        task_message.provider_id = aws_account.account_id
+        task_messages.append(task_message)
+
+    responses = await remote_worker.run(task_messages, templates=account_templates)
+    template_changes = [
+        template_change_stream.write(template_change)
+        for template_change in merge_template_changes(account_templates, responses)
+    ]
+
+    if ctx.execute:
+        # Workers only apply to a single account, so a template marked as deleted
+        # is removed once it has been removed from every account without an error.
+        template_errors = {
+            template_change.template_path
+            for template_change in template_changes
+            if template_change.exceptions_seen
+        }
+        for template in templates:
+            if (
+                getattr(template, "deleted", False)
+                and template.iambic_managed != IambicManaged.IMPORT_ONLY
+                and str(template.file_path) not in template_errors
+            ):
+                template.delete()
+
+    return template_changes
+
+
 async def import_service_resources(
     exe_message: ExecutionMessage,
     config: AWSConfig,
@@ -305,49 +402,53 @@ async def import_service_resources(
         exe_message = exe_message.copy()
         exe_message.metadata = dict(service=service_name)
 
-    for async_collector_callable in async_collector_callables:
-        tasks = []
+    task_messages = []
+    for account in config.accounts:
+        task_message = exe_message.copy()
 
-        for account in config.accounts:
-            task_message = exe_message.copy()
+        if task_message.provider_id and task_message.provider_id != account.account_id:
+            continue
+        elif account.iambic_managed == IambicManaged.DISABLED:
+            continue
+        elif not task_message.provider_id:
+            task_message.provider_id = account.account_id
 
-            if (
-                task_message.provider_id
-                and task_message.provider_id != account.account_id
-            ):
-                continue
-            elif account.iambic_managed == IambicManaged.DISABLED:
-                continue
-            elif not task_message.provider_id:
-                task_message.provider_id = account.account_id
+        task_messages.append(task_message)
 
-            tasks.append(
-                async_collector_callable(
-                    task_message, config, existing_template_map, messages
-                )
+    if base_runner and ctx.use_remote and remote_worker and not messages:
+        # Each worker runs every collector of the service for its account
+        # and writes the output to the execution directory read by the generators
+        await remote_worker.run(task_messages, base_output_dir=base_output_dir)
+    else:
+        if remote_worker and not ctx.use_remote:
+            log.warning(
+                "The remote worker definition must be defined in the config to run remote execution."
             )
 
-        if tasks:
-            if base_runner and ctx.use_remote and remote_worker and not messages:
-                # TODO: Update to use the remote_worker
-                await asyncio.gather(*tasks)
-                # TODO: Add a process to gather status messages from the remote worker
-            else:
-                if remote_worker:
-                    log.warning(
-                        "The remote worker definition must be defined in the config to run remote execution."
+        for async_collector_callable in async_collector_callables:
+            await asyncio.gather(
+                *[
+                    telemetry.trace(
+                        async_collector_callable(
+                            task_message, config, existing_template_map, messages
+                        ),
+                        provider_id=task_message.provider_id,
                     )
-                await asyncio.gather(*tasks)
+                    for task_message in task_messages
+                ]
+            )
 
     if base_runner:
         await asyncio.gather(
             *[
-                async_generator_callable(
-                    exe_message,
-                    config,
-                    base_output_dir,
-                    existing_template_map,
-                    messages,
+                telemetry.trace(
+                    async_generator_callable(
+                        exe_message,
+                        config,
+                        base_output_dir,
+                        existing_template_map,
+                        messages,
+                    )
                 )
                 for async_generator_callable in async_generator_callables
             ]
@@ -402,16 +503,16 @@ async def import_aws_resources(
     remote_worker=None,
 ):
     tasks: list[Coroutine] = []
+    for aws_account in config.accounts:
+        aws_account.read_cache.start_run(exe_message.execution_id)
 
     if not exe_message.metadata or exe_message.metadata["service"] == "identity_center":
-        identity_center_template_map = None
-        if not remote_worker or exe_message.metadata:
-            identity_center_template_map = await get_existing_template_map(
-                repo_dir=base_output_dir,
-                template_type="AWS::IdentityCenter.*",
-                template_map=config.template_map,
-                nested=True,
-            )
+        identity_center_template_map = await get_existing_template_map(
+            repo_dir=base_output_dir,
+            template_type="AWS::IdentityCenter.*",
+            template_map=config.template_map,
+            nested=True,
+        )
 
         tasks.append(
             import_identity_center_resources(
@@ -424,20 +525,18 @@ async def import_aws_resources(
             )
         )
 
-    tasks += await import_organization_resources(
-        exe_message, config, base_output_dir, messages, remote_worker
-    )  # type: ignore
+    if not exe_message.metadata or exe_message.metadata["service"] == "scp":
+        tasks += await import_organization_resources(
+            exe_message, config, base_output_dir, messages, remote_worker
+        )  # type: ignore
 
     if not exe_message.metadata or exe_message.metadata["service"] == "iam":
-        iam_template_map = None
-
-        if not remote_worker or exe_message.metadata:
-            iam_template_map = await get_existing_template_map(
-                repo_dir=base_output_dir,
-                template_type="AWS::IAM.*",
-                template_map=config.template_map,
-                nested=True,
-            )
+        iam_template_map = await get_existing_template_map(
+            repo_dir=base_output_dir,
+            template_type="AWS::IAM.*",
+            template_map=config.template_map,
+            nested=True,
+        )
 
         tasks.append(
             import_service_resources(
@@ -476,6 +575,7 @@ async def import_organization_resources(
     tasks = []
     if not config.organizations:
         return tasks
+    scp_policy_cache.clear()
     exe_messages = await config.get_command_by_organization_account(exe_message)
     scp_template_map = await get_existing_template_map(
         repo_dir=base_output_dir,
@@ -485,6 +585,10 @@ async def import_organization_resources(
     )
 
     for exe_msg in exe_messages:
+        if exe_message.provider_id and exe_msg.provider_id != exe_message.provider_id:
+            # The message is a shard for a single organization
+            continue
+
         aws_account_map: dict[str, AWSAccount] = await get_organizations_account_map(
             exe_msg, config
         )
@@ -709,6 +813,8 @@ async def detect_changes(  # noqa: C901
                             )
 
                         if resource_id:
+                            # The cloud side moved so the next enforce run must re-read it
+                            drift_fingerprints.invalidate(account_id, resource_id)
                             detect_log_details.append(
                                 {
                                     "resource_id": resource_id,
@@ -730,6 +836,7 @@ async def detect_changes(  # noqa: C901
                 QueueUrl=queue_url, MaxNumberOfMessages=10
             ).get("Messages", [])
 
+    drift_fingerprints.save()
     exe_message = ExecutionMessage(
         execution_id=str(uuid.uuid4()), command=Command.IMPORT, provider_type="aws"
     )
@@ -1069,8 +1176,9 @@ async def aws_account_update_and_discovery(
         account.account_id: idx for idx, account in enumerate(config.accounts)
     }
 
+    # Discovery needs the current state of the org, not the cached inventory
     orgs_accounts = await asyncio.gather(
-        *[org.get_accounts() for org in config.organizations]
+        *[org.get_accounts(refresh=True) for org in config.organizations]
     )
     import_new_account = await discover_new_aws_accounts(
         exe_message,
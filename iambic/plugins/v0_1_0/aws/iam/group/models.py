@@ -25,7 +25,7 @@ from iambic.plugins.v0_1_0.aws.iam.group.utils import (
 from iambic.plugins.v0_1_0.aws.iam.models import Path
 from iambic.plugins.v0_1_0.aws.iam.policy.models import ManagedPolicyRef, PolicyDocument
 from iambic.plugins.v0_1_0.aws.models import AccessModel, AWSAccount, AWSTemplate
-from iambic.plugins.v0_1_0.aws.utils import boto_crud_call
+from iambic.plugins.v0_1_0.aws.utils import IAMPrincipalChangeSet, boto_crud_call
 
 AWS_IAM_GROUP_TEMPLATE_TYPE = "NOQ::AWS::IAM::Group"
 
@@ -128,7 +128,10 @@ class AwsIamGroupTemplate(AWSTemplate, AccessModel):
 
         deleted = self.get_attribute_val_for_account(aws_account, "deleted", False)
         current_group = await get_group(
-            group_name, client, include_policies=bool(not deleted)
+            group_name,
+            client,
+            include_policies=bool(not deleted),
+            read_cache=aws_account.read_cache,
         )
         if current_group:
             account_change_details.current_value = {
@@ -249,6 +252,8 @@ class AwsIamGroupTemplate(AWSTemplate, AccessModel):
                 )
                 return account_change_details
 
+        # Policy writes are queued and run together once every change is known
+        change_set = IAMPrincipalChangeSet(aws_account.write_limiter)
         tasks.extend(
             [
                 apply_group_managed_policies(
@@ -257,6 +262,7 @@ class AwsIamGroupTemplate(AWSTemplate, AccessModel):
                     managed_policies,
                     existing_managed_policies,
                     log_params,
+                    change_set,
                 ),
                 apply_group_inline_policies(
                     group_name,
@@ -264,11 +270,13 @@ class AwsIamGroupTemplate(AWSTemplate, AccessModel):
                     inline_policies,
                     existing_inline_policies,
                     log_params,
+                    change_set,
                 ),
             ]
         )
 
         changes_made = await asyncio.gather(*tasks)
+        await change_set.execute()
         if any(changes_made):
             account_change_details.extend_changes(
                 list(chain.from_iterable(changes_made))
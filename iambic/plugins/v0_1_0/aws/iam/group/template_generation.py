@@ -37,6 +37,7 @@ from iambic.plugins.v0_1_0.aws.iam.group.utils import (
 from iambic.plugins.v0_1_0.aws.models import AWSAccount
 from iambic.plugins.v0_1_0.aws.template_generation import (
     base_group_str_attribute,
+    create_templated_resources,
     group_dict_attribute,
     group_int_or_str_attribute,
 )
@@ -537,20 +538,14 @@ async def generate_aws_group_templates(
     grouped_group_map = await base_group_str_attribute(aws_account_map, account_groups)
 
     log.debug("Writing templated groups")
-    all_resource_ids = set()
-    for group_name, group_refs in grouped_group_map.items():
-        resource_template = await create_templated_group(
-            aws_account_map,
-            group_name,
-            group_refs,
-            group_dir,
-            existing_template_map,
-            config,
-        )
-        if not resource_template:
-            # Template not updated. Most likely because it's an `enforced` template.
-            continue
-        all_resource_ids.add(resource_template.resource_id)
+    all_resource_ids = await create_templated_resources(
+        create_templated_group,
+        aws_account_map,
+        grouped_group_map,
+        group_dir,
+        existing_template_map,
+        config,
+    )
 
     if not detect_messages:
         # NEVER call this if messages are passed in because all_resource_ids will only contain those resources
@@ -2,20 +2,21 @@ from __future__ import annotations
 
 import asyncio
 import json
-from itertools import chain
-from typing import TYPE_CHECKING, Union
+from typing import TYPE_CHECKING, Optional, Union
 
 from deepdiff import DeepDiff
 
 from iambic.core.context import ctx
 from iambic.core.logger import log
 from iambic.core.models import ProposedChange, ProposedChangeType
-from iambic.core.utils import (
-    aio_wrapper,
-    get_rendered_template_str_value,
-    plugin_apply_wrapper,
+from iambic.core.utils import aio_wrapper, get_rendered_template_str_value
+from iambic.plugins.v0_1_0.aws.utils import (
+    AWSReadCache,
+    IAMPrincipalChangeSet,
+    boto_crud_call,
+    cached_read,
+    paginated_search,
 )
-from iambic.plugins.v0_1_0.aws.utils import boto_crud_call, paginated_search
 
 if TYPE_CHECKING:
     from iambic.plugins.v0_1_0.aws.models import AWSAccount
@@ -80,17 +81,28 @@ async def get_group_managed_policies(
     return [{"PolicyArn": policy["PolicyArn"]} for policy in policies]
 
 
-async def get_group(group_name: str, iam_client, include_policies: bool = True) -> dict:
+async def get_group(
+    group_name: str,
+    iam_client,
+    include_policies: bool = True,
+    read_cache: AWSReadCache = None,
+) -> dict:
     try:
         current_group = (
-            await boto_crud_call(iam_client.get_group, GroupName=group_name)
+            await cached_read(
+                read_cache, boto_crud_call, iam_client.get_group, GroupName=group_name
+            )
         )["Group"]
         if include_policies:
-            current_group["ManagedPolicies"] = await get_group_managed_policies(
-                group_name, iam_client
+            current_group["ManagedPolicies"] = await cached_read(
+                read_cache, get_group_managed_policies, group_name, iam_client
             )
-            current_group["InlinePolicies"] = await get_group_inline_policies(
-                group_name, iam_client, as_dict=False
+            current_group["InlinePolicies"] = await cached_read(
+                read_cache,
+                get_group_inline_policies,
+                group_name,
+                iam_client,
+                as_dict=False,
             )
     except iam_client.exceptions.NoSuchEntityException:
         current_group = {}
@@ -126,8 +138,10 @@ async def apply_group_managed_policies(
     template_policies: list[dict],
     existing_policies: list[dict],
     log_params: dict,
+    change_set: Optional[IAMPrincipalChangeSet] = None,
 ) -> list[ProposedChange]:
-    tasks = []
+    execute_change_set = change_set is None
+    change_set = change_set or IAMPrincipalChangeSet()
     response = []
     template_policies = [policy["PolicyArn"] for policy in template_policies]
     existing_managed_policies = [policy["PolicyArn"] for policy in existing_policies]
@@ -154,12 +168,12 @@ async def apply_group_managed_policies(
             ]
             response.extend(proposed_changes)
             if ctx.execute:
-                apply_awaitable = boto_crud_call(
+                change_set.add(
                     iam_client.attach_group_policy,
+                    proposed_changes,
                     GroupName=group_name,
                     PolicyArn=policy_arn,
                 )
-                tasks.append(plugin_apply_wrapper(apply_awaitable, proposed_changes))
         log.debug(log_str, managed_policies=new_managed_policies, **log_params)
 
     # Delete existing managed policies not in template
@@ -184,19 +198,17 @@ async def apply_group_managed_policies(
             ]
             response.extend(proposed_changes)
             if ctx.execute:
-                apply_awaitable = boto_crud_call(
+                change_set.remove(
                     iam_client.detach_group_policy,
+                    proposed_changes,
                     GroupName=group_name,
                     PolicyArn=policy_arn,
                 )
-                tasks.append(plugin_apply_wrapper(apply_awaitable, proposed_changes))
         log.debug(log_str, managed_policies=existing_managed_policies, **log_params)
 
-    if tasks:
-        results: list[list[ProposedChange]] = await asyncio.gather(*tasks)
-        return list(chain.from_iterable(results))
-    else:
-        return response
+    if execute_change_set:
+        await change_set.execute()
+    return response
 
 
 async def apply_group_inline_policies(
@@ -205,10 +217,11 @@ async def apply_group_inline_policies(
     template_policies: list[dict],
     existing_policies: list[dict],
     log_params: dict,
+    change_set: Optional[IAMPrincipalChangeSet] = None,
 ) -> list[ProposedChange]:
-    apply_tasks = []
-    delete_tasks = []
-    plan_response = []
+    execute_change_set = change_set is None
+    change_set = change_set or IAMPrincipalChangeSet()
+    response = []
     template_policy_map = {
         policy["PolicyName"]: {k: v for k, v in policy.items() if k != "PolicyName"}
         for policy in template_policies
@@ -229,19 +242,19 @@ async def apply_group_inline_policies(
                     attribute="inline_policies",
                 )
             ]
-            plan_response.extend(proposed_changes)
+            response.extend(proposed_changes)
 
             if ctx.execute:
                 log_str = f"{log_str} Removing inline policy..."
-
-                apply_awaitable = boto_crud_call(
+                # Wait for the policy deletion to propagate before applying new policies
+                # Otherwise a max policy limit error may be thrown
+                change_set.remove(
                     iam_client.delete_group_policy,
+                    proposed_changes,
+                    settle_seconds=3,
                     GroupName=group_name,
                     PolicyName=policy_name,
                 )
-                delete_tasks.append(
-                    plugin_apply_wrapper(apply_awaitable, proposed_changes)
-                )
             log.debug(log_str, policy_name=policy_name, **log_params)
 
     for policy_name, policy_document in template_policy_map.items():
@@ -290,38 +303,25 @@ async def apply_group_inline_policies(
                         new_value=policy_document,
                     )
                 ]
-            plan_response.extend(proposed_changes)
-
             log_str = f"{resource_existence} inline policies discovered."
-            if ctx.execute and policy_document:
+            if not ctx.execute:
+                response.extend(proposed_changes)
+            elif policy_document:
                 log_str = f"{log_str} {boto_action} inline policy..."
-                apply_awaitable = boto_crud_call(
+                response.extend(proposed_changes)
+                change_set.add(
                     iam_client.put_group_policy,
+                    proposed_changes,
                     GroupName=group_name,
                     PolicyName=policy_name,
                     PolicyDocument=json.dumps(policy_document),
                 )
-                apply_tasks.append(
-                    plugin_apply_wrapper(apply_awaitable, proposed_changes)
-                )
 
             log.debug(log_str, policy_name=policy_name, **log_params)
 
-    if apply_tasks or delete_tasks:
-        results: list[list[ProposedChange]] = []
-        if delete_tasks:
-            results.extend(await asyncio.gather(*delete_tasks))
-            if apply_tasks:
-                # Wait for the policy deletion to propagate before applying new policies
-                # Otherwise a max policy limit error may be thrown
-                await asyncio.sleep(3)
-
-        if apply_tasks:
-            results.extend(await asyncio.gather(*apply_tasks))
-
-        return list(chain.from_iterable(results))
-    else:
-        return plan_response
+    if execute_change_set:
+        await change_set.execute()
+    return response
 
 
 async def delete_iam_group(group_name: str, iam_client, log_params: dict):
@@ -375,7 +375,9 @@ class AwsIamManagedPolicyTemplate(AWSTemplate, AccessModel):
             account=str(aws_account),
         )
         policy_arn = account_policy.pop("Arn")
-        current_policy = await get_managed_policy(client, policy_arn)
+        current_policy = await aws_account.read_cache.get(
+            get_managed_policy, client, policy_arn
+        )
         if current_policy:
             account_change_details.current_value = {**current_policy}
 
@@ -405,7 +407,7 @@ class AwsIamManagedPolicyTemplate(AWSTemplate, AccessModel):
 
                 if ctx.execute:
                     apply_awaitable = delete_managed_policy(
-                        client, policy_arn, log_params
+                        client, policy_arn, log_params, aws_account.read_cache
                     )
                     proposed_changes = await plugin_apply_wrapper(
                         apply_awaitable, proposed_changes
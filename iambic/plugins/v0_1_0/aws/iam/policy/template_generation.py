@@ -29,12 +29,15 @@ from iambic.plugins.v0_1_0.aws.iam.policy.models import (
     ManagedPolicyProperties,
 )
 from iambic.plugins.v0_1_0.aws.iam.policy.utils import (
+    IAMBIC_INCREMENTAL_MANAGED_POLICY_IMPORT,
     get_managed_policy,
+    get_managed_policy_cache_path,
     list_managed_policies,
 )
 from iambic.plugins.v0_1_0.aws.models import AWSAccount
 from iambic.plugins.v0_1_0.aws.template_generation import (
     base_group_str_attribute,
+    create_templated_resources,
     group_dict_attribute,
     group_int_or_str_attribute,
 )
@@ -109,7 +112,12 @@ async def generate_account_managed_policy_resource_files(
 
     response = dict(account_id=aws_account.account_id, managed_policies=[])
     iam_client = await aws_account.get_boto3_client("iam")
-    account_managed_policies = await list_managed_policies(iam_client)
+    account_managed_policies = await list_managed_policies(
+        iam_client,
+        cache_path=get_managed_policy_cache_path(aws_account.account_id)
+        if IAMBIC_INCREMENTAL_MANAGED_POLICY_IMPORT
+        else None,
+    )
 
     log.debug(
         "Retrieved AWS IAM Managed Policies.",
@@ -531,20 +539,14 @@ async def generate_aws_managed_policy_templates(
     )
 
     log.debug("Writing templated managed policies")
-    all_resource_ids = set()
-    for policy_name, policy_refs in grouped_managed_policy_map.items():
-        resource_template = await create_templated_managed_policy(
-            aws_account_map,
-            policy_name,
-            policy_refs,
-            resource_dir,
-            existing_template_map,
-            config,
-        )
-        if not resource_template:
-            # Template not updated. Most likely because it's an `enforced` template.
-            continue
-        all_resource_ids.add(resource_template.resource_id)
+    all_resource_ids = await create_templated_resources(
+        create_templated_managed_policy,
+        aws_account_map,
+        grouped_managed_policy_map,
+        resource_dir,
+        existing_template_map,
+        config,
+    )
 
     if not detect_messages:
         # NEVER call this if messages are passed in because all_resource_ids will only contain those resources
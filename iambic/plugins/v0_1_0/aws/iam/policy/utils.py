@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 import asyncio
+import os
+import time
 from itertools import chain
+from typing import Optional
 
 from botocore.exceptions import ClientError
 from deepdiff import DeepDiff
@@ -10,9 +13,30 @@ from iambic.core import noq_json as json
 from iambic.core.context import ctx
 from iambic.core.logger import log
 from iambic.core.models import ProposedChange, ProposedChangeType
-from iambic.core.utils import NoqSemaphore, aio_wrapper, plugin_apply_wrapper
+from iambic.core.utils import (
+    NoqSemaphore,
+    aio_wrapper,
+    get_cache_file_path,
+    load_json_cache_file,
+    plugin_apply_wrapper,
+    save_json_cache_file,
+)
 from iambic.plugins.v0_1_0.aws.models import AWSAccount
-from iambic.plugins.v0_1_0.aws.utils import boto_crud_call, paginated_search
+from iambic.plugins.v0_1_0.aws.utils import (
+    AWSReadCache,
+    boto_crud_call,
+    cached_read,
+    paginated_search,
+)
+
+# When set to 1, true or yes, imports only refetch managed policies whose version or update date moved
+IAMBIC_INCREMENTAL_MANAGED_POLICY_IMPORT = os.getenv(
+    "IAMBIC_INCREMENTAL_MANAGED_POLICY_IMPORT", ""
+).lower() in ("1", "true", "yes")
+# Tag changes don't move a policy's UpdateDate so cached entries are refreshed periodically
+MANAGED_POLICY_CACHE_TTL = int(
+    os.getenv("IAMBIC_MANAGED_POLICY_CACHE_TTL", 60 * 60 * 24)
+)
 
 
 async def list_managed_policy_versions(iam_client, policy_arn: str) -> list[dict]:
@@ -88,13 +112,34 @@ def get_oldest_policy_version_id(policy_versions: list[dict]) -> str:
         return policy_versions[1]["VersionId"]
 
 
+def get_managed_policy_cache_path(account_id: str) -> str:
+    return get_cache_file_path("cache", "aws", account_id, "managed_policies.json")
+
+
+def get_managed_policy_version_marker(managed_policy: dict) -> str:
+    """Represents the state of a policy as returned by list_policies.
+
+    If it hasn't moved since the last import, the policy document hasn't changed.
+    """
+    return (
+        f"{managed_policy.get('DefaultVersionId')}|{managed_policy.get('UpdateDate')}"
+    )
+
+
 async def list_managed_policies(
     iam_client,
     scope: str = "Local",
     only_attached: bool = False,
     path_prefix: str = "/",
     policy_usage_filter: str = None,
+    cache_path: Optional[str] = None,
 ):
+    """List the managed policies with their default version document and tags.
+
+    If cache_path is provided, only the policies whose DefaultVersionId or UpdateDate
+    moved since the cache was written are fetched.
+    The rest are served from the cache which is then rewritten with the current policies.
+    """
     get_managed_policy_semaphore = NoqSemaphore(get_managed_policy, 50)
     list_policy_kwargs = dict(
         Scope=scope,
@@ -107,16 +152,70 @@ async def list_managed_policies(
     managed_policies = await paginated_search(
         iam_client.list_policies, response_key="Policies", **list_policy_kwargs
     )
-    return await get_managed_policy_semaphore.process(
+    if not cache_path:
+        return await get_managed_policy_semaphore.process(
+            [
+                {"iam_client": iam_client, "policy_arn": policy["Arn"]}
+                for policy in managed_policies
+            ]
+        )
+
+    managed_policy_cache = (
+        load_json_cache_file(cache_path, "managed policy cache") or {}
+    )
+    current_time = time.time()
+    policy_arn_map = {}
+    stale_policies = []
+    for policy in managed_policies:
+        cached_policy = managed_policy_cache.get(policy["Arn"])
+        if (
+            cached_policy
+            and cached_policy["version_marker"]
+            == get_managed_policy_version_marker(policy)
+            and current_time - cached_policy["fetched_at"] <= MANAGED_POLICY_CACHE_TTL
+        ):
+            policy_arn_map[policy["Arn"]] = cached_policy
+        else:
+            stale_policies.append(policy)
+
+    log.debug(
+        "Resolved managed policies from cache.",
+        cached_policy_count=len(policy_arn_map),
+        stale_policy_count=len(stale_policies),
+    )
+    fetched_policies = await get_managed_policy_semaphore.process(
         [
             {"iam_client": iam_client, "policy_arn": policy["Arn"]}
-            for policy in managed_policies
+            for policy in stale_policies
         ]
     )
+    response = {
+        arn: cached_policy["policy"] for arn, cached_policy in policy_arn_map.items()
+    }
+    for policy, fetched_policy in zip(stale_policies, fetched_policies):
+        response[policy["Arn"]] = fetched_policy
+        if not fetched_policy:
+            # The policy was deleted between the list and the get
+            continue
+
+        policy_arn_map[policy["Arn"]] = {
+            "version_marker": get_managed_policy_version_marker(policy),
+            "fetched_at": current_time,
+            # Serialized so a cached policy is written out identically on the next import
+            "policy": json.loads(json.dumps(fetched_policy)),
+        }
+
+    # Rewriting from the listed policies drops any policy that has been deleted
+    save_json_cache_file(cache_path, policy_arn_map)
+    return [response[policy["Arn"]] for policy in managed_policies]
 
 
-async def delete_managed_policy(iam_client, policy_arn: str, log_params: dict):
-    policy_attachments = await get_managed_policy_attachments(iam_client, policy_arn)
+async def delete_managed_policy(
+    iam_client, policy_arn: str, log_params: dict, read_cache: AWSReadCache = None
+):
+    policy_attachments = await cached_read(
+        read_cache, get_managed_policy_attachments, iam_client, policy_arn
+    )
     policy_versions = await list_managed_policy_versions(iam_client, policy_arn)
     tasks = []
 
@@ -149,6 +248,11 @@ async def delete_managed_policy(iam_client, policy_arn: str, log_params: dict):
         **log_params,
     )
     await asyncio.gather(*tasks)
+    if read_cache:
+        # The cached managed policies of the detached principals are stale
+        for detachment_type in ["User", "Role", "Group"]:
+            for entity in policy_attachments[f"Policy{detachment_type}s"]:
+                read_cache.invalidate(entity[f"{detachment_type}Name"])
     await boto_crud_call(iam_client.delete_policy, PolicyArn=policy_arn)
 
 
@@ -44,7 +44,7 @@ from iambic.plugins.v0_1_0.aws.models import (
     Description,
     Tag,
 )
-from iambic.plugins.v0_1_0.aws.utils import boto_crud_call
+from iambic.plugins.v0_1_0.aws.utils import IAMPrincipalChangeSet, boto_crud_call
 
 AWS_IAM_ROLE_TEMPLATE_TYPE = "NOQ::AWS::IAM::Role"
 
@@ -238,7 +238,10 @@ class AwsIamRoleTemplate(AWSTemplate, AccessModel):
         )
         deleted = self.get_attribute_val_for_account(aws_account, "deleted", False)
         current_role = await get_role(
-            role_name, client, include_policies=bool(not deleted)
+            role_name,
+            client,
+            include_policies=bool(not deleted),
+            read_cache=aws_account.read_cache,
         )
         if current_role:
             account_change_details.current_value = {**current_role}  # Create a new dict
@@ -268,7 +271,9 @@ class AwsIamRoleTemplate(AWSTemplate, AccessModel):
                 log.debug(log_str, **log_params)
 
                 if ctx.execute:
-                    apply_awaitable = delete_iam_role(role_name, client, log_params)
+                    apply_awaitable = delete_iam_role(
+                        role_name, client, log_params, aws_account.read_cache
+                    )
                     proposed_changes = await plugin_apply_wrapper(
                         apply_awaitable, proposed_changes
                     )
@@ -282,6 +287,8 @@ class AwsIamRoleTemplate(AWSTemplate, AccessModel):
         managed_policies = account_role.pop("ManagedPolicies", [])
         existing_inline_policies = current_role.pop("InlinePolicies", [])
         existing_managed_policies = current_role.pop("ManagedPolicies", [])
+        # Tag and policy writes are queued and run together once every change is known
+        change_set = IAMPrincipalChangeSet(aws_account.write_limiter)
         tasks = []
         if role_exists:
             tasks.extend(
@@ -292,6 +299,7 @@ class AwsIamRoleTemplate(AWSTemplate, AccessModel):
                         account_role["Tags"],
                         current_role.get("Tags", []),
                         log_params,
+                        change_set,
                     ),
                     update_assume_role_policy(
                         role_name,
@@ -413,6 +421,7 @@ class AwsIamRoleTemplate(AWSTemplate, AccessModel):
                         managed_policies,
                         existing_managed_policies,
                         log_params,
+                        change_set,
                     ),
                     apply_role_inline_policies(
                         role_name,
@@ -420,11 +429,13 @@ class AwsIamRoleTemplate(AWSTemplate, AccessModel):
                         inline_policies,
                         existing_inline_policies,
                         log_params,
+                        change_set,
                     ),
                 ]
             )
 
         changes_made = await asyncio.gather(*tasks)
+        await change_set.execute()
         if any(changes_made):
             account_change_details.extend_changes(
                 list(chain.from_iterable(changes_made))
@@ -39,6 +39,7 @@ from iambic.plugins.v0_1_0.aws.iam.role.utils import (
 from iambic.plugins.v0_1_0.aws.models import AWSAccount
 from iambic.plugins.v0_1_0.aws.template_generation import (
     base_group_str_attribute,
+    create_templated_resources,
     group_dict_attribute,
     group_int_or_str_attribute,
 )
@@ -157,7 +158,9 @@ async def generate_role_resource_file_for_all_accounts(
     async def get_role_for_account(aws_account: AWSAccount):
         iam_client = await aws_account.get_boto3_client("iam")
         account_role_name = get_rendered_template_str_value(role_name, aws_account)
-        role = await get_role(account_role_name, iam_client)
+        role = await get_role(
+            account_role_name, iam_client, read_cache=aws_account.read_cache
+        )
         if "PermissionsBoundary" in role:
             role["PermissionsBoundary"]["PolicyArn"] = role["PermissionsBoundary"].pop(
                 "PermissionsBoundaryArn"
@@ -221,7 +224,7 @@ async def set_role_resource_tags(
     role_name: str, role_resource_path: str, aws_account: AWSAccount
 ):
     iam_client = await aws_account.get_boto3_client("iam")
-    role_tags = await list_role_tags(role_name, iam_client)
+    role_tags = await aws_account.read_cache.get(list_role_tags, role_name, iam_client)
     await resource_file_upsert(role_resource_path, {"Tags": role_tags}, False)
 
 
@@ -229,7 +232,9 @@ async def set_role_resource_inline_policies(
     role_name: str, role_resource_path: str, aws_account: AWSAccount
 ):
     iam_client = await aws_account.get_boto3_client("iam")
-    role_inline_policies = await get_role_inline_policies(role_name, iam_client)
+    role_inline_policies = await aws_account.read_cache.get(
+        get_role_inline_policies, role_name, iam_client
+    )
     for k in role_inline_policies.keys():
         role_inline_policies[k]["policy_name"] = k
 
@@ -243,7 +248,9 @@ async def set_role_resource_managed_policies(
     role_name: str, role_resource_path: str, aws_account: AWSAccount
 ):
     iam_client = await aws_account.get_boto3_client("iam")
-    role_managed_policies = await get_role_managed_policies(role_name, iam_client)
+    role_managed_policies = await aws_account.read_cache.get(
+        get_role_managed_policies, role_name, iam_client
+    )
     await resource_file_upsert(
         role_resource_path, {"ManagedPolicies": role_managed_policies}, False
     )
@@ -652,20 +659,14 @@ async def generate_aws_role_templates(
     grouped_role_map = await base_group_str_attribute(aws_account_map, account_roles)
 
     log.info("Writing templated roles")
-    all_resource_ids = set()
-    for role_name, role_refs in grouped_role_map.items():
-        resource_template = await create_templated_role(
-            aws_account_map,
-            role_name,
-            role_refs,
-            role_dir,
-            existing_template_map,
-            config,
-        )
-        if not resource_template:
-            # Template not updated. Most likely because it's an `enforced` template.
-            continue
-        all_resource_ids.add(resource_template.resource_id)
+    all_resource_ids = await create_templated_resources(
+        create_templated_role,
+        aws_account_map,
+        grouped_role_map,
+        role_dir,
+        existing_template_map,
+        config,
+    )
 
     if not detect_messages:
         # NEVER call this if messages are passed in because all_resource_ids will only contain those resources
@@ -3,7 +3,7 @@ from __future__ import annotations
 import asyncio
 import json
 from itertools import chain
-from typing import Union
+from typing import Optional, Union
 
 from deepdiff import DeepDiff
 
@@ -16,7 +16,13 @@ from iambic.core.utils import (
     plugin_apply_wrapper,
 )
 from iambic.plugins.v0_1_0.aws.models import AWSAccount
-from iambic.plugins.v0_1_0.aws.utils import boto_crud_call, paginated_search
+from iambic.plugins.v0_1_0.aws.utils import (
+    AWSReadCache,
+    IAMPrincipalChangeSet,
+    boto_crud_call,
+    cached_read,
+    paginated_search,
+)
 
 
 async def get_role_inline_policy_names(role_name: str, iam_client):
@@ -106,19 +112,30 @@ async def get_role_managed_policies(role_name: str, iam_client) -> list[dict[str
     return [{"PolicyArn": policy["PolicyArn"]} for policy in policies]
 
 
-async def get_role(role_name: str, iam_client, include_policies: bool = True) -> dict:
+async def get_role(
+    role_name: str,
+    iam_client,
+    include_policies: bool = True,
+    read_cache: AWSReadCache = None,
+) -> dict:
     try:
-        current_role = (await boto_crud_call(iam_client.get_role, RoleName=role_name))[
-            "Role"
-        ]
+        current_role = (
+            await cached_read(
+                read_cache, boto_crud_call, iam_client.get_role, RoleName=role_name
+            )
+        )["Role"]
         current_role.get("PermissionsBoundary", {}).pop("PermissionsBoundaryType", None)
 
         if include_policies:
-            current_role["ManagedPolicies"] = await get_role_managed_policies(
-                role_name, iam_client
+            current_role["ManagedPolicies"] = await cached_read(
+                read_cache, get_role_managed_policies, role_name, iam_client
             )
-            current_role["InlinePolicies"] = await get_role_inline_policies(
-                role_name, iam_client, as_dict=False
+            current_role["InlinePolicies"] = await cached_read(
+                read_cache,
+                get_role_inline_policies,
+                role_name,
+                iam_client,
+                as_dict=False,
             )
 
         if not current_role.get("Tags"):
@@ -158,7 +175,13 @@ async def apply_role_tags(
     template_tags: list[dict],
     existing_tags: list[dict],
     log_params: dict,
+    change_set: Optional[IAMPrincipalChangeSet] = None,
 ) -> list[ProposedChange]:
+    """
+    The tag changes of the role, queued on change_set when executing.
+
+    Without a change_set the changes are applied before returning.
+    """
     existing_tag_map = {tag["Key"]: tag.get("Value") for tag in existing_tags}
     template_tag_map = {tag["Key"]: tag.get("Value") for tag in template_tags}
     tags_to_apply = [
@@ -169,108 +192,61 @@ async def apply_role_tags(
             tag["Key"], None
         )  # existing_tag_map default cannot be "", because "" is an valid value for a tag
     ]
-    tasks = []
+    execute_change_set = change_set is None
+    change_set = change_set or IAMPrincipalChangeSet()
     response = []
 
     if tags_to_remove := [
         tag["Key"] for tag in existing_tags if tag["Key"] not in template_tag_map.keys()
     ]:
         log_str = "Stale tags discovered."
+        proposed_changes = [
+            ProposedChange(
+                change_type=ProposedChangeType.DETACH,
+                attribute="tags",
+                resource_type="aws:iam:role",
+                resource_id=role_name,
+                change_summary={"TagKeys": tags_to_remove},
+            )
+        ]
+        response.extend(proposed_changes)
         if ctx.execute:
             log_str = f"{log_str} Removing tags..."
-
-            async def untag_role():
-                exceptions = []
-                try:
-                    await boto_crud_call(
-                        iam_client.untag_role,
-                        RoleName=role_name,
-                        TagKeys=tags_to_remove,
-                    )
-                except Exception as e:
-                    exceptions.append(str(e))
-                return [
-                    ProposedChange(
-                        change_type=ProposedChangeType.DETACH,
-                        attribute="tags",
-                        resource_type="aws:iam:role",
-                        resource_id=role_name,
-                        change_summary={"TagKeys": tags_to_remove},
-                        exceptions_seen=exceptions,
-                    )
-                ]
-
-            tasks.append(untag_role())
-        else:
-            response.append(
-                ProposedChange(
-                    change_type=ProposedChangeType.DETACH,
-                    attribute="tags",
-                    resource_type="aws:iam:role",
-                    resource_id=role_name,
-                    change_summary={"TagKeys": tags_to_remove},
-                )
+            change_set.remove(
+                iam_client.untag_role,
+                proposed_changes,
+                RoleName=role_name,
+                TagKeys=tags_to_remove,
             )
 
         log.debug(log_str, tags=tags_to_remove, **log_params)
 
-        if tasks:
-            results: list[list[ProposedChange]] = await asyncio.gather(
-                *tasks, return_exceptions=True
-            )
-            for r in results:
-                response.extend(r)
-
-    tasks = []
     if tags_to_apply:
         log_str = "New tags discovered in AWS."
-
+        proposed_changes = [
+            ProposedChange(
+                change_type=ProposedChangeType.ATTACH,
+                attribute="tags",
+                resource_type="aws:iam:role",
+                resource_id=role_name,
+                new_value=tag,
+            )
+            for tag in tags_to_apply
+        ]
+        response.extend(proposed_changes)
         if ctx.execute:
             log_str = f"{log_str} Adding tags..."
+            change_set.add(
+                iam_client.tag_role,
+                proposed_changes,
+                RoleName=role_name,
+                Tags=tags_to_apply,
+            )
 
-            async def tag_role():
-                exceptions = []
-                response = []
-                try:
-                    await boto_crud_call(
-                        iam_client.tag_role, RoleName=role_name, Tags=tags_to_apply
-                    )
-                except Exception as e:
-                    exceptions.append(str(e))
-                for tag in tags_to_apply:
-                    response.append(
-                        ProposedChange(
-                            change_type=ProposedChangeType.ATTACH,
-                            attribute="tags",
-                            resource_type="aws:iam:role",
-                            resource_id=role_name,
-                            new_value=tag,
-                            exceptions_seen=exceptions,
-                        )
-                    )
-                return response
-
-            tasks.append(tag_role())
-        else:
-            for tag in tags_to_apply:
-                response.append(
-                    ProposedChange(
-                        change_type=ProposedChangeType.ATTACH,
-                        attribute="tags",
-                        resource_type="aws:iam:role",
-                        resource_id=role_name,
-                        new_value=tag,
-                    )
-                )
         log.debug(log_str, tags=tags_to_apply, **log_params)
 
-    if tasks:
-        results: list[list[ProposedChange]] = await asyncio.gather(
-            *tasks, return_exceptions=True
-        )
-        for r in results:
-            response.extend(r)
-
+    if execute_change_set:
+        await change_set.execute()
     return response
 
 
@@ -353,8 +329,10 @@ async def apply_role_managed_policies(
     template_policies: list[dict],
     existing_policies: list[dict],
     log_params: dict,
+    change_set: Optional[IAMPrincipalChangeSet] = None,
 ) -> list[ProposedChange]:
-    tasks = []
+    execute_change_set = change_set is None
+    change_set = change_set or IAMPrincipalChangeSet()
     response = []
     template_policies = [policy["PolicyArn"] for policy in template_policies]
     existing_managed_policies = [policy["PolicyArn"] for policy in existing_policies]
@@ -369,35 +347,24 @@ async def apply_role_managed_policies(
         log_str = "New managed policies discovered."
         if ctx.execute:
             log_str = f"{log_str} Attaching managed policies..."
-            for policy_arn in new_managed_policies:
-                proposed_changes = [
-                    ProposedChange(
-                        change_type=ProposedChangeType.ATTACH,
-                        resource_type="aws:policy_document",
-                        resource_id=policy_arn,
-                        attribute="managed_policies",
-                        new_value={"PolicyArn": policy_arn},
-                    )
-                ]
-                apply_awaitable = boto_crud_call(
+        for policy_arn in new_managed_policies:
+            proposed_changes = [
+                ProposedChange(
+                    change_type=ProposedChangeType.ATTACH,
+                    resource_type="aws:policy_document",
+                    resource_id=policy_arn,
+                    attribute="managed_policies",
+                    new_value={"PolicyArn": policy_arn},
+                )
+            ]
+            response.extend(proposed_changes)
+            if ctx.execute:
+                change_set.add(
                     iam_client.attach_role_policy,
+                    proposed_changes,
                     RoleName=role_name,
                     PolicyArn=policy_arn,
                 )
-                tasks.append(plugin_apply_wrapper(apply_awaitable, proposed_changes))
-        else:
-            response.extend(
-                [
-                    ProposedChange(
-                        change_type=ProposedChangeType.ATTACH,
-                        resource_type="aws:policy_document",
-                        resource_id=policy_arn,
-                        attribute="managed_policies",
-                        new_value={"PolicyArn": policy_arn},
-                    )
-                    for policy_arn in new_managed_policies
-                ]
-            )
 
         log.debug(log_str, managed_policies=new_managed_policies, **log_params)
 
@@ -409,44 +376,31 @@ async def apply_role_managed_policies(
     ]
     if existing_managed_policies:
         log_str = "Stale managed policies discovered."
-
         if ctx.execute:
             log_str = f"{log_str} Detaching managed policies..."
-            for policy_arn in existing_managed_policies:
-                proposed_changes = [
-                    ProposedChange(
-                        current_value={"PolicyArn": policy_arn},
-                        change_type=ProposedChangeType.DETACH,
-                        resource_type="aws:policy_document",
-                        resource_id=policy_arn,
-                        attribute="managed_policies",
-                    )
-                ]
-                apply_awaitable = boto_crud_call(
+        for policy_arn in existing_managed_policies:
+            proposed_changes = [
+                ProposedChange(
+                    current_value={"PolicyArn": policy_arn},
+                    change_type=ProposedChangeType.DETACH,
+                    resource_type="aws:policy_document",
+                    resource_id=policy_arn,
+                    attribute="managed_policies",
+                )
+            ]
+            response.extend(proposed_changes)
+            if ctx.execute:
+                change_set.remove(
                     iam_client.detach_role_policy,
+                    proposed_changes,
                     RoleName=role_name,
                     PolicyArn=policy_arn,
                 )
-                tasks.append(plugin_apply_wrapper(apply_awaitable, proposed_changes))
-        else:
-            response.extend(
-                [
-                    ProposedChange(
-                        current_value={"PolicyArn": policy_arn},
-                        change_type=ProposedChangeType.DETACH,
-                        resource_type="aws:policy_document",
-                        resource_id=policy_arn,
-                        attribute="managed_policies",
-                    )
-                    for policy_arn in existing_managed_policies
-                ]
-            )
-        log.debug(log_str, managed_policies=existing_managed_policies, **log_params)
 
-    if tasks:
-        results: list[list[ProposedChange]] = await asyncio.gather(*tasks)
-        return list(chain.from_iterable(results))
+        log.debug(log_str, managed_policies=existing_managed_policies, **log_params)
 
+    if execute_change_set:
+        await change_set.execute()
     return response
 
 
@@ -547,10 +501,11 @@ async def apply_role_inline_policies(
     template_policies: list[dict],
     existing_policies: list[dict],
     log_params: dict,
+    change_set: Optional[IAMPrincipalChangeSet] = None,
 ) -> list[ProposedChange]:
-    apply_tasks = []
-    delete_tasks = []
-    plan_response = []
+    execute_change_set = change_set is None
+    change_set = change_set or IAMPrincipalChangeSet()
+    response = []
     template_policy_map = {
         policy["PolicyName"]: {k: v for k, v in policy.items() if k != "PolicyName"}
         for policy in template_policies
@@ -572,19 +527,19 @@ async def apply_role_inline_policies(
                     attribute="inline_policies",
                 )
             ]
-            plan_response.extend(proposed_changes)
+            response.extend(proposed_changes)
 
             if ctx.execute:
                 log_str = f"{log_str} Removing inline policy..."
-
-                apply_awaitable = boto_crud_call(
+                # Wait for the policy deletion to propagate before applying new policies
+                # Otherwise a max policy limit error may be thrown
+                change_set.remove(
                     iam_client.delete_role_policy,
+                    proposed_changes,
+                    settle_seconds=3,
                     RoleName=role_name,
                     PolicyName=policy_name,
                 )
-                delete_tasks.append(
-                    plugin_apply_wrapper(apply_awaitable, proposed_changes)
-                )
             log.debug(log_str, policy_name=policy_name, **log_params)
 
     for policy_name, policy_document in template_policy_map.items():
@@ -633,41 +588,30 @@ async def apply_role_inline_policies(
                         new_value=policy_document,
                     )
                 ]
-            plan_response.extend(proposed_changes)
-
             log_str = f"{resource_existence} inline policies discovered."
-            if ctx.execute and policy_document:
+            if not ctx.execute:
+                response.extend(proposed_changes)
+            elif policy_document:
                 log_str = f"{log_str} {boto_action} inline policy..."
-                apply_awaitable = boto_crud_call(
+                response.extend(proposed_changes)
+                change_set.add(
                     iam_client.put_role_policy,
+                    proposed_changes,
                     RoleName=role_name,
                     PolicyName=policy_name,
                     PolicyDocument=json.dumps(policy_document),
                 )
-                apply_tasks.append(
-                    plugin_apply_wrapper(apply_awaitable, proposed_changes)
-                )
 
             log.debug(log_str, policy_name=policy_name, **log_params)
 
-    if apply_tasks or delete_tasks:
-        results: list[list[ProposedChange]] = []
-        if delete_tasks:
-            results.extend(await asyncio.gather(*delete_tasks))
-            if apply_tasks:
-                # Wait for the policy deletion to propagate before applying new policies
-                # Otherwise a max policy limit error may be thrown
-                await asyncio.sleep(3)
-
-        if apply_tasks:
-            results.extend(await asyncio.gather(*apply_tasks))
-
-        return list(chain.from_iterable(results))
-    else:
-        return plan_response
+    if execute_change_set:
+        await change_set.execute()
+    return response
 
 
-async def delete_iam_role(role_name: str, iam_client, log_params: dict):
+async def delete_iam_role(
+    role_name: str, iam_client, log_params: dict, read_cache: AWSReadCache = None
+):
     instance_profiles = await get_role_instance_profiles(role_name, iam_client)
 
     tasks = []
@@ -693,7 +637,9 @@ async def delete_iam_role(role_name: str, iam_client, log_params: dict):
 
     tasks = []
     # Detach managed policies
-    managed_policies = await get_role_managed_policies(role_name, iam_client)
+    managed_policies = await cached_read(
+        read_cache, get_role_managed_policies, role_name, iam_client
+    )
     managed_policies = [policy["PolicyArn"] for policy in managed_policies]
     log.debug(
         "Detaching managed policies.", managed_policies=managed_policies, **log_params
@@ -706,7 +652,9 @@ async def delete_iam_role(role_name: str, iam_client, log_params: dict):
         )
 
     # Delete inline policies
-    inline_policies = await get_role_inline_policies(role_name, iam_client)
+    inline_policies = await cached_read(
+        read_cache, get_role_inline_policies, role_name, iam_client
+    )
     inline_policies = list(inline_policies.keys())
     log.debug(
         "Deleting inline policies.", managed_policies=inline_policies, **log_params
@@ -30,7 +30,7 @@ from iambic.plugins.v0_1_0.aws.iam.user.utils import (
     get_user,
 )
 from iambic.plugins.v0_1_0.aws.models import AccessModel, AWSAccount, AWSTemplate, Tag
-from iambic.plugins.v0_1_0.aws.utils import boto_crud_call
+from iambic.plugins.v0_1_0.aws.utils import IAMPrincipalChangeSet, boto_crud_call
 
 AWS_IAM_USER_TEMPLATE_TYPE = "NOQ::AWS::IAM::User"
 
@@ -278,6 +278,7 @@ class AwsIamUserTemplate(AWSTemplate, AccessModel):
                 not deleted
                 and getattr(aws_account, "enable_iam_user_credentials", False)
             ),
+            read_cache=aws_account.read_cache,
         )
         if current_user:
             account_change_details.current_value = {**current_user}  # Create a new dict
@@ -324,6 +325,8 @@ class AwsIamUserTemplate(AWSTemplate, AccessModel):
         existing_inline_policies = current_user.pop("InlinePolicies", [])
         existing_managed_policies = current_user.pop("ManagedPolicies", [])
         existing_groups = current_user.pop("Groups", [])
+        # Tag, policy and group writes are queued and run together once every change is known
+        change_set = IAMPrincipalChangeSet(aws_account.write_limiter)
         tasks = []
 
         if user_exists:
@@ -335,6 +338,7 @@ class AwsIamUserTemplate(AWSTemplate, AccessModel):
                         account_user["Tags"],
                         current_user.get("Tags", []),
                         log_params,
+                        change_set,
                     ),
                     apply_user_permission_boundary(
                         user_name,
@@ -440,6 +444,7 @@ class AwsIamUserTemplate(AWSTemplate, AccessModel):
                     managed_policies,
                     existing_managed_policies,
                     log_params,
+                    change_set,
                 ),
                 apply_user_inline_policies(
                     user_name,
@@ -447,6 +452,7 @@ class AwsIamUserTemplate(AWSTemplate, AccessModel):
                     inline_policies,
                     existing_inline_policies,
                     log_params,
+                    change_set,
                 ),
                 apply_user_groups(
                     user_name,
@@ -454,11 +460,13 @@ class AwsIamUserTemplate(AWSTemplate, AccessModel):
                     groups,
                     existing_groups,
                     log_params,
+                    change_set,
                 ),
             ]
         )
 
         changes_made = await asyncio.gather(*tasks)
+        await change_set.execute()
         if any(changes_made):
             account_change_details.extend_changes(
                 list(chain.from_iterable(changes_made))
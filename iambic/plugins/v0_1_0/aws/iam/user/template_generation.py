@@ -4,9 +4,11 @@ import asyncio
 import itertools
 import os
 from collections import defaultdict
+from datetime import datetime
 from typing import TYPE_CHECKING, Optional
 
 import aiofiles
+import pytz
 
 from iambic.core import noq_json as json
 from iambic.core.detect import generate_template_output, group_detect_messages
@@ -24,8 +26,10 @@ from iambic.plugins.v0_1_0.aws.iam.user.models import (
     UserProperties,
 )
 from iambic.plugins.v0_1_0.aws.iam.user.utils import (
+    credential_report_service,
     get_user,
     get_user_credentials,
+    get_user_credentials_from_report,
     get_user_groups,
     get_user_inline_policies,
     get_user_managed_policies,
@@ -36,6 +40,7 @@ from iambic.plugins.v0_1_0.aws.iam.user.utils import (
 from iambic.plugins.v0_1_0.aws.models import AWSAccount
 from iambic.plugins.v0_1_0.aws.template_generation import (
     base_group_str_attribute,
+    create_templated_resources,
     group_dict_attribute,
     group_int_or_str_attribute,
 )
@@ -225,14 +230,27 @@ async def set_user_resource_tags(
 
 
 async def set_user_credentials(
-    user_name: str, user_resource_path: str, aws_account: AWSAccount
+    user_name: str,
+    user_resource_path: str,
+    aws_account: AWSAccount,
+    user_summary: Optional[dict] = None,
 ):
     iam_client = await aws_account.get_boto3_client("iam")
-    await resource_file_upsert(
-        user_resource_path,
-        {"Credentials": await get_user_credentials(user_name, iam_client, True)},
-        False,
-    )
+    if user_summary:
+        # A user recreated since the report was generated has a stale row
+        user_created = None
+        async with aiofiles.open(user_resource_path, mode="r") as f:
+            if create_date := json.loads(await f.read()).get("CreateDate"):
+                user_created = datetime.strptime(
+                    create_date, "%Y-%m-%d %H:%M:%S %Z"
+                ).replace(tzinfo=pytz.UTC)
+        credentials = await get_user_credentials_from_report(
+            user_name, iam_client, user_summary, user_created
+        )
+    else:
+        credentials = await get_user_credentials(user_name, iam_client, True)
+
+    await resource_file_upsert(user_resource_path, {"Credentials": credentials}, False)
 
 
 async def set_user_resource_inline_policies(
@@ -617,7 +635,20 @@ async def collect_aws_users(
                 "Setting credentials in user templates",
                 accounts=list(aws_account_map.keys()),
             )
-            await set_user_credentials_semaphore.process(messages)
+            credential_reports = await credential_report_service.get_reports(
+                list(aws_account_map.values())
+            )
+            await set_user_credentials_semaphore.process(
+                [
+                    {
+                        **message,
+                        "user_summary": credential_reports.get(
+                            message["aws_account"].account_id, {}
+                        ).get(message["user_name"]),
+                    }
+                    for message in messages
+                ]
+            )
         log.info(
             "Finished retrieving user details", accounts=list(aws_account_map.keys())
         )
@@ -668,20 +699,14 @@ async def generate_aws_user_templates(
     grouped_user_map = await base_group_str_attribute(aws_account_map, account_users)
 
     log.debug("Writing templated users")
-    all_resource_ids = set()
-    for user_name, user_refs in grouped_user_map.items():
-        resource_template = await create_templated_user(
-            aws_account_map,
-            user_name,
-            user_refs,
-            user_dir,
-            existing_template_map,
-            config,
-        )
-        if not resource_template:
-            # Template not updated. Most likely because it's an `enforced` template.
-            continue
-        all_resource_ids.add(resource_template.resource_id)
+    all_resource_ids = await create_templated_resources(
+        create_templated_user,
+        aws_account_map,
+        grouped_user_map,
+        user_dir,
+        existing_template_map,
+        config,
+    )
 
     if not detect_messages:
         # NEVER call this if messages are passed in because all_resource_ids will only contain those resources
@@ -3,11 +3,13 @@ from __future__ import annotations
 import asyncio
 import csv
 import json
+import os
+import time
 from collections import defaultdict
 from datetime import datetime, timedelta
 from io import StringIO
 from itertools import chain
-from typing import Union
+from typing import Any, Optional, Union
 
 import pytz
 from deepdiff import DeepDiff
@@ -15,9 +17,33 @@ from deepdiff import DeepDiff
 from iambic.core.context import ctx
 from iambic.core.logger import log
 from iambic.core.models import ProposedChange, ProposedChangeType
-from iambic.core.utils import aio_wrapper, plugin_apply_wrapper
+from iambic.core.utils import (
+    aio_wrapper,
+    get_cache_file_path,
+    load_json_cache_file,
+    plugin_apply_wrapper,
+    save_json_cache_file,
+)
 from iambic.plugins.v0_1_0.aws.models import AWSAccount
-from iambic.plugins.v0_1_0.aws.utils import boto_crud_call, paginated_search
+from iambic.plugins.v0_1_0.aws.utils import (
+    AWSReadCache,
+    IAMPrincipalChangeSet,
+    boto_crud_call,
+    cached_read,
+    paginated_search,
+)
+
+# Credential reports generated within this many seconds are reused, across runs as well.
+CREDENTIAL_REPORT_MAX_AGE = int(
+    os.getenv("IAMBIC_CREDENTIAL_REPORT_MAX_AGE", 60 * 60 * 12)
+)
+# A user's password state is looked up with get_login_profile if the report is older than this many seconds.
+CREDENTIAL_REPORT_PASSWORD_MAX_AGE = int(
+    os.getenv("IAMBIC_CREDENTIAL_REPORT_PASSWORD_MAX_AGE", 60 * 60)
+)
+CREDENTIAL_REPORT_MIN_POLL_INTERVAL = 1
+CREDENTIAL_REPORT_MAX_POLL_INTERVAL = 10
+CREDENTIAL_REPORT_TIMEOUT = 180
 
 
 def parse_report_date_str(report_date: str) -> Union[datetime, None]:
@@ -41,58 +67,31 @@ def last_used_date_to_str(report_date: Union[datetime, None]) -> str:
             return report_date.strftime("%Y-%m-%d")
 
 
-async def get_credential_report(aws_account: AWSAccount) -> dict:
-    iam_client = await aws_account.get_boto3_client("iam")
-    try:
-        credential_report = await boto_crud_call(iam_client.get_credential_report)
-    except (
-        iam_client.exceptions.CredentialReportExpiredException,
-        iam_client.exceptions.CredentialReportNotReadyException,
-        iam_client.exceptions.CredentialReportNotPresentException,
-    ):
-        credential_report = None
-
-    if not credential_report or (
-        credential_report["GeneratedTime"]
-        < (datetime.utcnow() - timedelta(hours=12)).replace(tzinfo=pytz.UTC)
-    ):
-        log.info(
-            "Generating credential report",
-            aws_account=str(aws_account),
-        )
-        await boto_crud_call(iam_client.generate_credential_report)
-        for _ in range(18):
-            await asyncio.sleep(10)
-            try:
-                credential_report = await boto_crud_call(
-                    iam_client.get_credential_report
-                )
-                break
-            except iam_client.exceptions.CredentialReportNotReadyException:
-                log.info(
-                    "Waiting for credential report to be completed",
-                    aws_account=str(aws_account),
-                )
-                continue
-
-    if not credential_report:
-        log.warning(
-            "Credential report generation timeout",
-            aws_account=str(aws_account),
-        )
-        return {}
-
-    report_str = credential_report["Content"].decode("utf-8")
+def parse_credential_report(
+    report_str: str, account_id: str, generated_time: Optional[datetime] = None
+) -> dict:
     reader = csv.DictReader(StringIO(report_str))
     report_rows: list[dict] = [row for row in reader if row["user"] != "<root_account>"]
     user_summaries = {}
     for row in report_rows:
         user_summaries[row["user"]] = {
-            "account": aws_account.account_id,
+            "account": account_id,
+            "report_generated": generated_time,
             "mfa_enabled": row["mfa_active"] == "true",
             "password": {
                 "enabled": row["password_enabled"] == "true",
             },
+            # Every access key of the user, including the inactive ones.
+            # The report has no access key ids so the keys are identified by creation date.
+            "access_keys": [
+                {
+                    "enabled": row[f"{key}_active"] == "true",
+                    "created": parse_report_date_str(row[f"{key}_last_rotated"]),
+                    "last_used": parse_report_date_str(row[f"{key}_last_used_date"]),
+                }
+                for key in ["access_key_1", "access_key_2"]
+                if row[f"{key}_last_rotated"] != "N/A"
+            ],
         }
         if user_summaries[row["user"]]["password"]["enabled"]:
             key = "password"
@@ -126,18 +125,199 @@ async def get_credential_report(aws_account: AWSAccount) -> dict:
     return user_summaries
 
 
+class CredentialReportService:
+    """
+    Retrieves the credential reports of many accounts at once.
+
+    Generation is started for every account without a current report,
+    then the pending accounts are polled together in a single loop that backs off
+    from CREDENTIAL_REPORT_MIN_POLL_INTERVAL to CREDENTIAL_REPORT_MAX_POLL_INTERVAL.
+    Reports are cached in the writable directory with their GeneratedTime
+    and reused across runs until they are older than max_age.
+    Parsed reports are kept in memory keyed by account and GeneratedTime.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_age: int = None):
+        self._cache_dir = cache_dir
+        self.max_age = CREDENTIAL_REPORT_MAX_AGE if max_age is None else max_age
+        self._parsed_reports: dict[tuple[str, str], dict] = {}
+
+    @property
+    def cache_dir(self) -> str:
+        if not self._cache_dir:
+            self._cache_dir = get_cache_file_path("credential_reports")
+        return self._cache_dir
+
+    def _get_cache_path(self, account_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{account_id}.json")
+
+    def _is_current(self, generated_time: datetime) -> bool:
+        return generated_time >= datetime.now(tz=pytz.UTC) - timedelta(
+            seconds=self.max_age
+        )
+
+    def _load_cached_report(self, account_id: str) -> Optional[dict]:
+        credential_report = load_json_cache_file(
+            self._get_cache_path(account_id), "cached credential report"
+        )
+        if not credential_report:
+            return None
+
+        credential_report["GeneratedTime"] = datetime.fromisoformat(
+            credential_report["GeneratedTime"]
+        )
+        if self._is_current(credential_report["GeneratedTime"]):
+            return credential_report
+
+    def _cache_report(self, account_id: str, credential_report: dict):
+        save_json_cache_file(
+            self._get_cache_path(account_id),
+            {
+                "GeneratedTime": credential_report["GeneratedTime"].isoformat(),
+                "Content": credential_report["Content"],
+            },
+        )
+
+    def _parse_report(self, account_id: str, credential_report: dict) -> dict:
+        key = (account_id, credential_report["GeneratedTime"].isoformat())
+        if key not in self._parsed_reports:
+            self._parsed_reports[key] = parse_credential_report(
+                credential_report["Content"],
+                account_id,
+                credential_report["GeneratedTime"],
+            )
+        return self._parsed_reports[key]
+
+    @staticmethod
+    async def _get_report(iam_client) -> Optional[dict]:
+        try:
+            credential_report = await boto_crud_call(iam_client.get_credential_report)
+        except (
+            iam_client.exceptions.CredentialReportExpiredException,
+            iam_client.exceptions.CredentialReportNotReadyException,
+            iam_client.exceptions.CredentialReportNotPresentException,
+        ):
+            return None
+
+        if isinstance(credential_report["Content"], bytes):
+            credential_report["Content"] = credential_report["Content"].decode("utf-8")
+        return credential_report
+
+    async def _start_report(
+        self, aws_account: AWSAccount
+    ) -> tuple[Any, Optional[dict]]:
+        """Returns the account's IAM client and its current report, if there is one.
+
+        Otherwise, generation of a new report is started.
+        """
+        iam_client = await aws_account.get_boto3_client("iam")
+        credential_report = await self._get_report(iam_client)
+        if credential_report and self._is_current(credential_report["GeneratedTime"]):
+            return iam_client, credential_report
+
+        log.info(
+            "Generating credential report",
+            aws_account=str(aws_account),
+        )
+        await boto_crud_call(iam_client.generate_credential_report)
+        return iam_client, None
+
+    async def get_reports(self, aws_accounts: list[AWSAccount]) -> dict[str, dict]:
+        """
+        The parsed credential report of every account, keyed by account id.
+
+        An account is left out if its report could not be retrieved in time.
+        """
+        credential_reports: dict[str, dict] = {}
+        uncached_accounts = []
+        for aws_account in aws_accounts:
+            if credential_report := self._load_cached_report(aws_account.account_id):
+                credential_reports[aws_account.account_id] = credential_report
+            else:
+                uncached_accounts.append(aws_account)
+
+        pending_accounts = {}
+        started_reports = await asyncio.gather(
+            *[self._start_report(aws_account) for aws_account in uncached_accounts],
+            return_exceptions=True,
+        )
+        for aws_account, started_report in zip(uncached_accounts, started_reports):
+            if isinstance(started_report, Exception):
+                log.warning(
+                    "Unable to retrieve the credential report.",
+                    aws_account=str(aws_account),
+                    error=repr(started_report),
+                )
+                continue
+
+            iam_client, credential_report = started_report
+            if credential_report:
+                self._cache_report(aws_account.account_id, credential_report)
+                credential_reports[aws_account.account_id] = credential_report
+            else:
+                pending_accounts[aws_account.account_id] = (aws_account, iam_client)
+
+        poll_interval = CREDENTIAL_REPORT_MIN_POLL_INTERVAL
+        deadline = time.monotonic() + CREDENTIAL_REPORT_TIMEOUT
+        while pending_accounts and time.monotonic() < deadline:
+            await asyncio.sleep(poll_interval)
+            poll_interval = min(poll_interval * 2, CREDENTIAL_REPORT_MAX_POLL_INTERVAL)
+            account_ids = list(pending_accounts.keys())
+            polled_reports = await asyncio.gather(
+                *[
+                    self._get_report(pending_accounts[account_id][1])
+                    for account_id in account_ids
+                ],
+                return_exceptions=True,
+            )
+            for account_id, credential_report in zip(account_ids, polled_reports):
+                if isinstance(credential_report, Exception):
+                    log.warning(
+                        "Unable to retrieve the credential report.",
+                        aws_account=str(pending_accounts.pop(account_id)[0]),
+                        error=repr(credential_report),
+                    )
+                elif credential_report:
+                    pending_accounts.pop(account_id)
+                    self._cache_report(account_id, credential_report)
+                    credential_reports[account_id] = credential_report
+
+            if pending_accounts:
+                log.info(
+                    "Waiting for credential reports to be completed",
+                    pending_accounts=len(pending_accounts),
+                )
+
+        for aws_account, _ in pending_accounts.values():
+            log.warning(
+                "Credential report generation timeout",
+                aws_account=str(aws_account),
+            )
+
+        return {
+            account_id: self._parse_report(account_id, credential_report)
+            for account_id, credential_report in credential_reports.items()
+        }
+
+
+credential_report_service = CredentialReportService()
+
+
+async def get_credential_report(aws_account: AWSAccount) -> dict:
+    credential_reports = await credential_report_service.get_reports([aws_account])
+    return credential_reports.get(aws_account.account_id, {})
+
+
 async def get_credential_summary_across_accounts(
     aws_accounts: list[AWSAccount],
 ) -> dict:
     user_account_credential_map = defaultdict(dict)
-    all_account_reports = await asyncio.gather(
-        *[get_credential_report(a) for a in aws_accounts]
-    )
-    for account_report in all_account_reports:
+    all_account_reports = await credential_report_service.get_reports(aws_accounts)
+    for account_report in all_account_reports.values():
         for user, user_summary in account_report.items():
-            user_account_credential_map[user][
-                user_summary.pop("account")
-            ] = user_summary
+            user_account_credential_map[user][user_summary["account"]] = {
+                k: v for k, v in user_summary.items() if k != "account"
+            }
     return user_account_credential_map
 
 
@@ -195,14 +375,19 @@ async def get_user_inline_policies(
         ]
 
 
-async def get_user_credentials(user_name: str, iam_client, get_last_used: bool) -> dict:
-    response = {"AccessKeys": [], "Password": {}}
-
+async def get_user_password_enabled(user_name: str, iam_client) -> bool:
     try:
         _ = await boto_crud_call(iam_client.get_login_profile, UserName=user_name)
-        response["Password"]["Enabled"] = True
+        return True
     except iam_client.exceptions.NoSuchEntityException:
-        response["Password"]["Enabled"] = False
+        return False
+
+
+async def get_user_credentials(user_name: str, iam_client, get_last_used: bool) -> dict:
+    response = {
+        "AccessKeys": [],
+        "Password": {"Enabled": await get_user_password_enabled(user_name, iam_client)},
+    }
 
     user_access_keys = await boto_crud_call(
         iam_client.list_access_keys, UserName=user_name
@@ -226,6 +411,63 @@ async def get_user_credentials(user_name: str, iam_client, get_last_used: bool)
     return response
 
 
+async def get_user_credentials_from_report(
+    user_name: str,
+    iam_client,
+    user_summary: dict,
+    user_last_changed: Optional[datetime] = None,
+) -> dict:
+    """
+    Build the response of get_user_credentials from the user's row in the credential report.
+
+    The access keys are still listed to get their ids.
+    Falls back to get_user_credentials if the keys changed since the report was generated.
+    The password state is looked up with get_login_profile if the report is older than
+    CREDENTIAL_REPORT_PASSWORD_MAX_AGE or was generated before the user last changed.
+    """
+    report_generated = user_summary.get("report_generated")
+    if (
+        not report_generated
+        or report_generated
+        < datetime.now(tz=pytz.UTC)
+        - timedelta(seconds=CREDENTIAL_REPORT_PASSWORD_MAX_AGE)
+        or (user_last_changed and user_last_changed > report_generated)
+    ):
+        password_enabled = await get_user_password_enabled(user_name, iam_client)
+    else:
+        password_enabled = user_summary["password"]["enabled"]
+
+    response = {"AccessKeys": [], "Password": {"Enabled": password_enabled}}
+    report_keys = {
+        report_key["created"]: report_key
+        for report_key in user_summary.get("access_keys", [])
+    }
+    user_access_keys = await boto_crud_call(
+        iam_client.list_access_keys, UserName=user_name
+    )
+    user_access_keys = user_access_keys["AccessKeyMetadata"]
+    for key in user_access_keys:
+        # The report dates are truncated to the second
+        report_key = report_keys.get(key["CreateDate"].replace(microsecond=0))
+        if not report_key:
+            log.debug(
+                "Access key is not in the credential report.",
+                user_name=user_name,
+                access_key_id=key["AccessKeyId"],
+            )
+            return await get_user_credentials(user_name, iam_client, True)
+
+        response["AccessKeys"].append(
+            {
+                "Id": key["AccessKeyId"],
+                "Enabled": key["Status"] == "Active",
+                "LastUsed": last_used_date_to_str(report_key["last_used"]),
+            }
+        )
+
+    return response
+
+
 async def get_user_managed_policies(user_name: str, iam_client) -> list[dict[str, str]]:
     marker: dict[str, str] = {}
     policies = []
@@ -251,24 +493,31 @@ async def get_user(
     include_policies: bool,
     include_credentials: bool,
     as_dict: bool = False,
+    read_cache: AWSReadCache = None,
 ) -> dict:
     try:
-        current_user = (await boto_crud_call(iam_client.get_user, UserName=user_name))[
-            "User"
-        ]
+        current_user = (
+            await cached_read(
+                read_cache, boto_crud_call, iam_client.get_user, UserName=user_name
+            )
+        )["User"]
         if include_policies:
-            current_user["ManagedPolicies"] = await get_user_managed_policies(
-                user_name, iam_client
+            current_user["ManagedPolicies"] = await cached_read(
+                read_cache, get_user_managed_policies, user_name, iam_client
             )
-            current_user["InlinePolicies"] = await get_user_inline_policies(
-                user_name, iam_client, as_dict=False
+            current_user["InlinePolicies"] = await cached_read(
+                read_cache,
+                get_user_inline_policies,
+                user_name,
+                iam_client,
+                as_dict=False,
             )
-            current_user["Groups"] = await get_user_groups(
-                user_name, iam_client, as_dict=as_dict
+            current_user["Groups"] = await cached_read(
+                read_cache, get_user_groups, user_name, iam_client, as_dict=as_dict
             )
         if include_credentials:
-            current_user["Credentials"] = await get_user_credentials(
-                user_name, iam_client, True
+            current_user["Credentials"] = await cached_read(
+                read_cache, get_user_credentials, user_name, iam_client, True
             )
     except iam_client.exceptions.NoSuchEntityException:
         current_user = {}
@@ -306,6 +555,7 @@ async def apply_user_tags(
     template_tags: list[dict],
     existing_tags: list[dict],
     log_params: dict,
+    change_set: Optional[IAMPrincipalChangeSet] = None,
 ) -> list[ProposedChange]:
     existing_tag_map = {tag["Key"]: tag.get("Value") for tag in existing_tags}
     template_tag_map = {tag["Key"]: tag.get("Value") for tag in template_tags}
@@ -314,7 +564,8 @@ async def apply_user_tags(
         for tag in template_tags
         if tag.get("Value") != existing_tag_map.get(tag["Key"])
     ]
-    tasks = []
+    execute_change_set = change_set is None
+    change_set = change_set or IAMPrincipalChangeSet()
     response = []
 
     if tags_to_remove := [
@@ -337,12 +588,12 @@ async def apply_user_tags(
         if ctx.execute:
             log_str = f"{log_str} Removing tags..."
 
-            apply_awaitable = boto_crud_call(
+            change_set.remove(
                 iam_client.untag_user,
+                proposed_changes,
                 UserName=user_name,
                 TagKeys=tags_to_remove,
             )
-            tasks.append(plugin_apply_wrapper(apply_awaitable, proposed_changes))
 
         log.debug(log_str, tags=tags_to_remove, **log_params)
 
@@ -363,18 +614,18 @@ async def apply_user_tags(
         response.extend(proposed_changes)
         if ctx.execute:
             log_str = f"{log_str} Adding tags..."
-            apply_awaitable = boto_crud_call(
-                iam_client.tag_user, UserName=user_name, Tags=tags_to_apply
+            change_set.add(
+                iam_client.tag_user,
+                proposed_changes,
+                UserName=user_name,
+                Tags=tags_to_apply,
             )
-            tasks.append(plugin_apply_wrapper(apply_awaitable, proposed_changes))
 
         log.debug(log_str, tags=tags_to_apply, **log_params)
 
-    if tasks:
-        results: list[list[ProposedChange]] = await asyncio.gather(*tasks)
-        return list(chain.from_iterable(results))
-    else:
-        return response
+    if execute_change_set:
+        await change_set.execute()
+    return response
 
 
 async def apply_user_permission_boundary(
@@ -594,8 +845,10 @@ async def apply_user_managed_policies(
     template_policies: list[dict],
     existing_policies: list[dict],
     log_params: dict,
+    change_set: Optional[IAMPrincipalChangeSet] = None,
 ) -> list[ProposedChange]:
-    tasks = []
+    execute_change_set = change_set is None
+    change_set = change_set or IAMPrincipalChangeSet()
     response = []
     template_policies = [policy["PolicyArn"] for policy in template_policies]
     existing_managed_policies = [policy["PolicyArn"] for policy in existing_policies]
@@ -608,39 +861,25 @@ async def apply_user_managed_policies(
     ]
     if new_managed_policies:
         log_str = "New managed policies discovered."
-
-        proposed_changes = [
-            ProposedChange(
-                change_type=ProposedChangeType.ATTACH,
-                resource_type="aws:policy_document",
-                resource_id=policy_arn,
-                attribute="managed_policies",
-            )
-            for policy_arn in new_managed_policies
-        ]
-        response.extend(proposed_changes)
-
         if ctx.execute:
             log_str = f"{log_str} Attaching managed policies..."
-
-            tasks = [
-                plugin_apply_wrapper(
-                    boto_crud_call(
-                        iam_client.attach_user_policy,
-                        UserName=user_name,
-                        PolicyArn=policy_arn,
-                    ),
-                    [
-                        ProposedChange(
-                            change_type=ProposedChangeType.ATTACH,
-                            resource_type="aws:policy_document",
-                            resource_id=policy_arn,
-                            attribute="managed_policies",
-                        )
-                    ],
+        for policy_arn in new_managed_policies:
+            proposed_changes = [
+                ProposedChange(
+                    change_type=ProposedChangeType.ATTACH,
+                    resource_type="aws:policy_document",
+                    resource_id=policy_arn,
+                    attribute="managed_policies",
                 )
-                for policy_arn in new_managed_policies
             ]
+            response.extend(proposed_changes)
+            if ctx.execute:
+                change_set.add(
+                    iam_client.attach_user_policy,
+                    proposed_changes,
+                    UserName=user_name,
+                    PolicyArn=policy_arn,
+                )
 
         log.debug(log_str, managed_policies=new_managed_policies, **log_params)
 
@@ -652,49 +891,31 @@ async def apply_user_managed_policies(
     ]
     if existing_managed_policies:
         log_str = "Stale managed policies discovered."
-
-        proposed_changes = [
-            ProposedChange(
-                change_type=ProposedChangeType.DETACH,
-                resource_type="aws:policy_document",
-                resource_id=policy_arn,
-                attribute="managed_policies",
-            )
-            for policy_arn in existing_managed_policies
-        ]
-        response.extend(proposed_changes)
-
         if ctx.execute:
             log_str = f"{log_str} Detaching managed policies..."
-
-            tasks.extend(
-                [
-                    plugin_apply_wrapper(
-                        boto_crud_call(
-                            iam_client.detach_user_policy,
-                            UserName=user_name,
-                            PolicyArn=policy_arn,
-                        ),
-                        [
-                            ProposedChange(
-                                change_type=ProposedChangeType.DETACH,
-                                resource_type="aws:policy_document",
-                                resource_id=policy_arn,
-                                attribute="managed_policies",
-                            )
-                        ],
-                    )
-                    for policy_arn in existing_managed_policies
-                ]
-            )
+        for policy_arn in existing_managed_policies:
+            proposed_changes = [
+                ProposedChange(
+                    change_type=ProposedChangeType.DETACH,
+                    resource_type="aws:policy_document",
+                    resource_id=policy_arn,
+                    attribute="managed_policies",
+                )
+            ]
+            response.extend(proposed_changes)
+            if ctx.execute:
+                change_set.remove(
+                    iam_client.detach_user_policy,
+                    proposed_changes,
+                    UserName=user_name,
+                    PolicyArn=policy_arn,
+                )
 
         log.debug(log_str, managed_policies=existing_managed_policies, **log_params)
 
-    if tasks:
-        results: list[list[ProposedChange]] = await asyncio.gather(*tasks)
-        return list(chain.from_iterable(results))
-    else:
-        return response
+    if execute_change_set:
+        await change_set.execute()
+    return response
 
 
 async def apply_user_inline_policies(
@@ -703,10 +924,11 @@ async def apply_user_inline_policies(
     template_policies: list[dict],
     existing_policies: list[dict],
     log_params: dict,
+    change_set: Optional[IAMPrincipalChangeSet] = None,
 ) -> list[ProposedChange]:
-    apply_tasks = []
-    delete_tasks = []
-    plan_response = []
+    execute_change_set = change_set is None
+    change_set = change_set or IAMPrincipalChangeSet()
+    response = []
     template_policy_map = {
         policy["PolicyName"]: {k: v for k, v in policy.items() if k != "PolicyName"}
         for policy in template_policies
@@ -727,19 +949,19 @@ async def apply_user_inline_policies(
                     attribute="inline_policies",
                 )
             ]
-            plan_response.extend(proposed_changes)
+            response.extend(proposed_changes)
 
             if ctx.execute:
                 log_str = f"{log_str} Removing inline policy..."
-
-                apply_awaitable = boto_crud_call(
+                # Wait for the policy deletion to propagate before applying new policies
+                # Otherwise a max policy limit error may be thrown
+                change_set.remove(
                     iam_client.delete_user_policy,
+                    proposed_changes,
+                    settle_seconds=3,
                     UserName=user_name,
                     PolicyName=policy_name,
                 )
-                delete_tasks.append(
-                    plugin_apply_wrapper(apply_awaitable, proposed_changes)
-                )
 
             log.debug(log_str, policy_name=policy_name, **log_params)
 
@@ -789,39 +1011,25 @@ async def apply_user_inline_policies(
                         new_value=policy_document,
                     )
                 ]
-            plan_response.extend(proposed_changes)
-
             log_str = f"{resource_existence} inline policies discovered."
-            if ctx.execute and policy_document:
+            if not ctx.execute:
+                response.extend(proposed_changes)
+            elif policy_document:
                 log_str = f"{log_str} {boto_action} inline policy..."
-
-                apply_awaitable = boto_crud_call(
+                response.extend(proposed_changes)
+                change_set.add(
                     iam_client.put_user_policy,
+                    proposed_changes,
                     UserName=user_name,
                     PolicyName=policy_name,
                     PolicyDocument=json.dumps(policy_document),
                 )
-                apply_tasks.append(
-                    plugin_apply_wrapper(apply_awaitable, proposed_changes)
-                )
 
             log.debug(log_str, policy_name=policy_name, **log_params)
 
-    if apply_tasks or delete_tasks:
-        results: list[list[ProposedChange]] = []
-        if delete_tasks:
-            results.extend(await asyncio.gather(*delete_tasks))
-            if apply_tasks:
-                # Wait for the policy deletion to propagate before applying new policies
-                # Otherwise a max policy limit error may be thrown
-                await asyncio.sleep(3)
-
-        if apply_tasks:
-            results.extend(await asyncio.gather(*apply_tasks))
-
-        return list(chain.from_iterable(results))
-    else:
-        return plan_response
+    if execute_change_set:
+        await change_set.execute()
+    return response
 
 
 async def apply_user_groups(
@@ -830,8 +1038,10 @@ async def apply_user_groups(
     template_groups: list[dict],
     existing_groups: list[dict],
     log_params: dict,
+    change_set: Optional[IAMPrincipalChangeSet] = None,
 ) -> list[ProposedChange]:
-    tasks = []
+    execute_change_set = change_set is None
+    change_set = change_set or IAMPrincipalChangeSet()
     response = []
     template_groups = [group["GroupName"] for group in template_groups]
     existing_groups = [group["GroupName"] for group in existing_groups]
@@ -851,12 +1061,12 @@ async def apply_user_groups(
             response.extend(proposed_changes)
             if ctx.execute:
                 log_str = f"{log_str} Adding user to group..."
-                apply_awaitable = boto_crud_call(
+                change_set.add(
                     iam_client.add_user_to_group,
+                    proposed_changes,
                     GroupName=group,
                     UserName=user_name,
                 )
-                tasks.append(plugin_apply_wrapper(apply_awaitable, proposed_changes))
 
             log.debug(log_str, group_name=group, **log_params)
 
@@ -875,20 +1085,18 @@ async def apply_user_groups(
             response.extend(proposed_changes)
             if ctx.execute:
                 log_str = f"{log_str} Removing user from group..."
-                apply_awaitable = boto_crud_call(
+                change_set.remove(
                     iam_client.remove_user_from_group,
+                    proposed_changes,
                     GroupName=group,
                     UserName=user_name,
                 )
-                tasks.append(plugin_apply_wrapper(apply_awaitable, proposed_changes))
 
             log.debug(log_str, group_name=group, **log_params)
 
-    if tasks:
-        results: list[list[ProposedChange]] = await asyncio.gather(*tasks)
-        return list(chain.from_iterable(results))
-    else:
-        return response
+    if execute_change_set:
+        await change_set.execute()
+    return response
 
 
 async def delete_iam_user(user_name: str, iam_client, log_params: dict):
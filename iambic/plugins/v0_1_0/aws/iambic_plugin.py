@@ -160,6 +160,10 @@ class AWSConfig(ConfigMixin, BaseModel):
     def templates(self):
         return get_aws_templates()
 
+    @property
+    def provider_children(self) -> list[AWSAccount]:
+        return self.accounts
+
     async def set_identity_center_details(self, account_id: str = None):
         if self.accounts:
             if account_id:
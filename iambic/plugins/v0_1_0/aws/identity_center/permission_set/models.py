@@ -18,9 +18,11 @@ from iambic.core.models import (
     ProposedChangeType,
     TemplateChangeDetails,
 )
-from iambic.core.utils import aio_wrapper, evaluate_on_provider, plugin_apply_wrapper
+from iambic.core.telemetry import telemetry
+from iambic.core.utils import aio_wrapper, plugin_apply_wrapper, template_provider_index
 from iambic.plugins.v0_1_0.aws.iam.policy.models import PolicyStatement
 from iambic.plugins.v0_1_0.aws.identity_center.permission_set.utils import (
+    IDENTITY_CENTER_PROVISIONING_TIMEOUT,
     WrapIdentityCenterStoreClient,
     apply_account_assignments,
     apply_permission_set_aws_managed_policies,
@@ -31,6 +33,7 @@ from iambic.plugins.v0_1_0.aws.identity_center.permission_set.utils import (
     delete_permission_set,
     enrich_permission_set_details,
     get_permission_set_users_and_groups_as_access_rules,
+    identity_center_poller,
 )
 from iambic.plugins.v0_1_0.aws.models import (
     AccessModel,
@@ -736,32 +739,18 @@ class AwsIdentityCenterPermissionSetTemplate(
         if ctx.execute and not account_change_details.exceptions_seen:
             if any(changes_made) and not self.deleted:
                 try:
-                    res = await boto_crud_call(
-                        identity_center_client.provision_permission_set,
-                        InstanceArn=instance_arn,
-                        PermissionSetArn=permission_set_arn,
-                        TargetType="ALL_PROVISIONED_ACCOUNTS",
-                    )
-
-                    request_id = res["PermissionSetProvisioningStatus"]["RequestId"]
-
-                    for _ in range(20):
-                        provision_status = await boto_crud_call(
+                    await asyncio.wait_for(
+                        identity_center_poller.run(
+                            identity_center_client.provision_permission_set,
                             identity_center_client.describe_permission_set_provisioning_status,
+                            "PermissionSetProvisioningStatus",
+                            "ProvisionPermissionSetRequestId",
                             InstanceArn=instance_arn,
-                            ProvisionPermissionSetRequestId=request_id,
-                        )
-
-                        if (
-                            provision_status["PermissionSetProvisioningStatus"][
-                                "Status"
-                            ]
-                            != "IN_PROGRESS"
-                        ):
-                            break
-
-                        await asyncio.sleep(1)
-                        continue
+                            PermissionSetArn=permission_set_arn,
+                            TargetType="ALL_PROVISIONED_ACCOUNTS",
+                        ),
+                        timeout=IDENTITY_CENTER_PROVISIONING_TIMEOUT,
+                    )
                 except Exception as err:
                     log.warning(
                         "Unable to resolve status when provisioning permission set.",
@@ -803,13 +792,18 @@ class AwsIdentityCenterPermissionSetTemplate(
         )
         relevant_accounts = []
 
-        for account in config.accounts:
+        for account in template_provider_index.get(self, config.accounts):
             if not account.identity_center_details:
                 continue
 
-            if evaluate_on_provider(self, account):
-                relevant_accounts.append(account)
-                tasks.append(self._apply_to_account(account))
+            relevant_accounts.append(account)
+            tasks.append(
+                telemetry.trace_apply(
+                    self,
+                    account.account_id,
+                    self._apply_to_account(account),
+                )
+            )
 
         if not relevant_accounts:
             if ctx.execute:
@@ -31,6 +31,7 @@ from iambic.plugins.v0_1_0.aws.identity_center.permission_set.utils import (
 from iambic.plugins.v0_1_0.aws.models import AWSAccount
 from iambic.plugins.v0_1_0.aws.template_generation import (
     base_group_str_attribute,
+    create_templated_resources,
     group_dict_attribute,
     group_int_or_str_attribute,
 )
@@ -578,20 +579,14 @@ async def generate_aws_permission_set_templates(
         "Writing templated AWS Identity Center Permission Set.",
         unique_identities=len(grouped_permission_set_map),
     )
-    all_resource_ids = set()
-    for name, refs in grouped_permission_set_map.items():
-        resource_template = await create_templated_permission_set(
-            aws_account_map,
-            name,
-            refs,
-            resource_dir,
-            existing_template_map,
-            config,
-        )
-        if not resource_template:
-            # Template not updated. Most likely because it's an `enforced` template.
-            continue
-        all_resource_ids.add(resource_template.resource_id)
+    all_resource_ids = await create_templated_resources(
+        create_templated_permission_set,
+        aws_account_map,
+        grouped_permission_set_map,
+        resource_dir,
+        existing_template_map,
+        config,
+    )
 
     if not detect_messages:
         # NEVER call this if messages are passed in because all_resource_ids will only contain those resources
@@ -4,6 +4,7 @@ import asyncio
 import os
 from functools import cache
 from itertools import chain
+from typing import Coroutine, Optional
 
 from botocore.exceptions import ClientError
 from deepdiff import DeepDiff
@@ -12,7 +13,12 @@ from iambic.core import noq_json as json
 from iambic.core.context import ctx
 from iambic.core.logger import log
 from iambic.core.models import ProposedChange, ProposedChangeType
-from iambic.core.utils import aio_wrapper, async_batch_processor, plugin_apply_wrapper
+from iambic.core.utils import (
+    LoopSemaphore,
+    aio_wrapper,
+    async_batch_processor,
+    plugin_apply_wrapper,
+)
 from iambic.plugins.v0_1_0.aws.models import AWSAccount
 from iambic.plugins.v0_1_0.aws.utils import boto_crud_call, legacy_paginated_search
 
@@ -30,6 +36,153 @@ IAMBIC_SKIP_NOT_RESOLVABLE_PRINCIPAL_ID = os.environ.get(
     "IAMBIC_SKIP_NOT_RESOLVABLE_PRINCIPAL_ID", False
 )
 
+# The max number of Identity Center operations (account assignments, provisioning) in flight at once
+IDENTITY_CENTER_MAX_IN_FLIGHT = int(
+    os.getenv("IAMBIC_IDENTITY_CENTER_MAX_IN_FLIGHT", 50)
+)
+IDENTITY_CENTER_MIN_POLL_INTERVAL = 0.5
+IDENTITY_CENTER_MAX_POLL_INTERVAL = 5
+# How many times in a row the status of an operation can fail to be described before it's reported as failed
+IDENTITY_CENTER_MAX_DESCRIBE_ATTEMPTS = 5
+# How long an apply waits on a permission set to be provisioned to its accounts
+IDENTITY_CENTER_PROVISIONING_TIMEOUT = 30
+
+
+class IdentityCenterOperationPoller:
+    """
+    Tracks every in flight asynchronous Identity Center operation in a single polling loop.
+
+    Operations are submitted as soon as fewer than max_in_flight are in progress,
+    across every permission set being applied.
+    Each round the status of all in progress operations is requested at once.
+    The interval between rounds backs off while nothing completes
+    and resets once an operation does.
+    A status that can't be described is requested again the next round,
+    up to max_describe_attempts times in a row.
+    An operation stops being polled once its caller stops waiting on it, e.g. on a timeout.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = IDENTITY_CENTER_MAX_IN_FLIGHT,
+        min_interval: float = IDENTITY_CENTER_MIN_POLL_INTERVAL,
+        max_interval: float = IDENTITY_CENTER_MAX_POLL_INTERVAL,
+        max_describe_attempts: int = IDENTITY_CENTER_MAX_DESCRIBE_ATTEMPTS,
+    ):
+        self.max_in_flight = max_in_flight
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_describe_attempts = max_describe_attempts
+        self._loop = None
+        self._limiter = LoopSemaphore(max_in_flight)
+        # request id -> (describe call kwargs, status key, future)
+        self._pending: dict[str, tuple[dict, str, asyncio.Future]] = {}
+        # request id -> the number of describe calls in a row that failed
+        self._describe_errors: dict[str, int] = {}
+        self._poll_task: Optional[asyncio.Task] = None
+
+    def _reset_for_loop(self):
+        # The poller outlives the event loop of a single asyncio.run
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._pending = {}
+            self._describe_errors = {}
+            self._poll_task = None
+
+    async def run(
+        self,
+        submit_call,
+        describe_call,
+        status_key: str,
+        request_id_param: str,
+        **kwargs,
+    ) -> dict:
+        """
+        Submit the operation and return its final status.
+
+        :param submit_call: The boto call that starts the operation, e.g. create_account_assignment.
+        :param describe_call: The boto call that returns the status of the operation.
+        :param status_key: The key of the status in both responses, e.g. AccountAssignmentCreationStatus.
+        :param request_id_param: The describe_call param the request id is passed as.
+        :param kwargs: The submit_call params. InstanceArn is also passed to describe_call.
+        """
+        self._reset_for_loop()
+        async with self._limiter:
+            response = await boto_crud_call(submit_call, **kwargs)
+            status = response.get(status_key, {})
+            if status.get("Status") != "IN_PROGRESS":
+                return status
+
+            request_id = status.get("RequestId")
+            future = asyncio.get_running_loop().create_future()
+            describe_kwargs = {
+                "boto_fnc": describe_call,
+                "InstanceArn": kwargs.get("InstanceArn"),
+                request_id_param: request_id,
+            }
+            self._pending[request_id] = (describe_kwargs, status_key, future)
+            if not self._poll_task or self._poll_task.done():
+                self._poll_task = asyncio.create_task(self._poll())
+            try:
+                return await future
+            finally:
+                # Also reached when the caller is cancelled, so the operation is no longer polled
+                self._pending.pop(request_id, None)
+                self._describe_errors.pop(request_id, None)
+
+    async def _poll(self):
+        try:
+            await self._poll_pending()
+        except Exception as err:
+            for _, _, future in self._pending.values():
+                if not future.done():
+                    future.set_exception(err)
+            self._pending = {}
+            self._describe_errors = {}
+
+    async def _poll_pending(self):
+        interval = self.min_interval
+        while self._pending:
+            await asyncio.sleep(interval)
+            pending = list(self._pending.items())
+            responses = await asyncio.gather(
+                *[
+                    boto_crud_call(**describe_kwargs)
+                    for _, (describe_kwargs, _, _) in pending
+                ],
+                return_exceptions=True,
+            )
+
+            completed = False
+            for (request_id, (_, status_key, future)), response in zip(
+                pending, responses
+            ):
+                if future.done():
+                    continue
+                elif isinstance(response, Exception):
+                    describe_errors = self._describe_errors.get(request_id, 0) + 1
+                    if describe_errors < self.max_describe_attempts:
+                        self._describe_errors[request_id] = describe_errors
+                        continue
+                    status = {"Status": "FAILED", "FailureReason": str(response)}
+                else:
+                    self._describe_errors.pop(request_id, None)
+                    status = response.get(status_key, {})
+                    if status.get("Status") == "IN_PROGRESS":
+                        continue
+
+                completed = True
+                self._pending.pop(request_id, None)
+                future.set_result(status)
+
+            interval = (
+                self.min_interval if completed else min(interval * 2, self.max_interval)
+            )
+
+
+identity_center_poller = IdentityCenterOperationPoller()
+
 
 async def get_permission_set_details(
     identity_center_client,
@@ -519,9 +672,12 @@ async def create_account_assignment(
     resource_id: str,
     resource_name: str,
     log_params: dict,
-):
-    status = await boto_crud_call(
+) -> dict:
+    creation_status = await identity_center_poller.run(
         identity_center_client.create_account_assignment,
+        identity_center_client.describe_account_assignment_creation_status,
+        "AccountAssignmentCreationStatus",
+        "AccountAssignmentCreationRequestId",
         InstanceArn=instance_arn,
         TargetId=account_id,
         TargetType="AWS_ACCOUNT",
@@ -529,31 +685,20 @@ async def create_account_assignment(
         PrincipalType=resource_type,
         PrincipalId=resource_id,
     )
-    request_id = status.get("AccountAssignmentCreationStatus", {}).get("RequestId")
-    creation_status = status.get("AccountAssignmentCreationStatus", {})
 
-    while creation_status.get("Status") == "IN_PROGRESS":
-        await asyncio.sleep(0.5)
-        status = await boto_crud_call(
-            identity_center_client.describe_account_assignment_creation_status,
-            InstanceArn=instance_arn,
-            AccountAssignmentCreationRequestId=request_id,
+    if creation_status.get("Status") == "FAILED":
+        log_params = {
+            **log_params,
+            "resource_type": f"aws:identity_center:account_assignment:{resource_type.lower()}",
+        }
+        log.error(
+            "Unable to create account assignment.",
+            reason=creation_status.get("FailureReason"),
+            assigned_account_id=account_id,
+            resource_name=resource_name,
+            **log_params,
         )
-        creation_status = status.get("AccountAssignmentCreationStatus", {})
-
-        if creation_status.get("Status") == "FAILED":
-            log_params = {
-                **log_params,
-                "resource_type": f"aws:identity_center:account_assignment:{resource_type.lower()}",
-            }
-            log.error(
-                "Unable to create account assignment.",
-                reason=creation_status.get("FailureReason"),
-                assigned_account_id=account_id,
-                resource_name=resource_name,
-                **log_params,
-            )
-            return
+    return creation_status
 
 
 async def delete_account_assignment(
@@ -565,9 +710,12 @@ async def delete_account_assignment(
     resource_id: str,
     resource_name: str,
     log_params: dict,
-):
-    status = await boto_crud_call(
+) -> dict:
+    deletion_status = await identity_center_poller.run(
         identity_center_client.delete_account_assignment,
+        identity_center_client.describe_account_assignment_deletion_status,
+        "AccountAssignmentDeletionStatus",
+        "AccountAssignmentDeletionRequestId",
         InstanceArn=instance_arn,
         TargetId=account_id,
         TargetType="AWS_ACCOUNT",
@@ -575,31 +723,39 @@ async def delete_account_assignment(
         PrincipalType=resource_type,
         PrincipalId=resource_id,
     )
-    request_id = status.get("AccountAssignmentDeletionStatus", {}).get("RequestId")
-    deletion_status = status.get("AccountAssignmentDeletionStatus", {})
 
-    while deletion_status.get("Status") == "IN_PROGRESS":
-        await asyncio.sleep(0.5)
-        status = await boto_crud_call(
-            identity_center_client.describe_account_assignment_deletion_status,
-            InstanceArn=instance_arn,
-            AccountAssignmentDeletionRequestId=request_id,
+    if deletion_status.get("Status") == "FAILED":
+        log_params = {
+            **log_params,
+            "resource_type": f"aws:identity_center:account_assignment:{resource_type.lower()}",
+        }
+        log.error(
+            "Unable to delete account assignment.",
+            reason=deletion_status.get("FailureReason"),
+            assigned_account_id=account_id,
+            resource_name=resource_name,
+            **log_params,
         )
-        deletion_status = status.get("AccountAssignmentDeletionStatus", {})
+    return deletion_status
 
-        if deletion_status.get("Status") == "FAILED":
-            log_params = {
-                **log_params,
-                "resource_type": f"aws:identity_center:account_assignment:{resource_type.lower()}",
-            }
-            log.error(
-                "Unable to delete account assignment.",
-                reason=deletion_status.get("FailureReason"),
-                assigned_account_id=account_id,
-                resource_name=resource_name,
-                **log_params,
+
+async def account_assignment_apply_wrapper(
+    apply_awaitable: Coroutine, proposed_changes: list[ProposedChange]
+) -> list[ProposedChange]:
+    """plugin_apply_wrapper that also reports an assignment operation that FAILED on the changes."""
+    try:
+        operation_status = await apply_awaitable
+    except Exception as e:
+        operation_status = {"Status": "FAILED", "FailureReason": str(e)}
+
+    if operation_status.get("Status") == "FAILED":
+        for change in proposed_changes:
+            change.exceptions_seen.append(
+                operation_status.get("FailureReason")
+                or "The account assignment operation failed."
             )
-            return
+
+    return proposed_changes
 
 
 async def apply_account_assignments(
@@ -667,7 +823,9 @@ async def apply_account_assignments(
                     resource_name=assignment["resource_name"],
                     log_params=log_params,
                 )
-                tasks.append(plugin_apply_wrapper(apply_awaitable, proposed_changes))
+                tasks.append(
+                    account_assignment_apply_wrapper(apply_awaitable, proposed_changes)
+                )
             log.info(log_str, details=assignment, **log_params)
 
     for assignment_id, assignment in template_assignment_map.items():
@@ -701,11 +859,14 @@ async def apply_account_assignments(
                     resource_name=assignment["resource_name"],
                     log_params=log_params,
                 )
-                tasks.append(plugin_apply_wrapper(apply_awaitable, proposed_changes))
+                tasks.append(
+                    account_assignment_apply_wrapper(apply_awaitable, proposed_changes)
+                )
             log.info(log_str, details=assignment, **log_params)
 
     if tasks:
-        results: list[list[ProposedChange]] = await async_batch_processor(tasks, 10, 1)
+        # The operations are throttled and polled by the identity_center_poller
+        results: list[list[ProposedChange]] = await asyncio.gather(*tasks)
         return list(chain.from_iterable(results))
     else:
         return response
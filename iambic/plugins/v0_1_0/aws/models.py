@@ -14,6 +14,7 @@ from pydantic import Extra, Field, constr, validator
 from ruamel.yaml import YAML, yaml_object
 
 from iambic.core.context import ctx
+from iambic.core.drift import drift_fingerprints
 from iambic.core.iambic_enum import IambicManaged
 from iambic.core.logger import log
 from iambic.core.models import (
@@ -29,23 +30,27 @@ from iambic.core.models import (
     Variable,
     strip_out_variables,
 )
+from iambic.core.telemetry import telemetry
 from iambic.core.utils import (
     NoqSemaphore,
-    evaluate_on_provider,
     get_provider_value,
+    get_rendered_template_str_value,
     sort_dict,
+    template_provider_index,
 )
 from iambic.plugins.v0_1_0.aws.identity_center.permission_set.active_directory_utils import (
     alternate_list_groups,
     alternate_list_users,
 )
 from iambic.plugins.v0_1_0.aws.utils import (
+    AWSReadCache,
+    AWSWriteLimiter,
     RegionName,
     boto_crud_call,
     create_assume_role_session,
     get_current_role_arn,
+    get_org_account_inventory,
     legacy_paginated_search,
-    set_org_account_variables,
 )
 
 yaml = YAML()
@@ -402,6 +407,20 @@ class AWSAccount(ProviderChild, BaseAWSAccountAndOrgModel):
 
         return await super().get_boto3_session(region_name)
 
+    @property
+    def read_cache(self) -> AWSReadCache:
+        """Reads made against the account during the current run."""
+        if self.boto3_session_map is None:
+            self.boto3_session_map = {}
+        return self.boto3_session_map.setdefault("read_cache", AWSReadCache())
+
+    @property
+    def write_limiter(self) -> AWSWriteLimiter:
+        """Caps the writes in flight against the account."""
+        if self.boto3_session_map is None:
+            self.boto3_session_map = {}
+        return self.boto3_session_map.setdefault("write_limiter", AWSWriteLimiter())
+
     async def set_hub_session_info(self):
         region_name = self.region_name
         session = boto3.Session(region_name=region_name)
@@ -838,28 +857,28 @@ class AWSOrganization(BaseAWSAccountAndOrgModel):
                 error=err,
             )
 
-    async def get_accounts(self) -> list[AWSAccount]:
+    async def get_accounts(
+        self, account_ids: Optional[set[str]] = None, refresh: bool = False
+    ) -> list[AWSAccount]:
         """Get all accounts in an AWS Organization
 
         Also extends variables for accounts that are already in the config.
         Does not overwrite variables.
+
+        The accounts and their tags are read from the org account inventory cache
+        unless refresh is set.
+        If account_ids is provided, only those accounts are returned.
         """
 
         session = await self.get_boto3_session()
         client = await self.get_boto3_client("organizations")
-        org_accounts = await legacy_paginated_search(
-            client.list_accounts,
-            "Accounts",
-        )
-
-        active_accounts = [
-            account for account in org_accounts if account["Status"] == "ACTIVE"
-        ]
-        org_accounts = await asyncio.gather(
-            *[set_org_account_variables(client, account) for account in active_accounts]
+        active_accounts = await get_org_account_inventory(
+            client, self.org_id or self.org_account_id, account_ids, refresh
         )
         discovered_accounts = [
-            org_account for org_account in org_accounts if org_account
+            account
+            for account in active_accounts
+            if account_ids is None or account["Id"] in account_ids
         ]
 
         discovered_accounts = await asyncio.gather(
@@ -945,12 +964,31 @@ class AWSTemplate(BaseTemplate, ExpiryModel):
             template_changes.proposed_changes = []
             return template_changes
 
-        for account in config.accounts:
-            if evaluate_on_provider(self, account):
-                relevant_accounts.append(account)
-                tasks.append(self._apply_to_account(account, aws_config=config))
+        unchanged_accounts = []
+        for account in template_provider_index.get(self, config.accounts):
+            if ctx.execute and drift_fingerprints.is_current(self, account):
+                unchanged_accounts.append(account)
+                continue
+            relevant_accounts.append(account)
+            tasks.append(
+                telemetry.trace_apply(
+                    self,
+                    account.account_id,
+                    self._apply_to_account(account, aws_config=config),
+                )
+            )
+
+        if unchanged_accounts:
+            log.debug(
+                "Skipping accounts with an unchanged drift fingerprint.",
+                accounts=[str(account) for account in unchanged_accounts],
+                **log_params,
+            )
 
         if not relevant_accounts:
+            if unchanged_accounts:
+                return template_changes
+
             if ctx.execute:
                 if self.deleted:
                     log_str = "Successfully removed resource."
@@ -975,9 +1013,27 @@ class AWSTemplate(BaseTemplate, ExpiryModel):
         proposed_changes: list[AccountChangeDetails] = []
         exceptions_seen = list()
 
-        for account_change in account_changes:
+        if ctx.execute:
+            # The resource may have changed even if the apply failed part way through
+            for account, account_change in zip(relevant_accounts, account_changes):
+                account.read_cache.invalidate(
+                    get_rendered_template_str_value(self.resource_id, account)
+                )
+                if not isinstance(account_change, AccountChangeDetails):
+                    continue
+                # So did the attachments of the managed policies (de)attached to it
+                for proposed_change in account_change.proposed_changes:
+                    if proposed_change.change_type in (
+                        ProposedChangeType.ATTACH,
+                        ProposedChangeType.DETACH,
+                    ):
+                        account.read_cache.invalidate(proposed_change.resource_id)
+
+        for account, account_change in zip(relevant_accounts, account_changes):
             if isinstance(account_change, AccountChangeDetails):
                 proposed_changes.append(account_change)
+                if ctx.execute and not account_change.exceptions_seen:
+                    drift_fingerprints.record(self, account)
             else:
                 exceptions_seen.append(
                     ProposedChange(
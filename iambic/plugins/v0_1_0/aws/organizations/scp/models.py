@@ -18,6 +18,7 @@ from iambic.core.models import (
     ExpiryModel,
     ProposedChange,
     ProposedChangeType,
+    rendered_resources,
 )
 from iambic.core.utils import normalize_dict_keys, plugin_apply_wrapper
 from iambic.plugins.v0_1_0.aws.iam.models import Path
@@ -37,6 +38,7 @@ from iambic.plugins.v0_1_0.aws.organizations.scp.utils import (
     create_policy,
     delete_policy,
     get_policy,
+    scp_policy_cache,
     service_control_policy_is_enabled,
 )
 
@@ -384,11 +386,14 @@ class AwsScpPolicyTemplate(AWSTemplate, AccessModel):
 
             changes_made: list[list[ProposedChange]] = await asyncio.gather(*tasks)
             if any(changes_made):
+                if ctx.execute:
+                    scp_policy_cache.invalidate(account_policy.get("PolicyId"))
                 account_change_details.extend_changes(
                     list(chain.from_iterable(changes_made))
                 )
                 if current_policy.get("Name") != account_policy.get("PolicyName"):
                     self.identifier = account_policy["PolicyName"]
+                    rendered_resources.invalidate(self)
                     self.write()
         else:
             proposed_changes = [
@@ -414,6 +419,7 @@ class AwsScpPolicyTemplate(AWSTemplate, AccessModel):
             )
 
             self.properties.policy_id = account_policy.get("PolicyId")
+            rendered_resources.invalidate(self)
             current_policy = await get_policy(client, account_policy.get("PolicyId"))
             current_policy = current_policy.dict()
 
@@ -433,12 +439,15 @@ class AwsScpPolicyTemplate(AWSTemplate, AccessModel):
 
             changes_made: list[list[ProposedChange]] = await asyncio.gather(*tasks)
             if any(changes_made):
+                if ctx.execute:
+                    scp_policy_cache.invalidate(account_policy.get("PolicyId"))
                 account_change_details.extend_changes(
                     list(chain.from_iterable(changes_made))
                 )
 
             # name and identifier must match
             self.identifier = current_policy.get("Name", self.identifier)
+            rendered_resources.invalidate(self)
             self.write()
 
         self.__log_after_apply(account_change_details, log_params)
@@ -2,9 +2,12 @@ from __future__ import annotations
 
 import asyncio
 import json
+import os
 import random
 from itertools import chain
+from typing import Optional
 
+import botocore.client
 from deepdiff import DeepDiff
 from git import TYPE_CHECKING
 from tenacity import retry, stop_after_attempt, wait_exponential
@@ -12,8 +15,12 @@ from tenacity import retry, stop_after_attempt, wait_exponential
 from iambic.core.context import ctx
 from iambic.core.logger import log
 from iambic.core.models import ProposedChange, ProposedChangeType
-from iambic.core.utils import NoqSemaphore, aio_wrapper, plugin_apply_wrapper
-from iambic.plugins.v0_1_0.aws.utils import boto_crud_call, legacy_paginated_search
+from iambic.core.utils import LoopSemaphore, aio_wrapper, plugin_apply_wrapper
+from iambic.plugins.v0_1_0.aws.utils import (
+    AWSReadCache,
+    boto_crud_call,
+    legacy_paginated_search,
+)
 
 if TYPE_CHECKING:
     from iambic.plugins.v0_1_0.aws.iambic_plugin import AWSConfig
@@ -23,16 +30,48 @@ if TYPE_CHECKING:
         ServiceControlPolicyTargetItem,
     )
 
+ORGANIZATIONS_API_CONCURRENCY = int(
+    os.getenv("IAMBIC_ORGANIZATIONS_API_CONCURRENCY", 10)
+)
+
+
+class OrganizationsPolicyCache(AWSReadCache):
+    """
+    A per-run, read-through cache of organizations policy reads.
+
+    Every read goes through a single limiter so import and apply share one
+    concurrency budget against the organizations API.
+    A client is keyed by the client itself rather than its service and region
+    because every org has its own organizations client.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None):
+        super().__init__(
+            LoopSemaphore(max_concurrency or ORGANIZATIONS_API_CONCURRENCY)
+        )
+
+    @classmethod
+    def _get_arg_key(cls, arg):
+        if isinstance(arg, botocore.client.BaseClient):
+            return arg
+        return super()._get_arg_key(arg)
+
+    def invalidate(self, policy_id: Optional[str] = None) -> int:
+        """Drop the cached reads for a policy or, if no policy is provided, everything."""
+        if policy_id is None:
+            self.clear()
+            return 0
+        return super().invalidate(policy_id)
+
+
+scp_policy_cache = OrganizationsPolicyCache()
+
 
 async def list_policies(
     client, filter="SERVICE_CONTROL_POLICY"
 ) -> list[ServiceControlPolicyItem]:
     """Retrieves the list of all policies in an organization of a specified type."""
 
-    from iambic.plugins.v0_1_0.aws.organizations.scp.models import (
-        ServiceControlPolicyItem,
-    )
-
     scp_policies = await legacy_paginated_search(
         client.list_policies,
         response_key="Policies",
@@ -41,33 +80,14 @@ async def list_policies(
 
     scp_policies = [p for p in scp_policies if p["AwsManaged"] is False]
 
-    list_targets_for_policy_semaphore = NoqSemaphore(list_targets_for_policy, 10)
-    describe_policy_semaphore = NoqSemaphore(get_policy_statements, 10)
-    list_tags_by_policy_semaphore = NoqSemaphore(list_tags_by_policy, 10)
-
-    targets = await list_targets_for_policy_semaphore.process(
-        [{"client": client, "policyId": policy["Id"]} for policy in scp_policies]
-    )
-
-    statements = await describe_policy_semaphore.process(
-        [{"client": client, "policyId": policy["Id"]} for policy in scp_policies]
-    )
-
-    tags = await list_tags_by_policy_semaphore.process(
-        [{"client": client, "policyId": policy["Id"]} for policy in scp_policies]
-    )
-
-    return [
-        ServiceControlPolicyItem.parse_obj(
-            {
-                **p,
-                "Targets": t,
-                "PolicyDocument": s,
-                "Tags": tg,
-            },
+    return list(
+        await asyncio.gather(
+            *[
+                get_policy_details(client, policy["Id"], policy)
+                for policy in scp_policies
+            ]
         )
-        for p, t, s, tg in zip(scp_policies, targets, statements, tags)
-    ]
+    )
 
 
 @retry(
@@ -96,7 +116,7 @@ async def list_targets_for_policy(
 
 
 async def get_policy_statements(client, policyId: str):
-    policy = await describe_policy(client, policyId)
+    policy = await scp_policy_cache.get(describe_policy, client, policyId)
     return policy.get("Content", {})
 
 
@@ -135,34 +155,48 @@ async def list_tags_by_policy(client, policyId: str) -> list[dict]:
     return targets
 
 
-async def get_policy(client, policyId: str) -> ServiceControlPolicyItem:
+async def get_policy_details(
+    client, policyId: str, policy_summary: Optional[dict] = None
+) -> ServiceControlPolicyItem:
+    """
+    Retrieves the policy document, targets and tags of a policy concurrently.
+
+    The policy summary is taken from the describe_policy response
+    unless it was already retrieved (e.g. by list_policies).
+    """
     from iambic.plugins.v0_1_0.aws.organizations.scp.models import (
         ServiceControlPolicyItem,
     )
 
-    policy = await describe_policy(client, policyId)
-
-    list_tags_by_policy_semaphore = NoqSemaphore(list_tags_by_policy, 10)
-    list_targets_for_policy_semaphore = NoqSemaphore(list_targets_for_policy, 10)
-
-    tags = await list_tags_by_policy_semaphore.process(
-        [{"client": client, "policyId": policyId}]
-    )
-
-    targets = await list_targets_for_policy_semaphore.process(
-        [{"client": client, "policyId": policyId}]
-    )
+    if policy_summary:
+        policy_document, targets, tags = await asyncio.gather(
+            get_policy_statements(client, policyId),
+            scp_policy_cache.get(list_targets_for_policy, client, policyId),
+            scp_policy_cache.get(list_tags_by_policy, client, policyId),
+        )
+    else:
+        policy, targets, tags = await asyncio.gather(
+            scp_policy_cache.get(describe_policy, client, policyId),
+            scp_policy_cache.get(list_targets_for_policy, client, policyId),
+            scp_policy_cache.get(list_tags_by_policy, client, policyId),
+        )
+        policy_summary = policy.get("PolicySummary", {})
+        policy_document = policy.get("Content", {})
 
     return ServiceControlPolicyItem.parse_obj(
         {
-            **policy.get("PolicySummary", {}),  # type: ignore
-            "Targets": targets[0],
-            "PolicyDocument": policy.get("Content", {}),
-            "Tags": tags[0],
+            **policy_summary,  # type: ignore
+            "Targets": targets,
+            "PolicyDocument": policy_document,
+            "Tags": tags,
         },
     )
 
 
+async def get_policy(client, policyId: str) -> ServiceControlPolicyItem:
+    return await get_policy_details(client, policyId)
+
+
 @retry(
     reraise=True,
     stop=stop_after_attempt(6),
@@ -188,13 +222,8 @@ async def delete_policy(client, policyId: str, *args, **kwargs):
     Before you perform this operation, you must first detach
     the policy from all organizational units (OUs), roots, and accounts.
     """
-    list_targets_for_policy_semaphore = NoqSemaphore(list_targets_for_policy, 10)
-
-    targets = chain.from_iterable(
-        await list_targets_for_policy_semaphore.process(
-            [{"client": client, "policyId": policyId}]
-        )
-    )
+    # Always read the live targets, a previous attempt may have detached some of them
+    targets = await list_targets_for_policy(client, policyId)
 
     targets_tasks = [
         detach_policy(client, policyId, target.TargetId) for target in targets
@@ -203,6 +232,7 @@ async def delete_policy(client, policyId: str, *args, **kwargs):
     await asyncio.gather(*targets_tasks)
 
     await boto_crud_call(client.delete_policy, PolicyId=policyId)
+    scp_policy_cache.invalidate(policyId)
 
     log.debug(f"Deleted policy {policyId}")
 
@@ -249,7 +279,7 @@ async def describe_organization(
 
 async def service_control_policy_is_enabled(client):
     """Check if SCPs are enabled for the organization."""
-    org = await describe_organization(client)
+    org = await scp_policy_cache.get(describe_organization, client)
 
     return (
         len(
@@ -1,7 +1,13 @@
 from __future__ import annotations
 
-from typing import Union
+import asyncio
+import os
+from functools import partial
+from typing import TYPE_CHECKING, Callable, Optional, Union
 
+from iambic.core.expiry_index import expiry_index
+from iambic.core.logger import log
+from iambic.core.models import BaseTemplate, template_deletions, template_write_stats
 from iambic.core.template_generation import (
     base_group_str_attribute as core_base_group_str_attribute,
 )
@@ -11,8 +17,28 @@ from iambic.core.template_generation import (
 from iambic.core.template_generation import (
     group_int_or_str_attribute as core_group_int_or_str_attribute,
 )
+from iambic.core.utils import aio_wrapper
 from iambic.plugins.v0_1_0.aws.models import AWSAccount
 
+if TYPE_CHECKING:
+    from iambic.plugins.v0_1_0.aws.iambic_plugin import AWSConfig
+
+# we must avoid import multiprocessing pool in the module loading time
+if os.environ.get("AWS_LAMBDA_FUNCTION_NAME", False):
+    from multiprocessing import cpu_count
+
+    from iambic.vendor.lambda_multiprocessing import Pool
+else:
+    from multiprocessing import Pool, cpu_count
+
+TEMPLATE_GENERATION_PROCESSES = int(
+    os.getenv("IAMBIC_TEMPLATE_GENERATION_PROCESSES", max(1, cpu_count() // 2))
+)
+# Below this many resources, starting the pool costs more than it saves
+TEMPLATE_GENERATION_POOL_THRESHOLD = int(
+    os.getenv("IAMBIC_TEMPLATE_GENERATION_POOL_THRESHOLD", 250)
+)
+
 
 async def base_group_str_attribute(
     aws_account_map: dict[str, AWSAccount], account_resources: list[dict]
@@ -79,3 +105,180 @@ async def group_dict_attribute(
         is_dict_attr,
         prefer_templatized,
     )
+
+
+async def _create_templated_resources(
+    create_templated_resource: Callable,
+    aws_account_map: dict[str, AWSAccount],
+    grouped_resource_map: dict[str, list[dict]],
+    resource_dir: str,
+    existing_template_map: dict[str, BaseTemplate],
+    config: AWSConfig,
+) -> list[str]:
+    resource_ids = []
+    for resource_name, resource_refs in grouped_resource_map.items():
+        resource_template = await create_templated_resource(
+            aws_account_map,
+            resource_name,
+            resource_refs,
+            resource_dir,
+            existing_template_map,
+            config,
+        )
+        if not resource_template:
+            # Template not updated. Most likely because it's an `enforced` template.
+            continue
+        resource_ids.append(resource_template.resource_id)
+
+    return resource_ids
+
+
+def _create_templated_resources_shard(
+    create_templated_resource: Callable,
+    aws_account_map: dict[str, AWSAccount],
+    resource_dir: str,
+    config: AWSConfig,
+    shard: tuple[dict[str, list[dict]], dict[str, BaseTemplate]],
+) -> dict:
+    """
+    Runs in a pool worker.
+
+    Template files are written by the worker but the deleted template files,
+    expiry index changes and template write stats of the shard are returned
+    for the parent to apply once, so workers never update the git index concurrently.
+    """
+    grouped_resource_map, existing_template_map = shard
+    # A forked worker starts with a copy of the parent's counters
+    template_write_stats.reset()
+    with expiry_index.track_changes() as expiry_changes, template_deletions.collect():
+        resource_ids = asyncio.run(
+            _create_templated_resources(
+                create_templated_resource,
+                aws_account_map,
+                grouped_resource_map,
+                resource_dir,
+                existing_template_map,
+                config,
+            )
+        )
+        return dict(
+            resource_ids=resource_ids,
+            deleted_file_paths=template_deletions.pop(),
+            expiry_changes=expiry_changes,
+            write_stats=template_write_stats.dict(),
+        )
+
+
+def _get_picklable_aws_account(aws_account: AWSAccount) -> AWSAccount:
+    # Sessions, clients and cached reads can't be sent to a worker and aren't used to generate templates
+    return aws_account.copy(
+        update={"boto3_session_map": None, "hub_session_info": None}
+    )
+
+
+def _get_picklable_config(config: AWSConfig) -> AWSConfig:
+    return config.copy(
+        update={
+            "accounts": [
+                _get_picklable_aws_account(account) for account in config.accounts
+            ],
+            "organizations": [
+                org.copy(update={"boto3_session_map": None})
+                for org in config.organizations
+            ],
+        }
+    )
+
+
+def _run_in_pool(fn: Callable, shards: list, processes: int) -> list:
+    with Pool(processes) as p:
+        return p.map(fn, shards)
+
+
+async def create_templated_resources(
+    create_templated_resource: Callable,
+    aws_account_map: dict[str, AWSAccount],
+    grouped_resource_map: dict[str, list[dict]],
+    resource_dir: str,
+    existing_template_map: dict[str, BaseTemplate],
+    config: AWSConfig,
+    processes: Optional[int] = None,
+) -> set[str]:
+    """Creates or updates the template of every grouped resource.
+
+    Generating a template is CPU bound so large imports are sharded by resource name
+    across a process pool.
+
+    :param create_templated_resource: e.g. create_templated_role
+    :param grouped_resource_map: dict(resource_name: str = list[dict(account_id:str, **)])
+    :return: The resource ids of the templates that were created or updated.
+        Used to determine which templates are orphaned.
+    """
+    processes = processes or TEMPLATE_GENERATION_PROCESSES
+    if processes <= 1 or len(grouped_resource_map) < TEMPLATE_GENERATION_POOL_THRESHOLD:
+        with template_deletions.batch():
+            return set(
+                await _create_templated_resources(
+                    create_templated_resource,
+                    aws_account_map,
+                    grouped_resource_map,
+                    resource_dir,
+                    existing_template_map,
+                    config,
+                )
+            )
+
+    # Several small shards per worker so a slow shard doesn't hold up the pool
+    resource_names = sorted(grouped_resource_map.keys())
+    shard_size = max(1, -(-len(resource_names) // (processes * 4)))
+    shards = []
+    for elem in range(0, len(resource_names), shard_size):
+        shard_names = resource_names[elem : elem + shard_size]
+        shards.append(
+            (
+                {name: grouped_resource_map[name] for name in shard_names},
+                {
+                    name: existing_template_map[name]
+                    for name in shard_names
+                    if name in existing_template_map
+                },
+            )
+        )
+
+    # Remove pending deletions first so a worker can't recreate a file the parent then removes
+    template_deletions.flush()
+    log.debug(
+        "Generating templates in a process pool.",
+        processes=processes,
+        shards=len(shards),
+        resources=len(resource_names),
+    )
+    shard_results = await aio_wrapper(
+        _run_in_pool,
+        partial(
+            _create_templated_resources_shard,
+            create_templated_resource,
+            {
+                account_id: _get_picklable_aws_account(aws_account)
+                for account_id, aws_account in aws_account_map.items()
+            },
+            resource_dir,
+            _get_picklable_config(config),
+        ),
+        shards,
+        processes,
+    )
+
+    all_resource_ids = set()
+    with template_deletions.batch():
+        for shard_result in shard_results:
+            all_resource_ids.update(shard_result["resource_ids"])
+            for file_path in shard_result["deleted_file_paths"]:
+                template_deletions.add(file_path)
+            expiry_index.apply_changes(shard_result["expiry_changes"])
+            shard_write_stats = shard_result["write_stats"]
+            template_write_stats.written += shard_write_stats["written"]
+            template_write_stats.skipped += shard_write_stats["skipped"]
+            template_write_stats.deleted += shard_write_stats["deleted"]
+
+    return all_resource_ids
@@ -1,20 +1,46 @@
 from __future__ import annotations
 
 import asyncio
+import copy
+import inspect
+import os
 import re
+import time
 from enum import Enum
-from typing import TYPE_CHECKING, Any, Optional, Union
+from itertools import chain
+from typing import TYPE_CHECKING, Any, Callable, Optional, Union
 
 import boto3
+import botocore.client
 from botocore.exceptions import ClientError, NoCredentialsError
 
 from iambic.core.iambic_enum import IambicManaged
 from iambic.core.logger import log
-from iambic.core.utils import aio_wrapper, is_regex_match
+from iambic.core.telemetry import telemetry
+from iambic.core.utils import (
+    LoopSemaphore,
+    NoqSemaphore,
+    SingleFlight,
+    aio_wrapper,
+    get_cache_file_path,
+    is_regex_match,
+    load_json_cache_file,
+    plugin_apply_wrapper,
+    save_json_cache_file,
+)
 
 if TYPE_CHECKING:
+    from iambic.core.models import ProposedChange
     from iambic.plugins.v0_1_0.aws.iambic_plugin import AWSConfig, ImportAction
 
+# An org account inventory older than this is fetched again before it's used
+ORG_ACCOUNT_INVENTORY_TTL = int(os.getenv("IAMBIC_ORG_ACCOUNT_INVENTORY_TTL", 60 * 60))
+ORG_ACCOUNT_TAG_CONCURRENCY = int(os.getenv("IAMBIC_ORG_ACCOUNT_TAG_CONCURRENCY", 25))
+# The writes in flight against a single account
+AWS_ACCOUNT_WRITE_CONCURRENCY = int(
+    os.getenv("IAMBIC_AWS_ACCOUNT_WRITE_CONCURRENCY", 10)
+)
+
 
 async def process_import_rules(
     config: AWSConfig,
@@ -105,8 +131,10 @@ async def boto_crud_call(
     else:
         retryable_errors = always_retryable_errors
 
+    api_call = getattr(boto_fnc, "__name__", str(boto_fnc))
     while True:
         try:
+            telemetry.increment("api_calls", provider="aws", api_call=api_call)
             return await aio_wrapper(boto_fnc, **kwargs)
         except ClientError as err:
             error_code = err.response["Error"]["Code"]
@@ -114,6 +142,14 @@ async def boto_crud_call(
                 if retry_count >= max_attempts:
                     raise
                 retry_count += 1
+                telemetry.increment("api_retries", provider="aws", api_call=api_call)
+                if any(
+                    throttle_err in error_code
+                    for throttle_err in always_retryable_errors
+                ):
+                    telemetry.increment(
+                        "api_throttles", provider="aws", api_call=api_call
+                    )
                 log.info(
                     f"{error_code} error",
                     provider="aws",
@@ -305,6 +341,96 @@ async def set_org_account_variables(client, account: dict) -> dict:
     return account
 
 
+def get_org_account_inventory_path(org_id: str) -> str:
+    return get_cache_file_path("cache", "aws", "organizations", org_id, "accounts.json")
+
+
+async def fetch_org_account_inventory(
+    client,
+    account_ids: Optional[set[str]] = None,
+    known_variables: Optional[dict[str, list]] = None,
+) -> dict:
+    """Lists the active accounts of an organization and retrieves their tag variables.
+
+    Tags are only retrieved for the accounts in account_ids (all accounts if not provided)
+    that aren't already in known_variables.
+    """
+    known_variables = known_variables or {}
+    org_accounts = await legacy_paginated_search(client.list_accounts, "Accounts")
+    accounts = [
+        {
+            "Id": account["Id"],
+            "Name": account["Name"],
+            "variables": known_variables.get(account["Id"]),
+        }
+        for account in org_accounts
+        if account["Status"] == "ACTIVE"
+    ]
+
+    if pending_accounts := [
+        account
+        for account in accounts
+        if account["variables"] is None
+        and (account_ids is None or account["Id"] in account_ids)
+    ]:
+        set_org_account_variables_semaphore = NoqSemaphore(
+            set_org_account_variables, ORG_ACCOUNT_TAG_CONCURRENCY
+        )
+        await set_org_account_variables_semaphore.process(
+            [{"client": client, "account": account} for account in pending_accounts]
+        )
+
+    return {"updated_at": time.time(), "accounts": accounts}
+
+
+async def get_org_account_inventory(
+    client,
+    org_id: str,
+    account_ids: Optional[set[str]] = None,
+    refresh: bool = False,
+) -> list[dict]:
+    """Returns the active accounts of an organization along with their tag variables.
+
+    The inventory is cached per org in the writable directory.
+    It's fetched again once it expired or if one of account_ids isn't in it, e.g. a new account.
+    If account_ids is provided, only the tags of those accounts are required
+    so a command touching a subset of accounts doesn't wait on the rest of the org.
+    """
+    inventory_path = get_org_account_inventory_path(org_id)
+    inventory = (
+        {}
+        if refresh
+        else load_json_cache_file(inventory_path, "org account inventory") or {}
+    )
+    accounts = inventory.get("accounts", [])
+    is_expired = bool(
+        accounts and time.time() - inventory["updated_at"] > ORG_ACCOUNT_INVENTORY_TTL
+    )
+    missing_variables = [
+        account
+        for account in accounts
+        if account.get("variables") is None
+        and (account_ids is None or account["Id"] in account_ids)
+    ]
+    missing_accounts = set(account_ids or []).difference(
+        account["Id"] for account in accounts
+    )
+
+    if accounts and not (is_expired or missing_variables or missing_accounts):
+        return accounts
+
+    known_variables = {}
+    if not is_expired:
+        known_variables = {
+            account["Id"]: account["variables"]
+            for account in accounts
+            if account.get("variables") is not None
+        }
+    inventory = await fetch_org_account_inventory(client, account_ids, known_variables)
+    save_json_cache_file(inventory_path, inventory)
+    return inventory["accounts"]
+
+
 async def get_aws_account_map(config: AWSConfig) -> dict:
     """Returns a map containing all enabled account configs across all provided config instances
 
@@ -362,6 +488,161 @@ async def create_assume_role_session(
         raise
 
 
+class AWSReadCache:
+    """
+    A read-through cache of AWS reads made during a single run.
+
+    Entries are keyed by the read function and its arguments.
+    A boto3 client argument is keyed by its service and region,
+    a client method by its service, region and name.
+    Concurrent identical reads share a single in-flight request
+    and every caller gets its own copy of the response.
+
+    The cache is kept for the run it was started for by start_run,
+    e.g. across the plan and the apply of `iambic apply`.
+    Reads are made through the limiter, if one is provided.
+    """
+
+    def __init__(self, limiter: Optional[LoopSemaphore] = None):
+        self.run_id: Optional[str] = None
+        self.limiter = limiter
+        self._results = SingleFlight()
+
+    @classmethod
+    def _get_arg_key(cls, arg):
+        if isinstance(arg, botocore.client.BaseClient):
+            return arg.meta.service_model.service_name, arg.meta.region_name
+        elif inspect.ismethod(arg) and isinstance(
+            arg.__self__, botocore.client.BaseClient
+        ):
+            return *cls._get_arg_key(arg.__self__), arg.__name__
+        return arg
+
+    def get_key(self, fn: Callable, *args, **kwargs) -> tuple:
+        return (
+            fn.__module__,
+            fn.__name__,
+            tuple(self._get_arg_key(arg) for arg in args),
+            tuple(sorted((k, self._get_arg_key(v)) for k, v in kwargs.items())),
+        )
+
+    async def _read(self, fn: Callable, *args, **kwargs):
+        if self.limiter is None:
+            return await fn(*args, **kwargs)
+        async with self.limiter:
+            return await fn(*args, **kwargs)
+
+    async def get(self, fn: Callable, *args, **kwargs):
+        key = self.get_key(fn, *args, **kwargs)
+        return copy.deepcopy(
+            await self._results.get(key, self._read, fn, *args, **kwargs)
+        )
+
+    def invalidate(self, resource_id: str) -> int:
+        """Drop every cached read that references the resource by name or ARN.
+
+        Returns the number of entries removed.
+        """
+
+        def _references_resource(key: tuple) -> bool:
+            return any(
+                isinstance(arg, str)
+                and (arg == resource_id or arg.endswith(f"/{resource_id}"))
+                for arg in chain(key[2], (v for _, v in key[3]))
+            )
+
+        stale_keys = [key for key in self._results.keys() if _references_resource(key)]
+        for key in stale_keys:
+            self._results.pop(key)
+
+        return len(stale_keys)
+
+    def clear(self):
+        self._results.clear()
+
+    def start_run(self, run_id: str):
+        """Clear the reads of a previous run. Reads of the same run are kept."""
+        if run_id != self.run_id:
+            self.clear()
+            self.run_id = run_id
+
+
+async def cached_read(
+    read_cache: Optional[AWSReadCache], fn: Callable, *args, **kwargs
+):
+    """Make the read through the read cache if one is provided."""
+    if read_cache is None:
+        return await fn(*args, **kwargs)
+    return await read_cache.get(fn, *args, **kwargs)
+
+
+class AWSWriteLimiter:
+    """
+    Caps the writes in flight against an account across every resource being applied.
+    """
+
+    def __init__(self, concurrency: int = AWS_ACCOUNT_WRITE_CONCURRENCY):
+        self.concurrency = concurrency
+        self._limiter = LoopSemaphore(concurrency)
+
+    async def call(self, boto_fnc, **kwargs):
+        async with self._limiter:
+            return await boto_crud_call(boto_fnc, **kwargs)
+
+
+class IAMPrincipalChangeSet:
+    """
+    The writes that bring an IAM principal (a role, user or group) in line with its template.
+
+    The apply helpers queue their writes instead of running them one attribute at a time.
+    execute runs every removal (untag, detach, delete, remove from group) before any addition
+    so the principal never goes over a quota in between, e.g. the managed policy limit.
+    Every write goes through the write limiter of the account, if one is set.
+    """
+
+    def __init__(self, write_limiter: Optional[AWSWriteLimiter] = None):
+        self.write_limiter = write_limiter
+        self.settle_seconds = 0
+        self._removals: list[tuple[Callable, dict, list[ProposedChange]]] = []
+        self._additions: list[tuple[Callable, dict, list[ProposedChange]]] = []
+
+    def remove(
+        self,
+        boto_fnc,
+        proposed_changes: list[ProposedChange],
+        settle_seconds: int = 0,
+        **kwargs,
+    ):
+        """Queue a removal, settle_seconds is the time the removal takes to propagate before any addition."""
+        self._removals.append((boto_fnc, kwargs, proposed_changes))
+        self.settle_seconds = max(self.settle_seconds, settle_seconds)
+
+    def add(self, boto_fnc, proposed_changes: list[ProposedChange], **kwargs):
+        self._additions.append((boto_fnc, kwargs, proposed_changes))
+
+    async def _run(
+        self, writes: list[tuple[Callable, dict, list[ProposedChange]]]
+    ) -> list[list[ProposedChange]]:
+        call = self.write_limiter.call if self.write_limiter else boto_crud_call
+        return await asyncio.gather(
+            *[
+                plugin_apply_wrapper(call(boto_fnc, **kwargs), proposed_changes)
+                for boto_fnc, kwargs, proposed_changes in writes
+            ]
+        )
+
+    async def execute(self) -> list[ProposedChange]:
+        """Run the queued writes and return their changes with any exception seen."""
+        removals, self._removals = self._removals, []
+        additions, self._additions = self._additions, []
+        results = await self._run(removals)
+        if removals and additions and self.settle_seconds:
+            await asyncio.sleep(self.settle_seconds)
+        results.extend(await self._run(additions))
+        self.settle_seconds = 0
+        return list(chain.from_iterable(results))
+
+
 def boto3_retry(f):
     async def wrapper(*args, **kwargs):
         max_retries = kwargs.pop("max_retries", 10)
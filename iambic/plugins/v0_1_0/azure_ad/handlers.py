@@ -7,6 +7,7 @@ from iambic.core.context import ctx
 from iambic.core.iambic_enum import IambicManaged
 from iambic.core.logger import log
 from iambic.core.models import ExecutionMessage
+from iambic.core.telemetry import telemetry
 from iambic.plugins.v0_1_0.azure_ad.group.template_generation import (
     collect_org_groups,
     generate_group_templates,
@@ -47,8 +48,14 @@ async def import_azure_ad_resources(
 
         collector_tasks.extend(
             [
-                collect_org_groups(task_message, config),
-                collect_org_users(task_message, config),
+                telemetry.trace(
+                    collect_org_groups(task_message, config),
+                    provider_id=task_message.provider_id,
+                ),
+                telemetry.trace(
+                    collect_org_users(task_message, config),
+                    provider_id=task_message.provider_id,
+                ),
             ]
         )
 
@@ -66,7 +73,11 @@ async def import_azure_ad_resources(
 
     if base_runner:
         generator_tasks = [
-            generate_group_templates(config, exe_message, base_output_dir),
-            generate_user_templates(config, exe_message, base_output_dir),
+            telemetry.trace(
+                generate_group_templates(config, exe_message, base_output_dir)
+            ),
+            telemetry.trace(
+                generate_user_templates(config, exe_message, base_output_dir)
+            ),
         ]
         await asyncio.gather(*generator_tasks)
@@ -13,6 +13,7 @@ from iambic.core.context import ctx
 from iambic.core.iambic_enum import IambicManaged
 from iambic.core.logger import log
 from iambic.core.models import BaseTemplate, TemplateChangeDetails
+from iambic.core.telemetry import telemetry
 
 if TYPE_CHECKING:  # pragma: no cover
     from iambic.plugins.v0_1_0.azure_ad.iambic_plugin import AzureADConfig
@@ -189,7 +190,13 @@ class AzureADTemplate(BaseTemplate):
             else:
                 log_str = "Detecting changes for resource."
             log.info(log_str, idp_name=azure_ad_organization.idp_name, **log_params)
-            tasks.append(self._apply_to_account(azure_ad_organization))
+            tasks.append(
+                telemetry.trace_apply(
+                    self,
+                    azure_ad_organization.idp_name,
+                    self._apply_to_account(azure_ad_organization),
+                )
+            )
 
         account_changes = list(await asyncio.gather(*tasks))
         template_changes.extend_changes(account_changes)
@@ -26,6 +26,7 @@ from github.Repository import Repository
 import iambic.output.markdown
 from iambic.config.dynamic_config import CURRENT_IAMBIC_VERSION, Config, load_config
 from iambic.config.utils import resolve_config_template_path
+from iambic.core.change_stream import TemplateChangeCounts, read_template_changes
 from iambic.core.context import ctx
 from iambic.core.git import clone_git_repo, get_remote_default_branch
 from iambic.core.iambic_enum import Command
@@ -204,6 +205,10 @@ TRUNCATED_WARNING = (
 )
 BODY_MAX_LENGTH = 65000
 TRUNCATED_BODY_MAX_LENGTH = BODY_MAX_LENGTH - len(TRUNCATED_WARNING)
+# Room is left in every comment for the header and the link to the extended plan details
+PLAN_COMMENT_MAX_LENGTH = BODY_MAX_LENGTH - 1000
+# Chunks past this are only in the extended plan details of the companion repository
+PLAN_COMMENT_MAX_CHUNKS = int(os.getenv("IAMBIC_GITHUB_PLAN_COMMENT_MAX_CHUNKS", 10))
 GIT_APPLY_COMMENT_TEMPLATE = """iambic {iambic_op} ran with:
 
 ```yaml
@@ -579,7 +584,14 @@ def handle_iambic_git_plan(
         else:
             log.debug("git_plan did not introduce linting changes")
 
-        template_changes = run_git_plan(
+        # The plan is streamed to a file so the changes are not all held in memory
+        stream_output = str(
+            pathlib.Path(proposed_changes_path or "proposed_changes.yaml").with_suffix(
+                ".jsonl"
+            )
+        )
+        # The plan output and its json are still written to proposed_changes_path
+        change_counts = run_git_plan(
             proposed_changes_path,
             repo_dir,
             config_path=config_path,
@@ -587,6 +599,7 @@ def handle_iambic_git_plan(
             # I do not want to pay the cost to flag expired resource in a pull request that I am working something else.
             # Let the main branch pay the cost of expiring resources.
             skip_flag_expired_resources_phase=True,
+            stream_output=stream_output,
         )
         _process_template_changes(
             github_client,
@@ -594,8 +607,10 @@ def handle_iambic_git_plan(
             pull_request,
             pull_number,
             proposed_changes_path,
-            template_changes,
+            [],
             "plan",
+            stream_output=stream_output,
+            change_counts=change_counts,
         )
         copy_data_to_data_directory()
         return HandleIssueCommentReturnCode.PLANNED
@@ -777,6 +792,32 @@ def github_app_workflow_wrapper(workflow_func: Callable, ux_op_name: str) -> Cal
     return wrapped_workflow_func
 
 
+def get_plan_comment_chunks(
+    template_changes: list[TemplateChangeDetails],
+    stream_output: str = None,
+    change_counts: TemplateChangeCounts = None,
+) -> list[str]:
+    """
+    Render the changes as markdown chunks that each fit in a PR comment.
+
+    If the plan was streamed to stream_output, the file is read one template at a time
+    instead of using template_changes, along with the change_counts of the stream.
+    """
+    if stream_output and os.path.exists(stream_output):
+        template_changes = read_template_changes(stream_output)
+
+    if change_counts is None:
+        change_counts = TemplateChangeCounts()
+        for template_change in template_changes:
+            change_counts.add(template_change)
+
+    return list(
+        iambic.output.markdown.gh_render_resource_change_chunks(
+            template_changes, change_counts, PLAN_COMMENT_MAX_LENGTH
+        )
+    )
+
+
 def _process_template_changes(
     github_client: github.Github,
     templates_repo: Repository,
@@ -785,11 +826,20 @@ def _process_template_changes(
     proposed_changes_path: str,  # Path where we are sourcing the machine output
     template_changes: list[TemplateChangeDetails],
     op_name: str,  # Examples are "plan", "apply"
+    stream_output: str = None,  # Path the template changes were streamed to
+    change_counts: TemplateChangeCounts = None,  # The counts of the streamed changes
 ):
     html_url = ""
-    if template_changes and len(template_changes) > 0:
-        rendered_content = iambic.output.markdown.gh_render_resource_changes(
-            template_changes
+    if change_counts:
+        has_changes = any(
+            change_counts.dict()[key] for key in ("num_templates", "num_exceptions")
+        )
+    else:
+        has_changes = bool(template_changes)
+
+    if has_changes:
+        rendered_chunks = get_plan_comment_chunks(
+            template_changes, stream_output, change_counts
         )
         html_url = _post_artifact_to_companion_repository(
             github_client,
@@ -797,22 +847,35 @@ def _process_template_changes(
             pull_number,
             op_name,
             proposed_changes_path,
-            rendered_content,
+            "".join(rendered_chunks),
         )
     else:
-        rendered_content = "no changes detected"
+        rendered_chunks = ["no changes detected"]
 
     run_link_fragment = ""
     if html_url:
         run_link_fragment = f"[Extended Plan Details]({html_url})"
 
-    rendered_content = (
-        f"""Reacting to `{op_name}`\n\n{rendered_content}\n\n {run_link_fragment}"""
-    )
-    if pull_request:
-        _post_render_content_as_pr_comment(
-            pull_request, rendered_content, blob_html_url=html_url
+    if len(rendered_chunks) > PLAN_COMMENT_MAX_CHUNKS:
+        log.warning(
+            "Plan has more comment chunks than can be posted.",
+            chunks=len(rendered_chunks),
+            max_chunks=PLAN_COMMENT_MAX_CHUNKS,
         )
+        rendered_chunks = rendered_chunks[:PLAN_COMMENT_MAX_CHUNKS]
+        rendered_chunks[-1] += f"\n\n{TRUNCATED_WARNING}"
+
+    for elem, rendered_content in enumerate(rendered_chunks):
+        part = ""
+        if len(rendered_chunks) > 1:
+            part = f" (part {elem + 1} of {len(rendered_chunks)})"
+        rendered_content = f"""Reacting to `{op_name}`{part}\n\n{rendered_content}"""
+        if elem == len(rendered_chunks) - 1:
+            rendered_content += f"\n\n {run_link_fragment}"
+        if pull_request:
+            _post_render_content_as_pr_comment(
+                pull_request, rendered_content, blob_html_url=html_url
+            )
 
 
 def handle_pull_request(github_client: github.Github, context: dict[str, Any]) -> None:
@@ -8,6 +8,7 @@ import json
 import os
 import tempfile
 import time
+from datetime import datetime
 from functools import cache
 from typing import Any, Callable
 from urllib.parse import urlparse
@@ -156,7 +157,21 @@ def get_app_webhook_secret_as_lambda_context():
     return _get_app_webhook_secret_as_lambda_context_old()
 
 
+# Installation tokens are valid for an hour, a cached token is only reused
+# if it is valid for longer than the longest an event can take to process.
+INSTALLATION_TOKEN_MIN_TTL = int(
+    os.getenv("IAMBIC_GITHUB_INSTALLATION_TOKEN_MIN_TTL", 60 * 20)
+)
+_installation_tokens: dict[tuple[str, str], tuple[str, float]] = {}
+
+
 async def _get_installation_token(app_id, installation_id):
+    cache_key = (str(app_id), str(installation_id))
+    if cached_token := _installation_tokens.get(cache_key):
+        installation_token, expires_at = cached_token
+        if expires_at - time.time() > INSTALLATION_TOKEN_MIN_TTL:
+            return installation_token
+
     encoded_jwt = get_app_bearer_token(get_app_private_key_as_lambda_context(), app_id)
     access_tokens_url = (
         f"https://api.github.com/app/installations/{installation_id}/access_tokens"
@@ -169,6 +184,13 @@ async def _get_installation_token(app_id, installation_id):
         async with session.post(access_tokens_url, headers=headers) as resp:
             payload = json.loads(await resp.text())
             installation_token = payload["token"]
+            if expires_at := payload.get("expires_at"):
+                _installation_tokens[cache_key] = (
+                    installation_token,
+                    datetime.fromisoformat(
+                        expires_at.replace("Z", "+00:00")
+                    ).timestamp(),
+                )
             return installation_token
 
 
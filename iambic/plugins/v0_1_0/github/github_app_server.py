@@ -0,0 +1,162 @@
+"""
+Runs the GitHub app as a long-running process, e.g. on ECS, instead of a Lambda function per event.
+
+Usage:
+    python -m iambic.plugins.v0_1_0.github.github_app_server
+
+Webhooks are posted to / and scheduled commands, e.g. {"command": "detect"}, to /events.
+Both must be signed with the webhook secret in the x-hub-signature-256 header.
+Events are acknowledged as soon as they are queued and processed one at a time by run_handler.
+Unlike the Lambda function the config, AWS sessions, installation tokens and git mirrors
+are kept between events. The config is only loaded again once the config file changes.
+"""
+from __future__ import annotations
+
+import os
+import queue
+import shutil
+import tempfile
+import threading
+from typing import Optional
+
+from aiohttp import web
+
+import iambic.core.utils
+from iambic.config.dynamic_config import config_cache
+from iambic.core.git import git_mirrors
+from iambic.core.logger import log
+from iambic.plugins.v0_1_0.github.github_app import (
+    iambic_app,
+    lower_case_all_header_keys,
+    run_handler,
+    verify_signature,
+)
+
+GITHUB_APP_SERVER_HOST = os.getenv("IAMBIC_GITHUB_APP_SERVER_HOST", "0.0.0.0")
+GITHUB_APP_SERVER_PORT = int(os.getenv("IAMBIC_GITHUB_APP_SERVER_PORT", 8080))
+GITHUB_APP_SERVER_QUEUE_SIZE = int(
+    os.getenv("IAMBIC_GITHUB_APP_SERVER_QUEUE_SIZE", 100)
+)
+
+routes = web.RouteTableDef()
+
+
+class GithubAppEventQueue:
+    """
+    Processes the queued events in order on a single worker thread.
+
+    Each event runs in its own temporary directory which is removed once the event has been processed.
+    """
+
+    def __init__(self, maxsize: int = GITHUB_APP_SERVER_QUEUE_SIZE):
+        self.queue: queue.Queue[Optional[dict]] = queue.Queue(maxsize)
+        self.working_directory = os.getcwd()
+        self._worker: Optional[threading.Thread] = None
+
+    def put(self, event: dict) -> bool:
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except queue.Full:
+            return False
+
+    def process(self, event: dict):
+        with tempfile.TemporaryDirectory(prefix="iambic-event") as event_directory:
+            # run_handler expects a fresh repo dir and creates temp dirs it never removes
+            shutil.rmtree(
+                getattr(iambic_app, "lambda").app.REPO_BASE_PATH, ignore_errors=True
+            )
+            default_temp_directory = tempfile.tempdir
+            tempfile.tempdir = event_directory
+            try:
+                run_handler(event)
+            except Exception as err:
+                log.exception("Unable to process GitHub app event.", error=str(err))
+            finally:
+                tempfile.tempdir = default_temp_directory
+                os.chdir(self.working_directory)
+
+    def _run(self):
+        while (event := self.queue.get()) is not None:
+            try:
+                self.process(event)
+            finally:
+                self.queue.task_done()
+        self.queue.task_done()
+
+    def start(self):
+        config_cache.enabled = True
+        git_mirrors.enabled = True
+        iambic.core.utils.init_writable_directory()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def stop(self):
+        if self._worker:
+            self.queue.put(None)
+            self._worker.join()
+            self._worker = None
+        config_cache.enabled = False
+        config_cache.clear()
+        git_mirrors.enabled = False
+
+
+github_app_event_queue = GithubAppEventQueue()
+
+
+def _is_signed(headers: dict, body: str) -> bool:
+    try:
+        # the format is in sha256=<sig>
+        verify_signature(headers["x-hub-signature-256"].split("=")[1], body)
+        return True
+    except Exception:
+        return False
+
+
+def _queue_event(event: dict) -> web.Response:
+    if not github_app_event_queue.put(event):
+        return web.json_response({"error": "queue is full"}, status=503)
+    return web.json_response(
+        {"queued": github_app_event_queue.queue.qsize()}, status=202
+    )
+
+
+@routes.post("/")
+async def webhook(request: web.Request) -> web.Response:
+    body = await request.text()
+    headers = lower_case_all_header_keys(request.headers)
+    if not _is_signed(headers, body):
+        return web.json_response({"error": "bad signature"}, status=401)
+    return _queue_event({"headers": headers, "rawBody": body})
+
+
+@routes.post("/events")
+async def scheduled_event(request: web.Request) -> web.Response:
+    body = await request.text()
+    if not _is_signed(lower_case_all_header_keys(request.headers), body):
+        return web.json_response({"error": "bad signature"}, status=401)
+    event = await request.json()
+    return _queue_event({**event, "source": "EventBridgeCron"})
+
+
+@routes.get("/healthz")
+async def healthz(request: web.Request) -> web.Response:
+    return web.json_response({"queued": github_app_event_queue.queue.qsize()})
+
+
+def get_app() -> web.Application:
+    app = web.Application()
+    app.add_routes(routes)
+    return app
+
+
+def run_server(host: str = GITHUB_APP_SERVER_HOST, port: int = GITHUB_APP_SERVER_PORT):
+    github_app_event_queue.start()
+    try:
+        web.run_app(get_app(), host=host, port=port, print=False)
+    finally:
+        github_app_event_queue.stop()
+
+
+if __name__ == "__main__":
+    run_server()
@@ -7,6 +7,7 @@ from iambic.core.context import ctx
 from iambic.core.iambic_enum import IambicManaged
 from iambic.core.logger import log
 from iambic.core.models import ExecutionMessage
+from iambic.core.telemetry import telemetry
 from iambic.plugins.v0_1_0.google_workspace.group.template_generation import (
     collect_project_groups,
     generate_group_templates,
@@ -46,8 +47,18 @@ async def import_google_resources(
 
         task_message = exe_message.copy()
         task_message.provider_id = workspace.project_id
-        collector_tasks.append(collect_project_groups(task_message, config))
-        collector_tasks.append(collect_project_users(task_message, config))
+        collector_tasks.append(
+            telemetry.trace(
+                collect_project_groups(task_message, config),
+                provider_id=task_message.provider_id,
+            )
+        )
+        collector_tasks.append(
+            telemetry.trace(
+                collect_project_users(task_message, config),
+                provider_id=task_message.provider_id,
+            )
+        )
 
     if collector_tasks:
         if base_runner and ctx.use_remote and remote_worker and not messages:
@@ -63,7 +74,11 @@ async def import_google_resources(
 
     if base_runner:
         generator_tasks = [
-            generate_group_templates(exe_message, config, base_output_dir),
-            generate_user_templates(exe_message, config, base_output_dir),
+            telemetry.trace(
+                generate_group_templates(exe_message, config, base_output_dir)
+            ),
+            telemetry.trace(
+                generate_user_templates(exe_message, config, base_output_dir)
+            ),
         ]
         await asyncio.gather(*generator_tasks)
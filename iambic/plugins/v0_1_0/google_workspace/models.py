@@ -12,6 +12,7 @@ from iambic.core.models import (
     ExpiryModel,
     TemplateChangeDetails,
 )
+from iambic.core.telemetry import telemetry
 
 if TYPE_CHECKING:
     from iambic.plugins.v0_1_0.google_workspace.iambic_plugin import (
@@ -117,7 +118,13 @@ class GoogleTemplate(BaseTemplate, ExpiryModel):
             else:
                 log_str = "Detecting changes for resource."
             log.info(log_str, **log_params)
-            tasks.append(self._apply_to_account(account))
+            tasks.append(
+                telemetry.trace_apply(
+                    self,
+                    account.project_id,
+                    self._apply_to_account(account),
+                )
+            )
 
         account_changes = await asyncio.gather(*tasks)
         template_changes.proposed_changes = [
@@ -19,6 +19,7 @@ from iambic.core.models import (
     ProposedChangeType,
     TemplateChangeDetails,
 )
+from iambic.core.telemetry import telemetry
 from iambic.plugins.v0_1_0.okta.group.utils import (
     create_group,
     get_group,
@@ -168,7 +169,13 @@ class OktaGroupTemplate(BaseTemplate, ExpiryModel):
             else:
                 log_str = "Detecting changes for resource."
             log.info(log_str, idp_name=okta_organization.idp_name, **log_params)
-            tasks.append(self._apply_to_account(okta_organization))
+            tasks.append(
+                telemetry.trace_apply(
+                    self,
+                    okta_organization.idp_name,
+                    self._apply_to_account(okta_organization),
+                )
+            )
 
         account_changes = await asyncio.gather(*tasks)
         template_changes.proposed_changes = [
@@ -7,6 +7,7 @@ from iambic.core.context import ctx
 from iambic.core.iambic_enum import IambicManaged
 from iambic.core.logger import log
 from iambic.core.models import ExecutionMessage
+from iambic.core.telemetry import telemetry
 from iambic.plugins.v0_1_0.okta.app.template_generation import (
     collect_org_apps,
     generate_app_templates,
@@ -36,7 +37,7 @@ async def import_okta_resources(
     remote_worker=None,
 ):
     base_runner = bool(not exe_message.provider_id)
-    collector_tasks = []
+    task_messages = []
 
     for organization in config.organizations:
         if organization.iambic_managed == IambicManaged.DISABLED:
@@ -48,31 +49,47 @@ async def import_okta_resources(
 
         task_message = exe_message.copy()
         task_message.provider_id = organization.idp_name
+        task_messages.append(task_message)
 
-        collector_tasks.extend(
-            [
-                collect_org_apps(task_message, config),
-                collect_org_groups(task_message, config),
-                collect_org_users(task_message, config),
-            ]
-        )
-
-    if collector_tasks:
+    if task_messages:
         if base_runner and ctx.use_remote and remote_worker and not messages:
-            # TODO: Update to use the remote_worker
-            await asyncio.gather(*collector_tasks)
-            # TODO: Add a process to gather status messages from the remote worker
+            # Each worker collects a single organization
+            await remote_worker.run(task_messages, base_output_dir=base_output_dir)
         else:
-            if remote_worker:
+            if remote_worker and not ctx.use_remote:
                 log.warning(
                     "The remote worker definition must be defined in the config to run remote execution."
                 )
+            collector_tasks = []
+            for task_message in task_messages:
+                collector_tasks.extend(
+                    [
+                        telemetry.trace(
+                            collect_org_apps(task_message, config),
+                            provider_id=task_message.provider_id,
+                        ),
+                        telemetry.trace(
+                            collect_org_groups(task_message, config),
+                            provider_id=task_message.provider_id,
+                        ),
+                        telemetry.trace(
+                            collect_org_users(task_message, config),
+                            provider_id=task_message.provider_id,
+                        ),
+                    ]
+                )
             await asyncio.gather(*collector_tasks)
 
     if base_runner:
         generator_tasks = [
-            generate_app_templates(config, exe_message, base_output_dir),
-            generate_group_templates(config, exe_message, base_output_dir),
-            generate_user_templates(config, exe_message, base_output_dir),
+            telemetry.trace(
+                generate_app_templates(config, exe_message, base_output_dir)
+            ),
+            telemetry.trace(
+                generate_group_templates(config, exe_message, base_output_dir)
+            ),
+            telemetry.trace(
+                generate_user_templates(config, exe_message, base_output_dir)
+            ),
         ]
         await asyncio.gather(*generator_tasks)
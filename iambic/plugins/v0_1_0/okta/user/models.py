@@ -19,6 +19,7 @@ from iambic.core.models import (
     ProposedChangeType,
     TemplateChangeDetails,
 )
+from iambic.core.telemetry import telemetry
 from iambic.core.utils import NoqSemaphore
 from iambic.plugins.v0_1_0.okta.models import User, UserStatus
 from iambic.plugins.v0_1_0.okta.user.utils import (
@@ -110,7 +111,13 @@ class OktaUserTemplate(BaseTemplate, ExpiryModel):
             else:
                 log_str = "Detecting changes for resource."
             log.info(log_str, idp_name=okta_organization.idp_name, **log_params)
-            tasks.append(self._apply_to_account(okta_organization))
+            tasks.append(
+                telemetry.trace_apply(
+                    self,
+                    okta_organization.idp_name,
+                    self._apply_to_account(okta_organization),
+                )
+            )
 
         account_changes = await asyncio.gather(*tasks)
         template_changes.proposed_changes = [
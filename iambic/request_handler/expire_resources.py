@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-import asyncio
+from datetime import datetime, timezone
 from typing import Type
 
+from iambic.core.expiry_index import expiry_index
 from iambic.core.logger import log
 from iambic.core.models import BaseTemplate
 from iambic.core.parser import load_templates
-from iambic.core.utils import remove_expired_resources
+from iambic.core.utils import flag_expired_resources_in_model
 
 
 async def flag_expired_resources(
@@ -16,16 +17,22 @@ async def flag_expired_resources(
     # Warning: The dynamic config must be loaded before this is called.
     #   This is done using iambic.config.dynamic_config.load_config(config_path)
     log.info("Scanning for expired resources")
-    templates = await asyncio.gather(
-        *[
-            remove_expired_resources(
-                template, template.resource_type, template.resource_id
-            )
-            for template in load_templates(template_paths, template_map)
-        ]
-    )
+    now = datetime.now(tz=timezone.utc)
+    # Templates indexed since they were last written are only loaded if something expired.
+    # Any other template is loaded, flagged and written so it's indexed for the next sweep.
+    template_paths = [
+        template_path
+        for template_path in template_paths
+        if not expiry_index.is_indexed(template_path)
+        or expiry_index.has_expired(template_path, now)
+    ]
 
-    for template in templates:
-        template.write(exclude_none=True, exclude_unset=True, exclude_defaults=True)
+    if template_paths:
+        for template in load_templates(template_paths, template_map):
+            flag_expired_resources_in_model(
+                template, template.resource_type, template.resource_id, now=now
+            )
+            template.write(exclude_none=True, exclude_unset=True, exclude_defaults=True)
+        expiry_index.save()
 
-    log.info("Expired resource scan complete.")
+    log.info("Expired resource scan complete.", templates_loaded=len(template_paths))
@@ -15,7 +15,12 @@ from iambic.core.git import (
 )
 from iambic.core.iambic_enum import Command
 from iambic.core.logger import log
-from iambic.core.models import BaseTemplate, ExecutionMessage, TemplateChangeDetails
+from iambic.core.models import (
+    BaseTemplate,
+    ExecutionMessage,
+    TemplateChangeDetails,
+    template_deletions,
+)
 from iambic.core.parser import load_templates
 from iambic.request_handler.expire_resources import flag_expired_resources
 
@@ -187,18 +192,20 @@ def commit_deleted_templates(
         template.file_path: template for template in templates if template.deleted
     }
 
-    for template_detail in details:
-        if template_detail.template_path in deleted_template_path_to_template:
-            if template_detail.exceptions_seen:
-                log_params = {"path": template_detail.template_path}
-                log.error(
-                    "add_commits_from_delete_templates cannot be deleted due to exceptions in apply",
-                    **log_params,
-                )
-            else:
-                deleted_template_path_to_template[
-                    template_detail.template_path
-                ].delete()
+    # Remove every deleted template from the index in one batch
+    with template_deletions.batch():
+        for template_detail in details:
+            if template_detail.template_path in deleted_template_path_to_template:
+                if template_detail.exceptions_seen:
+                    log_params = {"path": template_detail.template_path}
+                    log.error(
+                        "add_commits_from_delete_templates cannot be deleted due to exceptions in apply",
+                        **log_params,
+                    )
+                else:
+                    deleted_template_path_to_template[
+                        template_detail.template_path
+                    ].delete()
 
     diff_list = repo.head.commit.diff()
     if len(diff_list) > 0:
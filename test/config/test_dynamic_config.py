@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import pathlib
+from types import SimpleNamespace
 from typing import Any
 
 import pytest
@@ -8,12 +9,19 @@ import yaml
 
 from iambic.config.dynamic_config import (
     Config,
+    ConfigCache,
     ExtendsConfig,
     ExtendsConfigKey,
+    PluginDefinition,
+    PluginType,
+    get_plugin_defs_to_load,
     init_plugins,
+    load_config,
 )
 from iambic.core.iambic_enum import Command
 from iambic.core.models import ExecutionMessage
+from iambic.plugins.v0_1_0 import PLUGIN_VERSION
+from iambic.plugins.v0_1_0.aws.models import AWSAccount
 
 
 @pytest.mark.asyncio
@@ -85,3 +93,90 @@ async def test_run_import(test_config, test_config_path_two_accounts_plus_org):
     )
     config_path = pathlib.Path(test_config_path_two_accounts_plus_org)
     await test_config.run_import(execution_message, config_path.parent)
+
+
+def test_get_plugin_defs_to_load():
+    custom_plugin = PluginDefinition(
+        type=PluginType.DIRECTORY_PATH,
+        location="/opt/iambic/plugins/custom",
+        version=PLUGIN_VERSION,
+    )
+    plugin_defs = Config.__fields__["plugins"].default + [custom_plugin]
+
+    plugin_defs_to_load = get_plugin_defs_to_load(
+        plugin_defs, {"version": "1", "aws": {}}
+    )
+    assert [pathlib.Path(x.location).name for x in plugin_defs_to_load] == [
+        "aws",
+        "custom",
+    ]
+
+    # The extended source may define any plugin so nothing is skipped
+    assert (
+        get_plugin_defs_to_load(
+            plugin_defs, {"aws": {}, "extends": [{"key": "LOCAL_FILE"}]}
+        )
+        == plugin_defs
+    )
+
+
+@pytest.mark.asyncio
+async def test_load_config_uses_config_cache(tmp_path, monkeypatch):
+    config_cache = ConfigCache()
+    monkeypatch.setattr(
+        "iambic.config.dynamic_config.config_cache", config_cache, raising=True
+    )
+    config_body = f"template_type: NOQ::Core::Config\nversion: '{PLUGIN_VERSION}'\n"
+    config_paths = [tmp_path / "config.yaml", tmp_path / "other_config.yaml"]
+    for config_path in config_paths:
+        config_path.write_text(config_body)
+
+    # Disabled unless a long-running process enables it
+    assert await load_config(config_paths[0], configure_plugins=False) is not (
+        await load_config(config_paths[0], configure_plugins=False)
+    )
+
+    config_cache.enabled = True
+    config = await load_config(config_paths[0], configure_plugins=False)
+    cached_config = await load_config(config_paths[1], configure_plugins=False)
+    assert cached_config is config
+    assert cached_config.file_path == str(config_paths[1])
+
+    config_paths[1].write_text(f"{config_body}extends: []\n")
+    assert await load_config(config_paths[1], configure_plugins=False) is not config
+
+
+@pytest.mark.asyncio
+async def test_config_cache_rebuilds_sessions_once_expired(tmp_path, monkeypatch):
+    config_cache = ConfigCache()
+    config_cache.enabled = True
+    monkeypatch.setattr(
+        "iambic.config.dynamic_config.config_cache", config_cache, raising=True
+    )
+
+    async def process_config(base_config, config_path, *args, **kwargs):
+        # Stands in for a config with the AWS plugin configured
+        return SimpleNamespace(
+            file_path=config_path,
+            aws=SimpleNamespace(
+                accounts=[AWSAccount(account_id="123456789012", account_name="dev")]
+            ),
+        )
+
+    monkeypatch.setattr(
+        "iambic.config.dynamic_config.process_config", process_config, raising=True
+    )
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(
+        f"template_type: NOQ::Core::Config\nversion: '{PLUGIN_VERSION}'\n"
+    )
+
+    config = await load_config(config_path)
+    config.aws.accounts[0].boto3_session_map = {"us-east-1": "assumed role session"}
+    assert await load_config(config_path) is config
+
+    # The sessions are rebuilt along with the config before their credentials expire
+    config_cache._loaded_at -= config_cache.ttl + 1
+    reloaded_config = await load_config(config_path)
+    assert reloaded_config is not config
+    assert not reloaded_config.aws.accounts[0].boto3_session_map
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from iambic.core.change_stream import (
+    TemplateChangeCounts,
+    TemplateChangeStream,
+    read_template_changes,
+)
+from iambic.core.models import (
+    AccountChangeDetails,
+    ProposedChange,
+    ProposedChangeType,
+    TemplateChangeDetails,
+)
+from iambic.core.utils import yaml
+from iambic.output.models import ActionSummaries
+
+
+def get_template_changes() -> list[TemplateChangeDetails]:
+    return [
+        TemplateChangeDetails(
+            resource_id="role",
+            resource_type="aws:iam:role",
+            template_path="resources/aws/role.yaml",
+            proposed_changes=[
+                AccountChangeDetails(
+                    account=account,
+                    resource_id="role",
+                    current_value={"description": "before"},
+                    new_value={"description": "after"},
+                    proposed_changes=[
+                        ProposedChange(
+                            change_type=ProposedChangeType.UPDATE,
+                            resource_id="role",
+                            resource_type="aws:iam:role",
+                            attribute="description",
+                            current_value="before",
+                            new_value="after",
+                        )
+                    ],
+                )
+                for account in ("dev", "prod")
+            ],
+            exceptions_seen=[
+                AccountChangeDetails(
+                    account="staging",
+                    resource_id="role",
+                    exceptions_seen=[
+                        ProposedChange(
+                            change_type=ProposedChangeType.UPDATE,
+                            resource_id="role",
+                            exceptions_seen=["AccessDenied"],
+                        )
+                    ],
+                )
+            ],
+        ),
+        TemplateChangeDetails(
+            resource_id="group",
+            resource_type="okta:group",
+            template_path="resources/okta/group.yaml",
+            proposed_changes=[
+                ProposedChange(
+                    change_type=ProposedChangeType.CREATE,
+                    resource_id="group",
+                    resource_type="okta:group",
+                    new_value={"name": "group"},
+                )
+            ],
+        ),
+        TemplateChangeDetails(
+            resource_id="unchanged",
+            resource_type="okta:group",
+            template_path="resources/okta/unchanged.yaml",
+        ),
+    ]
+
+
+def test_template_change_counts_match_action_summaries():
+    template_changes = get_template_changes()
+    change_counts = TemplateChangeCounts()
+    for template_change in template_changes:
+        change_counts.add(template_change)
+
+    action_summaries = ActionSummaries.compile(template_changes)
+    assert change_counts.dict() == {
+        key: getattr(action_summaries, key) for key in change_counts.dict()
+    }
+    assert change_counts.dict()["num_update_actions"] == 2
+    assert change_counts.dict()["num_accounts"] == 3
+    assert change_counts.has_changes
+
+
+def test_template_change_counts_with_only_exceptions():
+    change_counts = TemplateChangeCounts()
+    assert not change_counts.has_changes
+
+    change_counts.add(
+        TemplateChangeDetails(
+            resource_id="role",
+            resource_type="aws:iam:role",
+            template_path="resources/aws/role.yaml",
+            exceptions_seen=get_template_changes()[0].exceptions_seen,
+        )
+    )
+    assert change_counts.dict()["num_templates"] == 0
+    assert change_counts.dict()["num_exceptions"] == 1
+    assert change_counts.has_changes
+
+
+@pytest.mark.parametrize(
+    "file_name", ["proposed_changes.jsonl", "proposed_changes.yaml"]
+)
+def test_template_change_stream(tmp_path, file_name):
+    template_change_stream = TemplateChangeStream()
+    file_path = str(tmp_path / file_name)
+    template_changes = get_template_changes()
+
+    # Nothing is written unless the stream is open
+    assert template_change_stream.write(template_changes[0]) is template_changes[0]
+
+    with template_change_stream.open(file_path):
+        written_changes = [
+            template_change_stream.write(template_change)
+            for template_change in template_changes
+        ]
+
+    with open(file_path) as f:
+        if file_name.endswith(".yaml"):
+            streamed_changes = list(yaml.load_all(f))
+        else:
+            streamed_changes = [json.loads(line) for line in f]
+
+    # Templates without changes are not written
+    assert [change["resource_id"] for change in streamed_changes] == ["role", "group"]
+    assert [
+        template_change.dict() for template_change in read_template_changes(file_path)
+    ] == [TemplateChangeDetails.parse_obj(change).dict() for change in streamed_changes]
+    assert streamed_changes[0]["proposed_changes"][0]["new_value"] == {
+        "description": "after"
+    }
+    # Only the counters and the exceptions without their values are kept once a change is written
+    assert not written_changes[0].proposed_changes
+    assert written_changes[0].exceptions_seen[0].account == "staging"
+    assert written_changes[0].template_path == "resources/aws/role.yaml"
+    assert not written_changes[1].exceptions_seen
+    assert template_change_stream.counts.dict()["num_create_actions"] == 1
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+import iambic.plugins.v0_1_0.aws.models
+from iambic.core.context import ctx
+from iambic.core.drift import DriftFingerprintStore
+from iambic.core.models import AccountChangeDetails, rendered_resources
+from iambic.plugins.v0_1_0.aws.iam.role.models import AwsIamRoleTemplate
+from iambic.plugins.v0_1_0.aws.iambic_plugin import AWSConfig
+from iambic.plugins.v0_1_0.aws.models import AWSAccount
+
+
+@pytest.fixture
+def role_template(tmp_path) -> AwsIamRoleTemplate:
+    return AwsIamRoleTemplate(
+        identifier="{{var.account_name}}_drift_role",
+        file_path=str(tmp_path / "drift_role.yaml"),
+        properties={
+            "role_name": "{{var.account_name}}_drift_role",
+            "assume_role_policy_document": {"statement": []},
+        },
+    )
+
+
+@pytest.fixture
+def drift_store(tmp_path) -> DriftFingerprintStore:
+    store = DriftFingerprintStore(file_path=str(tmp_path / "fingerprints.json"))
+    store.enabled = True
+    return store
+
+
+def test_is_current_after_record(
+    drift_store: DriftFingerprintStore,
+    role_template: AwsIamRoleTemplate,
+    aws_accounts: list[AWSAccount],
+):
+    aws_account = aws_accounts[0]
+    assert not drift_store.is_current(role_template, aws_account)
+
+    drift_store.record(role_template, aws_account)
+    assert drift_store.is_current(role_template, aws_account)
+    assert not drift_store.is_current(role_template, aws_accounts[1])
+
+
+def test_template_change_is_not_current(
+    drift_store: DriftFingerprintStore,
+    role_template: AwsIamRoleTemplate,
+    aws_accounts: list[AWSAccount],
+):
+    aws_account = aws_accounts[0]
+    drift_store.record(role_template, aws_account)
+    role_template.properties.description = "changed"
+    assert not drift_store.is_current(role_template, aws_account)
+
+
+def test_disabled_and_expired_are_not_current(
+    drift_store: DriftFingerprintStore,
+    role_template: AwsIamRoleTemplate,
+    aws_accounts: list[AWSAccount],
+):
+    aws_account = aws_accounts[0]
+    drift_store.record(role_template, aws_account)
+
+    drift_store.enabled = False
+    assert not drift_store.is_current(role_template, aws_account)
+
+    drift_store.enabled = True
+    entry = drift_store.fingerprints[drift_store.get_key(role_template, aws_account)]
+    entry["applied_at"] = time.time() - drift_store.ttl - 1
+    assert not drift_store.is_current(role_template, aws_account)
+
+
+def test_invalidate_by_change_signal(
+    drift_store: DriftFingerprintStore,
+    role_template: AwsIamRoleTemplate,
+    aws_accounts: list[AWSAccount],
+):
+    aws_account = aws_accounts[0]
+    drift_store.record(role_template, aws_account)
+
+    assert drift_store.invalidate(aws_account.account_id, "some_other_role") == 0
+    assert drift_store.invalidate(aws_account.account_id, "dev1_drift_role") == 1
+    assert not drift_store.is_current(role_template, aws_account)
+
+
+def test_save_and_reload(
+    drift_store: DriftFingerprintStore,
+    role_template: AwsIamRoleTemplate,
+    aws_accounts: list[AWSAccount],
+):
+    aws_account = aws_accounts[0]
+    drift_store.record(role_template, aws_account)
+    drift_store.save()
+
+    reloaded_store = DriftFingerprintStore(file_path=drift_store.file_path)
+    reloaded_store.enabled = True
+    assert reloaded_store.is_current(role_template, aws_account)
+
+
+@pytest.mark.asyncio
+async def test_apply_renders_once_per_account(
+    drift_store: DriftFingerprintStore,
+    role_template: AwsIamRoleTemplate,
+    aws_accounts: list[AWSAccount],
+    monkeypatch,
+    mocker,
+):
+    monkeypatch.setattr(
+        iambic.plugins.v0_1_0.aws.models, "drift_fingerprints", drift_store
+    )
+    monkeypatch.setattr(ctx, "eval_only", False)
+    aws_accounts = aws_accounts[:2]
+    for aws_account in aws_accounts:
+        drift_store.record(role_template, aws_account)
+    # The fingerprints are out of date so is_current has to render the template
+    role_template.properties.description = "changed"
+
+    async def _apply_to_account(self, aws_account, **kwargs):
+        # Creating sessions modifies the account but not the template
+        aws_account.boto3_session_map = {}
+        return AccountChangeDetails(
+            account=str(aws_account),
+            resource_id=self.resource_id,
+            new_value=self.apply_resource_dict(aws_account),
+        )
+
+    monkeypatch.setattr(AwsIamRoleTemplate, "_apply_to_account", _apply_to_account)
+    render_spy = mocker.spy(AwsIamRoleTemplate, "_apply_resource_dict")
+
+    with rendered_resources.batch():
+        await role_template.apply(AWSConfig(accounts=aws_accounts))
+
+    # Rendered by is_current and reused by the apply and by record
+    assert render_spy.call_count == len(aws_accounts)
+    assert all(
+        drift_store.is_current(role_template, aws_account)
+        for aws_account in aws_accounts
+    )
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+import iambic.core.executor
+import iambic.plugins.v0_1_0.example
+from iambic.core.executor import Executor, SQLiteExecutionQueue, merge_template_changes
+from iambic.core.iambic_enum import Command, ExecutionStatus
+from iambic.core.models import (
+    ExecutionMessage,
+    ExecutionResponse,
+    ProposedChangeType,
+    TemplateChangeDetails,
+)
+from iambic.plugins.v0_1_0.example.local_file.models import ExampleLocalFileTemplate
+
+TEST_CONFIG_YAML = """template_type: NOQ::Core::Config
+version: '1'
+
+plugins:
+  - type: DIRECTORY_PATH
+    location: {example_plugin_location}
+    version: v0_1_0
+example:
+  random: 1
+"""
+
+
+@pytest.fixture
+def example_config_path(tmp_path) -> str:
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(
+        TEST_CONFIG_YAML.format(
+            example_plugin_location=iambic.plugins.v0_1_0.example.__path__[0]
+        )
+    )
+    return str(config_path)
+
+
+def get_template(tmp_path, name: str) -> ExampleLocalFileTemplate:
+    return ExampleLocalFileTemplate(
+        name=name,
+        file_path=str(tmp_path / f"{name}.yaml"),
+        properties={"name": name},
+    )
+
+
+def test_sqlite_execution_queue(tmp_path):
+    execution_queue = SQLiteExecutionQueue(str(tmp_path / "queue.db"))
+    execution_queue.put_task({"task_id": "1", "run_id": "run"})
+    execution_queue.put_task({"task_id": "2", "run_id": "run"})
+    assert execution_queue.get_task_count("run") == 2
+
+    # Another handle on the same file sees the same queue
+    worker_queue = SQLiteExecutionQueue(execution_queue.file_path)
+    assert worker_queue.get_task(0) == {"task_id": "1", "run_id": "run"}
+    assert execution_queue.get_task(0) == {"task_id": "2", "run_id": "run"}
+    assert worker_queue.get_task(0) is None
+    assert execution_queue.get_task_count("run") == 0
+
+    # Results are only returned to their own run
+    worker_queue.put_result({"task_id": "0", "run_id": "stale"})
+    worker_queue.put_result({"task_id": "1", "run_id": "run"})
+    assert execution_queue.get_result("run", 0) == {"task_id": "1", "run_id": "run"}
+    assert execution_queue.get_result("run", 0) is None
+
+    # Only rows older than the max age are stale, those of runs in progress are kept
+    worker_queue.put_task({"task_id": "3", "run_id": "other"})
+    execution_queue.purge_stale(60)
+    assert execution_queue.get_task_count("other") == 1
+    execution_queue.purge("other")
+    assert execution_queue.get_task_count("other") == 0
+    execution_queue.purge_stale(0)
+    assert execution_queue.get_result("stale", 0) is None
+
+
+@pytest.mark.asyncio
+async def test_executor_fails_fast_without_workers(
+    tmp_path, example_config_path, monkeypatch
+):
+    monkeypatch.setattr(iambic.core.executor, "EXECUTOR_CLAIM_TIMEOUT", 0)
+    execution_queue = SQLiteExecutionQueue(str(tmp_path / "queue.db"))
+    # Left behind by a run that crashed
+    execution_queue.put_task({"task_id": "stale", "run_id": "crashed"})
+    with closing(sqlite3.connect(execution_queue.file_path)) as conn:
+        conn.execute("UPDATE tasks SET created_at = 0")
+        conn.commit()
+    executor = Executor(example_config_path, execution_queue, processes=0)
+    exe_message = ExecutionMessage(
+        execution_id="test",
+        command=Command.APPLY,
+        provider_type="example",
+        provider_id="a",
+    )
+
+    responses = await executor.run([exe_message], templates=[])
+
+    assert len(responses) == 1
+    assert responses[0].status == ExecutionStatus.FAILED
+    assert responses[0].errors == ["Execution task did not complete."]
+    # Neither the stale task nor the unclaimed task is left for a worker to pick up
+    assert execution_queue.get_task(0) is None
+
+
+@pytest.mark.asyncio
+async def test_executor_apply(tmp_path, example_config_path):
+    executor = Executor(
+        example_config_path,
+        SQLiteExecutionQueue(str(tmp_path / "queue.db")),
+        processes=2,
+    )
+    templates = [get_template(tmp_path, "one"), get_template(tmp_path, "two")]
+    shard_templates = {"a": templates, "b": templates[:1]}
+    exe_messages = [
+        ExecutionMessage(
+            execution_id="test",
+            command=Command.APPLY,
+            provider_type="example",
+            provider_id=provider_id,
+        )
+        for provider_id in ("a", "b")
+    ]
+
+    try:
+        responses = await executor.run(exe_messages, templates=shard_templates)
+    finally:
+        executor.stop()
+
+    assert sorted(response.provider_id for response in responses) == ["a", "b"]
+    assert all(response.status == ExecutionStatus.SUCCEEDED for response in responses)
+
+    template_changes = merge_template_changes(templates, responses)
+    assert len(template_changes) == 2
+    # One change per shard the template was sent to
+    assert {
+        template_change.resource_id: [
+            proposed_change.change_type
+            for proposed_change in template_change.proposed_changes
+        ]
+        for template_change in template_changes
+    } == {
+        templates[0].resource_id: [ProposedChangeType.DELETE] * 2,
+        templates[1].resource_id: [ProposedChangeType.DELETE],
+    }
+
+
+def test_merge_template_changes_reports_failed_shards(tmp_path):
+    template = get_template(tmp_path, "one")
+    exe_message = ExecutionMessage(
+        execution_id="test", command=Command.APPLY, provider_type="example"
+    )
+    responses = [
+        ExecutionResponse(
+            **exe_message.dict(exclude={"provider_id"}),
+            provider_id="a",
+            status=ExecutionStatus.SUCCEEDED,
+            template_changes=[
+                TemplateChangeDetails(
+                    resource_id=template.resource_id,
+                    resource_type=template.resource_type,
+                    template_path=template.file_path,
+                )
+            ],
+        ),
+        ExecutionResponse(
+            **exe_message.dict(exclude={"provider_id"}),
+            provider_id="b",
+            status=ExecutionStatus.FAILED,
+            errors=["boom"],
+        ),
+    ]
+
+    template_changes = merge_template_changes([template], responses)
+    assert len(template_changes) == 1
+    assert not template_changes[0].proposed_changes
+    assert template_changes[0].exceptions_seen[0].account == "b"
+    assert template_changes[0].exceptions_seen[0].exceptions_seen[
+        0
+    ].exceptions_seen == ["boom"]
+
+    # A failed shard is only reported on the templates it was sent
+    other_template = get_template(tmp_path, "two")
+    template_changes = merge_template_changes(
+        {"a": [template, other_template], "b": [other_template]}, responses
+    )
+    assert [template_change.resource_id for template_change in template_changes] == [
+        other_template.resource_id
+    ]
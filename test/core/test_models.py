@@ -5,18 +5,33 @@ import os
 import shutil
 import tempfile
 from datetime import date, datetime, timezone
+from pathlib import Path
 
 import git
 import pytest
 import pytz
 from git.diff import Diff
+from pydantic import ValidationError
 
 import iambic.plugins.v0_1_0.example
 from iambic.config.dynamic_config import load_config
 from iambic.core.iambic_enum import IambicManaged
-from iambic.core.models import BaseTemplate, ExpiryModel, strip_out_variables
+from iambic.core.models import (
+    AccountChangeDetails,
+    BaseTemplate,
+    ExpiryModel,
+    ProposedChange,
+    ProposedChangeType,
+    TemplateChangeDetails,
+    rendered_resources,
+    strip_out_variables,
+    template_deletions,
+    template_write_stats,
+)
 from iambic.core.parser import load_templates
 from iambic.core.template_generation import merge_model
+from iambic.plugins.v0_1_0.aws.iam.role.models import AwsIamRoleTemplate
+from iambic.plugins.v0_1_0.aws.models import Tag
 
 
 def test_merge_model():
@@ -251,6 +266,58 @@ async def test_get_body(templates_repo: tuple[str, str]):
     assert template_lines[2] == "template_schema_url: test_url"
 
 
+@pytest.mark.asyncio
+async def test_write_skips_unchanged_template(templates_repo: tuple[str, str]):
+    config_path, repo_dir = templates_repo
+    config = await load_config(config_path)
+
+    template = load_templates(
+        [f"{repo_dir}/{TEST_TEMPLATE_PATH}"], config.template_map
+    )[0]
+    template.write()
+    template_write_stats.reset()
+    last_modified = os.path.getmtime(template.file_path)
+
+    template.write()
+    assert template_write_stats.dict() == {"written": 0, "skipped": 1, "deleted": 0}
+    assert os.path.getmtime(template.file_path) == last_modified
+
+    template.notes = "updated notes"
+    template.write()
+    template.delete()
+    assert template_write_stats.dict() == {"written": 1, "skipped": 1, "deleted": 1}
+
+
+@pytest.mark.asyncio
+async def test_template_delete_in_batch(templates_repo: tuple[str, str]):
+    config_path, repo_dir = templates_repo
+    config = await load_config(config_path)
+    repo = git.Repo(repo_dir)
+
+    template = load_templates(
+        [f"{repo_dir}/{TEST_TEMPLATE_PATH}"], config.template_map
+    )[0]
+    other_template = template.copy(
+        update={"file_path": f"{repo_dir}/other_template.yaml"}
+    )
+    other_template.write()
+
+    with template_deletions.batch():
+        template.delete()
+        other_template.delete()
+        # Deletions are deferred until the batch ends
+        assert os.path.exists(template.file_path)
+        assert len(repo.index.diff("HEAD")) == 0
+        # A template written after it was deleted is kept
+        other_template.write()
+
+    assert not os.path.exists(template.file_path)
+    assert os.path.exists(other_template.file_path)
+    diff_index = repo.index.diff("HEAD")
+    assert len(diff_index) == 1
+    assert f"{repo_dir}/{diff_index[0].a_path}" == str(template.file_path)
+
+
 def test_var_regex():
     example = "{{var.account_name}}"
     result = strip_out_variables(example)
@@ -267,3 +334,116 @@ def test_var_regex_multiple_vars_no_underscore():
     example = "{{var.hello}} foo {{var.var}}"
     result = strip_out_variables(example)
     assert result == " foo "
+
+
+def test_change_records_are_validated_on_output():
+    proposed_change = ProposedChange(
+        change_type="Update", resource_id="role", current_value=3600
+    )
+    proposed_changes = [proposed_change]
+    account_change = AccountChangeDetails(
+        account="dev", resource_id="role", proposed_changes=proposed_changes
+    )
+    template_change = TemplateChangeDetails(
+        resource_id="role",
+        resource_type="aws:iam:role",
+        template_path=Path("resources/aws/role.yaml"),
+        proposed_changes=[account_change],
+    )
+
+    assert proposed_change.change_type == ProposedChangeType.UPDATE
+    assert template_change.template_path == "resources/aws/role.yaml"
+    # Records are neither copied nor share the list they were created with
+    assert account_change.proposed_changes[0] is proposed_change
+    assert account_change.proposed_changes is not proposed_changes
+    assert AccountChangeDetails(account="dev", resource_id="role").__fields_set__ == {
+        "account",
+        "resource_id",
+    }
+    # Records set with the same fields share their fields set until one is changed
+    other_change = ProposedChange(
+        change_type="Update", resource_id="role", current_value=3600
+    )
+    assert other_change.__fields_set__ is proposed_change.__fields_set__
+    other_change.new_value = 7200
+    assert "new_value" in other_change.__fields_set__
+    assert "new_value" not in proposed_change.__fields_set__
+
+    # Validated the same as a record parsed from the serialized changes
+    validated_change = template_change.validated()
+    assert (
+        validated_change.proposed_changes[0].proposed_changes[0].current_value == "3600"
+    )
+    assert validated_change == TemplateChangeDetails.parse_obj(template_change.dict())
+
+    with pytest.raises(ValidationError):
+        ProposedChange(change_type="Renamed")
+    with pytest.raises(ValidationError):
+        TemplateChangeDetails.parse_obj(
+            {
+                "resource_id": "role",
+                "resource_type": "aws:iam:role",
+                "template_path": "resources/aws/role.yaml",
+                "proposed_changes": [{"account": "dev"}],
+            }
+        )
+
+
+def test_apply_resource_dict_is_rendered_once_per_batch(mocker, aws_accounts):
+    role_template = AwsIamRoleTemplate(
+        identifier="{{var.account_name}}_role",
+        file_path="/tmp/role.yaml",
+        properties={
+            "role_name": "{{var.account_name}}_role",
+            "assume_role_policy_document": {"statement": []},
+        },
+    )
+    aws_account = aws_accounts[0]
+    render_spy = mocker.spy(AwsIamRoleTemplate, "_apply_resource_dict")
+
+    role_template.apply_resource_dict(aws_account)
+    role_template.apply_resource_dict(aws_account)
+    assert render_spy.call_count == 2
+
+    with rendered_resources.batch():
+        resource_dict = role_template.apply_resource_dict(aws_account)
+        resource_dict["RoleName"] = "modified"
+        assert role_template.apply_resource_dict(aws_account)["RoleName"] == (
+            f"{aws_account.account_name}_role"
+        )
+        assert render_spy.call_count == 3
+
+        role_template.apply_resource_dict(aws_accounts[1])
+        assert render_spy.call_count == 4
+
+        # Modifying a model that isn't part of the template keeps the rendered resources
+        aws_account.boto3_session_map = {}
+        role_template.apply_resource_dict(aws_account)
+        assert render_spy.call_count == 4
+
+        # A change to the template is only picked up once the template is invalidated
+        role_template.properties.description = "changed"
+        role_template.apply_resource_dict(aws_account)
+        assert render_spy.call_count == 4
+        rendered_resources.invalidate(role_template)
+        assert (
+            role_template.apply_resource_dict(aws_account)["Description"] == "changed"
+        )
+        assert render_spy.call_count == 5
+
+        # Removing expired resources invalidates the template, but only if any expired
+        role_template.properties.tags.append(
+            Tag(
+                key="team",
+                value="iam",
+                expires_at=datetime(2020, 1, 1, tzinfo=pytz.UTC),
+            )
+        )
+        asyncio.run(role_template.remove_expired_resources())
+        role_template.apply_resource_dict(aws_account)
+        assert render_spy.call_count == 6
+        asyncio.run(role_template.remove_expired_resources())
+        assert not role_template.apply_resource_dict(aws_account).get("Tags")
+        assert render_spy.call_count == 6
+
+    assert not rendered_resources._entries
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from iambic.core.telemetry import Telemetry
+
+
+@pytest.fixture
+def telemetry() -> Telemetry:
+    return Telemetry(enabled=True)
+
+
+def test_disabled_telemetry_records_nothing():
+    telemetry = Telemetry()
+
+    with telemetry.span("load_config"):
+        telemetry.increment("api_calls", api_call="list_roles")
+
+    assert not telemetry.spans
+    assert not telemetry.counters
+
+
+@pytest.mark.asyncio
+async def test_spans_are_nested_across_tasks(telemetry: Telemetry):
+    @telemetry.traced()
+    async def collect_roles(provider_id: str):
+        telemetry.increment("api_calls", provider="aws", api_call="list_roles")
+
+    with telemetry.span("run_import"):
+        await asyncio.gather(
+            *[
+                telemetry.trace(collect_roles(provider_id), provider_id=provider_id)
+                for provider_id in ("1", "2")
+            ]
+        )
+
+    run_import, *children = telemetry.spans
+    assert run_import.name == "run_import"
+    # The traced coroutine and the decorated function are each a span
+    assert sorted(span.name for span in children) == ["collect_roles"] * 4
+    assert all(span.parent_span_id for span in children)
+
+    summary = telemetry.summary()
+    assert summary["phases"]["collect_roles"]["count"] == 4
+    assert summary["counters"] == [
+        {
+            "name": "api_calls",
+            "attributes": {
+                "api_call": "list_roles",
+                "provider": "aws",
+                "provider_id": provider_id,
+            },
+            "value": 1,
+        }
+        for provider_id in ("1", "2")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_trace_apply(telemetry: Telemetry):
+    template = SimpleNamespace(resource_type="aws:iam:role", resource_id="role")
+
+    async def apply_to_account():
+        return "changes"
+
+    assert (
+        await telemetry.trace_apply(template, "123456789012", apply_to_account())
+        == "changes"
+    )
+    (span,) = telemetry.spans
+    assert span.name == "apply_to_account"
+    assert span.attributes == {
+        "resource_type": "aws:iam:role",
+        "resource_id": "role",
+        "provider_id": "123456789012",
+    }
+
+
+def test_export(telemetry: Telemetry, tmp_path):
+    with pytest.raises(ValueError):
+        with telemetry.span("apply_to_account", provider_id="1"):
+            raise ValueError("boom")
+
+    summary_path, trace_path = telemetry.export(str(tmp_path))
+    assert os.path.dirname(summary_path) == str(tmp_path)
+
+    with open(summary_path) as f:
+        summary = json.load(f)
+    assert summary["phases"]["apply_to_account"]["errors"] == 1
+
+    with open(trace_path) as f:
+        trace = json.load(f)
+    span = trace["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert span["traceId"] == telemetry.trace_id
+    assert span["name"] == "apply_to_account"
+    assert span["status"]["code"] == 2
+    assert span["attributes"] == [{"key": "provider_id", "value": {"stringValue": "1"}}]
+    assert int(span["endTimeUnixNano"]) >= int(span["startTimeUnixNano"])
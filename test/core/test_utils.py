@@ -7,20 +7,33 @@ from typing import List
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from ruamel.yaml import CommentedMap
 from stringcase import pascalcase, snakecase
 
+from iambic.core.iambic_enum import IambicManaged
 from iambic.core.models import BaseModel
 from iambic.core.utils import (
     GlobalRetryController,
+    LoopSemaphore,
+    SingleFlight,
     convert_between_json_and_yaml,
     create_commented_map,
     evaluate_on_provider,
+    get_access_rule_matrix,
+    load_json_cache_file,
+    load_template_dict,
     normalize_dict_keys,
+    save_json_cache_file,
     simplify_dt,
     sort_dict,
+    template_provider_index,
     transform_comments,
     yaml,
 )
+from iambic.plugins.v0_1_0.aws.iam.policy.models import AwsIamManagedPolicyTemplate
+from iambic.plugins.v0_1_0.aws.iam.role.models import AwsIamRoleTemplate
+from iambic.plugins.v0_1_0.aws.models import AccessModel
+from iambic.plugins.v0_1_0.okta.group.models import OktaGroupTemplate
 
 
 @pytest.mark.parametrize(
@@ -322,6 +335,70 @@ class TestSimplifyDt(unittest.TestCase):
         self.assertEqual(simplify_dt(input_value), expected_result)
 
 
+@pytest.mark.asyncio
+async def test_single_flight():
+    calls = []
+
+    async def read(name: str):
+        calls.append(name)
+        await asyncio.sleep(0.01)
+        if name == "fail":
+            raise ValueError(name)
+        return name
+
+    single_flight = SingleFlight()
+    # Concurrent calls of the same key share a single call
+    assert (
+        await asyncio.gather(*[single_flight.get("a", read, "a") for _ in range(5)])
+        == ["a"] * 5
+    )
+    assert calls == ["a"]
+
+    # Failed calls are not kept
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            await single_flight.get("fail", read, "fail")
+    assert single_flight.keys() == ["a"]
+
+    single_flight.pop("a")
+    await single_flight.get("a", read, "a")
+    assert calls == ["a", "fail", "fail", "a"]
+
+
+def test_json_cache_file(tmp_path):
+    file_path = str(tmp_path / "cache" / "entries.json")
+    assert load_json_cache_file(file_path, "entries") is None
+
+    save_json_cache_file(file_path, {"key": [1, 2]})
+    assert load_json_cache_file(file_path, "entries") == {"key": [1, 2]}
+
+    # A file that can't be loaded is started fresh
+    with open(file_path, "w") as f:
+        f.write("{")
+    assert load_json_cache_file(file_path, "entries") is None
+
+
+def test_loop_semaphore():
+    limiter = LoopSemaphore(2)
+    in_flight = []
+    max_in_flight = []
+
+    async def call():
+        async with limiter:
+            in_flight.append(1)
+            max_in_flight.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.pop()
+
+    async def run():
+        await asyncio.gather(*[call() for _ in range(5)])
+        return limiter.semaphore
+
+    # Each event loop gets its own semaphore
+    assert asyncio.run(run()) is not asyncio.run(run())
+    assert max(max_in_flight) == 2
+
+
 @pytest.mark.asyncio
 async def test_gather_templates(tmpdir):
     from iambic.core.utils import Path, gather_templates
@@ -420,3 +497,191 @@ def test_evaluate_on_provider_organization_account():
     provider_details.organization_account = True
 
     assert evaluate_on_provider(resource, provider_details)
+
+
+@pytest.mark.parametrize(
+    "access_rules",
+    [
+        {},
+        {"included_accounts": ["dev*"]},
+        {"included_accounts": ["*"], "excluded_accounts": ["prod*", "qa1"]},
+        {"included_accounts": ["prod1", "123456789010"], "excluded_accounts": ["*"]},
+        {"included_accounts": ["prod*"], "excluded_accounts": ["prod3"]},
+        {"included_accounts": ["*"], "excluded_orgs": ["o-2"]},
+        {"included_accounts": ["staging*"], "included_orgs": ["o-1"]},
+        {"included_accounts": ["Dev1", "STAGING*"], "excluded_accounts": ["dev"]},
+        {"included_accounts": ["*"], "iambic_managed": "import_only"},
+    ],
+)
+def test_access_rule_matrix_matches_evaluate_on_provider(aws_accounts, access_rules):
+    aws_accounts = [account.copy() for account in aws_accounts]
+    for elem, account in enumerate(aws_accounts):
+        account.org_id = "o-1" if elem % 2 else "o-2"
+    aws_accounts[0].iambic_managed = IambicManaged.DISABLED
+    aws_accounts[1].iambic_managed = IambicManaged.IMPORT_ONLY
+
+    resource = AccessModel(**access_rules)
+    access_rule_matrix = get_access_rule_matrix(aws_accounts)
+    for exclude_import_only in (True, False):
+        bits = access_rule_matrix.evaluate(resource, exclude_import_only)
+        assert [
+            bool(bits & access_rule_matrix.bit(account)) for account in aws_accounts
+        ] == [
+            evaluate_on_provider(resource, account, exclude_import_only)
+            for account in aws_accounts
+        ]
+
+
+def test_template_provider_index(aws_accounts):
+    aws_accounts = [account.copy() for account in aws_accounts]
+    templates = [
+        AccessModel(included_accounts=["dev*"]),
+        AccessModel(included_accounts=["*"], excluded_accounts=["prod*"]),
+        AccessModel(included_accounts=["prod1"]),
+    ]
+
+    try:
+        assert template_provider_index.build(templates, aws_accounts) == templates
+        for template in templates:
+            assert template_provider_index.get(template, aws_accounts) == [
+                account
+                for account in aws_accounts
+                if evaluate_on_provider(template, account)
+            ]
+
+        # A different list of children, e.g. the account of a shard, isn't indexed
+        shard_accounts = [aws_accounts[0]]
+        assert template_provider_index.get(templates[0], shard_accounts) == [
+            account
+            for account in shard_accounts
+            if evaluate_on_provider(templates[0], account)
+        ]
+
+        # Only templates touching the scoped accounts are applied
+        with template_provider_index.scope(["prod*"]):
+            assert template_provider_index.build(templates, aws_accounts) == [
+                templates[2]
+            ]
+        assert [
+            account.account_name
+            for account in template_provider_index.get(templates[2], aws_accounts)
+        ] == ["prod1"]
+    finally:
+        template_provider_index.clear()
+
+
+# Templates as they are written by BaseTemplate.write
+GOLDEN_TEMPLATES = {
+    AwsIamRoleTemplate: """template_type: NOQ::AWS::IAM::Role
+template_schema_url: https://docs.iambic.org/reference/schemas/aws_iam_role_template
+excluded_accounts:
+  - prod
+expires_at: 2030-01-01T00:00 UTC
+identifier: '{{var.account_name}}_iambic_test_role'
+properties:
+  description: "Used by the test suite\\non {{var.account_name}}\\n"
+  assume_role_policy_document:
+    statement:
+      - action: sts:AssumeRole
+        effect: Allow
+        principal:
+          service: ec2.amazonaws.com
+    version: '2012-10-17'
+  inline_policies:
+    - policy_name: s3-access
+      statement:
+        - action:
+            - s3:GetObject
+            - s3:ListBucket
+          effect: Allow
+          resource:
+            - arn:aws:s3:::bucket
+            - arn:aws:s3:::bucket/*
+      version: '2012-10-17'
+  max_session_duration: 7200
+  path: /iambic/
+  role_name: '{{var.account_name}}_iambic_test_role'
+  tags:
+    - key: owner
+      value: 'true'
+""",
+    AwsIamManagedPolicyTemplate: """template_type: NOQ::AWS::IAM::ManagedPolicy
+template_schema_url: https://docs.iambic.org/reference/schemas/aws_iam_managed_policy_template
+included_accounts:
+  - dev-*
+identifier: read-only
+included_orgs:
+  - o-123
+properties:
+  description: Read only access
+  policy_document:
+    statement:
+      - action:
+          - s3:Get*
+        condition:
+          StringEquals:
+            aws:RequestedRegion: us-west-2
+        effect: Allow
+        resource: '*'
+        sid: ReadOnly
+    version: '2012-10-17'
+  policy_name: read-only
+""",
+    OktaGroupTemplate: """template_type: NOQ::Okta::Group
+template_schema_url: https://docs.iambic.org/reference/schemas/okta_group_template
+idp_name: development
+notes: |-
+  Managed by the platform team
+  Ask in the platform channel for access
+properties:
+  name: engineering
+  description: Engineering team
+  members:
+    - expires_at: 2030-01-01T00:00 UTC
+      username: alice@example.com
+    - username: bob@example.com
+""",
+}
+
+
+@pytest.mark.parametrize("template_cls", GOLDEN_TEMPLATES.keys())
+def test_load_template_dict_golden(tmp_path, template_cls):
+    template_yaml = GOLDEN_TEMPLATES[template_cls]
+    file_path = str(tmp_path / "template.yaml")
+    with open(file_path, "w") as f:
+        f.write(template_yaml)
+
+    template_dict = load_template_dict(file_path)
+    round_trip_template_dict = load_template_dict(file_path, round_trip=True)
+    # Loaded by the fast loader
+    assert not isinstance(template_dict, CommentedMap)
+    assert template_dict == round_trip_template_dict
+    for loaded_dict in (template_dict, round_trip_template_dict):
+        template = template_cls(file_path=file_path, **loaded_dict)
+        assert template.get_body() == template_yaml
+
+
+@pytest.mark.parametrize(
+    "template_yaml,round_trip",
+    [
+        ("name: engineering\nmembers:\n  - username: alice\n", False),
+        ("name: engineering  # the team\n", True),
+        ("name: engineering\n\nmembers: []\n", True),
+        ("name: &name engineering\ndescription: *name\n", True),
+        ("name: engineering\nmembers: [alice]\n", True),
+        ("name: engineering\nversion: 1.0\n", True),
+        ("name: engineering\nexpires_at: 2030-01-01T00:00:00Z\n", True),
+    ],
+)
+def test_load_template_dict_round_trip_fallback(tmp_path, template_yaml, round_trip):
+    file_path = str(tmp_path / "template.yaml")
+    with open(file_path, "w") as f:
+        f.write(template_yaml)
+
+    template_dict = load_template_dict(file_path)
+    round_trip_template_dict = load_template_dict(file_path, round_trip=True)
+    assert isinstance(template_dict, CommentedMap) is round_trip
+    assert template_dict == round_trip_template_dict
+    assert yaml.dump(create_commented_map(template_dict)) == yaml.dump(
+        create_commented_map(round_trip_template_dict)
+    )
@@ -2,8 +2,13 @@ from __future__ import annotations
 
 import pytest
 
+from iambic.core.change_stream import TemplateChangeCounts
 from iambic.core.models import TemplateChangeDetails
-from iambic.output.markdown import gh_render_resource_changes
+from iambic.output.markdown import (
+    gh_render_resource_change_chunks,
+    gh_render_resource_changes,
+    gh_render_template_change,
+)
 from iambic.output.models import ActionSummaries, get_template_data
 
 from . import get_templates_mixed, get_update_template
@@ -51,3 +56,54 @@ def test_gh_render_resource_changes(
 ):
     rendered_markdown = gh_render_resource_changes(template_change_details)
     assert rendered_markdown != ""
+
+
+def test_gh_render_resource_changes_with_template_data(mocker):
+    template_changes = get_templates_mixed()
+    template_data = get_template_data(template_changes)
+    compile_spy = mocker.spy(ActionSummaries, "compile")
+    assert gh_render_resource_changes(
+        template_changes, template_data
+    ) == gh_render_resource_changes(template_changes)
+    # Only the render without a compiled summary compiles one
+    assert compile_spy.call_count == 1
+
+    # Nothing is kept across calls, changes made to the list are always summarized
+    assert get_template_data(template_changes[:1]).num_templates == 1
+    # Duplicate changes are only counted once
+    template_changes.append(template_changes[0])
+    assert (
+        get_template_data(template_changes).num_create_actions
+        == template_data.num_create_actions
+    )
+
+
+def test_gh_render_resource_change_chunks():
+    template_changes = get_templates_mixed() * 5
+    change_counts = TemplateChangeCounts()
+    for template_change in template_changes:
+        change_counts.add(template_change)
+    rendered_templates = [
+        gh_render_template_change(template_change)
+        for template_change in template_changes
+        if template_change.proposed_changes or template_change.exceptions_seen
+    ]
+    max_length = max(len(rendered) for rendered in rendered_templates) + 1000
+
+    chunks = list(
+        gh_render_resource_change_chunks(
+            iter(template_changes), change_counts, max_length
+        )
+    )
+    assert len(chunks) > 1
+    assert all(len(chunk) <= max_length for chunk in chunks)
+    assert chunks[0].startswith("# IAMbic Summary")
+    # Every template is rendered once and in order
+    assert "".join(chunks).endswith("".join(rendered_templates))
+
+    # A template too large for a chunk is replaced with a stub
+    chunks = list(
+        gh_render_resource_change_chunks(template_changes, change_counts, 1000)
+    )
+    assert all(len(chunk) <= 1000 for chunk in chunks[1:])
+    assert "too large to include" in chunks[-1]
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 import json
+from unittest import mock
 
 import boto3
 import pytest
 from moto import mock_iam
 
+from iambic.core import noq_json
 from iambic.core.models import ProposedChangeType
 from iambic.plugins.v0_1_0.aws.iam.policy.utils import (
     apply_managed_policy_tags,
@@ -118,6 +120,34 @@ async def test_managed_policies(mock_iam_client):
     assert policies[0]["PolicyName"] == EXAMPLE_MANAGED_POLICY_NAME
 
 
+@pytest.mark.asyncio
+async def test_managed_policies_with_cache(mock_iam_client, tmp_path):
+    cache_path = str(tmp_path / "managed_policies.json")
+    policies = await list_managed_policies(mock_iam_client, cache_path=cache_path)
+    assert len(policies) == 1
+
+    # Unchanged policies are served from the cache
+    with mock.patch(
+        "iambic.plugins.v0_1_0.aws.iam.policy.utils.get_managed_policy"
+    ) as mock_get_managed_policy:
+        cached_policies = await list_managed_policies(
+            mock_iam_client, cache_path=cache_path
+        )
+        assert not mock_get_managed_policy.called
+    assert cached_policies == noq_json.loads(noq_json.dumps(policies))
+
+    # A new default version moves the marker so the policy is refetched
+    new_policy_document = json.loads(EXAMPLE_POLICY_DOCUMENT)
+    new_policy_document["Statement"][0]["Action"] = "acm:DescribeCertificate"
+    mock_iam_client.create_policy_version(
+        PolicyArn=EXAMPLE_POLICY_ARN,
+        PolicyDocument=json.dumps(new_policy_document),
+        SetAsDefault=True,
+    )
+    policies = await list_managed_policies(mock_iam_client, cache_path=cache_path)
+    assert policies[0]["PolicyDocument"] == new_policy_document
+
+
 @pytest.mark.asyncio
 async def test_delete_managed_policy(mock_iam_client):
     await delete_managed_policy(mock_iam_client, EXAMPLE_POLICY_ARN, {})
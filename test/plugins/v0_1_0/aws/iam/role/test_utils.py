@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+from collections import Counter
 from typing import Any, Dict
 
 import boto3
@@ -8,6 +9,10 @@ import pytest
 from moto import mock_iam
 
 from iambic.core.models import ProposedChangeType
+from iambic.plugins.v0_1_0.aws.iam.policy.utils import (
+    delete_managed_policy,
+    get_managed_policy_attachments,
+)
 from iambic.plugins.v0_1_0.aws.iam.role.utils import (
     apply_role_inline_policies,
     apply_role_managed_policies,
@@ -23,6 +28,7 @@ from iambic.plugins.v0_1_0.aws.iam.role.utils import (
     list_role_tags,
     list_roles,
 )
+from iambic.plugins.v0_1_0.aws.utils import AWSReadCache
 
 EXAMPLE_ROLE_NAME = "example_role_name"
 EXAMPLE_ASSUME_ROLE_DOCUMENT = """
@@ -313,3 +319,55 @@ async def test_apply_role_inline_policies_on_detach(mock_iam_client):
 async def test_delete_iam_role(mock_iam_client):
     log_params = {}
     await delete_iam_role(EXAMPLE_ROLE_NAME, mock_iam_client, log_params)
+
+
+@pytest.mark.asyncio
+async def test_get_role_reads_through_the_read_cache(mock_iam_client):
+    api_calls = Counter()
+    mock_iam_client.meta.events.register(
+        "before-call.iam", lambda model, **kwargs: api_calls.update([model.name])
+    )
+    read_cache = AWSReadCache()
+    read_cache.start_run("run")
+
+    await get_role(
+        EXAMPLE_ROLE_NAME,
+        mock_iam_client,
+        include_policies=False,
+        read_cache=read_cache,
+    )
+    role = await get_role(EXAMPLE_ROLE_NAME, mock_iam_client, read_cache=read_cache)
+    assert role["ManagedPolicies"] == [{"PolicyArn": EXAMPLE_MANAGED_POLICY_ARN}]
+    # The role itself was only read once
+    assert api_calls["GetRole"] == 1
+    assert api_calls["ListAttachedRolePolicies"] == 1
+
+    # Reads are kept for the whole run
+    read_cache.start_run("run")
+    await get_role(EXAMPLE_ROLE_NAME, mock_iam_client, read_cache=read_cache)
+    assert api_calls["GetRole"] == 1
+
+    # Deleting the managed policy reuses the attachments already looked up
+    # and drops the now stale managed policies of the role
+    policy_arn = mock_iam_client.create_policy(
+        PolicyName="example_policy", PolicyDocument=EXAMPLE_INLINE_POLICY_DOCUMENT
+    )["Policy"]["Arn"]
+    mock_iam_client.attach_role_policy(RoleName=EXAMPLE_ROLE_NAME, PolicyArn=policy_arn)
+    read_cache.invalidate(EXAMPLE_ROLE_NAME)
+    await get_role(EXAMPLE_ROLE_NAME, mock_iam_client, read_cache=read_cache)
+    attachments = await read_cache.get(
+        get_managed_policy_attachments, mock_iam_client, policy_arn
+    )
+    assert [role["RoleName"] for role in attachments["PolicyRoles"]] == [
+        EXAMPLE_ROLE_NAME
+    ]
+    await delete_managed_policy(mock_iam_client, policy_arn, {}, read_cache)
+    assert api_calls["ListEntitiesForPolicy"] == 1
+    role = await get_role(EXAMPLE_ROLE_NAME, mock_iam_client, read_cache=read_cache)
+    assert role["ManagedPolicies"] == [{"PolicyArn": EXAMPLE_MANAGED_POLICY_ARN}]
+    assert api_calls["ListAttachedRolePolicies"] == 3
+
+    # A new run starts from an empty cache
+    read_cache.start_run("next run")
+    await get_role(EXAMPLE_ROLE_NAME, mock_iam_client, read_cache=read_cache)
+    assert api_calls["GetRole"] == 4
@@ -1,19 +1,24 @@
 from __future__ import annotations
 
 import json
+from datetime import datetime, timedelta
 from typing import Any, Dict
 
 import boto3
 import pytest
+import pytz
 from moto import mock_iam
 
 from iambic.core.models import ProposedChangeType
 from iambic.plugins.v0_1_0.aws.iam.user.utils import (
+    CredentialReportService,
     apply_user_inline_policies,
     apply_user_managed_policies,
     apply_user_permission_boundary,
     apply_user_tags,
     delete_iam_user,
+    get_user_credentials,
+    get_user_credentials_from_report,
     get_user_groups,
     get_user_inline_policies,
     get_user_inline_policy_names,
@@ -285,3 +290,128 @@ async def test_apply_user_inline_policies_on_detach(mock_iam_client):
 async def test_delete_iam_user(mock_iam_client):
     log_params = {}
     await delete_iam_user(EXAMPLE_USERNAME, mock_iam_client, log_params)
+
+
+@pytest.mark.asyncio
+async def test_get_user_credentials_from_report(mock_iam_client):
+    access_key = mock_iam_client.create_access_key(UserName=EXAMPLE_USERNAME)[
+        "AccessKey"
+    ]
+    user_summary = {
+        "report_generated": datetime.now(tz=pytz.UTC),
+        "password": {"enabled": False},
+        "access_keys": [
+            {
+                "enabled": True,
+                "created": access_key["CreateDate"].replace(microsecond=0),
+                "last_used": None,
+            }
+        ],
+    }
+    credentials = await get_user_credentials_from_report(
+        EXAMPLE_USERNAME, mock_iam_client, user_summary
+    )
+    assert credentials == await get_user_credentials(
+        EXAMPLE_USERNAME, mock_iam_client, True
+    )
+    assert credentials["AccessKeys"][0]["Id"] == access_key["AccessKeyId"]
+
+    # A key created after the report was generated falls back to the per user calls
+    mock_iam_client.create_access_key(UserName=EXAMPLE_USERNAME)
+    credentials = await get_user_credentials_from_report(
+        EXAMPLE_USERNAME, mock_iam_client, user_summary
+    )
+    assert len(credentials["AccessKeys"]) == 2
+
+    # A key created after a report without any keys is found as well
+    user_summary = {
+        "report_generated": datetime.now(tz=pytz.UTC),
+        "password": {"enabled": False},
+        "access_keys": [],
+    }
+    credentials = await get_user_credentials_from_report(
+        EXAMPLE_USERNAME, mock_iam_client, user_summary
+    )
+    assert len(credentials["AccessKeys"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_get_user_credentials_from_report_password(mock_iam_client):
+    mock_iam_client.create_login_profile(
+        UserName=EXAMPLE_USERNAME, Password="Example-password-1"
+    )
+    user_summary = {
+        "report_generated": datetime.now(tz=pytz.UTC),
+        "password": {"enabled": False},
+        "access_keys": [],
+    }
+    credentials = await get_user_credentials_from_report(
+        EXAMPLE_USERNAME, mock_iam_client, user_summary
+    )
+    assert credentials["Password"]["Enabled"] is False
+
+    # The login profile is used if the user changed after the report was generated
+    credentials = await get_user_credentials_from_report(
+        EXAMPLE_USERNAME,
+        mock_iam_client,
+        user_summary,
+        user_summary["report_generated"] + timedelta(minutes=1),
+    )
+    assert credentials["Password"]["Enabled"] is True
+
+    # Or if the report is too old to trust the password state
+    user_summary["report_generated"] -= timedelta(hours=6)
+    credentials = await get_user_credentials_from_report(
+        EXAMPLE_USERNAME, mock_iam_client, user_summary
+    )
+    assert credentials["Password"]["Enabled"] is True
+
+
+class FakeAWSAccount:
+    def __init__(self, account_id: str, iam_client):
+        self.account_id = account_id
+        self.iam_client = iam_client
+
+    async def get_boto3_client(self, *args, **kwargs):
+        if not self.iam_client:
+            raise AssertionError("The cached credential report should be used")
+        return self.iam_client
+
+    def __str__(self):
+        return self.account_id
+
+
+@pytest.mark.asyncio
+async def test_credential_report_service(mock_iam_client, tmp_path):
+    account_ids = ["123456789010", "123456789011"]
+    credential_report_service = CredentialReportService(
+        cache_dir=str(tmp_path), max_age=60 * 60 * 24 * 365 * 100
+    )
+    credential_reports = await credential_report_service.get_reports(
+        [FakeAWSAccount(account_id, mock_iam_client) for account_id in account_ids]
+    )
+    assert sorted(credential_reports.keys()) == account_ids
+    for account_id in account_ids:
+        user_summary = credential_reports[account_id][EXAMPLE_USERNAME]
+        assert user_summary["account"] == account_id
+        assert user_summary["password"] == {"enabled": False}
+
+    # A later run reuses the cached reports without calling AWS
+    credential_report_service = CredentialReportService(
+        cache_dir=str(tmp_path), max_age=60 * 60 * 24 * 365 * 100
+    )
+    assert (
+        await credential_report_service.get_reports(
+            [FakeAWSAccount(account_id, None) for account_id in account_ids]
+        )
+        == credential_reports
+    )
+
+    # Expired reports are generated again
+    credential_report_service = CredentialReportService(
+        cache_dir=str(tmp_path), max_age=0
+    )
+    credential_reports = await credential_report_service.get_reports(
+        [FakeAWSAccount(account_ids[0], None)]
+    )
+    assert credential_reports == {}
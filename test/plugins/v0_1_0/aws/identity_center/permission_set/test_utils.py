@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import json
+from collections import defaultdict
 from typing import Optional
 from unittest import mock
 from unittest.mock import AsyncMock, MagicMock
@@ -11,11 +12,13 @@ import botocore
 import pytest
 from moto import mock_ssoadmin
 
+from iambic.core.context import ctx
 from iambic.core.models import ProposedChangeType, ProviderChild
 from iambic.plugins.v0_1_0.aws.identity_center.permission_set.models import (
     AWS_IDENTITY_CENTER_PERMISSION_SET_TEMPLATE_TYPE,
 )
 from iambic.plugins.v0_1_0.aws.identity_center.permission_set.utils import (
+    IdentityCenterOperationPoller,
     apply_account_assignments,
     apply_permission_set_aws_managed_policies,
     apply_permission_set_customer_managed_policies,
@@ -607,6 +610,187 @@ async def test_apply_account_assignments():
     assert created_assignment.attribute == "account_assignment"
 
 
+class FakeIdentityCenterOperations:
+    """
+    Completes the second status request of an operation and fails the operations on account 0.
+
+    The first describe_errors status requests of every operation raise an error.
+    """
+
+    def __init__(self, describe_errors: int = 0):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.describe_errors = describe_errors
+        self.status_requests = defaultdict(int)
+
+    def create_account_assignment(self, **kwargs):
+        ...
+
+    def describe_account_assignment_creation_status(self, **kwargs):
+        ...
+
+    async def boto_crud_call(self, boto_fnc, **kwargs):
+        if boto_fnc == self.create_account_assignment:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            request_id = kwargs["TargetId"]
+            return {
+                "AccountAssignmentCreationStatus": {
+                    "RequestId": request_id,
+                    "Status": "IN_PROGRESS",
+                }
+            }
+
+        request_id = kwargs["AccountAssignmentCreationRequestId"]
+        self.status_requests[request_id] += 1
+        if self.status_requests[request_id] <= self.describe_errors:
+            raise Exception("ThrottlingException")
+
+        status = "IN_PROGRESS"
+        if self.status_requests[request_id] > self.describe_errors + 1:
+            self.in_flight -= 1
+            status = "FAILED" if request_id == "0" else "SUCCEEDED"
+        return {
+            "AccountAssignmentCreationStatus": {
+                "RequestId": request_id,
+                "Status": status,
+                "FailureReason": "ConflictException" if status == "FAILED" else None,
+            }
+        }
+
+
+@pytest.mark.asyncio
+async def test_identity_center_operation_poller():
+    operations = FakeIdentityCenterOperations()
+    poller = IdentityCenterOperationPoller(
+        max_in_flight=5, min_interval=0.01, max_interval=0.02
+    )
+    with mock.patch(
+        "iambic.plugins.v0_1_0.aws.identity_center.permission_set.utils.boto_crud_call",
+        new=operations.boto_crud_call,
+    ):
+        statuses = await asyncio.gather(
+            *[
+                poller.run(
+                    operations.create_account_assignment,
+                    operations.describe_account_assignment_creation_status,
+                    "AccountAssignmentCreationStatus",
+                    "AccountAssignmentCreationRequestId",
+                    InstanceArn=EXAMPLE_IDENTITY_CENTER_INSTANCE_ARN,
+                    TargetId=str(elem),
+                )
+                for elem in range(20)
+            ]
+        )
+
+    assert [status["Status"] for status in statuses] == ["FAILED"] + ["SUCCEEDED"] * 19
+    assert operations.max_in_flight == 5
+    assert all(count == 2 for count in operations.status_requests.values())
+
+
+@pytest.mark.asyncio
+async def test_identity_center_operation_poller_retries_describe_errors():
+    operations = FakeIdentityCenterOperations(describe_errors=2)
+    with mock.patch(
+        "iambic.plugins.v0_1_0.aws.identity_center.permission_set.utils.boto_crud_call",
+        new=operations.boto_crud_call,
+    ):
+        poller = IdentityCenterOperationPoller(min_interval=0.01, max_interval=0.02)
+        status = await poller.run(
+            operations.create_account_assignment,
+            operations.describe_account_assignment_creation_status,
+            "AccountAssignmentCreationStatus",
+            "AccountAssignmentCreationRequestId",
+            InstanceArn=EXAMPLE_IDENTITY_CENTER_INSTANCE_ARN,
+            TargetId="1",
+        )
+        assert status["Status"] == "SUCCEEDED"
+
+        # The operation fails once the status can't be described max_describe_attempts times in a row
+        poller = IdentityCenterOperationPoller(
+            min_interval=0.01, max_interval=0.02, max_describe_attempts=2
+        )
+        status = await poller.run(
+            operations.create_account_assignment,
+            operations.describe_account_assignment_creation_status,
+            "AccountAssignmentCreationStatus",
+            "AccountAssignmentCreationRequestId",
+            InstanceArn=EXAMPLE_IDENTITY_CENTER_INSTANCE_ARN,
+            TargetId="2",
+        )
+        assert status == {"Status": "FAILED", "FailureReason": "ThrottlingException"}
+
+
+@pytest.mark.asyncio
+async def test_identity_center_operation_poller_timeout():
+    # Every status request fails so the operation stays in progress
+    operations = FakeIdentityCenterOperations(describe_errors=1000)
+    poller = IdentityCenterOperationPoller(min_interval=0.01, max_interval=0.02)
+    with mock.patch(
+        "iambic.plugins.v0_1_0.aws.identity_center.permission_set.utils.boto_crud_call",
+        new=operations.boto_crud_call,
+    ):
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(
+                poller.run(
+                    operations.create_account_assignment,
+                    operations.describe_account_assignment_creation_status,
+                    "AccountAssignmentCreationStatus",
+                    "AccountAssignmentCreationRequestId",
+                    InstanceArn=EXAMPLE_IDENTITY_CENTER_INSTANCE_ARN,
+                    TargetId="1",
+                ),
+                timeout=0.05,
+            )
+
+        # The request is no longer polled once its caller stopped waiting
+        assert not poller._pending
+        await asyncio.wait_for(poller._poll_task, timeout=1)
+        status_requests = operations.status_requests["1"]
+        await asyncio.sleep(0.05)
+        assert operations.status_requests["1"] == status_requests
+
+
+@pytest.mark.asyncio
+async def test_apply_account_assignments_reports_failures(monkeypatch):
+    operations = FakeIdentityCenterOperations()
+    identity_center_client = MagicMock(
+        create_account_assignment=operations.create_account_assignment,
+        describe_account_assignment_creation_status=operations.describe_account_assignment_creation_status,
+    )
+    monkeypatch.setattr(ctx, "eval_only", False)
+    with mock.patch(
+        "iambic.plugins.v0_1_0.aws.identity_center.permission_set.utils.boto_crud_call",
+        new=operations.boto_crud_call,
+    ), mock.patch(
+        "iambic.plugins.v0_1_0.aws.identity_center.permission_set.utils.identity_center_poller",
+        new=IdentityCenterOperationPoller(min_interval=0.01, max_interval=0.02),
+    ):
+        proposed_changes = await apply_account_assignments(
+            identity_center_client,
+            EXAMPLE_IDENTITY_CENTER_INSTANCE_ARN,
+            "arn:aws:sso:::permissionSet/ssoins-1234567890abcdef0/ps-1234567890abcdef0",
+            [
+                {
+                    "account_id": str(elem),
+                    "resource_id": "test-group-id",
+                    "resource_name": "Test Group",
+                    "account_name": f"account-{elem}",
+                    "resource_type": "GROUP",
+                }
+                for elem in range(3)
+            ],
+            [],
+            {},
+        )
+
+    assert {change.account: change.exceptions_seen for change in proposed_changes} == {
+        "account-0": ["ConflictException"],
+        "account-1": [],
+        "account-2": [],
+    }
+
+
 @pytest.mark.asyncio
 @mock_ssoadmin
 async def test_apply_permission_set_inline_policy(mock_ssoadmin_client_bundle: tuple):
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import json
 
 import boto3
@@ -150,6 +151,28 @@ async def test_get_policy(mock_organizations_client):
     assert len(resp.Targets) == 1
 
 
+@pytest.mark.asyncio
+async def test_get_policy_reuses_cached_reads(mock_organizations_client, mocker):
+    client, data = mock_organizations_client
+    policy = data[-1]
+
+    spy_describe_policy = mocker.spy(utils, "describe_policy")
+    spy_list_targets_for_policy = mocker.spy(utils, "list_targets_for_policy")
+
+    await list_policies(client)
+    resp = await get_policy(client, policy["Id"])
+    assert resp.Id == policy["Id"]
+    assert resp.Name == EXAMPLE_POLICY_NAME
+    spy_describe_policy.assert_called_once()
+    spy_list_targets_for_policy.assert_called_once()
+
+    # Concurrent reads of the same policy share a single request
+    utils.scp_policy_cache.invalidate(policy["Id"])
+    await asyncio.gather(*[get_policy(client, policy["Id"]) for _ in range(5)])
+    assert spy_describe_policy.call_count == 2
+    assert spy_list_targets_for_policy.call_count == 2
+
+
 @pytest.mark.asyncio
 async def test_delete_policy(mock_organizations_client, mocker):
     client, data = mock_organizations_client
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from iambic.core.context import ctx
+from iambic.core.iambic_enum import Command
+from iambic.core.models import ExecutionMessage
+from iambic.plugins.v0_1_0.aws.handlers import (
+    apply_with_remote_worker,
+    import_service_resources,
+)
+from iambic.plugins.v0_1_0.aws.iam.role.models import AwsIamRoleTemplate
+from iambic.plugins.v0_1_0.aws.iambic_plugin import AWSConfig
+
+
+@pytest.mark.asyncio
+async def test_import_service_resources_dispatches_to_remote_worker(
+    aws_accounts, monkeypatch
+):
+    monkeypatch.setattr(ctx, "use_remote", True)
+    config = AWSConfig(accounts=aws_accounts)
+    remote_worker = AsyncMock()
+    collector = AsyncMock()
+    generator = AsyncMock()
+    exe_message = ExecutionMessage(
+        execution_id="test", command=Command.IMPORT, provider_type="aws"
+    )
+
+    await import_service_resources(
+        exe_message,
+        config,
+        "/tmp/output",
+        "iam",
+        [collector],
+        [generator],
+        remote_worker=remote_worker,
+        existing_template_map={},
+    )
+
+    # One shard per account for the service, collected by the remote workers
+    collector.assert_not_called()
+    remote_worker.run.assert_awaited_once()
+    task_messages = remote_worker.run.call_args.args[0]
+    assert sorted(task_message.provider_id for task_message in task_messages) == [
+        account.account_id for account in aws_accounts
+    ]
+    assert all(
+        task_message.metadata == {"service": "iam"} for task_message in task_messages
+    )
+    assert remote_worker.run.call_args.kwargs == {"base_output_dir": "/tmp/output"}
+
+    # The base runner generates the templates from the collected output
+    generator.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_apply_with_remote_worker_sends_each_account_its_templates(
+    aws_accounts,
+):
+    config = AWSConfig(accounts=aws_accounts)
+    role_templates = [
+        AwsIamRoleTemplate(
+            identifier=account.account_name,
+            file_path=f"/tmp/{account.account_name}.yaml",
+            included_accounts=[account.account_name],
+            properties={"role_name": account.account_name},
+        )
+        for account in aws_accounts[:2]
+    ]
+    remote_worker = AsyncMock()
+    remote_worker.run.return_value = []
+    exe_message = ExecutionMessage(
+        execution_id="test", command=Command.APPLY, provider_type="aws"
+    )
+
+    await apply_with_remote_worker(exe_message, config, role_templates, remote_worker)
+
+    # Accounts without a template don't get a shard
+    task_messages = remote_worker.run.call_args.args[0]
+    assert [task_message.provider_id for task_message in task_messages] == [
+        account.account_id for account in aws_accounts[:2]
+    ]
+    assert remote_worker.run.call_args.kwargs == {
+        "templates": {
+            account.account_id: [role_template]
+            for account, role_template in zip(aws_accounts, role_templates)
+        }
+    }
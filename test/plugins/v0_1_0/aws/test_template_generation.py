@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+
+import iambic.core.models
+import iambic.plugins.v0_1_0.aws.template_generation as template_generation
+from iambic.core.expiry_index import expiry_index
+from iambic.core.models import template_write_stats
+from iambic.plugins.v0_1_0.aws.iam.role.models import AwsIamRoleTemplate
+from iambic.plugins.v0_1_0.aws.iambic_plugin import AWSConfig
+from iambic.plugins.v0_1_0.aws.template_generation import create_templated_resources
+
+
+async def create_templated_example_role(
+    aws_account_map,
+    role_name,
+    role_refs,
+    role_dir,
+    existing_template_map,
+    config,
+):
+    if role_name.startswith("enforced"):
+        return
+    elif role_name.startswith("deleted"):
+        AwsIamRoleTemplate.load(os.path.join(role_dir, f"{role_name}.yaml")).delete()
+        return
+
+    template = AwsIamRoleTemplate(
+        identifier=role_name,
+        file_path=os.path.join(role_dir, f"{role_name}.yaml"),
+        included_accounts=[
+            aws_account_map[role_ref["account_id"]].account_name
+            for role_ref in role_refs
+        ],
+        properties={
+            "role_name": role_name,
+            "assume_role_policy_document": {"statement": []},
+        },
+    )
+    template.write()
+    return template
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("processes", [1, 2])
+async def test_create_templated_resources(
+    aws_accounts, tmp_path, monkeypatch, mocker, processes
+):
+    monkeypatch.setattr(template_generation, "TEMPLATE_GENERATION_POOL_THRESHOLD", 0)
+    aws_account_map = {account.account_id: account for account in aws_accounts}
+    grouped_role_map = {
+        f"role_{elem}": [{"account_id": aws_accounts[elem % 3].account_id}]
+        for elem in range(20)
+    }
+    grouped_role_map["enforced_role"] = [{"account_id": aws_accounts[0].account_id}]
+    deleted_file_paths = []
+    for elem in range(4):
+        role_name = f"deleted_role_{elem}"
+        grouped_role_map[role_name] = [{"account_id": aws_accounts[0].account_id}]
+        deleted_template = await create_templated_example_role(
+            aws_account_map,
+            role_name.replace("deleted_", ""),
+            grouped_role_map[role_name],
+            str(tmp_path),
+            {},
+            None,
+        )
+        deleted_file_paths.append(str(tmp_path / f"{role_name}.yaml"))
+        os.rename(deleted_template.file_path, deleted_file_paths[-1])
+    remove_spy = mocker.spy(iambic.core.models, "remove_template_files")
+
+    template_write_stats.reset()
+    resource_ids = await create_templated_resources(
+        create_templated_example_role,
+        aws_account_map,
+        grouped_role_map,
+        str(tmp_path),
+        {},
+        AWSConfig(accounts=aws_accounts),
+        processes=processes,
+    )
+
+    assert resource_ids == {f"role_{elem}" for elem in range(20)}
+    assert len(os.listdir(tmp_path)) == 20
+    assert template_write_stats.written == 20
+    assert template_write_stats.deleted == 4
+    # The deleted files are removed at once by the parent, not by each worker
+    assert remove_spy.call_count == 1
+    assert sorted(remove_spy.call_args.args[0]) == deleted_file_paths
+    # The expiry index of the parent has the templates written by the workers
+    assert all(
+        expiry_index.is_indexed(str(tmp_path / f"role_{elem}.yaml"))
+        for elem in range(20)
+    )
+    assert not any(
+        expiry_index.is_indexed(file_path) for file_path in deleted_file_paths
+    )
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import time
 from unittest.mock import Mock
 
 import pytest
@@ -133,3 +134,192 @@ async def test_process_import_rules():
 
         # Verify result
         assert result == test_rule["result"]
+
+
+@pytest.fixture
+def org_client_with_accounts():
+    import boto3
+    from moto import mock_organizations
+
+    with mock_organizations():
+        client = boto3.client("organizations", region_name="us-east-1")
+        client.create_organization(FeatureSet="ALL")
+        account_ids = []
+        for elem in range(3):
+            account_id = client.create_account(
+                AccountName=f"inventory_account_{elem}",
+                Email=f"inventory_account_{elem}@noq.dev",
+            )["CreateAccountStatus"]["AccountId"]
+            client.tag_resource(
+                ResourceId=account_id, Tags=[{"Key": "team", "Value": f"team_{elem}"}]
+            )
+            account_ids.append(account_id)
+
+        yield client, account_ids
+
+
+@pytest.mark.asyncio
+async def test_get_org_account_inventory(org_client_with_accounts, tmp_path, mocker):
+    import iambic.core.utils as core_utils
+    import iambic.plugins.v0_1_0.aws.utils as utils
+
+    client, account_ids = org_client_with_accounts
+    mocker.patch.object(
+        core_utils, "get_writable_directory", return_value=str(tmp_path)
+    )
+    spy_fetch = mocker.spy(utils, "fetch_org_account_inventory")
+
+    # Only the tags of the requested accounts are retrieved
+    accounts = await utils.get_org_account_inventory(
+        client, "o-inventory", {account_ids[0]}
+    )
+    account_map = {account["Id"]: account for account in accounts}
+    assert account_map[account_ids[0]]["variables"] == [
+        {"key": "team", "value": "team_0"}
+    ]
+    assert account_map[account_ids[1]]["variables"] is None
+    assert spy_fetch.call_count == 1
+
+    # Served from the cache
+    await utils.get_org_account_inventory(client, "o-inventory", {account_ids[0]})
+    assert spy_fetch.call_count == 1
+
+    # Only the missing tags are retrieved
+    accounts = await utils.get_org_account_inventory(client, "o-inventory")
+    assert spy_fetch.call_count == 2
+    assert all(account["variables"] is not None for account in accounts)
+
+    # An account created since the inventory was cached is fetched right away
+    new_account_id = client.create_account(
+        AccountName="inventory_account_new", Email="inventory_account_new@noq.dev"
+    )["CreateAccountStatus"]["AccountId"]
+    accounts = await utils.get_org_account_inventory(
+        client, "o-inventory", {account_ids[0], new_account_id}
+    )
+    assert spy_fetch.call_count == 3
+    assert new_account_id in {account["Id"] for account in accounts}
+
+    # An expired inventory is refreshed before it's returned
+    inventory_path = utils.get_org_account_inventory_path("o-inventory")
+    inventory = core_utils.load_json_cache_file(inventory_path, "org account inventory")
+    inventory["updated_at"] -= utils.ORG_ACCOUNT_INVENTORY_TTL + 1
+    core_utils.save_json_cache_file(inventory_path, inventory)
+    await utils.get_org_account_inventory(client, "o-inventory")
+    assert spy_fetch.call_count == 4
+    assert (
+        core_utils.load_json_cache_file(inventory_path, "org account inventory")[
+            "updated_at"
+        ]
+        > inventory["updated_at"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_aws_read_cache():
+    import asyncio
+
+    from iambic.plugins.v0_1_0.aws.utils import AWSReadCache
+
+    calls = []
+
+    async def get_resource(resource_name: str, iam_client, include_policies=True):
+        calls.append(resource_name)
+        await asyncio.sleep(0.01)
+        return {"Name": resource_name, "Tags": []}
+
+    read_cache = AWSReadCache()
+    iam_client = Mock()
+
+    # Concurrent identical reads share a single request
+    responses = await asyncio.gather(
+        *[read_cache.get(get_resource, "role_a", iam_client) for _ in range(5)]
+    )
+    assert calls == ["role_a"]
+    assert all(response == {"Name": "role_a", "Tags": []} for response in responses)
+
+    # Every caller gets its own copy
+    responses[0]["Tags"].append("mutated")
+    assert (await read_cache.get(get_resource, "role_a", iam_client))["Tags"] == []
+
+    await read_cache.get(get_resource, "role_a", iam_client, include_policies=False)
+    await read_cache.get(get_resource, "arn:aws:iam::123456789012:role/role_a", None)
+    await read_cache.get(get_resource, "role_b", iam_client)
+    assert len(calls) == 4
+
+    assert read_cache.invalidate("role_a") == 3
+    await read_cache.get(get_resource, "role_a", iam_client)
+    await read_cache.get(get_resource, "role_b", iam_client)
+    assert len(calls) == 5
+
+
+@pytest.mark.asyncio
+async def test_iam_principal_change_set(mocker):
+    from iambic.core.models import ProposedChange, ProposedChangeType
+    from iambic.plugins.v0_1_0.aws.utils import AWSWriteLimiter, IAMPrincipalChangeSet
+
+    calls = []
+    in_flight = []
+
+    def write(action):
+        def _write(**kwargs):
+            in_flight.append(action)
+            calls.append((action, len(in_flight)))
+            time.sleep(0.01)
+            in_flight.remove(action)
+            if action == "put_role_policy":
+                raise Exception("LimitExceeded")
+
+        _write.__name__ = action
+        return _write
+
+    def get_changes(change_type: ProposedChangeType) -> list[ProposedChange]:
+        return [ProposedChange(change_type=change_type, resource_id="role")]
+
+    mock_sleep = mocker.patch(
+        "iambic.plugins.v0_1_0.aws.utils.asyncio.sleep", new_callable=mocker.AsyncMock
+    )
+    change_set = IAMPrincipalChangeSet(AWSWriteLimiter(concurrency=2))
+    change_set.add(
+        write("tag_role"), get_changes(ProposedChangeType.ATTACH), RoleName="role"
+    )
+    change_set.add(
+        write("attach_role_policy"),
+        get_changes(ProposedChangeType.ATTACH),
+        RoleName="role",
+    )
+    change_set.add(
+        write("put_role_policy"),
+        get_changes(ProposedChangeType.UPDATE),
+        RoleName="role",
+    )
+    change_set.remove(
+        write("detach_role_policy"),
+        get_changes(ProposedChangeType.DETACH),
+        RoleName="role",
+    )
+    change_set.remove(
+        write("delete_role_policy"),
+        get_changes(ProposedChangeType.DELETE),
+        settle_seconds=3,
+        RoleName="role",
+    )
+
+    changes = await change_set.execute()
+
+    # Removals run first, no more writes are in flight than the limiter allows
+    assert {action for action, _ in calls[:2]} == {
+        "detach_role_policy",
+        "delete_role_policy",
+    }
+    assert max(concurrent for _, concurrent in calls) <= 2
+    mock_sleep.assert_called_once_with(3)
+    assert [change.change_type for change in changes] == [
+        ProposedChangeType.DETACH,
+        ProposedChangeType.DELETE,
+        ProposedChangeType.ATTACH,
+        ProposedChangeType.ATTACH,
+        ProposedChangeType.UPDATE,
+    ]
+    assert changes[-1].exceptions_seen == ["LimitExceeded"]
+    # The change set is empty once executed
+    assert await change_set.execute() == []
@@ -11,6 +11,12 @@ import pytest
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import ec
 
+from iambic.core.change_stream import (
+    TemplateChangeCounts,
+    TemplateChangeStream,
+    template_change_stream,
+)
+from iambic.core.models import ProposedChange, TemplateChangeDetails
 from iambic.core.utils import jws_encode_with_past_time
 from iambic.plugins.v0_1_0.github.github import (
     BODY_MAX_LENGTH,
@@ -18,9 +24,11 @@ from iambic.plugins.v0_1_0.github.github import (
     MERGEABLE_STATE_CLEAN,
     HandleIssueCommentReturnCode,
     _post_artifact_to_companion_repository,
+    _process_template_changes,
     ensure_body_length_fits_github_spec,
     format_github_url,
     get_session_name,
+    handle_iambic_git_plan,
     handle_issue_comment,
     handle_pull_request,
     maybe_merge,
@@ -377,6 +385,7 @@ def test_issue_comment_with_git_plan(
     mock_repository.clone_from.return_value.head.commit.hexsha = (
         issue_comment_git_plan_context["sha"]
     )
+    mock_run_git_plan.return_value = TemplateChangeCounts()
     handle_issue_comment(mock_github_client, issue_comment_git_plan_context)
     assert mock_resolve_config_template_path.called
     assert mock_lint_git_changes.called
@@ -691,6 +700,134 @@ def test_post_artifact_to_companion_repository(
     assert html_url
 
 
+def test_process_template_changes_posts_plan_in_chunks(mock_github_client, tmp_path):
+    template_changes = [
+        TemplateChangeDetails(
+            resource_id=f"role-{elem}",
+            resource_type="aws:iam:role",
+            template_path=f"resources/aws/iam/role/role-{elem}.yaml",
+            proposed_changes=[
+                ProposedChange(
+                    change_type="Update",
+                    resource_id=f"role-{elem}",
+                    resource_type="aws:iam:role",
+                    attribute="description",
+                    current_value="before",
+                    new_value="after",
+                )
+            ],
+        )
+        for elem in range(100)
+    ]
+    stream_output = str(tmp_path / "proposed_changes.jsonl")
+    template_change_stream = TemplateChangeStream()
+    with template_change_stream.open(stream_output):
+        for template_change in template_changes:
+            template_change_stream.write(template_change)
+
+    mock_pull_request = MagicMock(name="pull_request")
+    with patch(
+        "iambic.plugins.v0_1_0.github.github._post_artifact_to_companion_repository",
+        return_value="https://fake-location/",
+    ):
+        _process_template_changes(
+            mock_github_client,
+            mock_github_client.get_repo("ExampleOrg/iambic-templates"),
+            mock_pull_request,
+            "1337",
+            str(tmp_path / "proposed_changes.yaml"),
+            [],
+            "plan",
+            stream_output=stream_output,
+            change_counts=template_change_stream.counts,
+        )
+
+    bodies = [
+        comment_call.args[0]
+        for comment_call in mock_pull_request.create_issue_comment.call_args_list
+    ]
+    assert len(bodies) > 1
+    assert all(len(body) <= BODY_MAX_LENGTH for body in bodies)
+    assert bodies[0].startswith(f"Reacting to `plan` (part 1 of {len(bodies)})")
+    assert "https://fake-location/" in bodies[-1]
+    # Every template is posted from the stream
+    assert all(
+        sum(f"role-{elem}.yaml" in body for body in bodies) == 1 for elem in range(100)
+    )
+
+
+def test_handle_iambic_git_plan_writes_plan_artifacts(
+    mock_github_client,
+    mock_resolve_config_template_path,
+    mock_load_config,
+    mock_lint_git_changes,
+    tmp_path,
+    monkeypatch,
+):
+    monkeypatch.chdir(tmp_path)
+    proposed_changes_path = str(tmp_path / "proposed_changes.yaml")
+    template_change = TemplateChangeDetails(
+        resource_id="role",
+        resource_type="aws:iam:role",
+        template_path="resources/aws/iam/role/role.yaml",
+        proposed_changes=[
+            ProposedChange(
+                change_type="Update",
+                resource_id="role",
+                attribute="description",
+                current_value="before",
+                new_value="after",
+            )
+        ],
+    )
+
+    async def plan_git_changes(*args, **kwargs):
+        return [template_change_stream.write(template_change.copy(deep=True))]
+
+    templates_repo = mock_github_client.get_repo("ExampleOrg/iambic-templates")
+    gist_repo = mock_github_client.get_repo.return_value
+    gist_repo.create_file.return_value = {"content": MagicMock(html_url="url")}
+    mock_pull_request = MagicMock(name="pull_request")
+    with patch(
+        "iambic.plugins.v0_1_0.github.github.get_lambda_repo_path",
+        return_value=str(tmp_path),
+    ), patch(
+        "iambic.plugins.v0_1_0.github.github.prepare_local_repo"
+    ) as mock_prepare_local_repo, patch(
+        "iambic.plugins.v0_1_0.github.github.SHARED_CONTAINER_GITHUB_DIRECTORY",
+        str(tmp_path / "shared"),
+    ), patch(
+        "iambic.main.check_and_update_resource_limit"
+    ), patch(
+        "iambic.main.plan_git_changes", side_effect=plan_git_changes
+    ):
+        mock_prepare_local_repo.return_value.head.commit.diff.return_value = []
+        return_code = handle_iambic_git_plan(
+            {},
+            mock_github_client,
+            templates_repo,
+            mock_pull_request,
+            "ExampleOrg/iambic-templates",
+            "1337",
+            "feature",
+            "https://github.com/ExampleOrg/iambic-templates.git",
+            proposed_changes_path=proposed_changes_path,
+        )
+
+    assert return_code == HandleIssueCommentReturnCode.PLANNED
+    with open(tmp_path / "proposed_changes.json") as f:
+        assert json.load(f) == [template_change.dict()]
+    assert (tmp_path / "shared" / "proposed_changes.yaml").exists()
+    uploaded_files = {
+        create_file_call.args[0].rsplit("/", 1)[-1]: create_file_call.args[2]
+        for create_file_call in gist_repo.create_file.call_args_list
+    }
+    assert json.loads(uploaded_files["proposed_changes.json"]) == [
+        template_change.dict()
+    ]
+    assert "role.yaml" in mock_pull_request.create_issue_comment.call_args.args[0]
+
+
 def test_ensure_body_length_fits_github_spec():
     blob_html_url = "https://fake-location/"
     body = "h" * (BODY_MAX_LENGTH + 1)
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import json
+import time
+from datetime import datetime, timedelta, timezone
 from unittest.mock import patch
 
 import pytest
 
 from iambic.plugins.v0_1_0.github.github_app import (
     _get_installation_token,
+    _installation_tokens,
     calculate_signature,
     run_handler,
     verify_signature,
@@ -189,3 +192,35 @@ async def test_get_installation_token(skip_authentication):
     with patch("aiohttp.ClientSession.post", return_value=resp):
         token = await _get_installation_token("fake_app_id", "fake_installation_id")
         assert token == "fake_token"
+
+
+@pytest.mark.asyncio
+async def test_get_installation_token_is_cached(skip_authentication):
+    expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
+    resp = MockResponse(
+        json.dumps(
+            {
+                "token": "fake_token",
+                "expires_at": expires_at.isoformat().replace("+00:00", "Z"),
+            }
+        ),
+        200,
+    )
+
+    with patch.dict(_installation_tokens, clear=True):
+        with patch("aiohttp.ClientSession.post", return_value=resp) as mock_post:
+            for _ in range(2):
+                token = await _get_installation_token(
+                    "fake_app_id", "fake_installation_id"
+                )
+                assert token == "fake_token"
+            assert mock_post.call_count == 1
+
+            # A token that expires before an event could be processed is replaced
+            _installation_tokens[("fake_app_id", "fake_installation_id")] = (
+                "old_token",
+                time.time() + 60,
+            )
+            token = await _get_installation_token("fake_app_id", "fake_installation_id")
+            assert token == "fake_token"
+            assert mock_post.call_count == 2
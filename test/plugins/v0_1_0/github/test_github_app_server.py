@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from iambic.config.dynamic_config import config_cache
+from iambic.core.git import git_mirrors
+from iambic.plugins.v0_1_0.github.github_app import calculate_signature
+from iambic.plugins.v0_1_0.github.github_app_server import GithubAppEventQueue, get_app
+
+WEBHOOK_SECRET = "e9aec442806878a2ab7bc0676c515e03c1a8ab59"
+
+
+@pytest.fixture()
+def event_queue():
+    event_queue = GithubAppEventQueue(maxsize=2)
+    with patch(
+        "iambic.plugins.v0_1_0.github.github_app_server.github_app_event_queue",
+        event_queue,
+    ), patch(
+        "iambic.plugins.v0_1_0.github.github_app.get_app_webhook_secret_as_lambda_context",
+        return_value=WEBHOOK_SECRET,
+    ):
+        yield event_queue
+
+
+def get_signed_headers(body: str, **headers) -> dict:
+    return {
+        "X-Hub-Signature-256": f"sha256={calculate_signature(WEBHOOK_SECRET, body)}",
+        **headers,
+    }
+
+
+@pytest.mark.asyncio
+async def test_github_app_server_queues_signed_events(event_queue):
+    webhook_body = json.dumps({"installation": {"id": "fake-installation-id"}})
+    cron_body = json.dumps({"command": "detect"})
+
+    async with TestClient(TestServer(get_app())) as client:
+        resp = await client.post(
+            "/",
+            data=webhook_body,
+            headers=get_signed_headers(webhook_body, **{"X-GitHub-Event": "push"}),
+        )
+        assert resp.status == 202
+
+        resp = await client.post(
+            "/events", data=cron_body, headers=get_signed_headers(cron_body)
+        )
+        assert resp.status == 202
+
+        resp = await client.post(
+            "/events", data=cron_body, headers=get_signed_headers(cron_body)
+        )
+        assert resp.status == 503
+
+        resp = await client.post(
+            "/events",
+            data=cron_body,
+            headers={"X-Hub-Signature-256": "sha256=bad-signature"},
+        )
+        assert resp.status == 401
+
+    webhook_event = event_queue.queue.get_nowait()
+    assert webhook_event["rawBody"] == webhook_body
+    assert webhook_event["headers"]["x-github-event"] == "push"
+    assert event_queue.queue.get_nowait() == {
+        "command": "detect",
+        "source": "EventBridgeCron",
+    }
+
+
+def test_github_app_event_queue_cleans_up_each_event(
+    event_queue, tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    event_directories = []
+
+    def run_handler(event):
+        event_directories.append(tempfile.mkdtemp(prefix="lambda"))
+        os.chdir(event_directories[-1])
+        raise Exception("handler failed")
+
+    event_queue.working_directory = str(tmp_path)
+    # Keep the repos the handler expects to be fresh out of the home directory
+    monkeypatch.setattr(
+        "iambic.lambda.app.REPO_BASE_PATH", str(tmp_path / "repos"), raising=True
+    )
+    with patch(
+        "iambic.plugins.v0_1_0.github.github_app_server.run_handler",
+        side_effect=run_handler,
+    ):
+        event_queue.start()
+        try:
+            for _ in range(2):
+                event_queue.put({"source": "EventBridgeCron", "command": "detect"})
+            event_queue.queue.join()
+        finally:
+            event_queue.stop()
+
+    # A failed event does not stop the worker
+    assert len(event_directories) == 2
+    assert not any(os.path.exists(directory) for directory in event_directories)
+    assert os.getcwd() == str(tmp_path)
+    assert not config_cache.enabled
+    assert not git_mirrors.enabled
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import datetime
+from unittest.mock import patch
+
+import pytest
+
+from iambic.core.expiry_index import ExpiryIndex, get_expiry_entries
+from iambic.core.parser import load_templates
+from iambic.plugins.v0_1_0.aws.iam.role.models import AwsIamRoleTemplate
+from iambic.request_handler.expire_resources import flag_expired_resources
+
+TEMPLATE_MAP = {
+    AwsIamRoleTemplate.__fields__["template_type"].default: AwsIamRoleTemplate
+}
+
+
+def get_template(file_path: str, expires_at: datetime.datetime) -> AwsIamRoleTemplate:
+    return AwsIamRoleTemplate(
+        file_path=file_path,
+        identifier="role",
+        properties={
+            "role_name": "role",
+            "inline_policies": [
+                {
+                    "policy_name": policy_name,
+                    "expires_at": expires_at if policy_name == "expiring" else None,
+                    "statement": [
+                        {"action": "s3:GetObject", "effect": "Allow", "resource": "*"}
+                    ],
+                }
+                for policy_name in ("expiring", "permanent")
+            ],
+        },
+    )
+
+
+@pytest.fixture
+def expiry_index(tmp_path):
+    expiry_index = ExpiryIndex(str(tmp_path / "expiry_index.json"))
+    with patch("iambic.core.models.expiry_index", expiry_index), patch(
+        "iambic.request_handler.expire_resources.expiry_index", expiry_index
+    ):
+        yield expiry_index
+
+
+@pytest.mark.asyncio
+async def test_flag_expired_resources_uses_expiry_index(tmp_path, expiry_index):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    file_path = str(tmp_path / "role.yaml")
+    template = get_template(file_path, now + datetime.timedelta(days=1))
+    template.write()
+
+    assert get_expiry_entries(template) == [
+        (
+            "$.properties.inline_policies[0]",
+            template.properties.inline_policies[0].expires_at.timestamp(),
+        )
+    ]
+    assert expiry_index.is_indexed(file_path)
+
+    with patch(
+        "iambic.request_handler.expire_resources.load_templates",
+        side_effect=load_templates,
+    ) as mock_load_templates:
+        # Nothing has expired so the template isn't loaded
+        await flag_expired_resources([file_path], TEMPLATE_MAP)
+        assert mock_load_templates.call_count == 0
+
+        # Once expired, the template is loaded and the expired policy removed
+        get_template(file_path, now - datetime.timedelta(days=1)).write()
+        await flag_expired_resources([file_path], TEMPLATE_MAP)
+        assert mock_load_templates.call_count == 1
+        template = AwsIamRoleTemplate.load(file_path)
+        assert [
+            policy.policy_name for policy in template.properties.inline_policies
+        ] == ["permanent"]
+        # The index is persisted by the sweep
+        assert ExpiryIndex(expiry_index.file_path).entries[file_path] == {
+            "file_signature": expiry_index.get_file_signature(file_path),
+            "expires_at": [],
+        }
+
+        await flag_expired_resources([file_path], TEMPLATE_MAP)
+        assert mock_load_templates.call_count == 1
+
+        # Changed outside of iambic, e.g. by a git pull, so the template is loaded again
+        with open(file_path, "a") as f:
+            f.write("\n")
+        assert not expiry_index.is_indexed(file_path)
+        await flag_expired_resources([file_path], TEMPLATE_MAP)
+        assert mock_load_templates.call_count == 2
+        assert expiry_index.is_indexed(file_path)
@@ -1,16 +1,20 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import os
 import shutil
 import tempfile
 
 import pytest
+from click.testing import CliRunner
 
 import iambic.plugins.v0_1_0.example
 from iambic.config.dynamic_config import load_config
+from iambic.core.models import TemplateChangeDetails
+from iambic.core.telemetry import telemetry
 from iambic.core.utils import gather_templates
-from iambic.main import ctx, run_apply
+from iambic.main import cli, ctx, get_import_time_report, run_apply, run_plan
 
 TEST_TEMPLATE_YAML = """template_type: NOQ::Example::LocalFile
 name: test_template
@@ -83,3 +87,83 @@ def test_run_apply(mock_context, example_test_filesystem):
     with open(f"{repo_dir}/{TEST_TEMPLATE_PATH}", "r") as f:
         after_template_content = "\n".join(f.readlines())
     assert "tomorrow" not in after_template_content
+
+
+def test_profile_startup():
+    result = CliRunner().invoke(cli, ["--profile-startup"])
+    assert result.exit_code == 0
+    assert result.output.startswith("Startup import time: ")
+    assert "iambic.main" in result.output
+
+    # The wizard is only imported by the setup command
+    _, module_times = get_import_time_report(limit=None)
+    imported_modules = {module_time[2].strip() for module_time in module_times}
+    assert "iambic.config.dynamic_config" in imported_modules
+    assert "iambic.config.wizard" not in imported_modules
+
+
+def test_telemetry_dir(example_test_filesystem, tmp_path, monkeypatch):
+    _, repo_dir = example_test_filesystem
+    monkeypatch.setattr(telemetry, "enabled", False)
+    monkeypatch.setattr(telemetry, "spans", [])
+    # lint sets these on the shared context
+    monkeypatch.setattr(ctx, "eval_only", ctx.eval_only)
+    monkeypatch.setattr(ctx, "command", ctx.command)
+
+    result = CliRunner().invoke(
+        cli, ["--telemetry-dir", str(tmp_path), "lint", "--repo-dir", repo_dir]
+    )
+    assert result.exit_code == 0, result.output
+
+    with open(tmp_path / "telemetry_summary.json") as f:
+        summary = json.load(f)
+    assert {
+        "load_config",
+        "gather_templates",
+        "load_templates",
+        "write_template",
+    }.issubset(summary["phases"])
+    assert os.path.exists(tmp_path / "telemetry_trace.json")
+
+
+def test_run_plan_stream_output(example_test_filesystem, tmp_path, monkeypatch):
+    _, repo_dir = example_test_filesystem
+    monkeypatch.setattr(ctx, "eval_only", ctx.eval_only)
+    monkeypatch.chdir(tmp_path)
+    stream_output = str(tmp_path / "proposed_changes.jsonl")
+
+    run_plan(
+        [f"{repo_dir}/{TEST_TEMPLATE_PATH}"],
+        repo_dir=repo_dir,
+        stream_output=stream_output,
+    )
+
+    with open(stream_output) as f:
+        template_changes = [json.loads(line) for line in f]
+    assert len(template_changes) == 1
+    assert template_changes[0]["template_path"] == f"{repo_dir}/{TEST_TEMPLATE_PATH}"
+
+    # The same outputs as a plan that isn't streamed are written
+    with open("proposed_changes.json") as f:
+        assert json.load(f) == [
+            TemplateChangeDetails.parse_obj(template_change).dict()
+            for template_change in template_changes
+        ]
+    assert os.path.exists("proposed_changes.txt")
+
+
+def test_run_plan_account_scope(example_test_filesystem, tmp_path, monkeypatch):
+    _, repo_dir = example_test_filesystem
+    monkeypatch.setattr(ctx, "eval_only", ctx.eval_only)
+    stream_output = str(tmp_path / "proposed_changes.jsonl")
+
+    # The example templates aren't applied to any account
+    run_plan(
+        [f"{repo_dir}/{TEST_TEMPLATE_PATH}"],
+        repo_dir=repo_dir,
+        stream_output=stream_output,
+        accounts=["dev-*"],
+    )
+
+    with open(stream_output) as f:
+        assert not f.read()